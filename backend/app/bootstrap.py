@@ -0,0 +1,126 @@
+"""
+Schema creation and seed data, run once per deploy.
+
+    python -m app.bootstrap
+
+Importing ``app.main`` used to do all of this in every API worker and test
+process. Deployments now run this command before starting the workers and
+set ``DATABASE_BOOTSTRAP_ON_STARTUP=0``; with the default of 1 the API runs it
+from its startup hook instead, still never at import time.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from .database import Base, SessionLocal, engine
+from .services.asset_fixity import ensure_asset_fixity_column
+from .services.asset_projection import backfill_asset_projection, ensure_asset_projection_columns
+from .services.auth import seed_auth_data_if_changed
+from .services.search_index import ensure_search_indexes
+
+
+def _ensure_sqlite_schema_compatibility(bind: Engine) -> None:
+    if bind.dialect.name != "sqlite":
+        return
+
+    inspector = inspect(bind)
+    existing_columns = {column["name"] for column in inspector.get_columns("assets")}
+    statements: list[str] = []
+    if "visibility_scope" not in existing_columns:
+        statements.append("ALTER TABLE assets ADD COLUMN visibility_scope VARCHAR DEFAULT 'open'")
+    if "collection_object_id" not in existing_columns:
+        statements.append("ALTER TABLE assets ADD COLUMN collection_object_id INTEGER")
+    if "image_record_id" not in existing_columns:
+        statements.append("ALTER TABLE assets ADD COLUMN image_record_id INTEGER")
+
+    if "image_records" in inspector.get_table_names():
+        image_record_columns = {column["name"] for column in inspector.get_columns("image_records")}
+        if "sheet_id" not in image_record_columns:
+            statements.append("ALTER TABLE image_records ADD COLUMN sheet_id INTEGER")
+        if "line_no" not in image_record_columns:
+            statements.append("ALTER TABLE image_records ADD COLUMN line_no INTEGER")
+
+    with bind.begin() as connection:
+        for statement in statements:
+            connection.execute(text(statement))
+        connection.execute(
+            text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_assets_image_record_id "
+                "ON assets(image_record_id) WHERE image_record_id IS NOT NULL"
+            )
+        )
+        connection.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_image_records_sheet_id "
+                "ON image_records(sheet_id)"
+            )
+        )
+
+
+def _ensure_query_indexes(bind: Engine) -> None:
+    # ``create_all`` skips columns and indexes on tables that already exist.
+    ensure_asset_fixity_column(bind)
+    ensure_asset_projection_columns(bind)
+    ensure_search_indexes(bind)
+    with bind.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_assets_created_at_id "
+                "ON assets(created_at, id)"
+            )
+        )
+
+
+def initialize_schema(bind: Engine = engine) -> None:
+    Base.metadata.create_all(bind=bind)
+    _ensure_sqlite_schema_compatibility(bind)
+    _ensure_query_indexes(bind)
+
+
+def project_asset_metadata(bind: Engine = engine) -> int:
+    """Fill the projected asset columns of rows written before they existed; returns how many were filled."""
+    with SessionLocal(bind=bind) as session:
+        return backfill_asset_projection(session, missing_only=True)
+
+
+def seed_database(bind: Engine = engine, *, force: bool = False) -> bool:
+    """Apply the auth seed if its definitions changed since the last run; returns whether it ran."""
+    with SessionLocal(bind=bind) as session:
+        return seed_auth_data_if_changed(session, force=force)
+
+
+def bootstrap_database(bind: Engine = engine, *, force_seed: bool = False) -> dict[str, float | int | bool]:
+    started = time.perf_counter()
+    initialize_schema(bind)
+    projected = project_asset_metadata(bind)
+    schema_done = time.perf_counter()
+    seeded = seed_database(bind, force=force_seed)
+    return {
+        "schema_ms": round((schema_done - started) * 1000, 1),
+        "projected_assets": projected,
+        "seed_ms": round((time.perf_counter() - schema_done) * 1000, 1),
+        "seeded": seeded,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Create or upgrade the database schema and apply seed data.")
+    parser.add_argument("--force-seed", action="store_true", help="Re-apply the seed even if its fingerprint is unchanged.")
+    args = parser.parse_args()
+
+    result = bootstrap_database(force_seed=args.force_seed)
+    seed_status = "applied" if result["seeded"] else "unchanged, skipped"
+    print(
+        f"schema ready in {result['schema_ms']}ms ({result['projected_assets']} assets projected); "
+        f"seed {seed_status} in {result['seed_ms']}ms",
+        flush=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 from celery import Celery
 
-from .config import REDIS_URL
+from .config import IIIF_TILE_CACHE_GC_INTERVAL_SECONDS, PREVIEW_CACHE_GC_INTERVAL_SECONDS, REDIS_URL
 
 celery_app = Celery(
     "meam_worker",
@@ -12,6 +12,20 @@ celery_app = Celery(
 # Optional configuration, see the application user guide.
 celery_app.conf.update(
     result_expires=3600,
+    beat_schedule={
+        "collect-preview-garbage": {
+            "task": "app.tasks.collect_preview_garbage",
+            "schedule": float(PREVIEW_CACHE_GC_INTERVAL_SECONDS),
+        },
+        "collect-iiif-tile-cache-garbage": {
+            "task": "app.tasks.collect_iiif_tile_cache_garbage",
+            "schedule": float(IIIF_TILE_CACHE_GC_INTERVAL_SECONDS),
+        },
+        "expire-resumable-uploads": {
+            "task": "app.tasks.expire_resumable_uploads",
+            "schedule": 3600.0,
+        },
+    },
 )
 
 if __name__ == "__main__":
@@ -1,4 +1,5 @@
 import os
+import secrets
 from pathlib import Path
 
 
@@ -46,6 +47,73 @@ API_PUBLIC_URL = os.getenv("API_PUBLIC_URL", "http://localhost:3000/api")
 CANTALOUPE_PUBLIC_URL = os.getenv("CANTALOUPE_PUBLIC_URL", "http://localhost:8182/iiif/2")
 CANTALOUPE_INTERNAL_URL = os.getenv("CANTALOUPE_INTERNAL_URL") or CANTALOUPE_PUBLIC_URL
 
+# Schema creation and seeding belong to ``python -m app.bootstrap``; run it once
+# per deploy and set this to 0 so API workers start without touching the schema.
+DATABASE_BOOTSTRAP_ON_STARTUP = os.getenv("DATABASE_BOOTSTRAP_ON_STARTUP", "1") == "1"
+
+# "async" streams tiles through one shared pooled client; "sync" keeps the
+# legacy one-request-per-tile proxy for comparison and rollback.
+IIIF_PROXY_MODE = os.getenv("IIIF_PROXY_MODE", "async").strip().lower()
+IIIF_UPSTREAM_MAX_CONNECTIONS = int(os.getenv("IIIF_UPSTREAM_MAX_CONNECTIONS", "64"))
+IIIF_UPSTREAM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("IIIF_UPSTREAM_MAX_KEEPALIVE_CONNECTIONS", "32"))
+IIIF_UPSTREAM_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("IIIF_UPSTREAM_KEEPALIVE_EXPIRY_SECONDS", "30"))
+
+# "cantaloupe" proxies pixels to the Cantaloupe service; "native" renders
+# IIIF Image API 2.1 level 1 responses in-process from the pyramidal TIFFs.
+IIIF_IMAGE_SERVER = os.getenv("IIIF_IMAGE_SERVER", "cantaloupe").strip().lower()
+IIIF_NATIVE_MAX_WORKERS = int(os.getenv("IIIF_NATIVE_MAX_WORKERS", str(os.cpu_count() or 4)))
+IIIF_NATIVE_JPEG_QUALITY = int(os.getenv("IIIF_NATIVE_JPEG_QUALITY", "85"))
+
+# Tile/info.json cache. The disk cache defaults to UPLOAD_DIR/.cache/iiif-tiles
+# so every worker on the same volume shares it; 0 bytes disables a level.
+IIIF_TILE_CACHE_MEMORY_BYTES = int(os.getenv("IIIF_TILE_CACHE_MEMORY_BYTES", str(64 * 1024 * 1024)))
+IIIF_TILE_CACHE_DISK_BYTES = int(os.getenv("IIIF_TILE_CACHE_DISK_BYTES", str(2 * 1024 * 1024 * 1024)))
+IIIF_TILE_CACHE_DIR = os.getenv("IIIF_TILE_CACHE_DIR", "")
+IIIF_TILE_CACHE_MAX_ENTRY_BYTES = int(os.getenv("IIIF_TILE_CACHE_MAX_ENTRY_BYTES", str(4 * 1024 * 1024)))
+IIIF_TILE_CACHE_MAX_AGE_SECONDS = int(os.getenv("IIIF_TILE_CACHE_MAX_AGE_SECONDS", str(365 * 24 * 60 * 60)))
+# The disk budget is enforced by a periodic task, so it can be overshot by
+# whatever the workers write between two runs.
+IIIF_TILE_CACHE_GC_INTERVAL_SECONDS = int(os.getenv("IIIF_TILE_CACHE_GC_INTERVAL_SECONDS", "600"))
+
+# Manifests sign short-lived tile capabilities with this key. Without an
+# explicit secret each process gets its own, so tokens minted by another
+# worker fall back to the regular session check instead of failing.
+IIIF_CAPABILITY_SECRET = os.getenv("IIIF_CAPABILITY_SECRET") or secrets.token_hex(32)
+# Expiry is rounded up to whole windows of this length: a capability URL is
+# valid for between one and two TTLs after the manifest handed it out.
+IIIF_CAPABILITY_TTL_SECONDS = int(os.getenv("IIIF_CAPABILITY_TTL_SECONDS", "3600"))
+
+# Resolved session users are cached per process for this long. Logout and role
+# or scope edits clear the entry in the process that handled them; other
+# workers may keep it until the TTL runs out. 0 disables the cache.
+SESSION_USER_CACHE_TTL_SECONDS = float(os.getenv("SESSION_USER_CACHE_TTL_SECONDS", "30"))
+SESSION_USER_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_USER_CACHE_MAX_ENTRIES", "4096"))
+
+# Identical concurrent tile/info.json/preview work is always collapsed within a
+# process; with file locks (off by default) the leader is also shared across
+# worker processes.
+SINGLE_FLIGHT_FILE_LOCKS = os.getenv("SINGLE_FLIGHT_FILE_LOCKS", "0") == "1"
+
+# Longest-edge sizes of the preview renditions rendered when an asset becomes ready.
+PREVIEW_LADDER_SIZES = tuple(
+    int(size) for size in os.getenv("PREVIEW_LADDER_SIZES", "150,400,800,1600").split(",") if size.strip()
+)
+# Disk budget for UPLOAD_DIR/previews; the periodic garbage collector first drops
+# previews of replaced sources and deleted assets, then least recently used files.
+PREVIEW_CACHE_MAX_BYTES = int(os.getenv("PREVIEW_CACHE_MAX_BYTES", str(5 * 1024 * 1024 * 1024)))
+PREVIEW_CACHE_GC_INTERVAL_SECONDS = int(os.getenv("PREVIEW_CACHE_GC_INTERVAL_SECONDS", "3600"))
+# Previews younger than this are never collected, so in-flight responses keep their file.
+PREVIEW_CACHE_MIN_AGE_SECONDS = int(os.getenv("PREVIEW_CACHE_MIN_AGE_SECONDS", "300"))
+
+# Resumable (chunked) uploads: idle sessions are removed after the TTL.
+RESUMABLE_UPLOAD_TTL_SECONDS = int(os.getenv("RESUMABLE_UPLOAD_TTL_SECONDS", str(24 * 60 * 60)))
+RESUMABLE_UPLOAD_MAX_BYTES = int(os.getenv("RESUMABLE_UPLOAD_MAX_BYTES", str(64 * 1024 * 1024 * 1024)))
+
+# Long-lived `exiftool -stay_open` processes per API/worker process; 0 runs one ExifTool per file.
+EXIFTOOL_POOL_SIZE = int(os.getenv("EXIFTOOL_POOL_SIZE", "2"))
+# A request that takes longer restarts its ExifTool process.
+EXIFTOOL_TIMEOUT_SECONDS = float(os.getenv("EXIFTOOL_TIMEOUT_SECONDS", "120"))
+
 # Moonshot (Kimi) is OpenAI-compatible. Keep the OPENAI_* names for backwards
 # compatibility, but default them to Moonshot when dedicated Moonshot values are
 # not provided.
@@ -70,3 +138,18 @@ FACE_RECOGNITION_INDEX_DIR = os.getenv(
     str((FACE_RUNTIME_ROOT / "index").resolve()),
 )
 FACE_RECOGNITION_STRICT_LOCAL_MODELS = os.getenv("FACE_RECOGNITION_STRICT_LOCAL_MODELS", "1") == "1"
+# Galleries with at least this many clusters use the IVF index built by
+# scripts/build_face_ann_index.py, probing FACE_RECOGNITION_ANN_NPROBE lists
+# per face; smaller galleries, or stores without one, are searched exactly.
+FACE_RECOGNITION_ANN_MIN_CLUSTERS = int(os.getenv("FACE_RECOGNITION_ANN_MIN_CLUSTERS", "20000"))
+FACE_RECOGNITION_ANN_NPROBE = int(os.getenv("FACE_RECOGNITION_ANN_NPROBE", "16"))
+# Records per batch task when a whole sheet is recognised, and images decoded
+# ahead of detection inside one batch.
+FACE_RECOGNITION_BATCH_SIZE = int(os.getenv("FACE_RECOGNITION_BATCH_SIZE", "16"))
+FACE_RECOGNITION_DECODE_WORKERS = int(os.getenv("FACE_RECOGNITION_DECODE_WORKERS", "4"))
+# Longest side, in pixels, that images are decoded at for face recognition.
+# Detection runs at 640x640 regardless, so this only bounds the crops the
+# embeddings are taken from; 0 decodes the full original.
+FACE_RECOGNITION_DECODE_MAX_SIDE = int(os.getenv("FACE_RECOGNITION_DECODE_MAX_SIDE", "2048"))
+# Load the models in every new worker process instead of on its first task.
+FACE_RECOGNITION_WARM_UP = os.getenv("FACE_RECOGNITION_WARM_UP", "1") == "1"
@@ -1,9 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import inspect, text
 
-from .database import Base, engine
-from .database import SessionLocal
+from . import config
 from .routers.auth import router as auth_router
 from .routers.assets import router as assets_router
 from .routers.applications import router as applications_router
@@ -15,51 +13,17 @@ from .routers.ingest import router as ingest_router
 from .routers.image_records import router as image_records_router
 from .routers.platform import router as platform_router
 from .routers.three_d import router as three_d_router
-from .services.auth import seed_auth_data
+from .routers.uploads import router as uploads_router
+from .services.iiif_image_server import shutdown_iiif_render_executor
+from .services.iiif_upstream import close_iiif_upstream_client
+from .utils.exiftool_pool import close_exiftool_pool
 
 
-def _ensure_sqlite_schema_compatibility() -> None:
-    if engine.dialect.name != "sqlite":
-        return
+def _bootstrap_database_on_startup() -> None:
+    from .bootstrap import bootstrap_database
 
-    inspector = inspect(engine)
-    existing_columns = {column["name"] for column in inspector.get_columns("assets")}
-    statements: list[str] = []
-    if "visibility_scope" not in existing_columns:
-        statements.append("ALTER TABLE assets ADD COLUMN visibility_scope VARCHAR DEFAULT 'open'")
-    if "collection_object_id" not in existing_columns:
-        statements.append("ALTER TABLE assets ADD COLUMN collection_object_id INTEGER")
-    if "image_record_id" not in existing_columns:
-        statements.append("ALTER TABLE assets ADD COLUMN image_record_id INTEGER")
+    bootstrap_database()
 
-    if "image_records" in inspector.get_table_names():
-        image_record_columns = {column["name"] for column in inspector.get_columns("image_records")}
-        if "sheet_id" not in image_record_columns:
-            statements.append("ALTER TABLE image_records ADD COLUMN sheet_id INTEGER")
-        if "line_no" not in image_record_columns:
-            statements.append("ALTER TABLE image_records ADD COLUMN line_no INTEGER")
-
-    with engine.begin() as connection:
-        for statement in statements:
-            connection.execute(text(statement))
-        connection.execute(
-            text(
-                "CREATE UNIQUE INDEX IF NOT EXISTS uq_assets_image_record_id "
-                "ON assets(image_record_id) WHERE image_record_id IS NOT NULL"
-            )
-        )
-        connection.execute(
-            text(
-                "CREATE INDEX IF NOT EXISTS ix_image_records_sheet_id "
-                "ON image_records(sheet_id)"
-            )
-        )
-
-# Initialize DB tables
-Base.metadata.create_all(bind=engine)
-_ensure_sqlite_schema_compatibility()
-with SessionLocal() as session:
-    seed_auth_data(session)
 
 app = FastAPI(title="MEAM Prototype API")
 
@@ -72,6 +36,12 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+if config.DATABASE_BOOTSTRAP_ON_STARTUP:
+    app.add_event_handler("startup", _bootstrap_database_on_startup)
+app.add_event_handler("shutdown", close_iiif_upstream_client)
+app.add_event_handler("shutdown", shutdown_iiif_render_executor)
+app.add_event_handler("shutdown", close_exiftool_pool)
+
 app.include_router(health_router)
 app.include_router(auth_router)
 app.include_router(assets_router)
@@ -82,4 +52,5 @@ app.include_router(downloads_router)
 app.include_router(ingest_router)
 app.include_router(image_records_router)
 app.include_router(three_d_router)
+app.include_router(uploads_router)
 app.include_router(platform_router)
@@ -1,10 +1,14 @@
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, JSON, String
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, JSON, String, Text, event
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Session, relationship
 from .database import Base
 
 class Asset(Base):
     __tablename__ = "assets"
+    __table_args__ = (
+        # Serves the newest-first keyset pagination of GET /assets.
+        Index("ix_assets_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String, index=True)
@@ -14,6 +18,8 @@ class Asset(Base):
     visibility_scope = Column(String, default="open", index=True)
     collection_object_id = Column(Integer, index=True, nullable=True)
     image_record_id = Column(Integer, ForeignKey("image_records.id", ondelete="SET NULL"), unique=True, index=True, nullable=True)
+    # Lower-case hex SHA-256 of the original, for exact duplicate lookups.
+    fixity_sha256 = Column(String(64), index=True, nullable=True)
     metadata_info = Column(JSON, nullable=True)  # Store Exif/IPTC as JSON
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     resource_type = Column(String, default="image_2d_cultural_object")
@@ -21,8 +27,63 @@ class Asset(Base):
     
     # Status: processing, ready, error
     status = Column(String, default="processing")
+
+    # Projection of hot metadata_info fields, maintained by services.asset_projection.
+    title = Column(String, index=True, nullable=True)
+    profile_key = Column(String, index=True, nullable=True)
+    object_number = Column(String, index=True, nullable=True)
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    iiif_access_file_path = Column(String, nullable=True)
+    derivative_rule_id = Column(String, index=True, nullable=True)
+    preview_enabled = Column(Boolean, index=True, nullable=True)
+    # Lower-cased text behind /platform/resources?q=, indexed per dialect by services.search_index.
+    search_text = Column(Text, nullable=True)
+
     application_items = relationship("ApplicationItem", back_populates="asset")
     image_record = relationship("ImageRecord", back_populates="asset", uselist=False)
+    # Bulky source metadata (the ExifTool dump), loaded only by the detail view.
+    source_metadata_record = relationship(
+        "AssetSourceMetadata",
+        back_populates="asset",
+        uselist=False,
+        cascade="all, delete-orphan",
+    )
+
+
+class AssetSourceMetadata(Base):
+    __tablename__ = "asset_source_metadata"
+
+    asset_id = Column(Integer, ForeignKey("assets.id", ondelete="CASCADE"), primary_key=True)
+    # ``raw_metadata`` keys moved off ``assets.metadata_info``; see services.asset_source_metadata.
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    asset = relationship("Asset", back_populates="source_metadata_record")
+
+
+@event.listens_for(Session, "before_flush")
+def _sync_derived_columns(session, _flush_context, _instances) -> None:
+    from .services.asset_projection import sync_asset_projection
+    from .services.search_index import build_image_record_search_text
+
+    for instance in (*session.new, *session.dirty):
+        if isinstance(instance, Asset):
+            sync_asset_projection(instance)
+        elif isinstance(instance, ImageRecord):
+            search_text = build_image_record_search_text(instance)
+            if instance.search_text != search_text:
+                instance.search_text = search_text
+
+
+class BootstrapState(Base):
+    """Fingerprints of the seed data last applied by ``app.bootstrap``."""
+
+    __tablename__ = "bootstrap_state"
+
+    key = Column(String, primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    applied_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
 class User(Base):
@@ -155,6 +216,7 @@ class ImageRecord(Base):
     collection_object_id = Column(Integer, index=True, nullable=True)
     profile_key = Column(String, default="other", index=True)
     metadata_info = Column(JSON, nullable=True)
+    search_text = Column(Text, nullable=True)
     created_by_user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), index=True, nullable=True)
     submitted_by_user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), index=True, nullable=True)
     assigned_photographer_user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), index=True, nullable=True)
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import Annotated
 
-from fastapi import Cookie, Depends, Header, HTTPException, status
+from fastapi import Cookie, Depends, Header, HTTPException, Request, status
+from sqlalchemy import and_, false, func, or_
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
 
 from .database import get_db
 from .models import User
-from .services.auth import DEFAULT_USERS, get_user_by_session_token
+from .services.auth import DEFAULT_USERS, get_active_session
+from .services.session_user_cache import get_session_user_cache
 
 PermissionName = str
 RoleName = str
@@ -151,6 +154,37 @@ def _build_current_user_from_db_user(user: User) -> CurrentUser:
     )
 
 
+def _copy_current_user(user: CurrentUser) -> CurrentUser:
+    return replace(
+        user,
+        roles=set(user.roles),
+        permissions=set(user.permissions),
+        collection_scope=set(user.collection_scope),
+    )
+
+
+def _resolve_session_user(db: Session, token: str) -> CurrentUser:
+    """The user behind ``token``; a warm cache hit costs no queries."""
+    cache = get_session_user_cache()
+    cached = cache.get(token)
+    if cached is not None:
+        return _copy_current_user(cached)
+
+    generation = cache.generation
+    session = get_active_session(db, token)
+    if session is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired session token")
+    current_user = _build_current_user_from_db_user(session.user)
+    cache.put(
+        token,
+        _copy_current_user(current_user),
+        user_pk=session.user_id,
+        session_expires_at=session.expires_at,
+        generation=generation,
+    )
+    return current_user
+
+
 def build_system_user() -> CurrentUser:
     roles = {"system_admin"}
     return CurrentUser(
@@ -186,16 +220,10 @@ def get_current_user(
     if authorization:
         scheme, _, token = authorization.partition(" ")
         if scheme.lower() == "bearer" and token:
-            user = get_user_by_session_token(db, token.strip())
-            if user is None:
-                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired session token")
-            return _build_current_user_from_db_user(user)
+            return _resolve_session_user(db, token.strip())
 
     if session_token:
-        user = get_user_by_session_token(db, session_token.strip())
-        if user is None:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired session token")
-        return _build_current_user_from_db_user(user)
+        return _resolve_session_user(db, session_token.strip())
 
     if x_mdams_user:
         legacy_scope = _parse_collection_scope(x_mdams_collection_scope)
@@ -207,6 +235,17 @@ def get_current_user(
 CurrentUserDep = Annotated[CurrentUser, Depends(get_current_user)]
 
 
+def get_current_user_from_request(db: Session, request: Request) -> CurrentUser:
+    """Resolve the caller outside dependency injection, for routes that authenticate lazily."""
+    return get_current_user(
+        db=db,
+        authorization=request.headers.get("authorization"),
+        session_token=request.cookies.get("mdams.session"),
+        x_mdams_user=request.headers.get("x-mdams-user"),
+        x_mdams_collection_scope=request.headers.get("x-mdams-collection-scope"),
+    )
+
+
 def ensure_current_user(value: object) -> CurrentUser:
     return value if isinstance(value, CurrentUser) else build_system_user()
 
@@ -252,3 +291,30 @@ def can_access_visibility_scope(
             return False
         return collection_object_id in user.collection_scope
     return False
+
+
+def visibility_scope_clause(
+    user: CurrentUser,
+    *,
+    visibility_scope_column,
+    collection_object_id_column,
+) -> ColumnElement[bool]:
+    """``can_access_visibility_scope`` as a SQL predicate over the given columns.
+
+    A NULL or blank scope counts as open here; callers whose rows may carry the
+    scope elsewhere (e.g. in metadata) have to recheck those rows in Python.
+    """
+    normalized_scope = func.lower(func.trim(func.coalesce(visibility_scope_column, "open")))
+    clauses: list[ColumnElement[bool]] = []
+    if user.has_permission("image.view") or user.has_permission("three_d.view"):
+        clauses.append(normalized_scope.in_(("open", "")))
+    if user.has_permission("system.manage"):
+        clauses.append(normalized_scope == "owner_only")
+    elif user.collection_scope:
+        clauses.append(
+            and_(
+                normalized_scope == "owner_only",
+                collection_object_id_column.in_(sorted(user.collection_scope)),
+            )
+        )
+    return or_(*clauses) if clauses else false()
@@ -1,14 +1,129 @@
 from __future__ import annotations
 
+import base64
+import json
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import total_ordering
+from typing import Any
 
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
 
 from ..schemas import (
     UnifiedResourceDetail,
     UnifiedResourceSourceSummary,
     UnifiedResourceSummary,
 )
+from ..services.keyset import created_at_before, created_at_not_after, created_before
+
+
+@dataclass(frozen=True)
+class ResourceCursor:
+    """Position in the merged resource listing: the last summary of a page.
+
+    ``search_rank`` is set for searches, whose pages run in relevance order.
+    """
+
+    updated_at: datetime
+    source_system: str
+    source_id: str
+    search_rank: float | None = None
+
+    @classmethod
+    def from_summary(cls, summary: UnifiedResourceSummary) -> "ResourceCursor":
+        return cls(
+            updated_at=summary.updated_at,
+            source_system=summary.source_system,
+            source_id=summary.source_id,
+            search_rank=summary.search_rank,
+        )
+
+    def encode(self) -> str:
+        fields = [self.updated_at.isoformat(), self.source_system, self.source_id]
+        if self.search_rank is not None:
+            fields.append(self.search_rank)
+        payload = json.dumps(fields, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "ResourceCursor":
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            updated_at, source_system, source_id, *rest = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            if len(rest) > 1:
+                raise ValueError("Unexpected cursor fields")
+            return cls(
+                updated_at=datetime.fromisoformat(updated_at),
+                source_system=str(source_system),
+                source_id=str(source_id),
+                search_rank=float(rest[0]) if rest else None,
+            )
+        except (ValueError, TypeError) as exc:
+            raise ValueError("Invalid resource cursor") from exc
+
+
+@total_ordering
+class _Descending:
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Descending) and self.value == other.value
+
+    def __lt__(self, other: "_Descending") -> bool:
+        return other.value < self.value
+
+
+def resource_sort_key(resource: UnifiedResourceSummary | ResourceCursor) -> tuple:
+    """Listing order: newest ``updated_at`` first, then ``source_system``, then highest ``source_id``.
+
+    Search results put the highest ``search_rank`` first and use listing order among equal ranks.
+    """
+    updated_at = resource.updated_at
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    source_id = resource.source_id
+    id_value = (False, int(source_id)) if source_id.isdigit() else (True, source_id)
+    listing_key = (-updated_at.timestamp(), resource.source_system, _Descending(id_value))
+    if resource.search_rank is None:
+        return listing_key
+    return (-resource.search_rank, *listing_key)
+
+
+def resource_keyset_clause(
+    after: ResourceCursor,
+    *,
+    source_system: str,
+    updated_at_column,
+    id_column,
+    dialect: str,
+) -> ColumnElement[bool]:
+    """SQL for "rows of ``source_system`` that come after ``after``", for sources keyed by integer ids."""
+    if source_system > after.source_system:
+        # Ties on the timestamp sort after the cursor's own source.
+        return created_at_not_after(updated_at_column, after.updated_at, dialect=dialect)
+    if source_system < after.source_system:
+        return created_at_before(updated_at_column, after.updated_at, dialect=dialect)
+    if not after.source_id.isdigit():
+        raise ValueError("Invalid resource cursor")
+    return created_before(updated_at_column, id_column, after.updated_at, int(after.source_id), dialect=dialect)
+
+
+def ranked_keyset_clause(after: ResourceCursor, *, rank, listing_clause: ColumnElement[bool]) -> ColumnElement[bool]:
+    """SQL for "rows ranked after ``after``": a lower rank, or the same rank and later in listing order."""
+    return or_(rank < after.search_rank, and_(rank == after.search_rank, listing_clause))
+
+
+def unranked_search_position(after: ResourceCursor) -> str:
+    """Where a source whose matches all rank 0 resumes a search: ``"start"``, ``"keyset"`` or ``"done"``."""
+    if after.search_rank is None or after.search_rank == 0:
+        return "keyset"
+    return "start" if after.search_rank > 0 else "done"
 
 
 class PlatformSourceAdapter(ABC):
@@ -35,6 +150,41 @@ class PlatformSourceAdapter(ABC):
     ) -> list[UnifiedResourceSummary]:
         raise NotImplementedError
 
+    def iter_unified_resources(
+        self,
+        db: Session,
+        *,
+        after: ResourceCursor | None = None,
+        limit: int,
+        q: str | None = None,
+        status: str | None = None,
+        resource_type: str | None = None,
+        profile_key: str | None = None,
+        preview_enabled: bool | None = None,
+    ) -> list[UnifiedResourceSummary]:
+        """Up to ``limit`` resources following ``after``, in ``resource_sort_key`` order.
+
+        The fallback sorts the whole ``list_unified_resources`` result; adapters
+        over large tables should override it with a keyset query. Search
+        results carry a ``search_rank``; sources without a text index rank
+        every match 0.
+        """
+        resources = self.list_unified_resources(
+            db,
+            q=q,
+            status=status,
+            resource_type=resource_type,
+            profile_key=profile_key,
+            preview_enabled=preview_enabled,
+        )
+        if q and q.strip():
+            resources = [resource.model_copy(update={"search_rank": 0.0}) for resource in resources]
+        resources = sorted(resources, key=resource_sort_key)
+        if after is not None:
+            after_key = resource_sort_key(after)
+            resources = [resource for resource in resources if resource_sort_key(resource) > after_key]
+        return resources[:limit]
+
     @abstractmethod
     def get_unified_resource_by_source(
         self,
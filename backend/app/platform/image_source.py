@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import re
 from datetime import datetime, timezone
 
 from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Query, Session, defer
+from sqlalchemy.sql.elements import ColumnElement
 
 from ..models import Asset
 from ..schemas import (
@@ -13,9 +15,10 @@ from ..schemas import (
     UnifiedResourceSummary,
 )
 from ..services.asset_detail import build_asset_detail_response
-from ..services.iiif_access import is_iiif_ready
-from ..services.metadata_layers import PROFILE_DEFINITIONS, build_metadata_layers
-from .base import PlatformSourceAdapter
+from ..services.iiif_access import get_asset_layer_view, is_iiif_ready
+from ..services.metadata_layers import PROFILE_DEFINITIONS
+from ..services.search_index import apply_text_search
+from .base import PlatformSourceAdapter, ResourceCursor, ranked_keyset_clause, resource_keyset_clause
 from .registry import registry
 
 SOURCE_SYSTEM = "image_2d"
@@ -113,7 +116,7 @@ def list_unified_resources(
     )
 
 
-def list_unified_resources_filtered(
+def _filtered_asset_query(
     db: Session,
     *,
     q: str | None = None,
@@ -121,12 +124,15 @@ def list_unified_resources_filtered(
     resource_type: str | None = None,
     profile_key: str | None = None,
     preview_enabled: bool | None = None,
-) -> list[UnifiedResourceSummary]:
+) -> tuple[Query, ColumnElement | None] | None:
+    """The filtered asset query plus, when ``q`` is given, its relevance rank; ``None`` if nothing can match."""
     normalized_profile_key = profile_key.strip() if profile_key else None
     if normalized_profile_key and normalized_profile_key not in PROFILE_DEFINITIONS:
-        return []
+        return None
 
-    query = db.query(Asset)
+    normalized_query = q.strip().lower() if q else None
+    # Everything a summary shows lives on projected columns.
+    query = db.query(Asset).options(defer(Asset.metadata_info), defer(Asset.search_text))
 
     if status:
         query = query.filter(Asset.status == status)
@@ -134,69 +140,122 @@ def list_unified_resources_filtered(
     if resource_type:
         query = query.filter(Asset.resource_type == resource_type)
 
-    assets = query.order_by(Asset.created_at.desc(), Asset.id.desc()).all()
+    if normalized_profile_key:
+        query = query.filter(Asset.profile_key == normalized_profile_key)
 
-    resources: list[UnifiedResourceSummary] = []
-    normalized_query = q.strip().lower() if q else None
-    for asset in assets:
-        layers = build_metadata_layers(
-            asset_id=asset.id,
-            asset_filename=asset.filename,
-            asset_file_path=asset.file_path,
-            asset_file_size=asset.file_size,
-            asset_mime_type=asset.mime_type,
-            asset_status=asset.status,
-            asset_resource_type=asset.resource_type,
-            asset_created_at=asset.created_at,
-            metadata=asset.metadata_info or {},
-        )
-        asset_profile_key = str((layers.get("core") or {}).get("profile_key") or "other")
-        if normalized_profile_key and asset_profile_key != normalized_profile_key:
-            continue
-
-        if normalized_query:
-            search_tokens = [
-                str(asset.id),
-                f"{SOURCE_SYSTEM}:{asset.id}",
-                asset.filename or "",
-                asset.file_path or "",
-                asset.mime_type or "",
-                layers["core"].get("title") or "",
-                layers["core"].get("resource_type") or "",
-                layers["core"].get("resource_type_label") or "",
-                layers["core"].get("profile_label") or "",
-            ]
-            search_tokens.extend(str(value) for value in (layers.get("management") or {}).values())
-            search_tokens.extend(str(value) for value in (layers.get("technical") or {}).values())
-            profile_fields = (layers.get("profile") or {}).get("fields") or {}
-            search_tokens.extend(str(value) for value in profile_fields.values())
-            search_tokens.extend(str(value) for value in (layers.get("raw_metadata") or {}).values())
-            search_blob = " ".join(search_tokens).lower()
-            if normalized_query not in search_blob:
-                continue
-
-        asset_preview_enabled = is_iiif_ready(asset)
-        if preview_enabled is not None and preview_enabled != asset_preview_enabled:
-            continue
-        resources.append(
-            UnifiedResourceSummary(
-                id=_platform_id(asset.id),
-                source_system=SOURCE_SYSTEM,
-                source_id=str(asset.id),
-                source_label=SOURCE_LABEL,
-                title=str(layers["core"].get("title") or asset.filename),
-                resource_type=asset.resource_type or RESOURCE_TYPE,
-                profile_key=asset_profile_key,
-                profile_label=str((layers.get("core") or {}).get("profile_label") or PROFILE_DEFINITIONS[asset_profile_key]["label"]),
-                status=asset.status,
-                preview_enabled=asset_preview_enabled,
-                manifest_url=f"/api/iiif/{asset.id}/manifest",
-                detail_url=_resource_detail_url(asset.id),
-                updated_at=asset.created_at,
-                actions=_resource_actions(asset.id, preview_enabled=asset_preview_enabled),
-            )
+    if preview_enabled is not None:
+        query = query.filter(Asset.preview_enabled == preview_enabled)
+
+    if not normalized_query:
+        return query, None
+
+    id_match = re.fullmatch(rf"(?:{SOURCE_SYSTEM}:)?(\d+)", normalized_query)
+    search = apply_text_search(
+        query,
+        Asset,
+        normalized_query,
+        extra_clause=Asset.id == int(id_match.group(1)) if id_match else None,
+    )
+    return search.query, search.rank
+
+
+def _resource_summary(asset: Asset) -> UnifiedResourceSummary:
+    asset_profile_key = asset.profile_key if asset.profile_key in PROFILE_DEFINITIONS else "other"
+    asset_preview_enabled = bool(asset.preview_enabled)
+    return UnifiedResourceSummary(
+        id=_platform_id(asset.id),
+        source_system=SOURCE_SYSTEM,
+        source_id=str(asset.id),
+        source_label=SOURCE_LABEL,
+        title=str(asset.title or asset.filename),
+        resource_type=asset.resource_type or RESOURCE_TYPE,
+        profile_key=asset_profile_key,
+        profile_label=str(PROFILE_DEFINITIONS[asset_profile_key]["label"]),
+        status=asset.status,
+        preview_enabled=asset_preview_enabled,
+        manifest_url=f"/api/iiif/{asset.id}/manifest",
+        detail_url=_resource_detail_url(asset.id),
+        updated_at=asset.created_at,
+        actions=_resource_actions(asset.id, preview_enabled=asset_preview_enabled),
+    )
+
+
+def list_unified_resources_filtered(
+    db: Session,
+    *,
+    q: str | None = None,
+    status: str | None = None,
+    resource_type: str | None = None,
+    profile_key: str | None = None,
+    preview_enabled: bool | None = None,
+) -> list[UnifiedResourceSummary]:
+    filtered = _filtered_asset_query(
+        db,
+        q=q,
+        status=status,
+        resource_type=resource_type,
+        profile_key=profile_key,
+        preview_enabled=preview_enabled,
+    )
+    if filtered is None:
+        return []
+    query, rank = filtered
+
+    order_by = [Asset.created_at.desc(), Asset.id.desc()]
+    if rank is not None:
+        order_by.insert(0, rank.desc())
+    return [_resource_summary(asset) for asset in query.order_by(*order_by).all()]
+
+
+def iter_unified_resources(
+    db: Session,
+    *,
+    after: ResourceCursor | None = None,
+    limit: int,
+    q: str | None = None,
+    status: str | None = None,
+    resource_type: str | None = None,
+    profile_key: str | None = None,
+    preview_enabled: bool | None = None,
+) -> list[UnifiedResourceSummary]:
+    filtered = _filtered_asset_query(
+        db,
+        q=q,
+        status=status,
+        resource_type=resource_type,
+        profile_key=profile_key,
+        preview_enabled=preview_enabled,
+    )
+    if filtered is None:
+        return []
+    query, rank = filtered
+    if after is not None:
+        listing_clause = resource_keyset_clause(
+            after,
+            source_system=SOURCE_SYSTEM,
+            updated_at_column=Asset.created_at,
+            id_column=Asset.id,
+            dialect=db.get_bind().dialect.name,
         )
-    return resources
+        if rank is not None and after.search_rank is not None:
+            listing_clause = ranked_keyset_clause(after, rank=rank, listing_clause=listing_clause)
+        query = query.filter(listing_clause)
+    if rank is None:
+        assets = query.order_by(Asset.created_at.desc(), Asset.id.desc()).limit(limit).all()
+        return [_resource_summary(asset) for asset in assets]
+
+    # Searches page in relevance order; the rank travels with each summary so
+    # the router can merge sources by it and put it in the next cursor.
+    rows = (
+        query.add_columns(rank.label("search_rank"))
+        .order_by(rank.desc(), Asset.created_at.desc(), Asset.id.desc())
+        .limit(limit)
+        .all()
+    )
+    return [
+        _resource_summary(asset).model_copy(update={"search_rank": float(search_rank or 0.0)})
+        for asset, search_rank in rows
+    ]
 
 
 def get_unified_resource(asset_id: int, db: Session) -> UnifiedResourceDetail:
@@ -206,17 +265,7 @@ def get_unified_resource(asset_id: int, db: Session) -> UnifiedResourceDetail:
 
     source_record = build_asset_detail_response(asset)
     preview_enabled = is_iiif_ready(asset)
-    layers = build_metadata_layers(
-        asset_id=asset.id,
-        asset_filename=asset.filename,
-        asset_file_path=asset.file_path,
-        asset_file_size=asset.file_size,
-        asset_mime_type=asset.mime_type,
-        asset_status=asset.status,
-        asset_resource_type=asset.resource_type,
-        asset_created_at=asset.created_at,
-        metadata=asset.metadata_info or {},
-    )
+    layers = get_asset_layer_view(asset).layers
 
     return UnifiedResourceDetail(
         id=_platform_id(asset.id),
@@ -267,6 +316,29 @@ class Image2DSourceAdapter(PlatformSourceAdapter):
             preview_enabled=preview_enabled,
         )
 
+    def iter_unified_resources(
+        self,
+        db: Session,
+        *,
+        after: ResourceCursor | None = None,
+        limit: int,
+        q: str | None = None,
+        status: str | None = None,
+        resource_type: str | None = None,
+        profile_key: str | None = None,
+        preview_enabled: bool | None = None,
+    ) -> list[UnifiedResourceSummary]:
+        return iter_unified_resources(
+            db,
+            after=after,
+            limit=limit,
+            q=q,
+            status=status,
+            resource_type=resource_type,
+            profile_key=profile_key,
+            preview_enabled=preview_enabled,
+        )
+
     def get_unified_resource_by_source(
         self,
         source_system: str,
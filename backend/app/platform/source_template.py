@@ -5,6 +5,8 @@ Template for adding a new platform source adapter.
 
 Copy this module when introducing a second source system. Implement the
 three abstract methods and register the adapter in `app.platform.registry`.
+Override `iter_unified_resources` with a keyset query once the source is
+large; the inherited version pages over the full `list_unified_resources`.
 """
 
 from sqlalchemy.orm import Session
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime, timezone
 
 from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Query, Session
 
 from ..models import ThreeDAsset
 from ..schemas import (
@@ -12,9 +12,11 @@ from ..schemas import (
     UnifiedResourceSourceSummary,
     UnifiedResourceSummary,
 )
+from ..services.keyset import created_before
+from ..services.query_options import THREE_D_DETAIL_OPTIONS
 from ..services.three_d_detail import build_three_d_detail_response
 from ..services.three_d_metadata import PROFILE_DEFINITIONS, SOURCE_LABEL, SOURCE_SYSTEM, build_three_d_metadata_layers
-from .base import PlatformSourceAdapter
+from .base import PlatformSourceAdapter, ResourceCursor, resource_keyset_clause, unranked_search_position
 from .registry import registry
 
 RESOURCE_TYPE = "three_d_package"
@@ -107,6 +109,89 @@ def list_source_summary(db: Session) -> UnifiedResourceSourceSummary:
     )
 
 
+def _filtered_asset_query(db: Session, *, status: str | None, resource_type: str | None) -> Query:
+    query = db.query(ThreeDAsset)
+    if status:
+        query = query.filter(ThreeDAsset.status == status)
+    if resource_type:
+        query = query.filter(ThreeDAsset.resource_type == resource_type)
+    return query.order_by(ThreeDAsset.created_at.desc(), ThreeDAsset.id.desc())
+
+
+def _resource_summary(
+    asset: ThreeDAsset,
+    *,
+    normalized_query: str | None,
+    normalized_profile_key: str | None,
+    preview_enabled: bool | None,
+) -> UnifiedResourceSummary | None:
+    """The asset's summary, or ``None`` when the profile, text or preview filters reject it."""
+    file_records = _asset_file_records(asset)
+    layers = build_three_d_metadata_layers(
+        asset_id=asset.id,
+        asset_filename=asset.filename,
+        asset_file_path=asset.file_path,
+        asset_file_size=asset.file_size,
+        asset_mime_type=asset.mime_type,
+        asset_status=asset.status,
+        asset_resource_type=asset.resource_type,
+        asset_created_at=asset.created_at,
+        metadata=asset.metadata_info or {},
+        file_records=file_records,
+    )
+    asset_profile_key = str((layers.get("core") or {}).get("profile_key") or "other")
+    if normalized_profile_key and asset_profile_key != normalized_profile_key:
+        return None
+
+    if normalized_query:
+        search_tokens = [
+            str(asset.id),
+            f"{SOURCE_SYSTEM}:{asset.id}",
+            asset.filename or "",
+            asset.file_path or "",
+            asset.mime_type or "",
+            layers["core"].get("title") or "",
+            layers["core"].get("resource_type") or "",
+            layers["core"].get("resource_type_label") or "",
+            layers["core"].get("profile_label") or "",
+            layers["core"].get("version_label") or "",
+            layers["core"].get("web_preview_status") or "",
+            layers["core"].get("resource_group") or "",
+            layers.get("technical", {}).get("role_summary") or "",
+        ]
+        search_tokens.extend(str(value) for value in (layers.get("management") or {}).values())
+        search_tokens.extend(str(value) for value in (layers.get("collection") or {}).values())
+        search_tokens.extend(str(value) for value in (layers.get("technical") or {}).values())
+        profile_fields = (layers.get("profile") or {}).get("fields") or {}
+        search_tokens.extend(str(value) for value in profile_fields.values())
+        search_tokens.extend(str(value) for value in (layers.get("preservation") or {}).values())
+        search_tokens.extend(str(value) for value in (layers.get("raw_metadata") or {}).values())
+        search_blob = " ".join(search_tokens).lower()
+        if normalized_query not in search_blob:
+            return None
+
+    asset_preview_enabled = _asset_preview_enabled(asset, layers)
+    if preview_enabled is not None and preview_enabled != asset_preview_enabled:
+        return None
+
+    return UnifiedResourceSummary(
+        id=_platform_id(asset.id),
+        source_system=SOURCE_SYSTEM,
+        source_id=str(asset.id),
+        source_label=SOURCE_LABEL,
+        title=str(layers["core"].get("title") or asset.filename),
+        resource_type=asset.resource_type or RESOURCE_TYPE,
+        profile_key=asset_profile_key,
+        profile_label=str((layers.get("core") or {}).get("profile_label") or PROFILE_DEFINITIONS[asset_profile_key]["label"]),
+        status=asset.status,
+        preview_enabled=asset_preview_enabled,
+        manifest_url=f"/api/three-d/resources/{asset.id}" if asset_preview_enabled else f"/api/three-d/resources/{asset.id}",
+        detail_url=f"/api/platform/resources/{SOURCE_SYSTEM}/{asset.id}",
+        updated_at=asset.created_at,
+        actions=_resource_actions(asset.id, preview_enabled=asset_preview_enabled),
+    )
+
+
 def list_unified_resources(
     db: Session,
     *,
@@ -116,91 +201,88 @@ def list_unified_resources(
     profile_key: str | None = None,
     preview_enabled: bool | None = None,
 ) -> list[UnifiedResourceSummary]:
-    query = db.query(ThreeDAsset)
-    if status:
-        query = query.filter(ThreeDAsset.status == status)
-    if resource_type:
-        query = query.filter(ThreeDAsset.resource_type == resource_type)
+    normalized_query = q.strip().lower() if q else None
+    normalized_profile_key = profile_key.strip() if profile_key else None
+    if normalized_profile_key and normalized_profile_key not in PROFILE_DEFINITIONS:
+        return []
 
-    assets = query.order_by(ThreeDAsset.created_at.desc(), ThreeDAsset.id.desc()).all()
     resources: list[UnifiedResourceSummary] = []
+    for asset in _filtered_asset_query(db, status=status, resource_type=resource_type).all():
+        summary = _resource_summary(
+            asset,
+            normalized_query=normalized_query,
+            normalized_profile_key=normalized_profile_key,
+            preview_enabled=preview_enabled,
+        )
+        if summary is not None:
+            resources.append(summary)
+    return resources
+
+
+def iter_unified_resources(
+    db: Session,
+    *,
+    after: ResourceCursor | None = None,
+    limit: int,
+    q: str | None = None,
+    status: str | None = None,
+    resource_type: str | None = None,
+    profile_key: str | None = None,
+    preview_enabled: bool | None = None,
+) -> list[UnifiedResourceSummary]:
+    """Walks the assets in listing order, ``limit`` rows per query, until ``limit`` pass the Python-side filters."""
     normalized_query = q.strip().lower() if q else None
     normalized_profile_key = profile_key.strip() if profile_key else None
     if normalized_profile_key and normalized_profile_key not in PROFILE_DEFINITIONS:
         return []
 
-    for asset in assets:
-        file_records = _asset_file_records(asset)
-        layers = build_three_d_metadata_layers(
-            asset_id=asset.id,
-            asset_filename=asset.filename,
-            asset_file_path=asset.file_path,
-            asset_file_size=asset.file_size,
-            asset_mime_type=asset.mime_type,
-            asset_status=asset.status,
-            asset_resource_type=asset.resource_type,
-            asset_created_at=asset.created_at,
-            metadata=asset.metadata_info or {},
-            file_records=file_records,
+    # Without a text index every search match ranks 0, so the pages of a search
+    # run in listing order and start wherever the cursor's rank puts them.
+    search_rank = 0.0 if normalized_query else None
+    position = unranked_search_position(after) if after is not None else "start"
+    if position == "done":
+        return []
+
+    dialect = db.get_bind().dialect.name
+    query = _filtered_asset_query(db, status=status, resource_type=resource_type)
+    keyset_clause = (
+        resource_keyset_clause(
+            after,
+            source_system=SOURCE_SYSTEM,
+            updated_at_column=ThreeDAsset.created_at,
+            id_column=ThreeDAsset.id,
+            dialect=dialect,
         )
-        asset_profile_key = str((layers.get("core") or {}).get("profile_key") or "other")
-        if normalized_profile_key and asset_profile_key != normalized_profile_key:
-            continue
-
-        if normalized_query:
-            search_tokens = [
-                str(asset.id),
-                f"{SOURCE_SYSTEM}:{asset.id}",
-                asset.filename or "",
-                asset.file_path or "",
-                asset.mime_type or "",
-                layers["core"].get("title") or "",
-                layers["core"].get("resource_type") or "",
-                layers["core"].get("resource_type_label") or "",
-                layers["core"].get("profile_label") or "",
-                layers["core"].get("version_label") or "",
-                layers["core"].get("web_preview_status") or "",
-                layers["core"].get("resource_group") or "",
-                layers.get("technical", {}).get("role_summary") or "",
-            ]
-            search_tokens.extend(str(value) for value in (layers.get("management") or {}).values())
-            search_tokens.extend(str(value) for value in (layers.get("collection") or {}).values())
-            search_tokens.extend(str(value) for value in (layers.get("technical") or {}).values())
-            profile_fields = (layers.get("profile") or {}).get("fields") or {}
-            search_tokens.extend(str(value) for value in profile_fields.values())
-            search_tokens.extend(str(value) for value in (layers.get("preservation") or {}).values())
-            search_tokens.extend(str(value) for value in (layers.get("raw_metadata") or {}).values())
-            search_blob = " ".join(search_tokens).lower()
-            if normalized_query not in search_blob:
-                continue
-
-        asset_preview_enabled = _asset_preview_enabled(asset, layers)
-        if preview_enabled is not None and preview_enabled != asset_preview_enabled:
-            continue
-
-        resources.append(
-            UnifiedResourceSummary(
-                id=_platform_id(asset.id),
-                source_system=SOURCE_SYSTEM,
-                source_id=str(asset.id),
-                source_label=SOURCE_LABEL,
-                title=str(layers["core"].get("title") or asset.filename),
-                resource_type=asset.resource_type or RESOURCE_TYPE,
-                profile_key=asset_profile_key,
-                profile_label=str((layers.get("core") or {}).get("profile_label") or PROFILE_DEFINITIONS[asset_profile_key]["label"]),
-                status=asset.status,
-                preview_enabled=asset_preview_enabled,
-                manifest_url=f"/api/three-d/resources/{asset.id}" if asset_preview_enabled else f"/api/three-d/resources/{asset.id}",
-                detail_url=f"/api/platform/resources/{SOURCE_SYSTEM}/{asset.id}",
-                updated_at=asset.created_at,
-                actions=_resource_actions(asset.id, preview_enabled=asset_preview_enabled),
+        if position == "keyset"
+        else None
+    )
+    resources: list[UnifiedResourceSummary] = []
+    while len(resources) < limit:
+        page_query = query.filter(keyset_clause) if keyset_clause is not None else query
+        assets = page_query.limit(limit).all()
+        for asset in assets:
+            summary = _resource_summary(
+                asset,
+                normalized_query=normalized_query,
+                normalized_profile_key=normalized_profile_key,
+                preview_enabled=preview_enabled,
             )
+            if summary is not None:
+                if search_rank is not None:
+                    summary = summary.model_copy(update={"search_rank": search_rank})
+                resources.append(summary)
+                if len(resources) == limit:
+                    break
+        if len(assets) < limit:
+            break
+        keyset_clause = created_before(
+            ThreeDAsset.created_at, ThreeDAsset.id, assets[-1].created_at, assets[-1].id, dialect=dialect
         )
     return resources
 
 
 def get_unified_resource(asset_id: int, db: Session) -> UnifiedResourceDetail:
-    asset = db.query(ThreeDAsset).filter(ThreeDAsset.id == asset_id).first()
+    asset = db.query(ThreeDAsset).options(*THREE_D_DETAIL_OPTIONS).filter(ThreeDAsset.id == asset_id).first()
     if asset is None:
         raise LookupError("Resource not found")
 
@@ -256,6 +338,29 @@ class ThreeDSourceAdapter(PlatformSourceAdapter):
             preview_enabled=preview_enabled,
         )
 
+    def iter_unified_resources(
+        self,
+        db: Session,
+        *,
+        after: ResourceCursor | None = None,
+        limit: int,
+        q: str | None = None,
+        status: str | None = None,
+        resource_type: str | None = None,
+        profile_key: str | None = None,
+        preview_enabled: bool | None = None,
+    ) -> list[UnifiedResourceSummary]:
+        return iter_unified_resources(
+            db,
+            after=after,
+            limit=limit,
+            q=q,
+            status=status,
+            resource_type=resource_type,
+            profile_key=profile_key,
+            preview_enabled=preview_enabled,
+        )
+
     def get_unified_resource_by_source(
         self,
         source_system: str,
@@ -3,7 +3,7 @@ from __future__ import annotations
 import json
 import logging
 import re
-from typing import Literal
+from typing import Literal, Mapping
 
 import httpx
 from fastapi import APIRouter, Depends, Request
@@ -14,8 +14,7 @@ from .. import config
 from ..database import get_db
 from ..models import Asset
 from ..permissions import CurrentUser, ensure_current_user, require_permission
-from ..services.iiif_access import is_iiif_ready
-from ..services.metadata_layers import get_metadata_layers
+from ..services.iiif_access import get_asset_layer_view
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 logger = logging.getLogger(__name__)
@@ -308,34 +307,16 @@ def _flatten_metadata_text(value: object) -> list[str]:
     return [str(value)]
 
 
-def _asset_metadata_layers(asset: Asset) -> dict[str, object]:
-    return get_metadata_layers(
-        asset_id=asset.id,
-        asset_filename=asset.filename,
-        asset_file_path=asset.file_path,
-        asset_file_size=asset.file_size,
-        asset_mime_type=asset.mime_type,
-        asset_status=asset.status,
-        asset_resource_type=asset.resource_type,
-        asset_visibility_scope=asset.visibility_scope,
-        asset_collection_object_id=asset.collection_object_id,
-        asset_created_at=asset.created_at,
-        metadata=asset.metadata_info or {},
-    )
+def _asset_metadata_layers(asset: Asset) -> Mapping[str, object]:
+    return get_asset_layer_view(asset).layers
 
 
 def _extract_title(asset: Asset) -> str:
-    metadata_layers = _asset_metadata_layers(asset)
-    core = metadata_layers.get("core", {}) if isinstance(metadata_layers, dict) else {}
-    title = core.get("title") if isinstance(core, dict) else None
-    return str(title or asset.filename or f"Asset {asset.id}")
+    return str(asset.title or asset.filename or f"Asset {asset.id}")
 
 
 def _extract_object_number(asset: Asset) -> str | None:
-    metadata_layers = _asset_metadata_layers(asset)
-    core = metadata_layers.get("core", {}) if isinstance(metadata_layers, dict) else {}
-    value = core.get("object_number") if isinstance(core, dict) else None
-    return str(value) if value not in (None, "") else None
+    return asset.object_number or None
 
 
 def _normalize_query(query: str) -> list[str]:
@@ -348,16 +329,16 @@ def _score_asset(asset: Asset, query: str) -> tuple[float, list[str]]:
         return 0.0, []
 
     metadata_layers = _asset_metadata_layers(asset)
-    core = metadata_layers.get("core", {}) if isinstance(metadata_layers, dict) else {}
+    core = metadata_layers.get("core", {})
     searchable_values = [
         asset.filename or "",
         asset.file_path or "",
         asset.process_message or "",
         _extract_title(asset),
-        f"{core.get('source_system') or ''}:{core.get('source_id') or ''}" if isinstance(core, dict) else "",
-        str(core.get("source_system") or "") if isinstance(core, dict) else "",
-        str(core.get("source_id") or "") if isinstance(core, dict) else "",
-        str(core.get("object_number") or "") if isinstance(core, dict) else "",
+        f"{core.get('source_system') or ''}:{core.get('source_id') or ''}",
+        str(core.get("source_system") or ""),
+        str(core.get("source_id") or ""),
+        str(core.get("object_number") or ""),
         " ".join(_flatten_metadata_text(asset.metadata_info or {})),
     ]
     haystack = "\n".join(searchable_values).lower()
@@ -378,8 +359,6 @@ def _build_manifest_url(request: Request, asset_id: int) -> str:
 
 
 def _build_search_result(request: Request, asset: Asset, score: float, reasons: list[str]) -> MiradorSearchResult:
-    metadata_layers = _asset_metadata_layers(asset)
-    core = metadata_layers.get("core", {}) if isinstance(metadata_layers, dict) else {}
     return MiradorSearchResult(
         asset_id=asset.id,
         title=_extract_title(asset),
@@ -402,15 +381,14 @@ def _search_assets(
     limit: int = 5,
     current_asset_id: int | None = None,
 ) -> list[MiradorSearchResult]:
-    assets = db.query(Asset).order_by(Asset.created_at.desc(), Asset.id.desc()).all()
+    asset_query = db.query(Asset).filter(Asset.preview_enabled.is_(True))
+    if current_asset_id is not None:
+        asset_query = asset_query.filter(Asset.id != current_asset_id)
+    assets = asset_query.order_by(Asset.created_at.desc(), Asset.id.desc()).all()
     results: list[MiradorSearchResult] = []
     for asset in assets:
-        if current_asset_id is not None and asset.id == current_asset_id:
-            continue
         if not _is_asset_visible_to_user(asset, user):
             continue
-        if not is_iiif_ready(asset):
-            continue
         score, reasons = _score_asset(asset, query)
         if score > 0:
             results.append(_build_search_result(request, asset, score, reasons))
@@ -8,7 +8,7 @@ from uuid import uuid4
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 
 from ..database import get_db
 from ..models import Application, ApplicationItem, Asset
@@ -19,6 +19,7 @@ from ..schemas import (
     ApplicationDetailResponse,
     ApplicationListItem,
 )
+from ..services.query_options import APPLICATION_DETAIL_OPTIONS, APPLICATION_LIST_OPTIONS
 
 router = APIRouter(tags=["applications"])
 
@@ -58,7 +59,7 @@ def _to_list_item(application: Application) -> ApplicationListItem:
 def _get_application_or_404(application_id: int, db: Session) -> Application:
     application = (
         db.query(Application)
-        .options(joinedload(Application.items).joinedload(ApplicationItem.asset))
+        .options(*APPLICATION_DETAIL_OPTIONS)
         .filter(Application.id == application_id)
         .first()
     )
@@ -182,7 +183,7 @@ def list_applications(
     user = ensure_current_user(user)
     applications = (
         db.query(Application)
-        .options(joinedload(Application.items))
+        .options(*APPLICATION_LIST_OPTIONS)
         .order_by(Application.created_at.desc(), Application.id.desc())
         .all()
     )
@@ -3,12 +3,19 @@ import os
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile
 from fastapi.responses import FileResponse
 from PIL import Image
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session, defer
 
 from .. import config
 from ..database import get_db
 from ..models import Asset
-from ..permissions import CurrentUser, can_access_visibility_scope, ensure_current_user, require_permission
+from ..permissions import (
+    CurrentUser,
+    can_access_visibility_scope,
+    ensure_current_user,
+    require_permission,
+    visibility_scope_clause,
+)
 from ..schemas import AssetDetailResponse, AssetOut
 from ..services.asset_detail import build_asset_detail_response
 from ..services.iiif_access import (
@@ -17,9 +24,13 @@ from ..services.iiif_access import (
     mark_asset_derivative_pending,
     mark_asset_ready_with_original_access,
 )
+from ..services.ingest_pipeline import IngestTimer, sniff_image_header, stream_upload_to_disk
+from ..services.keyset import created_before
 from ..services.metadata_layers import build_metadata_layers, get_original_file_path
-from ..services.preview_images import ensure_preview_image
-from ..tasks import generate_iiif_access_derivative
+from ..services.preview_cache import list_asset_preview_paths
+from ..services.preview_images import ensure_preview_image, ensure_preview_rendition, get_preview_ladder_paths
+from ..services.resumable_uploads import ResumableUploadError, resolve_upload_file
+from ..tasks import generate_iiif_access_derivative, generate_preview_ladder
 
 router = APIRouter(tags=["assets"])
 
@@ -53,7 +64,8 @@ def _normalize_collection_object_id(value: object) -> int | None:
 
 @router.post("/upload", response_model=AssetOut)
 async def upload_file(
-    file: UploadFile = File(...),
+    file: UploadFile | None = File(None),
+    upload_id: str | None = Form(None),
     visibility_scope: str | None = Form("open"),
     collection_object_id: int | None = Form(None),
     db: Session = Depends(get_db),
@@ -62,60 +74,74 @@ async def upload_file(
     normalized_visibility_scope = _normalize_visibility_scope(visibility_scope)
     normalized_collection_object_id = _normalize_collection_object_id(collection_object_id)
 
+    try:
+        file = resolve_upload_file(file, upload_id, owner=getattr(_user, "user_id", None))
+    except ResumableUploadError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
+
     file_location = os.path.join(config.UPLOAD_DIR, file.filename)
     os.makedirs(os.path.dirname(file_location), exist_ok=True)
 
-    chunk_size = 64 * 1024
-    with open(file_location, "wb") as buffer:
-        while content := await file.read(chunk_size):
-            buffer.write(content)
+    timer = IngestTimer()
+    with timer.stage("stream"):
+        streamed = await stream_upload_to_disk(file, file_location)
 
-    file_size = os.path.getsize(file_location)
+    file_size = streamed.file_size
     width, height = 0, 0
-    try:
-        with Image.open(file_location) as img:
-            width, height = img.size
-    except Exception:
-        pass
+    with timer.stage("probe"):
+        sniffed = sniff_image_header(streamed.header)
+        if sniffed is not None:
+            width, height = sniffed.width, sniffed.height
+        else:
+            try:
+                with Image.open(file_location) as img:
+                    width, height = img.size
+            except Exception:
+                pass
+
+    metadata_info = build_metadata_layers(
+        asset_filename=file.filename,
+        asset_file_path=file_location,
+        asset_file_size=file_size,
+        asset_mime_type=file.content_type,
+        asset_status="processing",
+        asset_resource_type="image_2d_cultural_object",
+        asset_visibility_scope=normalized_visibility_scope,
+        asset_collection_object_id=normalized_collection_object_id,
+        metadata={
+            "width": width,
+            "height": height,
+            "ingest_method": "upload",
+            "original_file_name": file.filename,
+            "image_file_name": os.path.basename(file_location),
+            "file_size": file_size,
+            "format_name": file.content_type,
+            "fixity_sha256": streamed.sha256,
+            "visibility_scope": normalized_visibility_scope,
+            "collection_object_id": normalized_collection_object_id,
+        },
+        source_metadata={
+            "ingest_method": "upload",
+            "file_name": file.filename,
+            "file_size": file_size,
+            "visibility_scope": normalized_visibility_scope,
+            "collection_object_id": normalized_collection_object_id,
+        },
+    )
+    metadata_info["technical"]["ingest_timings"] = timer.as_dict()
 
     db_asset = Asset(
         filename=file.filename,
         file_path=file_location,
         file_size=file_size,
         mime_type=file.content_type,
+        fixity_sha256=streamed.sha256,
         visibility_scope=normalized_visibility_scope,
         collection_object_id=normalized_collection_object_id,
         status="processing",
         resource_type="image_2d_cultural_object",
         process_message="Asset upload received.",
-        metadata_info=build_metadata_layers(
-            asset_filename=file.filename,
-            asset_file_path=file_location,
-            asset_file_size=file_size,
-            asset_mime_type=file.content_type,
-            asset_status="processing",
-            asset_resource_type="image_2d_cultural_object",
-            asset_visibility_scope=normalized_visibility_scope,
-            asset_collection_object_id=normalized_collection_object_id,
-            metadata={
-                "width": width,
-                "height": height,
-                "ingest_method": "upload",
-                "original_file_name": file.filename,
-                "image_file_name": os.path.basename(file_location),
-                "file_size": file_size,
-                "format_name": file.content_type,
-                "visibility_scope": normalized_visibility_scope,
-                "collection_object_id": normalized_collection_object_id,
-            },
-            source_metadata={
-                "ingest_method": "upload",
-                "file_name": file.filename,
-                "file_size": file_size,
-                "visibility_scope": normalized_visibility_scope,
-                "collection_object_id": normalized_collection_object_id,
-            },
-        ),
+        metadata_info=metadata_info,
     )
 
     if get_asset_iiif_access_file_path(db_asset, allow_original_fallback=False):
@@ -129,6 +155,8 @@ async def upload_file(
 
     if db_asset.status == "processing":
         generate_iiif_access_derivative.delay(db_asset.id, file_location)
+    elif db_asset.status == "ready":
+        generate_preview_ladder.delay(db_asset.id)
 
     return db_asset
 
@@ -206,17 +234,81 @@ def _is_asset_visible_to_user(asset: Asset, user: CurrentUser) -> bool:
     )
 
 
+def _asset_list_recheck_clause(user: CurrentUser):
+    """Rows whose scope or collection is only recorded in ``metadata_info.core``.
+
+    ``_asset_visibility_scope`` and ``_asset_collection_object_id`` fall back to
+    metadata when the columns are empty, which SQL cannot see, so these rows
+    are fetched as candidates and decided in Python.
+    """
+    blank_scope = or_(Asset.visibility_scope.is_(None), func.trim(Asset.visibility_scope) == "")
+    if user.has_permission("system.manage") or not user.collection_scope:
+        return blank_scope
+    owner_only = func.lower(func.trim(Asset.visibility_scope)) == "owner_only"
+    return or_(blank_scope, and_(owner_only, Asset.collection_object_id.is_(None)))
+
+
+def _asset_keyset_clause(dialect: str, created_at, asset_id: int):
+    # ``created_at`` has a server default, so it is only missing on hand-made rows.
+    if created_at is None:
+        return Asset.id < asset_id
+    return created_before(Asset.created_at, Asset.id, created_at, asset_id, dialect=dialect)
+
+
 @router.get("/assets", response_model=list[AssetOut])
 def list_assets(
     skip: int = 0,
     limit: int = 100,
+    after_id: int | None = None,
     db: Session = Depends(get_db),
     user: CurrentUser = Depends(require_permission("image.view")),
 ):
+    """
+    Newest assets first. Pass the ``id`` of the last asset of a page as
+    ``after_id`` to fetch the next one; ``skip`` still works but has to walk
+    over the skipped rows.
+    """
     user = ensure_current_user(user)
-    assets = db.query(Asset).order_by(Asset.created_at.desc(), Asset.id.desc()).all()
-    visible_assets = [asset for asset in assets if _is_asset_visible_to_user(asset, user)]
-    return visible_assets[skip : skip + limit]
+    skip = max(int(skip), 0)
+    limit = max(int(limit), 0)
+    if limit == 0:
+        return []
+
+    visible_clause = visibility_scope_clause(
+        user,
+        visibility_scope_column=Asset.visibility_scope,
+        collection_object_id_column=Asset.collection_object_id,
+    )
+    recheck_clause = _asset_list_recheck_clause(user)
+    query = (
+        db.query(Asset, and_(visible_clause, ~recheck_clause).label("visible"))
+        .options(defer(Asset.metadata_info))
+        .filter(or_(visible_clause, recheck_clause))
+        .order_by(Asset.created_at.desc(), Asset.id.desc())
+    )
+
+    dialect = db.get_bind().dialect.name
+    keyset = None
+    if after_id is not None:
+        anchor = db.query(Asset.created_at).filter(Asset.id == after_id).first()
+        if anchor is None:
+            raise HTTPException(status_code=404, detail="Asset in after_id not found")
+        keyset = (anchor.created_at, after_id)
+
+    wanted = skip + limit
+    visible_assets: list[Asset] = []
+    while len(visible_assets) < wanted:
+        batch_size = wanted - len(visible_assets)
+        page_query = query.filter(_asset_keyset_clause(dialect, *keyset)) if keyset else query
+        rows = page_query.limit(batch_size).all()
+        for asset, visible in rows:
+            # Candidates decided in Python load their metadata_info on access.
+            if visible or _is_asset_visible_to_user(asset, user):
+                visible_assets.append(asset)
+        if len(rows) < batch_size:
+            break
+        keyset = (rows[-1][0].created_at, rows[-1][0].id)
+    return visible_assets[skip:]
 
 
 @router.delete("/assets/{asset_id}")
@@ -238,6 +330,8 @@ def delete_asset(
         technical = metadata.get("technical") if isinstance(metadata, dict) else {}
         if isinstance(technical, dict):
             removable_paths.add(technical.get("preview_image_path"))
+        removable_paths.update(get_preview_ladder_paths(asset))
+        removable_paths.update(list_asset_preview_paths(asset.id))
 
         for removable_path in removable_paths:
             if isinstance(removable_path, str) and removable_path and os.path.exists(removable_path):
@@ -289,3 +383,31 @@ def get_asset_preview(
             "Pragma": "no-cache",
         },
     )
+
+
+@router.get("/assets/{asset_id}/preview/{size}")
+def get_asset_preview_rendition(
+    asset_id: int,
+    size: int,
+    db: Session = Depends(get_db),
+    user: CurrentUser = Depends(require_permission("image.view")),
+):
+    if size <= 0:
+        raise HTTPException(status_code=404, detail="Preview size not available")
+    asset = _get_asset_or_404(asset_id, db)
+    user = ensure_current_user(user)
+    if not _is_asset_visible_to_user(asset, user):
+        raise HTTPException(status_code=403, detail="Asset is not visible to current user")
+
+    preview_path = ensure_preview_rendition(asset, size)
+    if not preview_path:
+        raise HTTPException(status_code=404, detail="Preview image not available")
+
+    # Rendition files are named by source fingerprint, so the ETag that
+    # FileResponse derives from them changes whenever the source does.
+    return FileResponse(
+        preview_path,
+        media_type="image/jpeg",
+        filename=os.path.basename(preview_path),
+        headers={"Cache-Control": "no-cache"},
+    )
@@ -13,10 +13,10 @@ from ..database import get_db
 from ..models import Asset
 from ..services.iiif_access import (
     get_asset_iiif_access_file_path,
+    get_asset_layer_view,
     get_asset_original_file_path,
     get_asset_primary_file_path,
 )
-from ..services.metadata_layers import get_fixity_sha256
 
 router = APIRouter(tags=["downloads"])
 
@@ -65,7 +65,7 @@ def download_asset_bag(asset_id: int, background_tasks: BackgroundTasks, db: Ses
 
     try:
         manifest_entries: list[str] = []
-        fixity_sha256 = get_fixity_sha256(asset.metadata_info) or _calculate_sha256(original_file_path)
+        fixity_sha256 = get_asset_layer_view(asset).fixity_sha256 or _calculate_sha256(original_file_path)
 
         original_basename = os.path.basename(original_file_path)
         dest_original_path = os.path.join(data_dir, original_basename)
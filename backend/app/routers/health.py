@@ -7,6 +7,8 @@ from sqlalchemy.orm import Session
 
 from .. import config
 from ..database import get_db
+from ..services.session_user_cache import get_session_user_cache_stats
+from ..services.single_flight import get_single_flight_stats
 
 router = APIRouter(tags=["health"])
 
@@ -37,6 +39,8 @@ def build_health_payload(db: Session) -> dict:
         "service": "meam-prototype-api",
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "checks": checks,
+        "single_flight": get_single_flight_stats(),
+        "session_user_cache": get_session_user_cache_stats(),
         "http_status": http_status,
     }
 
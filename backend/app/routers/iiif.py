@@ -1,25 +1,68 @@
+import asyncio
 import json
 import os
+import re
+from dataclasses import dataclass
 from urllib.parse import quote
 
 import httpx
 from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import Response
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 
 from .. import config
 from ..database import get_db
 from ..models import Asset
-from ..permissions import CurrentUser, can_access_visibility_scope, ensure_current_user, require_permission
+from ..permissions import (
+    CurrentUser,
+    can_access_visibility_scope,
+    ensure_current_user,
+    get_current_user_from_request,
+    require_permission,
+)
 from ..services.iiif_access import (
+    build_iiif_source_fingerprint,
     get_asset_iiif_access_file_path,
+    get_asset_layer_view,
     is_iiif_ready,
-    requires_iiif_access_derivative,
 )
-from ..services.metadata_layers import build_iiif_metadata_entries, build_metadata_layers, get_dimensions
+from ..services.iiif_capability import (
+    IIIFSourceEntry,
+    forget_iiif_source,
+    issue_iiif_capability,
+    lookup_iiif_source,
+    remember_iiif_source,
+    verify_iiif_capability,
+)
+from ..services.iiif_image_server import (
+    IIIFImageRequestError,
+    build_iiif_info,
+    get_iiif_render_executor,
+    render_iiif_image,
+)
+from ..services.iiif_tile_cache import (
+    CachedTile,
+    build_tile_cache_key,
+    build_tile_etag,
+    etag_matches,
+    get_iiif_tile_cache,
+)
+from ..services.iiif_upstream import (
+    IIIF_UPSTREAM_TIMEOUT,
+    forwarded_response_headers,
+    get_iiif_upstream_client,
+)
+from ..services.metadata_layers import build_iiif_metadata_entries
+from ..services.single_flight import AsyncSingleFlight, cross_process_lock, record_single_flight_event
 
 router = APIRouter(tags=["iiif"])
-IIIF_UPSTREAM_TIMEOUT = httpx.Timeout(connect=10.0, read=300.0, write=10.0, pool=10.0)
+
+# Service URLs carry the derivative fingerprint ("v-<hex>/") so cached tiles
+# can be marked immutable: a regenerated derivative gets a new URL.
+SERVICE_VERSION_PREFIX = "v-"
+SERVICE_VERSION_PATTERN = re.compile(r"v-([0-9a-f]{16})/")
 
 
 def _asset_visibility_scope(asset: Asset) -> str:
@@ -121,8 +164,30 @@ def _iiif_identifier_for_source_path(source_path: str) -> str:
     return relative_path.replace(os.sep, "/")
 
 
-def _backend_image_service_url(request: Request, asset_id: int, iiif_identifier: str) -> str:
-    return f"{_api_base_url(request)}/iiif/{asset_id}/service/{_quote_iiif_identifier(iiif_identifier)}"
+def _backend_image_service_url(
+    request: Request,
+    asset_id: int,
+    iiif_identifier: str,
+    *,
+    version: str | None = None,
+    capability: str | None = None,
+) -> str:
+    # Capability URLs live beside ``service`` rather than under it, so no
+    # identifier can be mistaken for a capability.
+    service_segment = f"capability/{capability}" if capability else "service"
+    version_segment = f"{SERVICE_VERSION_PREFIX}{version}/" if version else ""
+    return (
+        f"{_api_base_url(request)}/iiif/{asset_id}/{service_segment}/"
+        f"{version_segment}{_quote_iiif_identifier(iiif_identifier)}"
+    )
+
+
+def _split_service_version(image_path: str) -> tuple[str | None, str]:
+    normalized_path = image_path.lstrip("/")
+    match = SERVICE_VERSION_PATTERN.match(normalized_path)
+    if not match:
+        return None, normalized_path
+    return match.group(1), normalized_path[match.end():]
 
 
 def _cantaloupe_image_service_url(request: Request, iiif_identifier: str) -> str:
@@ -157,24 +222,27 @@ def _resolve_iiif_source_path(asset: Asset) -> str:
     if iiif_source_path:
         return iiif_source_path
 
-    metadata_layers = build_metadata_layers(
-        asset_id=asset.id,
-        asset_filename=asset.filename,
-        asset_file_path=asset.file_path,
-        asset_file_size=asset.file_size,
-        asset_mime_type=asset.mime_type,
-        asset_status=asset.status,
-        asset_resource_type=asset.resource_type,
-        asset_visibility_scope=_asset_visibility_scope(asset),
-        asset_collection_object_id=_asset_collection_object_id(asset),
-        asset_created_at=asset.created_at,
-        metadata=asset.metadata_info or {},
-    )
-    if requires_iiif_access_derivative(metadata_layers):
+    if get_asset_layer_view(asset).requires_iiif_access_derivative:
         raise HTTPException(status_code=409, detail="IIIF access derivative is not ready")
     raise HTTPException(status_code=404, detail="IIIF source file not found")
 
 
+def _build_iiif_source_entry(asset: Asset, iiif_source_path: str) -> IIIFSourceEntry:
+    return IIIFSourceEntry(
+        source_path=iiif_source_path,
+        identifier=_iiif_identifier_for_source_path(iiif_source_path),
+        aliases=frozenset(alias for alias in (os.path.basename(iiif_source_path), asset.filename or "") if alias),
+        iiif_ready=is_iiif_ready(asset),
+    )
+
+
+def _remember_ready_source(asset_id: int, source: IIIFSourceEntry) -> None:
+    # Assets still waiting for their access derivative are re-read on every
+    # request so the switch to the derivative is picked up immediately.
+    if source.iiif_ready:
+        remember_iiif_source(asset_id, source)
+
+
 @router.get("/iiif/{asset_id}/manifest")
 def get_iiif_manifest(
     asset_id: int,
@@ -195,23 +263,19 @@ def get_iiif_manifest(
     annotation_page_id = f"{api_base_url}/iiif/{asset_id}/page/1"
     annotation_id = f"{api_base_url}/iiif/{asset_id}/annotation/1"
 
-    iiif_identifier = _iiif_identifier_for_source_path(iiif_source_path)
-    image_service_id = _backend_image_service_url(request, asset_id, iiif_identifier)
-
-    metadata_layers = build_metadata_layers(
-        asset_id=asset.id,
-        asset_filename=asset.filename,
-        asset_file_path=asset.file_path,
-        asset_file_size=asset.file_size,
-        asset_mime_type=asset.mime_type,
-        asset_status=asset.status,
-        asset_resource_type=asset.resource_type,
-        asset_visibility_scope=_asset_visibility_scope(asset),
-        asset_collection_object_id=_asset_collection_object_id(asset),
-        asset_created_at=asset.created_at,
-        metadata=asset.metadata_info or {},
+    source = _build_iiif_source_entry(asset, iiif_source_path)
+    _remember_ready_source(asset.id, source)
+    image_service_id = _backend_image_service_url(
+        request,
+        asset_id,
+        source.identifier,
+        version=build_iiif_source_fingerprint(iiif_source_path),
+        capability=issue_iiif_capability(asset.id, source.identifier, _asset_visibility_scope(asset).strip().lower()),
     )
-    width, height = get_dimensions(metadata_layers)
+
+    layer_view = get_asset_layer_view(asset)
+    metadata_layers = layer_view.layers
+    width, height = layer_view.dimensions
     if not width:
         width = 1000
     if not height:
@@ -281,7 +345,7 @@ def get_iiif_manifest(
                                         {
                                             "id": image_service_id,
                                             "type": "ImageService2",
-                                            "profile": "level2",
+                                            "profile": "level1" if config.IIIF_IMAGE_SERVER == "native" else "level2",
                                         }
                                     ],
                                 },
@@ -298,52 +362,383 @@ def get_iiif_manifest(
     return manifest
 
 
-@router.get("/iiif/{asset_id}/service/{image_path:path}")
-def proxy_iiif_image(
+@dataclass(frozen=True)
+class _ProxyTarget:
+    asset_id: int
+    target_url: str
+    source_path: str
+    resolved_identifier: str
+    suffix: str
+    iiif_ready: bool
+    visibility_scope: str
+    source_fingerprint: str | None
+    requested_version: str | None
+    capability: str | None = None
+
+    @property
+    def is_immutable(self) -> bool:
+        return bool(self.source_fingerprint) and self.requested_version == self.source_fingerprint
+
+    @property
+    def etag(self) -> str | None:
+        if not self.iiif_ready or not self.source_fingerprint:
+            return None
+        return build_tile_etag(self.source_fingerprint, self.suffix)
+
+    def cache_key(self, proxy_base_url: str) -> str | None:
+        if not self.iiif_ready or not self.source_fingerprint:
+            return None
+        # info.json embeds the public service URL, so it is cached per base URL.
+        suffix = f"{self.suffix}@{proxy_base_url}" if self.suffix.endswith("info.json") else self.suffix
+        return build_tile_cache_key(self.asset_id, self.source_fingerprint, suffix)
+
+
+def _build_proxy_target(
+    request: Request,
+    *,
+    asset_id: int,
+    image_path: str,
+    source: IIIFSourceEntry,
+    visibility_scope: str,
+    capability: str | None = None,
+) -> _ProxyTarget:
+    requested_version, unversioned_path = _split_service_version(image_path)
+    resolved_identifier, suffix = _resolve_requested_iiif_identifier(
+        unversioned_path,
+        expected_identifier=source.identifier,
+        aliases=set(source.aliases),
+    )
+
+    target_url = _cantaloupe_image_service_url(request, resolved_identifier)
+    if suffix:
+        target_url = f"{target_url}/{suffix}"
+    return _ProxyTarget(
+        asset_id=asset_id,
+        target_url=target_url,
+        source_path=source.source_path,
+        resolved_identifier=resolved_identifier,
+        suffix=suffix,
+        iiif_ready=source.iiif_ready,
+        visibility_scope=visibility_scope,
+        source_fingerprint=build_iiif_source_fingerprint(source.source_path),
+        requested_version=requested_version,
+        capability=capability,
+    )
+
+
+def _load_iiif_source_entry(db: Session, asset_id: int) -> IIIFSourceEntry:
+    asset = db.query(Asset).filter(Asset.id == asset_id).first()
+    if not asset:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    source = _build_iiif_source_entry(asset, _resolve_iiif_source_path(asset))
+    _remember_ready_source(asset_id, source)
+    return source
+
+
+def _resolve_proxy_target(
+    db: Session,
+    *,
     asset_id: int,
     image_path: str,
     request: Request,
-    db: Session = Depends(get_db),
-    user: CurrentUser = Depends(require_permission("image.view")),
-):
-    user = ensure_current_user(user)
+    user: CurrentUser,
+) -> _ProxyTarget:
     asset = db.query(Asset).filter(Asset.id == asset_id).first()
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
     _assert_asset_visible(asset, user)
 
-    iiif_source_path = _resolve_iiif_source_path(asset)
-    iiif_identifier = _iiif_identifier_for_source_path(iiif_source_path)
-    actual_filename = os.path.basename(iiif_source_path)
-    resolved_identifier, suffix = _resolve_requested_iiif_identifier(
-        image_path,
-        expected_identifier=iiif_identifier,
-        aliases={actual_filename, asset.filename or ""},
+    source = _build_iiif_source_entry(asset, _resolve_iiif_source_path(asset))
+    _remember_ready_source(asset_id, source)
+    return _build_proxy_target(
+        request,
+        asset_id=asset_id,
+        image_path=image_path,
+        source=source,
+        visibility_scope=_asset_visibility_scope(asset),
     )
 
-    target_url = _cantaloupe_image_service_url(request, resolved_identifier)
-    if suffix:
-        target_url = f"{target_url}/{suffix}"
 
-    upstream = httpx.get(target_url, timeout=IIIF_UPSTREAM_TIMEOUT)
+def _rewrite_info_json(content: bytes, *, proxy_base_url: str) -> bytes | None:
+    try:
+        info_json = json.loads(content)
+        info_json["@id"] = proxy_base_url
+        info_json["atId"] = proxy_base_url
+        info_json["id"] = proxy_base_url
+        return json.dumps(info_json, ensure_ascii=False).encode("utf-8")
+    except Exception:
+        return None
+
+
+def _is_info_json_response(suffix: str, content_type: str) -> bool:
+    return suffix.endswith("info.json") and "json" in content_type.lower()
+
+
+def _proxy_cache_headers(target: _ProxyTarget) -> dict[str, str]:
+    if not target.iiif_ready:
+        return {"cache-control": "no-store"}
+
+    # Lower-case keys so these replace the forwarded upstream validators.
+    headers: dict[str, str] = {}
+    if target.etag:
+        headers["etag"] = target.etag
+    if target.is_immutable:
+        # Shared caches only see capability URLs: a session-authenticated
+        # response would otherwise be replayed to requests without a session.
+        audience = "public" if target.capability and target.visibility_scope == "open" else "private"
+        headers["cache-control"] = f"{audience}, max-age={config.IIIF_TILE_CACHE_MAX_AGE_SECONDS}, immutable"
+    else:
+        headers["cache-control"] = "no-cache"
+    return headers
+
+
+def _proxy_iiif_upstream_sync(
+    target: _ProxyTarget,
+    *,
+    proxy_base_url: str,
+) -> tuple[Response, CachedTile | None]:
+    upstream = httpx.get(target.target_url, timeout=IIIF_UPSTREAM_TIMEOUT)
     content_type = upstream.headers.get("content-type", "application/octet-stream")
     content = upstream.content
 
-    if suffix.endswith("info.json") and "json" in content_type.lower():
-        try:
-            info_json = upstream.json()
-            proxy_base_url = _backend_image_service_url(request, asset_id, resolved_identifier)
-            info_json["@id"] = proxy_base_url
-            info_json["atId"] = proxy_base_url
-            info_json["id"] = proxy_base_url
-            content = json.dumps(info_json, ensure_ascii=False).encode("utf-8")
+    if _is_info_json_response(target.suffix, content_type):
+        rewritten = _rewrite_info_json(content, proxy_base_url=proxy_base_url)
+        if rewritten is not None:
+            content = rewritten
             content_type = "application/json; charset=utf-8"
-        except Exception:
-            pass
 
-    return Response(
+    headers = forwarded_response_headers(upstream.headers, include_length=False)
+    headers.pop("content-encoding", None)
+    headers.update(_proxy_cache_headers(target))
+    response = Response(
         content=content,
         status_code=upstream.status_code,
         media_type=content_type,
-        headers={"Cache-Control": "no-store"} if is_iiif_ready(asset) else None,
+        headers=headers,
+    )
+    cacheable = upstream.status_code == 200 and len(content) <= config.IIIF_TILE_CACHE_MAX_ENTRY_BYTES
+    return response, CachedTile(content=content, content_type=content_type) if cacheable else None
+
+
+async def _proxy_iiif_upstream_streaming(
+    target: _ProxyTarget,
+    *,
+    proxy_base_url: str,
+) -> tuple[Response, CachedTile | None]:
+    client = get_iiif_upstream_client()
+    upstream = await client.send(client.build_request("GET", target.target_url), stream=True)
+    content_type = upstream.headers.get("content-type", "application/octet-stream")
+
+    content_length = upstream.headers.get("content-length")
+    buffer_for_cache = (
+        upstream.status_code == 200
+        and target.cache_key(proxy_base_url) is not None
+        and content_length is not None
+        and content_length.isdigit()
+        and int(content_length) <= config.IIIF_TILE_CACHE_MAX_ENTRY_BYTES
+        and "content-encoding" not in upstream.headers
+    )
+
+    if _is_info_json_response(target.suffix, content_type) or buffer_for_cache:
+        try:
+            content = await upstream.aread()
+        finally:
+            await upstream.aclose()
+        if _is_info_json_response(target.suffix, content_type):
+            rewritten = _rewrite_info_json(content, proxy_base_url=proxy_base_url)
+            if rewritten is not None:
+                content = rewritten
+                content_type = "application/json; charset=utf-8"
+        headers = forwarded_response_headers(upstream.headers, include_length=False)
+        headers.pop("content-encoding", None)
+        headers.update(_proxy_cache_headers(target))
+        response = Response(
+            content=content,
+            status_code=upstream.status_code,
+            media_type=content_type,
+            headers=headers,
+        )
+        cacheable = upstream.status_code == 200 and len(content) <= config.IIIF_TILE_CACHE_MAX_ENTRY_BYTES
+        return response, CachedTile(content=content, content_type=content_type) if cacheable else None
+
+    headers = forwarded_response_headers(upstream.headers)
+    headers.update(_proxy_cache_headers(target))
+    return (
+        StreamingResponse(
+            upstream.aiter_raw(),
+            status_code=upstream.status_code,
+            media_type=content_type,
+            headers=headers,
+            background=BackgroundTask(upstream.aclose),
+        ),
+        None,
+    )
+
+
+async def _render_iiif_native(
+    target: _ProxyTarget,
+    *,
+    proxy_base_url: str,
+) -> tuple[Response, CachedTile | None]:
+    if not target.suffix:
+        return RedirectResponse(f"{proxy_base_url}/info.json", status_code=303), None
+
+    loop = asyncio.get_running_loop()
+    executor = get_iiif_render_executor()
+    try:
+        if target.suffix == "info.json":
+            info = await loop.run_in_executor(executor, lambda: build_iiif_info(target.source_path, service_id=proxy_base_url))
+            content = json.dumps(info, ensure_ascii=False).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        else:
+            content, content_type = await loop.run_in_executor(executor, render_iiif_image, target.source_path, target.suffix)
+    except IIIFImageRequestError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
+
+    response = Response(content=content, media_type=content_type, headers=_proxy_cache_headers(target))
+    cacheable = len(content) <= config.IIIF_TILE_CACHE_MAX_ENTRY_BYTES
+    return response, CachedTile(content=content, content_type=content_type) if cacheable else None
+
+
+_TILE_FLIGHT = AsyncSingleFlight("iiif_tile")
+
+
+def _cached_tile_response(target: _ProxyTarget, cached: CachedTile) -> Response:
+    return Response(content=cached.content, media_type=cached.content_type, headers=_proxy_cache_headers(target))
+
+
+async def _fetch_from_image_server(
+    target: _ProxyTarget,
+    *,
+    proxy_base_url: str,
+) -> tuple[Response, CachedTile | None]:
+    if config.IIIF_IMAGE_SERVER == "native":
+        return await _render_iiif_native(target, proxy_base_url=proxy_base_url)
+    if config.IIIF_PROXY_MODE == "sync":
+        return await run_in_threadpool(_proxy_iiif_upstream_sync, target, proxy_base_url=proxy_base_url)
+    return await _proxy_iiif_upstream_streaming(target, proxy_base_url=proxy_base_url)
+
+
+async def _fetch_and_cache(
+    target: _ProxyTarget,
+    *,
+    proxy_base_url: str,
+    cache_key: str,
+) -> tuple[Response, CachedTile | None]:
+    tile_cache = get_iiif_tile_cache()
+    lock = cross_process_lock(tile_cache.lock_path(cache_key))
+    if lock is not None:
+        # Polled on the event loop, so waiting parks no threadpool worker and a
+        # cancelled request cannot end up holding the lock.
+        await lock.acquire_async()
+    try:
+        if lock is not None:
+            # Another worker may have filled the shared disk cache while we waited.
+            cached = await run_in_threadpool(tile_cache.get, cache_key)
+            if cached is not None:
+                record_single_flight_event(_TILE_FLIGHT.namespace, "cross_process_hits")
+                return _cached_tile_response(target, cached), cached
+
+        response, cache_entry = await _fetch_from_image_server(target, proxy_base_url=proxy_base_url)
+        if cache_entry is not None:
+            await run_in_threadpool(tile_cache.put, cache_key, cache_entry)
+        return response, cache_entry
+    finally:
+        if lock is not None:
+            lock.release()
+
+
+async def _serve_proxy_target(target: _ProxyTarget, request: Request) -> Response:
+    if target.etag and etag_matches(request.headers.get("if-none-match"), target.etag):
+        return Response(status_code=304, headers=_proxy_cache_headers(target))
+
+    proxy_base_url = _backend_image_service_url(
+        request,
+        target.asset_id,
+        target.resolved_identifier,
+        version=target.source_fingerprint,
+        capability=target.capability,
+    )
+    cache_key = target.cache_key(proxy_base_url)
+    if cache_key is None:
+        response, _cache_entry = await _fetch_from_image_server(target, proxy_base_url=proxy_base_url)
+        return response
+
+    tile_cache = get_iiif_tile_cache()
+    cached = tile_cache.get_memory(cache_key) or await run_in_threadpool(tile_cache.get, cache_key)
+    if cached is not None:
+        return _cached_tile_response(target, cached)
+
+    (response, cache_entry), is_leader = await _TILE_FLIGHT.do(
+        cache_key,
+        lambda: _fetch_and_cache(target, proxy_base_url=proxy_base_url, cache_key=cache_key),
+    )
+    if is_leader:
+        return response
+    if cache_entry is not None:
+        return _cached_tile_response(target, cache_entry)
+    # The leader streamed its body or got an error status, neither of which
+    # can be replayed; fetch independently.
+    response, _cache_entry = await _fetch_from_image_server(target, proxy_base_url=proxy_base_url)
+    return response
+
+
+# Capability URLs from the manifest are authorised by signature alone,
+# without a session lookup.
+@router.get("/iiif/{asset_id}/capability/{capability}/{image_path:path}")
+async def proxy_iiif_image_with_capability(
+    asset_id: int,
+    capability: str,
+    image_path: str,
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    source = lookup_iiif_source(asset_id)
+    if source is None or not os.path.exists(source.source_path):
+        forget_iiif_source(asset_id)
+        try:
+            source = await run_in_threadpool(_load_iiif_source_entry, db, asset_id)
+        except HTTPException:
+            # A missing or unservable asset is only reported once the session
+            # check has passed, so capability URLs cannot probe for assets.
+            source = None
+
+    grant = None
+    if source is not None:
+        grant = verify_iiif_capability(capability, asset_id=asset_id, identifier=source.identifier)
+    if grant is None:
+        # Expired, tampered or minted by another worker's key: fall back to
+        # the full session and visibility check.
+        user = await run_in_threadpool(get_current_user_from_request, db, request)
+        user = require_permission("image.view")(user)
+        return await proxy_iiif_image(asset_id=asset_id, image_path=image_path, request=request, db=db, user=user)
+
+    target = _build_proxy_target(
+        request,
+        asset_id=asset_id,
+        image_path=image_path,
+        source=source,
+        visibility_scope=grant.visibility_scope,
+        capability=capability,
+    )
+    return await _serve_proxy_target(target, request)
+
+
+@router.get("/iiif/{asset_id}/service/{image_path:path}")
+async def proxy_iiif_image(
+    asset_id: int,
+    image_path: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    user: CurrentUser = Depends(require_permission("image.view")),
+):
+    user = ensure_current_user(user)
+    target = await run_in_threadpool(
+        _resolve_proxy_target,
+        db,
+        asset_id=asset_id,
+        image_path=image_path,
+        request=request,
+        user=user,
     )
+    return await _serve_proxy_target(target, request)
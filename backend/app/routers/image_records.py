@@ -1,12 +1,11 @@
 from __future__ import annotations
 
-import hashlib
 import os
 import secrets
 from datetime import datetime, timezone
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
 from sqlalchemy.orm import Session
 from PIL import Image
 
@@ -18,6 +17,7 @@ from ..schemas import (
     CulturalObjectSampleListResponse,
     CulturalObjectLookupResponse,
     ImageIngestSheetDetailResponse,
+    ImageIngestSheetFaceRecognitionResponse,
     ImageIngestSheetSaveRequest,
     ImageIngestSheetSummary,
     ImageRecordActionRequest,
@@ -31,6 +31,7 @@ from ..schemas import (
     ImageRecordValidationResult,
     ImageRecordValidationState,
 )
+from ..services.asset_fixity import find_assets_by_fixity, normalize_fixity_sha256
 from ..services.cultural_object_lookup import list_cultural_object_samples, lookup_cultural_object_by_number
 from ..services.face_recognition import build_face_recognition_pending_state
 from ..services.image_record_validation import (
@@ -43,8 +44,28 @@ from ..services.iiif_access import (
     mark_asset_derivative_pending,
     mark_asset_ready_with_original_access,
 )
-from ..services.metadata_layers import CORE_FIELD_LABELS, FIELD_LABELS, PROFILE_DEFINITIONS, build_metadata_layers, get_fixity_sha256
-from ..tasks import generate_iiif_access_derivative, recognize_business_activity_faces
+from ..services.ingest_pipeline import (
+    IngestTimer,
+    StreamedUpload,
+    read_file_header,
+    sniff_image_header,
+    stream_upload_to_disk,
+)
+from ..services.metadata_layers import CORE_FIELD_LABELS, FIELD_LABELS, PROFILE_DEFINITIONS, build_metadata_layers
+from ..services.query_options import (
+    IMAGE_INGEST_SHEET_DETAIL_OPTIONS,
+    IMAGE_INGEST_SHEET_LIST_OPTIONS,
+    IMAGE_RECORD_LIST_OPTIONS,
+    IMAGE_RECORD_SUMMARY_OPTIONS,
+)
+from ..services.resumable_uploads import ResumableUploadError, resolve_upload_file
+from ..services.search_index import apply_text_search
+from ..tasks import (
+    enqueue_face_recognition_batches,
+    generate_iiif_access_derivative,
+    generate_preview_ladder,
+    recognize_business_activity_faces,
+)
 from ..utils.metadata import extract_metadata
 
 router = APIRouter(prefix="/image-records", tags=["image-records"])
@@ -191,8 +212,8 @@ def _sheet_metadata_info(sheet: ImageIngestSheet) -> dict[str, Any]:
     return sheet.metadata_info if isinstance(sheet.metadata_info, dict) else {}
 
 
-def _get_sheet_or_404(sheet_id: int, db: Session) -> ImageIngestSheet:
-    sheet = db.query(ImageIngestSheet).filter(ImageIngestSheet.id == sheet_id).first()
+def _get_sheet_or_404(sheet_id: int, db: Session, *options) -> ImageIngestSheet:
+    sheet = db.query(ImageIngestSheet).options(*options).filter(ImageIngestSheet.id == sheet_id).first()
     if sheet is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image ingest sheet not found")
     return sheet
@@ -368,33 +389,16 @@ def _clear_pending_upload(record: ImageRecord) -> None:
     _set_pending_upload(record, None)
 
 
-def _record_search_text(record: ImageRecord) -> str:
-    management = _management_section(record)
-    profile_fields = _profile_fields(record)
-    tokens = [
-        record.record_no,
-        record.title,
-        management.get("project_name"),
-        management.get("image_name"),
-        profile_fields.get("object_number"),
-    ]
-    return " ".join(str(token).lower() for token in tokens if token not in (None, ""))
-
-
-def _matches_query(record: ImageRecord, normalized_query: str | None) -> bool:
+def _search_records(query, normalized_query: str | None, *order_by):
+    """Apply the ``q`` filter in SQL; matches are ranked first, then ``order_by`` breaks ties."""
     if not normalized_query:
-        return True
-    return normalized_query.lower() in _record_search_text(record)
+        return query.order_by(*order_by)
+    search = apply_text_search(query, ImageRecord, normalized_query)
+    return search.query.order_by(search.rank.desc(), *order_by)
 
 
 def _duplicate_assets_for_hash(db: Session, sha256: str) -> list[Asset]:
-    if not sha256:
-        return []
-    matches: list[Asset] = []
-    for asset in db.query(Asset).order_by(Asset.id.asc()).all():
-        if get_fixity_sha256(asset.metadata_info) == sha256:
-            matches.append(asset)
-    return matches
+    return find_assets_by_fixity(db, sha256)
 
 
 def _serialize_pending_upload(record: ImageRecord) -> ImageRecordPendingUpload | None:
@@ -845,23 +849,6 @@ def _temp_upload_dir() -> str:
     return directory
 
 
-async def _write_upload_file(destination_path: str, upload_file: UploadFile) -> int:
-    written = 0
-    with open(destination_path, "wb") as buffer:
-        while content := await upload_file.read(64 * 1024):
-            buffer.write(content)
-            written += len(content)
-    return written
-
-
-def _compute_file_sha256(file_path: str) -> str:
-    digest = hashlib.sha256()
-    with open(file_path, "rb") as handle:
-        while chunk := handle.read(64 * 1024):
-            digest.update(chunk)
-    return digest.hexdigest()
-
-
 def _extract_probe_dimensions(metadata: dict[str, Any]) -> tuple[int | None, int | None, str | None]:
     file_group = metadata.get("File")
     if not isinstance(file_group, dict):
@@ -887,18 +874,38 @@ def _extract_probe_dimensions(metadata: dict[str, Any]) -> tuple[int | None, int
     return width, height, format_name
 
 
-def _probe_image_file(file_path: str, fallback_mime_type: str | None) -> tuple[int | None, int | None, str | None, int | None]:
+# Formats whose files can hold several frames; only these are reopened to count them.
+_MULTI_FRAME_FORMATS = {"TIFF", "GIF", "PNG", "WEBP", "MPO", "PSD"}
+
+
+def _probe_image_file(
+    file_path: str,
+    fallback_mime_type: str | None,
+    header: bytes | None = None,
+) -> tuple[int | None, int | None, str | None, int | None]:
     width: int | None = None
     height: int | None = None
     format_name: str | None = fallback_mime_type
     frame_count: int | None = None
-    try:
-        with Image.open(file_path) as image:
-            width, height = image.size
-            format_name = image.format or fallback_mime_type
-            frame_count = int(getattr(image, "n_frames", 1) or 1)
-    except Exception:
-        pass
+
+    # ``header`` is what the upload stream captured; it only has to be read
+    # from disk for callers that did not stream the file themselves.
+    sniffed = sniff_image_header(header if header is not None else read_file_header(file_path))
+    if sniffed is not None:
+        width, height, format_name = sniffed.width, sniffed.height, sniffed.format_name
+        if sniffed.format_name not in _MULTI_FRAME_FORMATS and sniffed.format_name != "PSB":
+            frame_count = 1
+
+    if sniffed is None or sniffed.format_name in _MULTI_FRAME_FORMATS:
+        # Pillow opens lazily: for a TIFF whose IFD sits after the pixel data it
+        # seeks straight there, and counting frames walks the IFD chain only.
+        try:
+            with Image.open(file_path) as image:
+                width, height = width or image.size[0], height or image.size[1]
+                format_name = image.format or format_name
+                frame_count = int(getattr(image, "n_frames", 1) or 1)
+        except Exception:
+            pass
 
     if width is None or height is None:
         exif_metadata = extract_metadata(file_path)
@@ -935,6 +942,8 @@ def _apply_asset_access_strategy(asset: Asset) -> None:
 def _enqueue_asset_derivative_generation(asset: Asset) -> None:
     if asset.status == "processing" and asset.file_path:
         generate_iiif_access_derivative.delay(asset.id, asset.file_path)
+    elif asset.status == "ready":
+        generate_preview_ladder.delay(asset.id)
 
 
 def _set_face_recognition_pending(record: ImageRecord, asset: Asset) -> None:
@@ -997,15 +1006,22 @@ def _enqueue_business_activity_face_recognition(record: ImageRecord, asset: Asse
 def _build_pending_upload_payload(
     record: ImageRecord,
     asset_file: UploadFile,
-    file_path: str,
-    file_size: int,
+    streamed: StreamedUpload,
+    timer: IngestTimer,
     db: Session,
     actor: CurrentUser,
 ) -> dict[str, Any]:
     original_filename = os.path.basename(asset_file.filename or "upload.bin")
     extension = original_filename.rsplit(".", 1)[-1].lower() if "." in original_filename else ""
-    sha256 = _compute_file_sha256(file_path)
-    width, height, format_name, frame_count = _probe_image_file(file_path, asset_file.content_type)
+    file_path = streamed.path
+    file_size = streamed.file_size
+    sha256 = streamed.sha256
+    with timer.stage("probe"):
+        width, height, format_name, frame_count = _probe_image_file(
+            file_path,
+            asset_file.content_type,
+            streamed.header,
+        )
 
     filename_matches: list[str] = []
     lowered_filename = original_filename.lower()
@@ -1049,6 +1065,7 @@ def _build_pending_upload_payload(
         "warnings": [rule.message for rule in validation.validation_report if rule.level == "warning"],
         "validation": validation.model_dump(),
         "duplicate_assets": _serialize_duplicate_assets(duplicate_assets),
+        "ingest_timings": timer.as_dict(),
     }
 
 
@@ -1084,6 +1101,7 @@ def _build_asset_metadata_from_pending_upload(record: ImageRecord, pending_uploa
         "visibility_scope": record.visibility_scope,
         "collection_object_id": record.collection_object_id,
     }
+    ingest_timings = pending_upload.get("ingest_timings")
     return build_metadata_layers(
         asset_filename=str(pending_upload.get("filename") or ""),
         asset_file_path=str(pending_upload.get("temp_path") or ""),
@@ -1096,6 +1114,7 @@ def _build_asset_metadata_from_pending_upload(record: ImageRecord, pending_uploa
         metadata={
             **base_metadata,
             "management": _management_section(record),
+            "technical": {"ingest_timings": ingest_timings} if ingest_timings else {},
             "profile": {
                 "key": record.profile_key,
                 "fields": _profile_fields(record),
@@ -1137,17 +1156,26 @@ def list_ready_for_upload_records(
     db: Session = Depends(get_db),
     user: CurrentUser = Depends(require_permission("image.record.view_ready_for_upload")),
 ):
-    query = db.query(ImageRecord).filter(ImageRecord.status == READY_STATUS)
+    query = db.query(ImageRecord).options(*IMAGE_RECORD_SUMMARY_OPTIONS).filter(ImageRecord.status == READY_STATUS)
     if not user.has_permission("image.record.list"):
         photographer = _find_user_entity(db, user)
         if photographer is None:
             return []
         query = query.filter(ImageRecord.assigned_photographer_user_id == photographer.id)
 
-    records = query.order_by(ImageRecord.submitted_at.desc(), ImageRecord.updated_at.desc(), ImageRecord.id.desc()).all()
-    normalized_q = _clean_optional_text(q)
-    visible_records = [record for record in records if _matches_query(record, normalized_q)]
-    return [_serialize_image_record(record) for record in visible_records[skip : skip + limit]]
+    records = (
+        _search_records(
+            query,
+            _clean_optional_text(q),
+            ImageRecord.submitted_at.desc(),
+            ImageRecord.updated_at.desc(),
+            ImageRecord.id.desc(),
+        )
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return [_serialize_image_record(record) for record in records]
 
 
 @router.get("/artifact-lookup", response_model=CulturalObjectLookupResponse)
@@ -1177,7 +1205,12 @@ def list_image_ingest_sheets(
     user: CurrentUser = Depends(require_any_permission("image.record.list", "image.record.view_ready_for_upload")),
 ):
     normalized_q = _clean_optional_text(q)
-    sheets = db.query(ImageIngestSheet).order_by(ImageIngestSheet.updated_at.desc(), ImageIngestSheet.id.desc()).all()
+    sheets = (
+        db.query(ImageIngestSheet)
+        .options(*IMAGE_INGEST_SHEET_LIST_OPTIONS)
+        .order_by(ImageIngestSheet.updated_at.desc(), ImageIngestSheet.id.desc())
+        .all()
+    )
     visible: list[ImageIngestSheet] = []
     for sheet in sheets:
         if not _is_sheet_visible_to_user(sheet, user):
@@ -1221,8 +1254,7 @@ def create_image_ingest_sheet(
     sheet.sheet_no = f"IS-{datetime.now(timezone.utc):%Y%m%d}-{sheet.id:06d}"
     _apply_sheet_payload(sheet, payload, db, user)
     db.commit()
-    db.refresh(sheet)
-    return _serialize_sheet_detail(sheet, user)
+    return _serialize_sheet_detail(_get_sheet_or_404(sheet.id, db, *IMAGE_INGEST_SHEET_DETAIL_OPTIONS), user)
 
 
 @router.get("/sheets/{sheet_id}", response_model=ImageIngestSheetDetailResponse)
@@ -1231,7 +1263,7 @@ def get_image_ingest_sheet(
     db: Session = Depends(get_db),
     user: CurrentUser = Depends(require_permission("image.record.view")),
 ):
-    sheet = _get_sheet_or_404(sheet_id, db)
+    sheet = _get_sheet_or_404(sheet_id, db, *IMAGE_INGEST_SHEET_DETAIL_OPTIONS)
     if not _is_sheet_visible_to_user(sheet, user):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Image ingest sheet is not visible to current user")
     return _serialize_sheet_detail(sheet, user)
@@ -1247,8 +1279,36 @@ def update_image_ingest_sheet(
     sheet = _get_sheet_or_404(sheet_id, db)
     _apply_sheet_payload(sheet, payload, db, user)
     db.commit()
-    db.refresh(sheet)
-    return _serialize_sheet_detail(sheet, user)
+    return _serialize_sheet_detail(_get_sheet_or_404(sheet_id, db, *IMAGE_INGEST_SHEET_DETAIL_OPTIONS), user)
+
+
+@router.post(
+    "/sheets/{sheet_id}/face-recognition",
+    response_model=ImageIngestSheetFaceRecognitionResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def recognize_image_ingest_sheet_faces(
+    sheet_id: int,
+    db: Session = Depends(get_db),
+    user: CurrentUser = Depends(require_permission("image.record.edit")),
+):
+    """Re-run face recognition for every business-activity item of the sheet that has an image."""
+    if not config.FACE_RECOGNITION_ENABLED:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Face recognition is disabled")
+    sheet = _get_sheet_or_404(sheet_id, db, *IMAGE_INGEST_SHEET_DETAIL_OPTIONS)
+    if not _is_sheet_visible_to_user(sheet, user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Image ingest sheet is not visible to current user")
+
+    pairs: list[tuple[int, int]] = []
+    for record in sheet.items:
+        if record.profile_key != "business_activity" or record.asset is None:
+            continue
+        _set_face_recognition_pending(record, record.asset)
+        pairs.append((record.id, record.asset.id))
+    db.commit()
+
+    batch_count = enqueue_face_recognition_batches(pairs)
+    return ImageIngestSheetFaceRecognitionResponse(sheet_id=sheet_id, record_count=len(pairs), batch_count=batch_count)
 
 
 @router.post("/sheets/{sheet_id}/items", response_model=ImageRecordDetailResponse, status_code=status.HTTP_201_CREATED)
@@ -1372,7 +1432,7 @@ def list_image_records(
     db: Session = Depends(get_db),
     user: CurrentUser = Depends(require_any_permission("image.record.list", "image.record.view_ready_for_upload")),
 ):
-    query = db.query(ImageRecord)
+    query = db.query(ImageRecord).options(*IMAGE_RECORD_LIST_OPTIONS)
 
     normalized_status = _clean_optional_text(status_code)
     if normalized_status:
@@ -1380,9 +1440,8 @@ def list_image_records(
     elif not user.has_permission("image.record.list"):
         query = query.filter(ImageRecord.status.in_([READY_STATUS, UPLOADED_PENDING_VALIDATION_STATUS]))
 
-    records = query.order_by(ImageRecord.updated_at.desc(), ImageRecord.id.desc()).all()
-    normalized_q = _clean_optional_text(q)
-    visible_records = [record for record in records if _is_visible_to_user(record, user) and _matches_query(record, normalized_q)]
+    records = _search_records(query, _clean_optional_text(q), ImageRecord.updated_at.desc(), ImageRecord.id.desc()).all()
+    visible_records = [record for record in records if _is_visible_to_user(record, user)]
     visible_records = visible_records[skip : skip + limit]
     return [_serialize_image_record(record) for record in visible_records]
 
@@ -1486,7 +1545,8 @@ def return_image_record(
 @router.post("/{record_id}/upload-temp", response_model=ImageRecordDetailResponse)
 async def upload_temp_image_for_record(
     record_id: int,
-    file: UploadFile = File(...),
+    file: UploadFile | None = File(None),
+    upload_id: str | None = Form(None),
     db: Session = Depends(get_db),
     user: CurrentUser = Depends(require_permission("image.file.upload")),
 ):
@@ -1497,6 +1557,13 @@ async def upload_temp_image_for_record(
             detail="Temporary upload is only allowed for records that are ready for upload or awaiting validation",
         )
 
+    # Resolved only once the record checks pass: a resumable upload holds its
+    # part file open until it is streamed into place.
+    try:
+        file = resolve_upload_file(file, upload_id, owner=user.user_id)
+    except ResumableUploadError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
+
     _clear_pending_upload(record)
 
     filename = os.path.basename(file.filename or "")
@@ -1505,9 +1572,11 @@ async def upload_temp_image_for_record(
 
     temp_directory = _temp_upload_dir()
     temp_path = os.path.join(temp_directory, f"record-{record.id}-{secrets.token_hex(8)}-{filename}")
-    file_size = await _write_upload_file(temp_path, file)
+    timer = IngestTimer()
+    with timer.stage("stream"):
+        streamed = await stream_upload_to_disk(file, temp_path)
 
-    pending_upload = _build_pending_upload_payload(record, file, temp_path, file_size, db, user)
+    pending_upload = _build_pending_upload_payload(record, file, streamed, timer, db, user)
     _set_pending_upload(record, pending_upload)
     _append_audit_entry(record, "temp_upload_created", user, filename)
 
@@ -1545,6 +1614,7 @@ def confirm_bind_image_record(
         file_path=str(pending_upload.get("temp_path") or ""),
         file_size=int(pending_upload.get("file_size") or 0),
         mime_type=_clean_optional_text(pending_upload.get("mime_type")),
+        fixity_sha256=normalize_fixity_sha256(pending_upload.get("sha256")),
         visibility_scope=record.visibility_scope,
         collection_object_id=record.collection_object_id,
         image_record_id=record.id,
@@ -1603,6 +1673,7 @@ def confirm_replace_image_record_asset(
         file_path=str(pending_upload.get("temp_path") or ""),
         file_size=int(pending_upload.get("file_size") or 0),
         mime_type=_clean_optional_text(pending_upload.get("mime_type")),
+        fixity_sha256=normalize_fixity_sha256(pending_upload.get("sha256")),
         visibility_scope=record.visibility_scope,
         collection_object_id=record.collection_object_id,
         image_record_id=record.id,
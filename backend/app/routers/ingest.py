@@ -1,22 +1,25 @@
-import hashlib
 import json
 import os
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile
 from PIL import Image
 from sqlalchemy.orm import Session
 
 from .. import config
 from ..database import get_db
 from ..models import Asset
+from ..permissions import get_current_user_from_request
 from ..schemas import IngestSipResponse
+from ..services.asset_source_metadata import detach_source_metadata, store_asset_source_metadata
 from ..services.iiif_access import (
     get_asset_iiif_access_file_path,
     mark_asset_derivative_pending,
     mark_asset_ready_with_original_access,
 )
+from ..services.ingest_pipeline import IngestTimer, sniff_image_header, stream_upload_to_disk
 from ..services.metadata_layers import build_metadata_layers
-from ..tasks import generate_iiif_access_derivative
+from ..services.resumable_uploads import ResumableUploadError, resolve_upload_file
+from ..tasks import generate_iiif_access_derivative, generate_preview_ladder
 from ..utils.metadata import extract_metadata
 
 router = APIRouter(
@@ -28,8 +31,10 @@ router = APIRouter(
 
 @router.post("/sip", response_model=IngestSipResponse)
 async def ingest_sip(
-    file: UploadFile = File(...),
+    request: Request,
+    file: UploadFile | None = File(None),
     manifest: str = Form(...),
+    upload_id: str | None = Form(None),
     db: Session = Depends(get_db)
 ):
     """
@@ -38,6 +43,7 @@ async def ingest_sip(
 
     - **file**: The binary file stream (image).
     - **manifest**: JSON string containing metadata and client-side calculated SHA256 hash.
+    - **upload_id**: A completed resumable upload (see /uploads) to ingest instead of **file**.
     """
 
     try:
@@ -51,17 +57,25 @@ async def ingest_sip(
     except json.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid JSON manifest")
 
-    sha256_hash = hashlib.sha256()
+    owner = None
+    if isinstance(upload_id, str) and upload_id:
+        # Resumable uploads belong to whoever created them, so naming one
+        # needs the same credentials even though plain SIPs stay anonymous.
+        owner = get_current_user_from_request(db, request).user_id
+    try:
+        file = resolve_upload_file(file, upload_id, owner=owner)
+    except ResumableUploadError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
+
+    timer = IngestTimer()
     file_location = os.path.join(config.UPLOAD_DIR, file.filename)
     temp_location = file_location + ".tmp"
 
     try:
-        with open(temp_location, "wb") as buffer:
-            while content := await file.read(64 * 1024):
-                sha256_hash.update(content)
-                buffer.write(content)
+        with timer.stage("stream"):
+            streamed = await stream_upload_to_disk(file, temp_location)
 
-        server_hash = sha256_hash.hexdigest()
+        server_hash = streamed.sha256
         if server_hash.lower() != client_hash.lower():
             os.remove(temp_location)
             raise HTTPException(
@@ -73,15 +87,23 @@ async def ingest_sip(
             os.remove(file_location)
         os.rename(temp_location, file_location)
 
-        file_size = os.path.getsize(file_location)
-        exif_metadata = extract_metadata(file_location)
+        file_size = streamed.file_size
+        with timer.stage("exiftool"):
+            exif_metadata = extract_metadata(file_location)
 
         width, height = 0, 0
-        try:
-            with Image.open(file_location) as img:
-                width, height = img.size
-        except Exception:
-            pass
+        with timer.stage("probe"):
+            sniffed = sniff_image_header(streamed.header)
+            if sniffed is not None:
+                width, height = sniffed.width, sniffed.height
+            else:
+                # The dimensions live beyond the captured header (e.g. a TIFF
+                # whose IFD was written last); Pillow only seeks to them.
+                try:
+                    with Image.open(file_location) as img:
+                        width, height = img.size
+                except Exception:
+                    pass
 
         if width == 0 or height == 0:
             try:
@@ -128,7 +150,7 @@ async def ingest_sip(
                 "original_file_name": file.filename,
                 "image_file_name": image_file_name,
                 "file_size": file_size,
-                "format_name": file_group.get("FileType") or file.content_type,
+                "format_name": file_group.get("FileType") or (sniffed.format_name if sniffed else None) or file.content_type,
                 "format_version": file_group.get("FileTypeVersion"),
                 "width": width,
                 "height": height,
@@ -144,11 +166,15 @@ async def ingest_sip(
             },
         )
 
+        final_metadata["technical"]["ingest_timings"] = timer.as_dict()
+        source_metadata = detach_source_metadata(final_metadata)
+
         db_asset = Asset(
             filename=file.filename,
             file_path=file_location,
             file_size=file_size,
             mime_type=file.content_type,
+            fixity_sha256=server_hash,
             visibility_scope=normalized_visibility_scope,
             collection_object_id=collection_object_id,
             status="processing",
@@ -156,6 +182,7 @@ async def ingest_sip(
             process_message="SIP received and awaiting IIIF access decision.",
             metadata_info=final_metadata
         )
+        store_asset_source_metadata(db_asset, source_metadata)
 
         if get_asset_iiif_access_file_path(db_asset, allow_original_fallback=False):
             mark_asset_ready_with_original_access(db_asset)
@@ -168,6 +195,8 @@ async def ingest_sip(
 
         if db_asset.status == "processing":
             generate_iiif_access_derivative.delay(db_asset.id, file_location)
+        elif db_asset.status == "ready":
+            generate_preview_ladder.delay(db_asset.id)
 
         return {
             "status": "success",
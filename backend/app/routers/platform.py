@@ -1,4 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
+import heapq
+from itertools import islice
+
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
 from ..database import get_db
@@ -7,10 +10,15 @@ from ..schemas import (
     UnifiedResourceSourceSummary,
     UnifiedResourceSummary,
 )
+from ..platform.base import ResourceCursor, resource_sort_key
 from ..platform.registry import registry
 
 router = APIRouter(prefix="/platform", tags=["platform"])
 
+RESOURCE_PAGE_SIZE = 100
+RESOURCE_PAGE_MAX_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
 
 @router.get("/sources", response_model=list[UnifiedResourceSourceSummary])
 def get_sources(db: Session = Depends(get_db)):
@@ -19,32 +27,53 @@ def get_sources(db: Session = Depends(get_db)):
 
 @router.get("/resources", response_model=list[UnifiedResourceSummary])
 def get_resources(
+    response: Response,
     q: str | None = None,
     status: str | None = None,
     resource_type: str | None = None,
     profile_key: str | None = None,
     preview_enabled: bool | None = None,
     source_system: str | None = None,
+    cursor: str | None = None,
+    limit: int = RESOURCE_PAGE_SIZE,
     db: Session = Depends(get_db),
 ):
+    """
+    One page of at most ``limit`` resources across every source (100 by
+    default, 500 at most), newest first. With ``q`` the best matches come
+    first and equally relevant ones newest first. When more follow, the
+    ``X-Next-Cursor`` response header holds the ``cursor`` to send, with
+    the same filters, for the next page.
+    """
     adapters = [registry.get(source_system)] if source_system else list(registry.all())
     if source_system and adapters[0] is None:
         return []
-    resources: list[UnifiedResourceSummary] = []
-    for adapter in adapters:
-        if adapter is None:
-            continue
-        resources.extend(
-            adapter.list_unified_resources(
+    limit = min(max(int(limit), 1), RESOURCE_PAGE_MAX_SIZE)
+    try:
+        after = ResourceCursor.decode(cursor) if cursor else None
+        if after is not None and (after.search_rank is None) == bool(q and q.strip()):
+            raise ValueError("Resource cursor belongs to a different query")
+        # Each source contributes at most ``limit + 1`` rows; one past the page tells whether another follows.
+        pages = [
+            adapter.iter_unified_resources(
                 db,
+                after=after,
+                limit=limit + 1,
                 q=q,
                 status=status,
                 resource_type=resource_type,
                 profile_key=profile_key,
                 preview_enabled=preview_enabled,
             )
-        )
-    resources.sort(key=lambda item: item.updated_at, reverse=True)
+            for adapter in adapters
+            if adapter is not None
+        ]
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    resources = list(islice(heapq.merge(*pages, key=resource_sort_key), limit + 1))
+    if len(resources) > limit:
+        resources = resources[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = ResourceCursor.from_summary(resources[-1]).encode()
     return resources
 
 
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+from contextlib import ExitStack
 from pathlib import Path
 from datetime import datetime
 from typing import Sequence
@@ -20,6 +21,8 @@ from ..schemas import (
     ThreeDMetadataDictionaryResponse,
     ThreeDViewerSummary,
 )
+from ..services.query_options import THREE_D_DETAIL_OPTIONS, THREE_D_LIST_OPTIONS
+from ..services.resumable_uploads import ResumableUploadError, resolve_upload_file
 from ..services.three_d_dictionary import build_three_d_metadata_dictionary
 from ..services.three_d_detail import build_three_d_detail_response, build_three_d_viewer_summary
 from ..services.three_d_metadata import PROFILE_DEFINITIONS, build_three_d_metadata_layers
@@ -46,8 +49,8 @@ def _resource_dir(resource_id: int) -> Path:
     return Path(_three_d_dir()) / str(resource_id)
 
 
-def _get_resource_or_404(resource_id: int, db: Session) -> ThreeDAsset:
-    asset = db.query(ThreeDAsset).filter(ThreeDAsset.id == resource_id).first()
+def _get_resource_or_404(resource_id: int, db: Session, *options) -> ThreeDAsset:
+    asset = db.query(ThreeDAsset).options(*options).filter(ThreeDAsset.id == resource_id).first()
     if not asset:
         raise HTTPException(status_code=404, detail="3D resource not found")
     return asset
@@ -140,6 +143,22 @@ def _coerce_upload_list(value: Sequence[UploadFile] | UploadFile | None) -> list
     return []
 
 
+def _open_resumable_upload(upload_id: str, owner: str | None, opened: ExitStack, file: UploadFile | None = None) -> UploadFile:
+    upload = resolve_upload_file(file, upload_id, owner=owner)
+    opened.callback(upload.file.close)
+    return upload
+
+
+def _resumable_uploads(upload_ids: Sequence[str] | None, owner: str | None, opened: ExitStack) -> list[UploadFile]:
+    if not isinstance(upload_ids, (list, tuple)):
+        return []
+    return [
+        _open_resumable_upload(upload_id, owner, opened)
+        for upload_id in upload_ids
+        if isinstance(upload_id, str) and upload_id
+    ]
+
+
 def _collect_uploads(
     file: UploadFile | None,
     model_files: Sequence[UploadFile] | None,
@@ -374,6 +393,10 @@ async def upload_three_d_resource(
     mesh_uploads: list[UploadFile] | None = File(None, alias="model_files"),
     point_cloud_uploads: list[UploadFile] | None = File(None, alias="point_cloud_files"),
     oblique_uploads: list[UploadFile] | None = File(None, alias="oblique_files"),
+    upload_id: str | None = Form(None),
+    mesh_upload_ids: list[str] | None = Form(None, alias="model_upload_ids"),
+    point_cloud_upload_ids: list[str] | None = Form(None),
+    oblique_upload_ids: list[str] | None = Form(None),
     title: str | None = Form(None),
     profile_key: str | None = Form(None),
     project_name: str | None = Form(None),
@@ -409,113 +432,134 @@ async def upload_three_d_resource(
     db: Session = Depends(get_db),
     _user=Depends(require_permission("three_d.upload")),
 ):
-    uploads_by_role = _collect_uploads(file, mesh_uploads, point_cloud_uploads, oblique_uploads)
-    if not uploads_by_role:
-        raise HTTPException(status_code=400, detail="At least one 3D file is required")
-
-    derived_profile_key, resource_type = _determine_profile_and_resource_type(
-        requested_profile_key=profile_key,
-        uploads_by_role=uploads_by_role,
-        fallback_file=file,
-    )
-
-    resource_title = title or _upload_filename(file) or "未命名三维资源"
-    primary_filename = (
-        _upload_filename(file)
-        or next((upload.filename for upload in uploads_by_role.get("model", []) if upload.filename), None)
-        or next((upload.filename for upload in uploads_by_role.get("point_cloud", []) if upload.filename), None)
-        or next((upload.filename for upload in uploads_by_role.get("oblique_photo", []) if upload.filename), None)
-        or resource_title
-    )
-
-    normalized_storage_tier = (_normalize_optional_text(storage_tier) or "archive").lower()
-    normalized_preservation_status = (_normalize_optional_text(preservation_status) or "pending").lower()
-    normalized_object_number = _normalize_optional_text(object_number)
-    normalized_object_name = _normalize_optional_text(object_name)
-    normalized_object_type = _normalize_optional_text(object_type)
-    normalized_collection_unit = _normalize_optional_text(collection_unit)
-    normalized_object_summary = _normalize_optional_text(object_summary)
-    normalized_object_keywords = _collection_keywords_text(object_keywords, project_name, creator, creator_org)
-
-    normalized_collection_object_id = _normalize_optional_int(collection_object_id)
-
-    collection_object = None
-    if normalized_collection_object_id is not None:
-        collection_object = _get_collection_object_or_404(db, normalized_collection_object_id)
-        if normalized_object_number:
-            collection_object.object_number = normalized_object_number
-        if normalized_object_name:
-            collection_object.object_name = normalized_object_name
-        if normalized_object_type:
-            collection_object.object_type = normalized_object_type
-        if normalized_collection_unit:
-            collection_object.collection_unit = normalized_collection_unit
-        if normalized_object_summary:
-            collection_object.summary = normalized_object_summary
-        if normalized_object_keywords:
-            collection_object.keywords = normalized_object_keywords
-        existing_metadata = collection_object.metadata_info if isinstance(collection_object.metadata_info, dict) else {}
-        collection_object.metadata_info = {
-            **existing_metadata,
-            **{
-                key: value
-                for key, value in {
-                    "object_number": collection_object.object_number,
-                    "object_name": collection_object.object_name,
-                    "object_type": collection_object.object_type,
-                    "collection_unit": collection_object.collection_unit,
-                    "summary": collection_object.summary,
-                    "keywords": collection_object.keywords,
-                }.items()
-                if value is not None
-            },
-            "linked_via": "collection_object_id",
-        }
-        db.flush()
-    else:
-        collection_object = _get_or_create_collection_object(
-            db,
-            object_number=normalized_object_number,
-            object_name=normalized_object_name,
-            object_type=normalized_object_type,
-            collection_unit=normalized_collection_unit,
-            summary=normalized_object_summary,
-            keywords=normalized_object_keywords,
+    owner = getattr(_user, "user_id", None)
+    # Resumable uploads arrive as open handles; any exit before they are saved must close them.
+    with ExitStack() as opened_uploads:
+        try:
+            if isinstance(upload_id, str) and upload_id:
+                file = _open_resumable_upload(upload_id, owner, opened_uploads, file)
+            mesh_uploads = [
+                *_coerce_upload_list(mesh_uploads),
+                *_resumable_uploads(mesh_upload_ids, owner, opened_uploads),
+            ]
+            point_cloud_uploads = [
+                *_coerce_upload_list(point_cloud_uploads),
+                *_resumable_uploads(point_cloud_upload_ids, owner, opened_uploads),
+            ]
+            oblique_uploads = [
+                *_coerce_upload_list(oblique_uploads),
+                *_resumable_uploads(oblique_upload_ids, owner, opened_uploads),
+            ]
+        except ResumableUploadError as exc:
+            raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
+
+        uploads_by_role = _collect_uploads(file, mesh_uploads, point_cloud_uploads, oblique_uploads)
+        if not uploads_by_role:
+            raise HTTPException(status_code=400, detail="At least one 3D file is required")
+
+        derived_profile_key, resource_type = _determine_profile_and_resource_type(
+            requested_profile_key=profile_key,
+            uploads_by_role=uploads_by_role,
+            fallback_file=file,
         )
 
-    db_asset = ThreeDAsset(
-        collection_object=collection_object,
-        resource_group=resource_group or title or resource_title,
-        filename=str(primary_filename),
-        file_path="",
-        file_size=0,
-        mime_type=None,
-        status="processing",
-        resource_type=resource_type,
-        process_message="三维资源正在入库处理中",
-        version_label=(version_label or "original").strip() or "original",
-        version_order=int(version_order or 0),
-        is_current=bool(is_current) if is_current is not None else True,
-        is_web_preview=bool(is_web_preview) if is_web_preview is not None else False,
-        web_preview_status=(web_preview_status or "disabled").strip() or "disabled",
-        web_preview_reason=web_preview_reason,
-        storage_tier=normalized_storage_tier,
-        preservation_status=normalized_preservation_status,
-        preservation_note=_normalize_optional_text(preservation_note),
-        metadata_info={},
-    )
-    db.add(db_asset)
-    db.commit()
-    db.refresh(db_asset)
+        resource_title = title or _upload_filename(file) or "未命名三维资源"
+        primary_filename = (
+            _upload_filename(file)
+            or next((upload.filename for upload in uploads_by_role.get("model", []) if upload.filename), None)
+            or next((upload.filename for upload in uploads_by_role.get("point_cloud", []) if upload.filename), None)
+            or next((upload.filename for upload in uploads_by_role.get("oblique_photo", []) if upload.filename), None)
+            or resource_title
+        )
 
-    resource_dir = _resource_dir(db_asset.id)
-    resource_dir.mkdir(parents=True, exist_ok=True)
+        normalized_storage_tier = (_normalize_optional_text(storage_tier) or "archive").lower()
+        normalized_preservation_status = (_normalize_optional_text(preservation_status) or "pending").lower()
+        normalized_object_number = _normalize_optional_text(object_number)
+        normalized_object_name = _normalize_optional_text(object_name)
+        normalized_object_type = _normalize_optional_text(object_type)
+        normalized_collection_unit = _normalize_optional_text(collection_unit)
+        normalized_object_summary = _normalize_optional_text(object_summary)
+        normalized_object_keywords = _collection_keywords_text(object_keywords, project_name, creator, creator_org)
+
+        normalized_collection_object_id = _normalize_optional_int(collection_object_id)
+
+        collection_object = None
+        if normalized_collection_object_id is not None:
+            collection_object = _get_collection_object_or_404(db, normalized_collection_object_id)
+            if normalized_object_number:
+                collection_object.object_number = normalized_object_number
+            if normalized_object_name:
+                collection_object.object_name = normalized_object_name
+            if normalized_object_type:
+                collection_object.object_type = normalized_object_type
+            if normalized_collection_unit:
+                collection_object.collection_unit = normalized_collection_unit
+            if normalized_object_summary:
+                collection_object.summary = normalized_object_summary
+            if normalized_object_keywords:
+                collection_object.keywords = normalized_object_keywords
+            existing_metadata = collection_object.metadata_info if isinstance(collection_object.metadata_info, dict) else {}
+            collection_object.metadata_info = {
+                **existing_metadata,
+                **{
+                    key: value
+                    for key, value in {
+                        "object_number": collection_object.object_number,
+                        "object_name": collection_object.object_name,
+                        "object_type": collection_object.object_type,
+                        "collection_unit": collection_object.collection_unit,
+                        "summary": collection_object.summary,
+                        "keywords": collection_object.keywords,
+                    }.items()
+                    if value is not None
+                },
+                "linked_via": "collection_object_id",
+            }
+            db.flush()
+        else:
+            collection_object = _get_or_create_collection_object(
+                db,
+                object_number=normalized_object_number,
+                object_name=normalized_object_name,
+                object_type=normalized_object_type,
+                collection_unit=normalized_collection_unit,
+                summary=normalized_object_summary,
+                keywords=normalized_object_keywords,
+            )
 
-    saved_files = await save_three_d_uploads(resource_dir, uploads_by_role)
-    if not saved_files:
-        db.delete(db_asset)
+        db_asset = ThreeDAsset(
+            collection_object=collection_object,
+            resource_group=resource_group or title or resource_title,
+            filename=str(primary_filename),
+            file_path="",
+            file_size=0,
+            mime_type=None,
+            status="processing",
+            resource_type=resource_type,
+            process_message="三维资源正在入库处理中",
+            version_label=(version_label or "original").strip() or "original",
+            version_order=int(version_order or 0),
+            is_current=bool(is_current) if is_current is not None else True,
+            is_web_preview=bool(is_web_preview) if is_web_preview is not None else False,
+            web_preview_status=(web_preview_status or "disabled").strip() or "disabled",
+            web_preview_reason=web_preview_reason,
+            storage_tier=normalized_storage_tier,
+            preservation_status=normalized_preservation_status,
+            preservation_note=_normalize_optional_text(preservation_note),
+            metadata_info={},
+        )
+        db.add(db_asset)
         db.commit()
-        raise HTTPException(status_code=400, detail="No 3D files were saved")
+        db.refresh(db_asset)
+
+        resource_dir = _resource_dir(db_asset.id)
+        resource_dir.mkdir(parents=True, exist_ok=True)
+
+        saved_files = await save_three_d_uploads(resource_dir, uploads_by_role)
+        if not saved_files:
+            db.delete(db_asset)
+            db.commit()
+            raise HTTPException(status_code=400, detail="No 3D files were saved")
 
     primary_file = pick_primary_three_d_file(saved_files) or saved_files[0]
     for file_record in saved_files:
@@ -644,7 +688,14 @@ def list_three_d_resources(
     user: CurrentUser = Depends(require_permission("three_d.view")),
 ):
     user = ensure_current_user(user)
-    assets = db.query(ThreeDAsset).order_by(ThreeDAsset.created_at.desc(), ThreeDAsset.id.desc()).offset(skip).limit(limit).all()
+    assets = (
+        db.query(ThreeDAsset)
+        .options(*THREE_D_LIST_OPTIONS)
+        .order_by(ThreeDAsset.created_at.desc(), ThreeDAsset.id.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
     visible_assets = []
     for asset in assets:
         visibility_scope = None
@@ -667,7 +718,7 @@ def get_three_d_resource(
     db: Session = Depends(get_db),
     _user=Depends(require_permission("three_d.view")),
 ):
-    asset = _get_resource_or_404(resource_id, db)
+    asset = _get_resource_or_404(resource_id, db, *THREE_D_DETAIL_OPTIONS)
     return build_three_d_detail_response(asset)
 
 
@@ -677,7 +728,7 @@ def get_three_d_resource_viewer(
     db: Session = Depends(get_db),
     _user=Depends(require_permission("three_d.view")),
 ):
-    asset = _get_resource_or_404(resource_id, db)
+    asset = _get_resource_or_404(resource_id, db, *THREE_D_DETAIL_OPTIONS)
     detail = build_three_d_detail_response(asset)
     return build_three_d_viewer_summary(
         asset=asset,
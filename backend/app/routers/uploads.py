@@ -0,0 +1,105 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+
+from .. import config
+from ..permissions import CurrentUser, require_any_permission
+from ..schemas import ResumableUploadCreateRequest, ResumableUploadStatus
+from ..services.resumable_uploads import (
+    ResumableUploadError,
+    append_resumable_chunk,
+    cancel_resumable_upload,
+    create_resumable_upload,
+    finalize_resumable_upload,
+    get_resumable_upload,
+)
+
+router = APIRouter(prefix="/uploads", tags=["uploads"])
+
+# Anyone who may upload through one of the multipart routes may stage a resumable upload for it.
+require_upload_permission = require_any_permission("image.upload", "image.file.upload", "three_d.upload")
+
+
+def _upload_error(exc: ResumableUploadError) -> HTTPException:
+    headers = {"Upload-Offset": str(exc.offset)} if exc.offset is not None else None
+    return HTTPException(status_code=exc.status_code, detail=exc.detail, headers=headers)
+
+
+def _offset_headers(session) -> dict[str, str]:
+    return {
+        "Upload-Offset": str(session.offset),
+        "Upload-Length": str(session.length),
+        "Cache-Control": "no-store",
+    }
+
+
+@router.post("", response_model=ResumableUploadStatus, status_code=status.HTTP_201_CREATED)
+def create_upload(
+    payload: ResumableUploadCreateRequest,
+    response: Response,
+    user: CurrentUser = Depends(require_upload_permission),
+):
+    """
+    Start a resumable upload. Send the bytes with PATCH, check progress with
+    HEAD, then pass ``upload_id`` to /upload, /ingest/sip,
+    /image-records/{id}/upload-temp or /three-d/upload instead of a file.
+    """
+    try:
+        session = create_resumable_upload(
+            filename=payload.filename,
+            length=payload.length,
+            content_type=payload.content_type,
+            owner=user.user_id,
+            expected_sha256=payload.sha256,
+        )
+    except ResumableUploadError as exc:
+        raise _upload_error(exc) from exc
+    response.headers["Location"] = f"{config.API_PUBLIC_URL.rstrip('/')}{router.prefix}/{session.upload_id}"
+    response.headers.update(_offset_headers(session))
+    return session.as_dict()
+
+
+@router.head("/{upload_id}")
+def get_upload_offset(upload_id: str, user: CurrentUser = Depends(require_upload_permission)):
+    try:
+        session = get_resumable_upload(upload_id, owner=user.user_id)
+    except ResumableUploadError as exc:
+        raise _upload_error(exc) from exc
+    return Response(status_code=status.HTTP_200_OK, headers=_offset_headers(session))
+
+
+@router.get("/{upload_id}", response_model=ResumableUploadStatus)
+def get_upload_status(upload_id: str, user: CurrentUser = Depends(require_upload_permission)):
+    try:
+        return get_resumable_upload(upload_id, owner=user.user_id).as_dict()
+    except ResumableUploadError as exc:
+        raise _upload_error(exc) from exc
+
+
+@router.patch("/{upload_id}")
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset"),
+    user: CurrentUser = Depends(require_upload_permission),
+):
+    try:
+        session = await append_resumable_chunk(upload_id, upload_offset, request.stream(), owner=user.user_id)
+    except ResumableUploadError as exc:
+        raise _upload_error(exc) from exc
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers=_offset_headers(session))
+
+
+@router.post("/{upload_id}/finalize", response_model=ResumableUploadStatus)
+def finalize_upload(upload_id: str, user: CurrentUser = Depends(require_upload_permission)):
+    try:
+        return finalize_resumable_upload(upload_id, owner=user.user_id).as_dict()
+    except ResumableUploadError as exc:
+        raise _upload_error(exc) from exc
+
+
+@router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+def cancel_upload(upload_id: str, user: CurrentUser = Depends(require_upload_permission)):
+    try:
+        cancel_resumable_upload(upload_id, owner=user.user_id)
+    except ResumableUploadError as exc:
+        raise _upload_error(exc) from exc
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -181,6 +181,8 @@ class UnifiedResourceSummary(BaseModel):
     detail_url: str
     updated_at: datetime
     actions: list[UnifiedResourceAction] = Field(default_factory=list)
+    # Relevance of a search hit; orders and pages search results but is not part of the response.
+    search_rank: float | None = Field(default=None, exclude=True)
 
 
 class UnifiedResourceDetail(UnifiedResourceSummary):
@@ -198,6 +200,24 @@ class IngestSipResponse(BaseModel):
     sha256: str
 
 
+class ResumableUploadCreateRequest(BaseModel):
+    filename: str
+    length: int
+    content_type: str | None = None
+    sha256: str | None = None
+
+
+class ResumableUploadStatus(BaseModel):
+    upload_id: str
+    filename: str
+    length: int
+    offset: int
+    content_type: str | None = None
+    complete: bool
+    sha256: str | None = None
+    expires_at: int
+
+
 class ImageRecordAssetBinding(BaseModel):
     asset_id: int
     filename: str | None = None
@@ -388,6 +408,12 @@ class ImageIngestSheetDetailResponse(ImageIngestSheetSummary):
     items: list[ImageRecordSummary] = Field(default_factory=list)
 
 
+class ImageIngestSheetFaceRecognitionResponse(BaseModel):
+    sheet_id: int
+    record_count: int
+    batch_count: int
+
+
 class ApplicationCreateItemRequest(BaseModel):
     asset_id: int
     requested_variant: str | None = "current"
@@ -21,14 +21,16 @@ from app.schemas import (
     AssetStructureResponse,
     AssetTimelineEntry,
 )
+from .asset_source_metadata import load_asset_raw_metadata
 from .iiif_access import (
     get_asset_iiif_access_file_path,
     get_asset_iiif_access_mime_type,
+    get_asset_layer_view,
     get_asset_original_file_path,
     get_asset_primary_file_path,
     is_iiif_ready,
 )
-from .metadata_layers import RESOURCE_TYPE_LABELS, get_metadata_layers
+from .metadata_layers import RESOURCE_TYPE_LABELS
 
 STATUS_LABELS = {
     "processing": "Processing",
@@ -187,19 +189,8 @@ def _build_lifecycle_events(
 
 
 def build_asset_detail_response(asset: Asset) -> AssetDetailResponse:
-    metadata_layers = get_metadata_layers(
-        asset_id=asset.id,
-        asset_filename=asset.filename,
-        asset_file_path=asset.file_path,
-        asset_file_size=asset.file_size,
-        asset_mime_type=asset.mime_type,
-        asset_status=asset.status,
-        asset_resource_type=asset.resource_type,
-        asset_visibility_scope=asset.visibility_scope,
-        asset_collection_object_id=asset.collection_object_id,
-        asset_created_at=asset.created_at,
-        metadata=asset.metadata_info or {},
-    )
+    metadata_layers = get_asset_layer_view(asset).as_dict()
+    metadata_layers["raw_metadata"] = load_asset_raw_metadata(asset, metadata_layers.get("raw_metadata"))
     technical = metadata_layers["technical"]
 
     original_file_path = get_asset_original_file_path(asset)
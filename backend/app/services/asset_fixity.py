@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import re
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..models import Asset
+from .metadata_layers import get_fixity_sha256
+
+SHA256_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+def normalize_fixity_sha256(value: object) -> str | None:
+    """Lower-case hex SHA-256, or ``None`` for anything that is not one."""
+    if not isinstance(value, str):
+        return None
+    normalized = value.strip().lower()
+    return normalized if SHA256_PATTERN.fullmatch(normalized) else None
+
+
+def ensure_asset_fixity_column(engine: Engine) -> None:
+    """Add the indexed ``assets.fixity_sha256`` column to databases created before it existed."""
+    existing_columns = {column["name"] for column in inspect(engine).get_columns("assets")}
+    with engine.begin() as connection:
+        if "fixity_sha256" not in existing_columns:
+            connection.execute(text("ALTER TABLE assets ADD COLUMN fixity_sha256 VARCHAR(64)"))
+        connection.execute(text("CREATE INDEX IF NOT EXISTS ix_assets_fixity_sha256 ON assets(fixity_sha256)"))
+
+
+def find_assets_by_fixity(db: Session, sha256: str | None) -> list[Asset]:
+    normalized = normalize_fixity_sha256(sha256)
+    if normalized is None:
+        return []
+    return db.query(Asset).filter(Asset.fixity_sha256 == normalized).order_by(Asset.id.asc()).all()
+
+
+def backfill_asset_fixity(db: Session, *, batch_size: int = 500, limit: int | None = None) -> dict[str, int]:
+    """Copy the SHA-256 recorded in ``metadata_info`` into ``assets.fixity_sha256``.
+
+    Walks the assets still missing the column in id order and commits per batch,
+    so an interrupted run picks up where it stopped.
+    """
+    updated = 0
+    missing = 0
+    last_id = 0
+    while limit is None or updated + missing < limit:
+        remaining = batch_size if limit is None else min(batch_size, limit - updated - missing)
+        assets = (
+            db.query(Asset)
+            .filter(Asset.fixity_sha256.is_(None), Asset.id > last_id)
+            .order_by(Asset.id.asc())
+            .limit(remaining)
+            .all()
+        )
+        if not assets:
+            break
+        for asset in assets:
+            sha256 = normalize_fixity_sha256(get_fixity_sha256(asset.metadata_info))
+            if sha256 is None:
+                missing += 1
+                continue
+            asset.fixity_sha256 = sha256
+            updated += 1
+        last_id = assets[-1].id
+        db.commit()
+        db.expunge_all()
+    return {"updated": updated, "missing": missing}
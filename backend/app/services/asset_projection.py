@@ -0,0 +1,116 @@
+"""
+Denormalised copies of hot ``metadata_info`` fields on ``assets`` columns.
+
+``sync_asset_projection`` is the only writer. It runs from a ``before_flush``
+hook on every new or modified asset (see ``models``), so whichever code path
+changes an asset's metadata, status or file, the columns follow in the same
+transaction. Listings can then filter and sort on them in SQL.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..models import Asset
+from .asset_fixity import normalize_fixity_sha256
+from .iiif_access import get_asset_iiif_access_file_path, get_asset_layer_view
+from .search_index import build_asset_search_text
+
+# Column name -> DDL type, for databases created before the projection existed.
+ASSET_PROJECTION_COLUMNS: dict[str, str] = {
+    "title": "VARCHAR",
+    "profile_key": "VARCHAR",
+    "object_number": "VARCHAR",
+    "width": "INTEGER",
+    "height": "INTEGER",
+    "iiif_access_file_path": "VARCHAR",
+    "derivative_rule_id": "VARCHAR",
+    "preview_enabled": "BOOLEAN",
+}
+# ``search_text`` is projected too, but its column and index belong to ``search_index``.
+ASSET_PROJECTION_INDEXED_COLUMNS = ("title", "profile_key", "object_number", "derivative_rule_id", "preview_enabled")
+
+
+def _clean_text(value: Any) -> str | None:
+    if value in (None, ""):
+        return None
+    text_value = str(value).strip()
+    return text_value or None
+
+
+def project_asset_metadata(asset: Asset) -> dict[str, Any]:
+    layer_view = get_asset_layer_view(asset)
+    layers = layer_view.layers
+    core = layers.get("core") or {}
+    technical = layer_view.technical
+    profile_fields = (layers.get("profile") or {}).get("fields") or {}
+    width, height = layer_view.dimensions
+    iiif_access_file_path = get_asset_iiif_access_file_path(asset, allow_original_fallback=True, require_exists=False)
+    return {
+        "title": _clean_text(core.get("title")) or asset.filename,
+        "profile_key": _clean_text(core.get("profile_key")) or "other",
+        "object_number": _clean_text(core.get("object_number") or profile_fields.get("object_number")),
+        "width": width or None,
+        "height": height or None,
+        "iiif_access_file_path": iiif_access_file_path,
+        "derivative_rule_id": _clean_text(technical.get("derivative_rule_id")),
+        # Same rule as ``iiif_access.is_iiif_ready``.
+        "preview_enabled": asset.status == "ready" and iiif_access_file_path is not None,
+        "search_text": build_asset_search_text(asset, layers),
+    }
+
+
+def sync_asset_projection(asset: Asset) -> None:
+    for column, value in project_asset_metadata(asset).items():
+        if getattr(asset, column) != value:
+            setattr(asset, column, value)
+    if asset.fixity_sha256 is None:
+        fixity_sha256 = normalize_fixity_sha256(get_asset_layer_view(asset).fixity_sha256)
+        if fixity_sha256 is not None:
+            asset.fixity_sha256 = fixity_sha256
+
+
+def ensure_asset_projection_columns(engine: Engine) -> None:
+    existing_columns = {column["name"] for column in inspect(engine).get_columns("assets")}
+    with engine.begin() as connection:
+        for column, column_type in ASSET_PROJECTION_COLUMNS.items():
+            if column not in existing_columns:
+                connection.execute(text(f"ALTER TABLE assets ADD COLUMN {column} {column_type}"))
+        for column in ASSET_PROJECTION_INDEXED_COLUMNS:
+            connection.execute(text(f"CREATE INDEX IF NOT EXISTS ix_assets_{column} ON assets({column})"))
+
+
+def backfill_asset_projection(
+    db: Session,
+    *,
+    batch_size: int = 500,
+    limit: int | None = None,
+    missing_only: bool = False,
+) -> int:
+    """Recompute the projected columns of every asset in id order; returns how many were visited.
+
+    With ``missing_only`` only assets that were never projected are visited;
+    ``preview_enabled`` is always set by a projection, so those are the rows
+    where it is NULL.
+    """
+    visited = 0
+    last_id = 0
+    while limit is None or visited < limit:
+        remaining = batch_size if limit is None else min(batch_size, limit - visited)
+        query = db.query(Asset).filter(Asset.id > last_id)
+        if missing_only:
+            query = query.filter(Asset.preview_enabled.is_(None))
+        assets = query.order_by(Asset.id.asc()).limit(remaining).all()
+        if not assets:
+            break
+        for asset in assets:
+            sync_asset_projection(asset)
+        visited += len(assets)
+        last_id = assets[-1].id
+        db.commit()
+        db.expunge_all()
+    return visited
@@ -0,0 +1,83 @@
+"""
+Raw source metadata kept out of the ``assets`` row.
+
+The ExifTool dump captured at ingest is often larger than every normalised
+layer together, and nothing but the asset detail view reads it. It lives in
+``asset_source_metadata`` (one row per asset), while
+``assets.metadata_info["raw_metadata"]`` keeps the small bookkeeping entries.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Mapping
+
+from sqlalchemy.orm import Session
+
+from ..models import Asset, AssetSourceMetadata
+
+# ``raw_metadata`` keys that are moved to ``asset_source_metadata``.
+SOURCE_METADATA_KEYS = ("exif_metadata",)
+
+
+def detach_source_metadata(layers: dict[str, Any]) -> dict[str, Any]:
+    """Take ``SOURCE_METADATA_KEYS`` out of ``layers["raw_metadata"]`` and return them.
+
+    ``layers`` gets a new ``raw_metadata`` dict; the one it held is left as it was.
+    """
+    raw_metadata = layers.get("raw_metadata")
+    if not isinstance(raw_metadata, dict):
+        return {}
+    detached = {key: raw_metadata[key] for key in SOURCE_METADATA_KEYS if key in raw_metadata}
+    if detached:
+        layers["raw_metadata"] = {key: value for key, value in raw_metadata.items() if key not in detached}
+    return detached
+
+
+def store_asset_source_metadata(asset: Asset, payload: Mapping[str, Any]) -> None:
+    if not payload:
+        return
+    record = asset.source_metadata_record
+    if record is None:
+        asset.source_metadata_record = AssetSourceMetadata(payload=dict(payload))
+    else:
+        record.payload = {**(record.payload or {}), **payload}
+
+
+def load_asset_raw_metadata(asset: Asset, raw_metadata: Mapping[str, Any] | None) -> dict[str, Any]:
+    """``raw_metadata`` with the asset's stored source metadata merged back in; costs one query."""
+    merged = dict(raw_metadata or {})
+    record = getattr(asset, "source_metadata_record", None)
+    if record is not None and isinstance(record.payload, dict):
+        merged.update(record.payload)
+    return merged
+
+
+def migrate_asset_source_metadata(db: Session, *, batch_size: int = 500, limit: int | None = None) -> dict[str, int]:
+    """Move the source metadata of existing assets into ``asset_source_metadata``.
+
+    Walks every asset in id order and commits per batch, so an interrupted run
+    can simply be started again.
+    """
+    visited = 0
+    moved = 0
+    last_id = 0
+    while limit is None or visited < limit:
+        remaining = batch_size if limit is None else min(batch_size, limit - visited)
+        assets = db.query(Asset).filter(Asset.id > last_id).order_by(Asset.id.asc()).limit(remaining).all()
+        if not assets:
+            break
+        for asset in assets:
+            if not isinstance(asset.metadata_info, dict):
+                continue
+            layers = dict(asset.metadata_info)
+            detached = detach_source_metadata(layers)
+            if not detached:
+                continue
+            store_asset_source_metadata(asset, detached)
+            asset.metadata_info = layers
+            moved += 1
+        visited += len(assets)
+        last_id = assets[-1].id
+        db.commit()
+        db.expunge_all()
+    return {"visited": visited, "moved": moved}
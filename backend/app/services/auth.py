@@ -1,16 +1,21 @@
 from __future__ import annotations
 
 import hashlib
+import json
 import secrets
 from datetime import datetime, timedelta, timezone
 
 from sqlalchemy.orm import Session
 
-from ..models import Role, User, UserRole, UserSession
+from ..models import BootstrapState, Role, User, UserRole, UserSession
+from .session_user_cache import get_session_user_cache
 
 DEFAULT_PASSWORD = "mdams123"
 PASSWORD_SALT = "mdams-prototype-auth"
 SESSION_DURATION_HOURS = 12
+AUTH_SEED_STATE_KEY = "auth_seed"
+# Bump when seed_auth_data changes what it writes for the same definitions.
+AUTH_SEED_VERSION = 1
 
 DEFAULT_ROLES: dict[str, dict[str, str]] = {
     "image_structured_editor": {"label": "二维结构化编辑员", "description": "维护二维资源的结构化元数据。"},
@@ -99,6 +104,32 @@ def seed_auth_data(db: Session) -> None:
     db.commit()
 
 
+def auth_seed_fingerprint() -> str:
+    payload = {
+        "version": AUTH_SEED_VERSION,
+        "roles": DEFAULT_ROLES,
+        "users": DEFAULT_USERS,
+        # The raw inputs, not hash_password(): fingerprinting must stay cheaper than seeding.
+        "password": [DEFAULT_PASSWORD, PASSWORD_SALT],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def seed_auth_data_if_changed(db: Session, *, force: bool = False) -> bool:
+    """Run ``seed_auth_data`` unless the same definitions were already applied; returns whether it ran."""
+    fingerprint = auth_seed_fingerprint()
+    state = db.get(BootstrapState, AUTH_SEED_STATE_KEY)
+    if not force and state is not None and state.fingerprint == fingerprint:
+        return False
+    seed_auth_data(db)
+    if state is None:
+        db.add(BootstrapState(key=AUTH_SEED_STATE_KEY, fingerprint=fingerprint))
+    else:
+        state.fingerprint = fingerprint
+    db.commit()
+    return True
+
+
 def create_user_session(db: Session, user: User) -> UserSession:
     expires_at = datetime.now(timezone.utc) + timedelta(hours=SESSION_DURATION_HOURS)
     session = UserSession(
@@ -112,7 +143,7 @@ def create_user_session(db: Session, user: User) -> UserSession:
     return session
 
 
-def get_user_by_session_token(db: Session, token: str) -> User | None:
+def get_active_session(db: Session, token: str) -> UserSession | None:
     session = db.query(UserSession).filter(UserSession.session_token == token).first()
     if session is None:
         return None
@@ -123,10 +154,17 @@ def get_user_by_session_token(db: Session, token: str) -> User | None:
         db.delete(session)
         db.commit()
         return None
-    return session.user
+    return session
+
+
+def get_user_by_session_token(db: Session, token: str) -> User | None:
+    session = get_active_session(db, token)
+    return session.user if session is not None else None
 
 
 def delete_session_token(db: Session, token: str) -> None:
+    # Also covers tokens whose row is already gone but which this process still has cached.
+    get_session_user_cache().invalidate_token(token)
     session = db.query(UserSession).filter(UserSession.session_token == token).first()
     if session is not None:
         db.delete(session)
@@ -0,0 +1,228 @@
+"""
+Approximate nearest-neighbour search over the face index centres, in NumPy.
+
+An IVF index splits the unit-length centres into ``nlist`` inverted lists
+by spherical k-means. A query only scores the centres in the ``nprobe``
+lists whose coarse centroids are closest to it. More probes give better
+recall and cost more time.
+
+With product quantisation each centre is also stored as ``m`` one-byte
+codes. The probed candidates are then ranked from per-query lookup tables
+without reading their full vectors. Only the best ``rerank`` candidates
+are rescored exactly.
+
+Galleries smaller than ``FACE_RECOGNITION_ANN_MIN_CLUSTERS`` are always
+searched exactly.
+"""
+
+from __future__ import annotations
+
+import io
+import math
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any
+
+PQ_CENTROIDS = 256
+# Codebooks only need a few dozen points per codeword.
+PQ_TRAIN_SIZE = 64 * PQ_CENTROIDS
+
+
+def _numpy():
+    import numpy as np
+
+    return np
+
+
+def _normalize_rows(matrix):
+    np = _numpy()
+    return matrix / (np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-10)
+
+
+def exact_top_k(features, center_matrix, top_k: int):
+    """Best ``top_k`` rows of ``center_matrix`` per feature row as (rows, scores), best first."""
+    np = _numpy()
+    scores = features @ center_matrix.T
+    k = max(1, min(top_k, scores.shape[1]))
+    if k < scores.shape[1]:
+        candidates = np.argpartition(scores, -k, axis=1)[:, -k:]
+    else:
+        candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+
+def _assign(vectors, centroids, *, euclidean: bool = False, chunk_rows: int = 8192):
+    """Nearest centroid of every row, by inner product or by Euclidean distance; chunked to bound memory."""
+    np = _numpy()
+    # argmin |x - c|^2 == argmax (x.c - |c|^2 / 2)
+    bias = -0.5 * np.einsum("ij,ij->i", centroids, centroids) if euclidean else 0.0
+    labels = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), chunk_rows):
+        labels[start : start + chunk_rows] = np.argmax(vectors[start : start + chunk_rows] @ centroids.T + bias, axis=1)
+    return labels
+
+
+def _kmeans(vectors, k: int, *, iterations: int, rng, spherical: bool):
+    np = _numpy()
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    for _iteration in range(iterations):
+        labels = _assign(vectors, centroids, euclidean=not spherical)
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=k)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        filled = counts > 0
+        sums = np.zeros(centroids.shape, dtype=np.float64)
+        sums[filled] = np.add.reduceat(vectors[order], starts[filled], axis=0)
+        empty = ~filled
+        if empty.any():
+            # Restart empty clusters on random training points.
+            sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()), replace=False)]
+            counts[empty] = 1
+        centroids = (sums / counts[:, None]).astype(np.float32)
+        if spherical:
+            centroids = _normalize_rows(centroids)
+    return centroids
+
+
+def default_nlist(size: int) -> int:
+    return max(1, min(size, int(4 * math.sqrt(size))))
+
+
+@dataclass(frozen=True)
+class IVFIndex:
+    # (nlist x dims) unit-length coarse centroids.
+    coarse_centroids: Any
+    # Centre rows grouped by list: list ``i`` is ``list_rows[list_offsets[i]:list_offsets[i + 1]]``.
+    list_offsets: Any
+    list_rows: Any
+    # (m x 256 x dims/m) sub-space codebooks and (rows x m) codes in ``list_rows`` order, or None.
+    pq_codebooks: Any = None
+    pq_codes: Any = None
+
+    @property
+    def nlist(self) -> int:
+        return len(self.coarse_centroids)
+
+    @cached_property
+    def _list_positions(self) -> list[Any]:
+        np = _numpy()
+        return [np.arange(start, end) for start, end in zip(self.list_offsets[:-1], self.list_offsets[1:])]
+
+    def search(self, features, center_matrix, *, top_k: int, nprobe: int, rerank: int = 32):
+        """(rows, scores) like ``exact_top_k``; rows are -1 and scores -inf where fewer than ``top_k`` were found."""
+        np = _numpy()
+        nprobe = max(1, min(nprobe, self.nlist))
+        probes = np.argpartition(-(features @ self.coarse_centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+        rows_out = np.full((len(features), top_k), -1, dtype=np.int64)
+        scores_out = np.full((len(features), top_k), -np.inf, dtype=np.float32)
+
+        for query_index, (feature, lists) in enumerate(zip(features, probes)):
+            positions = np.concatenate([self._list_positions[probe] for probe in lists])
+            if not len(positions):
+                continue
+            if self.pq_codes is not None and len(positions) > rerank:
+                positions = positions[self._pq_shortlist(feature, positions, rerank)]
+            rows = self.list_rows[positions]
+            scores = center_matrix[rows] @ feature
+            k = min(top_k, len(rows))
+            best = np.argpartition(-scores, k - 1)[:k] if k < len(rows) else np.arange(len(rows))
+            best = best[np.argsort(-scores[best], kind="stable")]
+            rows_out[query_index, :k] = rows[best]
+            scores_out[query_index, :k] = scores[best]
+        return rows_out, scores_out
+
+    def _pq_shortlist(self, feature, positions, size: int):
+        np = _numpy()
+        subspaces = len(self.pq_codebooks)
+        # (m x 256) inner products of each query sub-vector with each codeword.
+        tables = np.einsum("mkd,md->mk", self.pq_codebooks, feature.reshape(subspaces, -1))
+        codes = self.pq_codes[positions]
+        approximate = tables[np.arange(subspaces), codes].sum(axis=1)
+        return np.argpartition(-approximate, size - 1)[:size]
+
+    def to_bytes(self) -> bytes:
+        np = _numpy()
+        arrays = {
+            "coarse_centroids": self.coarse_centroids,
+            "list_offsets": self.list_offsets,
+            "list_rows": self.list_rows,
+        }
+        if self.pq_codes is not None:
+            arrays.update(pq_codebooks=self.pq_codebooks, pq_codes=self.pq_codes)
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_file(cls, path) -> "IVFIndex":
+        np = _numpy()
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls(
+                coarse_centroids=arrays["coarse_centroids"],
+                list_offsets=arrays["list_offsets"],
+                list_rows=arrays["list_rows"],
+                pq_codebooks=arrays["pq_codebooks"] if "pq_codebooks" in arrays else None,
+                pq_codes=arrays["pq_codes"] if "pq_codes" in arrays else None,
+            )
+
+
+def encode_ivf(center_matrix, coarse_centroids, pq_codebooks=None) -> IVFIndex:
+    """Assign every centre to a list (and encode it) with already trained centroids and codebooks."""
+    np = _numpy()
+    labels = _assign(center_matrix, coarse_centroids)
+    list_rows = np.argsort(labels, kind="stable").astype(np.int64)
+    list_offsets = np.zeros(len(coarse_centroids) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(labels, minlength=len(coarse_centroids)), out=list_offsets[1:])
+
+    pq_codes = None
+    if pq_codebooks is not None:
+        subspaces = len(pq_codebooks)
+        ordered = np.asarray(center_matrix[list_rows], dtype=np.float32).reshape(len(list_rows), subspaces, -1)
+        pq_codes = np.empty((len(list_rows), subspaces), dtype=np.uint8)
+        for subspace, codebook in enumerate(pq_codebooks):
+            pq_codes[:, subspace] = _assign(np.ascontiguousarray(ordered[:, subspace]), codebook, euclidean=True)
+    return IVFIndex(
+        coarse_centroids=coarse_centroids,
+        list_offsets=list_offsets,
+        list_rows=list_rows,
+        pq_codebooks=pq_codebooks,
+        pq_codes=pq_codes,
+    )
+
+
+def build_ivf(
+    center_matrix,
+    *,
+    nlist: int | None = None,
+    pq_subvectors: int = 0,
+    iterations: int = 10,
+    train_size: int = 65536,
+    seed: int = 0,
+) -> IVFIndex:
+    """Train coarse centroids (and PQ codebooks when ``pq_subvectors`` > 0) on a sample and encode every centre."""
+    np = _numpy()
+    vectors = np.asarray(center_matrix, dtype=np.float32)
+    if not len(vectors):
+        raise ValueError("Cannot build an IVF index over an empty gallery")
+    nlist = max(1, min(nlist or default_nlist(len(vectors)), len(vectors)))
+    if pq_subvectors and vectors.shape[1] % pq_subvectors:
+        raise ValueError(f"pq_subvectors must divide the {vectors.shape[1]} embedding dimensions")
+
+    rng = np.random.default_rng(seed)
+    sample = vectors[rng.choice(len(vectors), size=min(len(vectors), max(train_size, nlist)), replace=False)]
+    coarse_centroids = _kmeans(sample, nlist, iterations=iterations, rng=rng, spherical=True)
+
+    pq_codebooks = None
+    if pq_subvectors:
+        pq_sample = sample[: min(len(sample), PQ_TRAIN_SIZE)]
+        split = pq_sample.reshape(len(pq_sample), pq_subvectors, -1)
+        codewords = min(PQ_CENTROIDS, len(pq_sample))
+        pq_codebooks = np.stack(
+            [
+                _kmeans(np.ascontiguousarray(split[:, subspace]), codewords, iterations=iterations, rng=rng, spherical=False)
+                for subspace in range(pq_subvectors)
+            ]
+        )
+    return encode_ivf(vectors, coarse_centroids, pq_codebooks)
@@ -0,0 +1,414 @@
+"""
+On-disk face index that worker processes map instead of unpickling.
+
+Layout under ``<FACE_RECOGNITION_INDEX_DIR>/store/``::
+
+    MANIFEST.json            which files make up the current generation
+    centers-<gen>.npy        unit-length cluster centres, float32 (clusters x dims)
+    norms-<gen>.npy          length of each cluster's summed face vectors, float64
+    clusters-<gen>.json      row order of the centres and the cluster metadata
+    faces-<gen>.npy          face embeddings added in generation <gen>, float32
+    faces-<gen>.json         face ids and cluster ids of those rows
+    ann-<gen>.npz            optional IVF/PQ index over the centres (see face_ann_index)
+
+Readers ``np.load(..., mmap_mode="r")`` the centre matrix, so every process
+on a host shares the same page-cache pages instead of holding its own copy.
+A writer only ever adds files and then swaps ``MANIFEST.json`` with
+``os.replace``; a reader sees either the old generation or the new one.
+Appending faces writes one new face segment and rewrites the centres, but
+never the embeddings written before. Once an ANN index has been built, every
+later generation re-encodes its centres with the same trained quantisers;
+``build_ann_index`` retrains them. Run one writer at a time.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import pickle
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Mapping, Sequence
+
+from .face_ann_index import IVFIndex, build_ivf, encode_ivf
+
+STORE_DIRNAME = "store"
+MANIFEST_NAME = "MANIFEST.json"
+STORE_FORMAT = 1
+
+_GENERATION_FILE = re.compile(r"^(centers|norms|clusters|faces|ann)-\d{6}(-\d+)?\.(npy|json|npz)$")
+
+
+class FaceIndexStoreError(RuntimeError):
+    pass
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError as exc:
+        raise FaceIndexStoreError("numpy is required for the face index store.") from exc
+    return np
+
+
+@dataclass(frozen=True)
+class FaceIndexData:
+    generation: int
+    dims: int
+    cluster_ids: tuple[str, ...]
+    clusters: dict[str, dict[str, Any]]
+    # Read-only memory map over ``centers-<gen>.npy``.
+    center_matrix: Any
+    ann: IVFIndex | None = None
+
+
+def get_store_dir(index_dir: str | Path) -> Path:
+    return Path(index_dir) / STORE_DIRNAME
+
+
+def manifest_key(store_dir: Path) -> tuple[int, int, int] | None:
+    """Cheap identity of the current manifest; changes with every swap, ``None`` if there is no store."""
+    try:
+        stat = (store_dir / MANIFEST_NAME).stat()
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def _read_json(path: Path) -> Any:
+    with path.open("r", encoding="utf-8") as file_obj:
+        return json.load(file_obj)
+
+
+def _read_manifest(store_dir: Path) -> dict[str, Any] | None:
+    try:
+        manifest = _read_json(store_dir / MANIFEST_NAME)
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError) as exc:
+        raise FaceIndexStoreError(f"Failed to read face index manifest in {store_dir}: {exc}") from exc
+    if manifest.get("format") != STORE_FORMAT:
+        raise FaceIndexStoreError(f"Unsupported face index format in {store_dir}: {manifest.get('format')!r}")
+    return manifest
+
+
+def _load_matrix(path: Path):
+    np = _numpy()
+    try:
+        return np.load(path, mmap_mode="r", allow_pickle=False)
+    except ValueError:
+        # Zero-length arrays cannot be mapped.
+        return np.load(path, allow_pickle=False)
+
+
+def open_face_index(store_dir: Path) -> FaceIndexData | None:
+    """Map the current generation; ``None`` when ``store_dir`` holds no index."""
+    # A writer may swap the manifest and delete the generation we just read it for.
+    for _attempt in range(3):
+        manifest = _read_manifest(store_dir)
+        if manifest is None:
+            return None
+        try:
+            cluster_table = _read_json(store_dir / manifest["clusters"])
+            center_matrix = _load_matrix(store_dir / manifest["centers"])
+            ann = IVFIndex.from_file(store_dir / manifest["ann"]) if manifest.get("ann") else None
+        except FileNotFoundError:
+            continue
+        except (OSError, ValueError, KeyError) as exc:
+            raise FaceIndexStoreError(f"Failed to open face index in {store_dir}: {exc}") from exc
+        return FaceIndexData(
+            generation=int(manifest["generation"]),
+            dims=int(manifest["dims"]),
+            cluster_ids=tuple(cluster_table["cluster_ids"]),
+            clusters=cluster_table["clusters"],
+            center_matrix=center_matrix,
+            ann=ann,
+        )
+    raise FaceIndexStoreError(f"Face index in {store_dir} kept changing while it was opened")
+
+
+def load_face_embeddings(store_dir: Path) -> tuple[list[str], list[str | None], Any]:
+    """Every stored face as (face ids, cluster ids, embedding matrix); the matrix is a copy."""
+    np = _numpy()
+    manifest = _read_manifest(store_dir)
+    if manifest is None:
+        return [], [], np.empty((0, 0), dtype=np.float32)
+    face_ids: list[str] = []
+    cluster_ids: list[str | None] = []
+    matrices = []
+    for segment in manifest["segments"]:
+        table = _read_json(store_dir / segment["ids"])
+        face_ids.extend(table["face_ids"])
+        cluster_ids.extend(table["cluster_ids"])
+        matrices.append(_load_matrix(store_dir / segment["embeddings"]))
+    embeddings = np.concatenate(matrices) if matrices else np.empty((0, manifest["dims"]), dtype=np.float32)
+    return face_ids, cluster_ids, embeddings
+
+
+def _normalize_rows(matrix):
+    np = _numpy()
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    return matrix / (np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-10)
+
+
+def _save_npy(path: Path, array) -> None:
+    np = _numpy()
+    with path.open("wb") as file_obj:
+        np.save(file_obj, array, allow_pickle=False)
+        file_obj.flush()
+        os.fsync(file_obj.fileno())
+
+
+def _save_json(path: Path, payload: Any) -> None:
+    with path.open("w", encoding="utf-8") as file_obj:
+        json.dump(payload, file_obj, ensure_ascii=False, separators=(",", ":"))
+        file_obj.flush()
+        os.fsync(file_obj.fileno())
+
+
+def _swap_manifest(store_dir: Path, manifest: dict[str, Any]) -> None:
+    manifest_path = store_dir / MANIFEST_NAME
+    temp_path = store_dir / f"{MANIFEST_NAME}.{os.getpid()}-{threading.get_ident()}.tmp"
+    _save_json(temp_path, manifest)
+    os.replace(temp_path, manifest_path)
+
+
+def _referenced_files(manifest: Mapping[str, Any] | None) -> set[str]:
+    if not manifest:
+        return set()
+    names = {manifest["centers"], manifest["norms"], manifest["clusters"]}
+    if manifest.get("ann"):
+        names.add(manifest["ann"])
+    for segment in manifest["segments"]:
+        names.update((segment["embeddings"], segment["ids"]))
+    return names
+
+
+def _remove_unreferenced(store_dir: Path, *manifests: Mapping[str, Any] | None) -> None:
+    # The previous generation is kept for readers that opened it just before the swap.
+    keep = set().union(*(_referenced_files(manifest) for manifest in manifests))
+    for path in store_dir.iterdir():
+        if _GENERATION_FILE.match(path.name) and path.name not in keep:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+def _save_bytes(path: Path, payload: bytes) -> None:
+    with path.open("wb") as file_obj:
+        file_obj.write(payload)
+        file_obj.flush()
+        os.fsync(file_obj.fileno())
+
+
+def _write_generation(
+    store_dir: Path,
+    previous: Mapping[str, Any] | None,
+    *,
+    dims: int,
+    segments: list[dict[str, str]],
+    face_ids: Sequence[str],
+    face_cluster_ids: Sequence[str | None],
+    embeddings,
+    cluster_ids: list[str],
+    clusters: dict[str, dict[str, Any]],
+    sums,
+) -> int:
+    np = _numpy()
+    store_dir.mkdir(parents=True, exist_ok=True)
+    generation = int(previous["generation"]) + 1 if previous else 1
+    suffix = f"{generation:06d}"
+
+    if len(face_ids):
+        segment = {"embeddings": f"faces-{suffix}.npy", "ids": f"faces-{suffix}.json"}
+        _save_npy(store_dir / segment["embeddings"], np.ascontiguousarray(embeddings, dtype=np.float32))
+        _save_json(store_dir / segment["ids"], {"face_ids": list(face_ids), "cluster_ids": list(face_cluster_ids)})
+        segments = [*segments, segment]
+
+    norms = np.linalg.norm(sums, axis=1) if len(sums) else np.empty((0,), dtype=np.float64)
+    centers = (sums / (norms[:, None] + 1e-10)) if len(sums) else np.empty((0, dims))
+    manifest = {
+        "format": STORE_FORMAT,
+        "generation": generation,
+        "dims": dims,
+        "centers": f"centers-{suffix}.npy",
+        "norms": f"norms-{suffix}.npy",
+        "clusters": f"clusters-{suffix}.json",
+        "segments": segments,
+    }
+    centers = np.ascontiguousarray(centers, dtype=np.float32)
+    _save_npy(store_dir / manifest["centers"], centers)
+    trained = IVFIndex.from_file(store_dir / previous["ann"]) if previous and previous.get("ann") else None
+    if trained is not None and len(centers) and trained.coarse_centroids.shape[1] == dims:
+        manifest["ann"] = f"ann-{suffix}.npz"
+        _save_bytes(
+            store_dir / manifest["ann"],
+            encode_ivf(centers, trained.coarse_centroids, trained.pq_codebooks).to_bytes(),
+        )
+    _save_npy(store_dir / manifest["norms"], norms.astype(np.float64))
+    _save_json(store_dir / manifest["clusters"], {"cluster_ids": cluster_ids, "clusters": clusters})
+    _swap_manifest(store_dir, manifest)
+    _remove_unreferenced(store_dir, manifest, previous)
+    return generation
+
+
+def _add_to_sums(sums, cluster_ids: list[str], vectors, face_cluster_ids: Sequence[str | None]):
+    """Add each vector to its cluster's row of ``sums``, appending rows for clusters not seen yet."""
+    np = _numpy()
+    rows = {cluster_id: row for row, cluster_id in enumerate(cluster_ids)}
+    new_rows = [
+        cluster_id
+        for cluster_id in dict.fromkeys(str(cluster_id) for cluster_id in face_cluster_ids if cluster_id is not None)
+        if cluster_id not in rows
+    ]
+    if new_rows:
+        for cluster_id in new_rows:
+            rows[cluster_id] = len(cluster_ids)
+            cluster_ids.append(cluster_id)
+        sums = np.vstack([sums, np.zeros((len(new_rows), sums.shape[1]), dtype=np.float64)])
+    for vector, cluster_id in zip(vectors, face_cluster_ids):
+        if cluster_id is not None:
+            sums[rows[str(cluster_id)]] += vector
+    return sums
+
+
+def append_faces(
+    store_dir: Path,
+    face_ids: Sequence[str],
+    face_cluster_ids: Sequence[str | None],
+    embeddings,
+    *,
+    clusters: Mapping[str, Mapping[str, Any]] | None = None,
+) -> int:
+    """Add faces (and optionally cluster metadata) as a new generation; returns its number.
+
+    Centres of the touched clusters move to the normalised sum of all their
+    faces, exactly what a full rebuild would give. Faces without a cluster are
+    stored but do not affect any centre. Cluster metadata such as ``count`` is
+    the caller's to keep current.
+    """
+    np = _numpy()
+    if len(face_ids) != len(face_cluster_ids) or len(face_ids) != len(embeddings):
+        raise FaceIndexStoreError("face_ids, face_cluster_ids and embeddings must have the same length")
+
+    previous = _read_manifest(store_dir)
+    vectors = _normalize_rows(embeddings) if len(face_ids) else None
+    if previous:
+        dims = int(previous["dims"])
+        current = open_face_index(store_dir)
+        cluster_ids = list(current.cluster_ids)
+        cluster_meta = {key: dict(value) for key, value in current.clusters.items()}
+        norms = np.load(store_dir / previous["norms"], allow_pickle=False)
+        sums = np.asarray(current.center_matrix, dtype=np.float64) * norms[:, None]
+        segments = list(previous["segments"])
+    else:
+        dims = int(vectors.shape[1]) if vectors is not None else 0
+        cluster_ids, cluster_meta, segments = [], {}, []
+        sums = np.empty((0, dims), dtype=np.float64)
+    if vectors is None:
+        vectors = np.empty((0, dims), dtype=np.float32)
+    elif vectors.shape[1] != dims:
+        raise FaceIndexStoreError(f"Embeddings have {vectors.shape[1]} dimensions, the index has {dims}")
+
+    for cluster_id, metadata in (clusters or {}).items():
+        cluster_meta.setdefault(str(cluster_id), {}).update(metadata)
+    sums = _add_to_sums(sums, cluster_ids, vectors, face_cluster_ids)
+
+    return _write_generation(
+        store_dir,
+        previous,
+        dims=dims,
+        segments=segments,
+        face_ids=[str(face_id) for face_id in face_ids],
+        face_cluster_ids=[None if cluster_id is None else str(cluster_id) for cluster_id in face_cluster_ids],
+        embeddings=vectors,
+        cluster_ids=cluster_ids,
+        clusters=cluster_meta,
+        sums=sums,
+    )
+
+
+def build_ann_index(store_dir: Path, *, nlist: int | None = None, pq_subvectors: int = 0) -> dict[str, int]:
+    """Train an IVF (and optional PQ) index over the current centres and publish it with the manifest."""
+    manifest = _read_manifest(store_dir)
+    if manifest is None:
+        raise FaceIndexStoreError(f"No face index in {store_dir}; convert or append faces first")
+    current = open_face_index(store_dir)
+    if not len(current.cluster_ids):
+        raise FaceIndexStoreError(f"Face index in {store_dir} has no clusters to index")
+    try:
+        ann = build_ivf(current.center_matrix, nlist=nlist, pq_subvectors=pq_subvectors)
+    except ValueError as exc:
+        raise FaceIndexStoreError(str(exc)) from exc
+
+    # Same generation, so the name gets a counter to stay unique across rebuilds.
+    builds = int(manifest.get("ann_builds") or 0) + 1
+    updated = {**manifest, "ann": f"ann-{int(manifest['generation']):06d}-{builds}.npz", "ann_builds": builds}
+    _save_bytes(store_dir / updated["ann"], ann.to_bytes())
+    _swap_manifest(store_dir, updated)
+    _remove_unreferenced(store_dir, updated, manifest)
+    return {"generation": int(manifest["generation"]), "nlist": ann.nlist, "pq_subvectors": pq_subvectors}
+
+
+def convert_legacy_index(index_dir: Path) -> dict[str, int]:
+    """Write ``meta.json`` + ``embeddings.pkl`` as a new store generation replacing any existing one.
+
+    Only run this on index files you trust: the legacy embeddings are a pickle.
+    Cluster rows keep the ``meta.json`` order, so matches are the same as before.
+    """
+    np = _numpy()
+    meta_path = index_dir / "meta.json"
+    embeddings_path = index_dir / "embeddings.pkl"
+    try:
+        metadata = _read_json(meta_path)
+        with embeddings_path.open("rb") as file_obj:
+            embeddings = pickle.load(file_obj)
+    except Exception as exc:
+        raise FaceIndexStoreError(f"Failed to read the legacy face index in {index_dir}: {exc}") from exc
+
+    raw_clusters = metadata.get("clusters")
+    clusters = {
+        str(cluster_id): cluster
+        for cluster_id, cluster in (raw_clusters if isinstance(raw_clusters, dict) else {}).items()
+        if isinstance(cluster, dict)
+    }
+    # The store gives each face one cluster; a face listed under two keeps the first.
+    face_cluster: dict[str, str] = {}
+    for cluster_id, cluster in clusters.items():
+        member_ids = cluster.get("face_ids")
+        for face_id in member_ids if isinstance(member_ids, list) else []:
+            if face_id in embeddings:
+                face_cluster.setdefault(face_id, cluster_id)
+
+    face_ids = [str(face_id) for face_id in embeddings]
+    face_cluster_ids = [face_cluster.get(face_id) for face_id in embeddings]
+    vectors = _normalize_rows(np.stack([np.asarray(embeddings[face_id]).reshape(-1) for face_id in embeddings])) if face_ids else None
+    dims = int(vectors.shape[1]) if vectors is not None else 0
+    if vectors is None:
+        vectors = np.empty((0, dims), dtype=np.float32)
+
+    populated = set(face_cluster.values())
+    cluster_ids = [cluster_id for cluster_id in clusters if cluster_id in populated]
+    sums = _add_to_sums(np.zeros((len(cluster_ids), dims), dtype=np.float64), cluster_ids, vectors, face_cluster_ids)
+    store_dir = get_store_dir(index_dir)
+    generation = _write_generation(
+        store_dir,
+        _read_manifest(store_dir),
+        dims=dims,
+        segments=[],
+        face_ids=face_ids,
+        face_cluster_ids=face_cluster_ids,
+        embeddings=vectors,
+        cluster_ids=cluster_ids,
+        clusters={
+            cluster_id: {key: value for key, value in cluster.items() if key != "face_ids"}
+            for cluster_id, cluster in clusters.items()
+        },
+        sums=sums,
+    )
+    return {"generation": generation, "faces": len(face_ids), "clusters": len(cluster_ids)}
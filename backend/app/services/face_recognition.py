@@ -115,6 +115,7 @@ def normalize_face_recognition_response(
                 "score": _normalize_float(item.get("score"), default=-1.0),
                 "bbox": _normalize_bbox(item.get("bbox")),
                 "cluster_id": _clean_name(person_info_dict.get("id")),
+                "margin": _normalize_float(item["margin"]) if item.get("margin") is not None else None,
             }
         )
 
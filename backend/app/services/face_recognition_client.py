@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 import os
-from typing import Any
+from typing import Any, Sequence
 
 import httpx
 
 from .. import config
-from .local_face_recognition import LocalFaceRecognitionError, recognize_image_file_locally
+from .local_face_recognition import (
+    LocalFaceRecognitionError,
+    recognize_image_file_locally,
+    recognize_image_files_locally,
+)
 
 
 class FaceRecognitionClientError(RuntimeError):
@@ -88,6 +92,11 @@ def _recognize_image_file_remote(
     return payload
 
 
+def _configured_provider() -> str:
+    provider = (config.FACE_RECOGNITION_PROVIDER or "local").strip().lower()
+    return provider if provider in {"local", "remote", "auto"} else "local"
+
+
 def recognize_image_file(
     file_path: str,
     *,
@@ -100,9 +109,7 @@ def recognize_image_file(
     if not file_path or not os.path.exists(file_path):
         raise FaceRecognitionClientError(f"Recognition source file does not exist: {file_path}")
 
-    provider = (config.FACE_RECOGNITION_PROVIDER or "local").strip().lower()
-    if provider not in {"local", "remote", "auto"}:
-        provider = "local"
+    provider = _configured_provider()
 
     errors: list[str] = []
 
@@ -131,3 +138,62 @@ def recognize_image_file(
     if errors:
         raise FaceRecognitionClientError(" ; ".join(errors))
     raise FaceRecognitionClientError("No face recognition provider is available")
+
+
+def recognize_image_files(
+    file_paths: Sequence[str],
+    *,
+    threshold: float | None = None,
+    request_ids: Sequence[str | None] | None = None,
+) -> list[dict[str, Any] | FaceRecognitionClientError]:
+    """Batch form of ``recognize_image_file``: one payload or error per path, in order.
+
+    The local runtime handles the whole batch at once; with ``auto`` only the
+    images it failed on are sent to the remote service, one request each.
+    """
+    if not config.FACE_RECOGNITION_ENABLED:
+        raise FaceRecognitionClientError("Face recognition is disabled")
+
+    provider = _configured_provider()
+    request_ids = list(request_ids) if request_ids is not None else [None] * len(file_paths)
+    results: list[dict[str, Any] | FaceRecognitionClientError | None] = [None] * len(file_paths)
+    errors: list[list[str]] = [[] for _path in file_paths]
+    for index, file_path in enumerate(file_paths):
+        if not file_path or not os.path.exists(file_path):
+            results[index] = FaceRecognitionClientError(f"Recognition source file does not exist: {file_path}")
+
+    pending = [index for index, result in enumerate(results) if result is None]
+    if pending and provider in {"local", "auto"}:
+        try:
+            local_results = recognize_image_files_locally(
+                [file_paths[index] for index in pending],
+                threshold=threshold,
+                request_ids=[request_ids[index] for index in pending],
+            )
+        except LocalFaceRecognitionError as exc:
+            local_results = [exc] * len(pending)
+        for index, local_result in zip(pending, local_results):
+            if not isinstance(local_result, LocalFaceRecognitionError):
+                results[index] = local_result
+            elif provider == "local":
+                results[index] = FaceRecognitionClientError(f"Local face recognition failed: {local_result}")
+            else:
+                errors[index].append(f"local={local_result}")
+
+    if provider in {"remote", "auto"}:
+        for index, result in enumerate(results):
+            if result is not None:
+                continue
+            try:
+                results[index] = _recognize_image_file_remote(
+                    file_paths[index],
+                    threshold=threshold,
+                    request_id=request_ids[index],
+                )
+            except FaceRecognitionClientError as exc:
+                errors[index].append(f"remote={exc}")
+
+    return [
+        result if result is not None else FaceRecognitionClientError(" ; ".join(error_list))
+        for result, error_list in zip(results, errors)
+    ]
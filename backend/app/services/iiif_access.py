@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import hashlib
 import os
+from types import MappingProxyType
 from typing import Any, Mapping
 
-import pyvips
 from sqlalchemy.orm.attributes import flag_modified
 
 from .. import config
@@ -26,7 +27,18 @@ def _path_exists(path: str | None) -> bool:
     return bool(path) and os.path.exists(path)
 
 
-def build_asset_layers(asset: Asset) -> dict[str, Any]:
+def build_iiif_source_fingerprint(source_path: str | None) -> str | None:
+    """Short version tag for a served file; changes whenever the derivative is rewritten."""
+    if not source_path:
+        return None
+    try:
+        stat = os.stat(source_path)
+    except OSError:
+        return None
+    return hashlib.sha1(f"{stat.st_mtime_ns}-{stat.st_size}".encode("ascii")).hexdigest()[:16]
+
+
+def build_asset_layers(asset: Asset, *, copy_raw_metadata: bool = True) -> dict[str, Any]:
     return build_metadata_layers(
         asset_id=asset.id,
         asset_filename=asset.filename,
@@ -39,11 +51,130 @@ def build_asset_layers(asset: Asset) -> dict[str, Any]:
         asset_collection_object_id=asset.collection_object_id,
         asset_created_at=asset.created_at,
         metadata=asset.metadata_info or {},
+        copy_raw_metadata=copy_raw_metadata,
     )
 
 
+# Asset columns the layers depend on besides ``metadata_info``.
+LAYER_VIEW_REVISION_COLUMNS = (
+    "id",
+    "filename",
+    "file_path",
+    "file_size",
+    "mime_type",
+    "status",
+    "resource_type",
+    "visibility_scope",
+    "collection_object_id",
+    "created_at",
+)
+
+
+def _read_only(value: Any) -> Any:
+    return MappingProxyType(value) if isinstance(value, dict) else value
+
+
+def _coerce_dimension(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class AssetLayerView:
+    """
+    The metadata layers of one asset revision, built once and shared by the
+    IIIF, preview, download and platform helpers.
+
+    Sections are read-only mappings, and ``raw_metadata`` is shared with
+    ``asset.metadata_info`` rather than copied. Writers keep using
+    ``build_asset_layers``, which returns a fresh, mutable dict.
+    """
+
+    __slots__ = (
+        "metadata",
+        "revision",
+        "layers",
+        "technical",
+        "original_file_path",
+        "iiif_access_file_path",
+        "iiif_access_mime_type",
+        "requires_iiif_access_derivative",
+        "width",
+        "height",
+        "fixity_sha256",
+    )
+
+    def __init__(self, asset: Asset, metadata: Any, revision: tuple) -> None:
+        layers = build_asset_layers(asset, copy_raw_metadata=False)
+        technical = layers["technical"]
+        # What ``populate_iiif_access_metadata`` would store; only the path helpers read it.
+        access_technical = dict(technical)
+        _apply_iiif_access_defaults(
+            access_technical,
+            asset_file_path=asset.file_path,
+            asset_filename=asset.filename,
+            asset_file_size=asset.file_size,
+            asset_mime_type=asset.mime_type,
+        )
+        fixity_sha256 = next(
+            (str(technical[key]) for key in ("fixity_sha256", "checksum") if technical.get(key) not in (None, "")),
+            None,
+        )
+
+        read_only_layers = MappingProxyType({key: _read_only(value) for key, value in layers.items()})
+
+        assign = super().__setattr__
+        assign("metadata", metadata)
+        assign("revision", revision)
+        assign("layers", read_only_layers)
+        assign("technical", read_only_layers["technical"])
+        assign(
+            "original_file_path",
+            _normalize_path(access_technical.get("original_file_path")) or _normalize_path(asset.file_path),
+        )
+        assign("iiif_access_file_path", _normalize_path(access_technical.get("iiif_access_file_path")))
+        assign("iiif_access_mime_type", _normalize_path(access_technical.get("iiif_access_mime_type")))
+        assign("requires_iiif_access_derivative", _technical_requires_derivative(access_technical))
+        assign("width", _coerce_dimension(technical.get("width")))
+        assign("height", _coerce_dimension(technical.get("height")))
+        assign("fixity_sha256", fixity_sha256)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("AssetLayerView is read-only")
+
+    @property
+    def dimensions(self) -> tuple[int, int]:
+        return self.width, self.height
+
+    def as_dict(self) -> dict[str, Any]:
+        """A mutable copy of the sections, e.g. for a response model; nested values are still shared."""
+        return {key: dict(value) if isinstance(value, Mapping) else value for key, value in self.layers.items()}
+
+
+def get_asset_layer_view(asset: Asset) -> AssetLayerView:
+    """
+    The asset's layer view, rebuilt only when its revision changes.
+
+    The revision is the ``metadata_info`` object itself plus the columns in
+    ``LAYER_VIEW_REVISION_COLUMNS``. Every writer assigns a new
+    ``metadata_info`` dict, and a reload from the database produces one too,
+    so identity is enough to notice a metadata change.
+    """
+    metadata = asset.metadata_info
+    revision = tuple(getattr(asset, column, None) for column in LAYER_VIEW_REVISION_COLUMNS)
+    view = getattr(asset, "_layer_view", None)
+    if view is None or view.metadata is not metadata or view.revision != revision:
+        view = AssetLayerView(asset, metadata, revision)
+        asset._layer_view = view
+    return view
+
+
 def requires_iiif_access_derivative(layers_or_metadata: Mapping[str, Any] | None) -> bool:
-    technical = get_technical_metadata(layers_or_metadata)
+    return _technical_requires_derivative(get_technical_metadata(layers_or_metadata))
+
+
+def _technical_requires_derivative(technical: Mapping[str, Any]) -> bool:
     strategy = str(technical.get("derivative_strategy") or "").strip().lower()
     priority = str(technical.get("derivative_priority") or "").strip().lower()
     rule_id = str(technical.get("derivative_rule_id") or "").strip().lower()
@@ -56,22 +187,14 @@ def requires_iiif_access_derivative(layers_or_metadata: Mapping[str, Any] | None
     return rule_id in {"psb_mandatory_access_bigtiff", "tiff_large_pyramidal_tiled_copy"}
 
 
-def populate_iiif_access_metadata(
-    layers_or_metadata: Mapping[str, Any] | None,
+def _apply_iiif_access_defaults(
+    technical: dict[str, Any],
     *,
     asset_file_path: str | None,
     asset_filename: str | None,
     asset_file_size: int | None,
     asset_mime_type: str | None,
-) -> dict[str, Any]:
-    layers = build_metadata_layers(
-        asset_filename=asset_filename,
-        asset_file_path=asset_file_path,
-        asset_file_size=asset_file_size,
-        asset_mime_type=asset_mime_type,
-        metadata=layers_or_metadata,
-    )
-    technical = layers["technical"]
+) -> None:
     normalized_asset_path = _normalize_path(asset_file_path)
 
     if normalized_asset_path and not technical.get("original_file_path"):
@@ -89,7 +212,7 @@ def populate_iiif_access_metadata(
         and technical.get("original_file_path") != normalized_asset_path
     )
     should_default_access_to_asset = bool(normalized_asset_path) and (
-        has_distinct_original or not requires_iiif_access_derivative(layers)
+        has_distinct_original or not _technical_requires_derivative(technical)
     )
     if should_default_access_to_asset and normalized_asset_path:
         technical.setdefault("iiif_access_file_path", normalized_asset_path)
@@ -97,19 +220,34 @@ def populate_iiif_access_metadata(
         if asset_mime_type:
             technical.setdefault("iiif_access_mime_type", asset_mime_type)
 
+
+def populate_iiif_access_metadata(
+    layers_or_metadata: Mapping[str, Any] | None,
+    *,
+    asset_file_path: str | None,
+    asset_filename: str | None,
+    asset_file_size: int | None,
+    asset_mime_type: str | None,
+) -> dict[str, Any]:
+    layers = build_metadata_layers(
+        asset_filename=asset_filename,
+        asset_file_path=asset_file_path,
+        asset_file_size=asset_file_size,
+        asset_mime_type=asset_mime_type,
+        metadata=layers_or_metadata,
+    )
+    _apply_iiif_access_defaults(
+        layers["technical"],
+        asset_file_path=asset_file_path,
+        asset_filename=asset_filename,
+        asset_file_size=asset_file_size,
+        asset_mime_type=asset_mime_type,
+    )
     return layers
 
 
 def get_asset_original_file_path(asset: Asset) -> str | None:
-    layers = populate_iiif_access_metadata(
-        asset.metadata_info or {},
-        asset_file_path=asset.file_path,
-        asset_filename=asset.filename,
-        asset_file_size=asset.file_size,
-        asset_mime_type=asset.mime_type,
-    )
-    technical = layers["technical"]
-    return _normalize_path(technical.get("original_file_path")) or _normalize_path(asset.file_path)
+    return get_asset_layer_view(asset).original_file_path
 
 
 def get_asset_iiif_access_file_path(
@@ -118,22 +256,15 @@ def get_asset_iiif_access_file_path(
     allow_original_fallback: bool = True,
     require_exists: bool = False,
 ) -> str | None:
-    layers = populate_iiif_access_metadata(
-        asset.metadata_info or {},
-        asset_file_path=asset.file_path,
-        asset_filename=asset.filename,
-        asset_file_size=asset.file_size,
-        asset_mime_type=asset.mime_type,
-    )
-    technical = layers["technical"]
-    iiif_access_path = _normalize_path(technical.get("iiif_access_file_path"))
+    view = get_asset_layer_view(asset)
+    iiif_access_path = view.iiif_access_file_path
     if iiif_access_path:
         if not require_exists or _path_exists(iiif_access_path):
             return iiif_access_path
         return None
 
-    if allow_original_fallback and not requires_iiif_access_derivative(layers):
-        original_path = get_asset_original_file_path(asset)
+    if allow_original_fallback and not view.requires_iiif_access_derivative:
+        original_path = view.original_file_path
         if original_path and (not require_exists or _path_exists(original_path)):
             return original_path
 
@@ -155,20 +286,12 @@ def get_asset_primary_file_path(asset: Asset, *, require_exists: bool = False) -
 
 
 def get_asset_iiif_access_mime_type(asset: Asset) -> str | None:
-    layers = populate_iiif_access_metadata(
-        asset.metadata_info or {},
-        asset_file_path=asset.file_path,
-        asset_filename=asset.filename,
-        asset_file_size=asset.file_size,
-        asset_mime_type=asset.mime_type,
-    )
-    technical = layers["technical"]
-    iiif_mime_type = _normalize_path(technical.get("iiif_access_mime_type"))
-    if iiif_mime_type:
-        return iiif_mime_type
+    view = get_asset_layer_view(asset)
+    if view.iiif_access_mime_type:
+        return view.iiif_access_mime_type
 
     iiif_access_path = get_asset_iiif_access_file_path(asset, allow_original_fallback=True, require_exists=False)
-    if iiif_access_path == get_asset_original_file_path(asset):
+    if iiif_access_path == view.original_file_path:
         return asset.mime_type
     return IIIF_ACCESS_MIME_TYPE if iiif_access_path else asset.mime_type
 
@@ -185,6 +308,8 @@ def build_iiif_access_output_path(asset: Asset) -> str:
 
 
 def generate_pyramidal_tiff_access_copy(source_path: str, output_path: str) -> tuple[int, int]:
+    import pyvips
+
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     image = pyvips.Image.new_from_file(source_path, access="sequential")
     image.write_to_file(
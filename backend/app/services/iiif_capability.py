@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from .. import config
+
+CAPABILITY_PATTERN = re.compile(r"(\d+)\.([a-z_]+)\.([A-Za-z0-9_-]{22})")
+CAPABILITY_SIGNATURE_LENGTH = 22
+SOURCE_MAP_MAX_ENTRIES = 4096
+
+
+@dataclass(frozen=True)
+class IIIFCapability:
+    asset_id: int
+    visibility_scope: str
+    expires_at: int
+
+
+@dataclass(frozen=True)
+class IIIFSourceEntry:
+    """What a tile request needs to know about an asset once access has been granted."""
+
+    source_path: str
+    identifier: str
+    aliases: frozenset[str]
+    iiif_ready: bool
+
+
+def _sign(asset_id: int, identifier: str, visibility_scope: str, expires_at: int) -> str:
+    message = f"{asset_id}\n{identifier}\n{visibility_scope}\n{expires_at}".encode("utf-8")
+    digest = hmac.new(config.IIIF_CAPABILITY_SECRET.encode("utf-8"), message, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).decode("ascii")[:CAPABILITY_SIGNATURE_LENGTH]
+
+
+def _capability_expiry(now: float) -> int:
+    # Expiry is rounded to whole TTL windows so every manifest fetched in the
+    # same window hands out the same URL, which keeps browser caches warm. The
+    # end of the next window is used, so a URL stays valid for at least one TTL
+    # and at most two.
+    ttl = max(int(config.IIIF_CAPABILITY_TTL_SECONDS), 1)
+    return (int(now) // ttl + 2) * ttl
+
+
+def issue_iiif_capability(
+    asset_id: int,
+    identifier: str,
+    visibility_scope: str,
+    *,
+    now: float | None = None,
+) -> str:
+    expires_at = _capability_expiry(time.time() if now is None else now)
+    signature = _sign(asset_id, identifier, visibility_scope, expires_at)
+    return f"{expires_at}.{visibility_scope}.{signature}"
+
+
+def verify_iiif_capability(
+    token: str,
+    *,
+    asset_id: int,
+    identifier: str,
+    now: float | None = None,
+) -> IIIFCapability | None:
+    match = CAPABILITY_PATTERN.fullmatch(token or "")
+    if not match:
+        return None
+    expires_at = int(match.group(1))
+    visibility_scope = match.group(2)
+    if expires_at < (time.time() if now is None else now):
+        return None
+    expected = _sign(asset_id, identifier, visibility_scope, expires_at)
+    if not hmac.compare_digest(expected, match.group(3)):
+        return None
+    return IIIFCapability(asset_id=asset_id, visibility_scope=visibility_scope, expires_at=expires_at)
+
+
+_SOURCE_MAP: OrderedDict[int, IIIFSourceEntry] = OrderedDict()
+_SOURCE_MAP_LOCK = threading.Lock()
+
+
+def remember_iiif_source(asset_id: int, entry: IIIFSourceEntry) -> None:
+    with _SOURCE_MAP_LOCK:
+        _SOURCE_MAP[asset_id] = entry
+        _SOURCE_MAP.move_to_end(asset_id)
+        while len(_SOURCE_MAP) > SOURCE_MAP_MAX_ENTRIES:
+            _SOURCE_MAP.popitem(last=False)
+
+
+def lookup_iiif_source(asset_id: int) -> IIIFSourceEntry | None:
+    with _SOURCE_MAP_LOCK:
+        entry = _SOURCE_MAP.get(asset_id)
+        if entry is not None:
+            _SOURCE_MAP.move_to_end(asset_id)
+        return entry
+
+
+def forget_iiif_source(asset_id: int) -> None:
+    with _SOURCE_MAP_LOCK:
+        _SOURCE_MAP.pop(asset_id, None)
+
+
+def reset_iiif_source_map() -> None:
+    with _SOURCE_MAP_LOCK:
+        _SOURCE_MAP.clear()
@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import math
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+from .. import config
+from .iiif_access import IIIF_TILE_SIZE, build_iiif_source_fingerprint
+
+if TYPE_CHECKING:
+    import pyvips
+
+IIIF_IMAGE_CONTEXT = "http://iiif.io/api/image/2/context.json"
+IIIF_IMAGE_PROTOCOL = "http://iiif.io/api/image"
+IIIF_IMAGE_PROFILE = "http://iiif.io/api/image/2/level1.json"
+IIIF_IMAGE_FORMATS = {"jpg": "image/jpeg", "png": "image/png"}
+IIIF_IMAGE_QUALITIES = ("default", "color", "gray")
+IIIF_IMAGE_SUPPORTS = (
+    "regionByPct",
+    "regionSquare",
+    "sizeByConfinedWh",
+    "sizeByDistortedWh",
+    "sizeByPct",
+    "sizeByWh",
+    "rotationBy90s",
+    "mirroring",
+)
+# libjpeg's shrink-on-load factors; any other loader only exposes full resolution.
+JPEG_SHRINK_FACTORS = (1, 2, 4, 8)
+
+_NUMBER = r"\d+(?:\.\d+)?"
+_REGION_PIXELS = re.compile(r"(\d+),(\d+),(\d+),(\d+)")
+_REGION_PERCENT = re.compile(rf"pct:({_NUMBER}),({_NUMBER}),({_NUMBER}),({_NUMBER})")
+_SIZE_WH = re.compile(r"(!)?(\d*),(\d*)")
+_SIZE_PERCENT = re.compile(rf"pct:({_NUMBER})")
+
+
+class IIIFImageRequestError(ValueError):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass(frozen=True)
+class PyramidLevel:
+    scale_factor: int
+    width: int
+    height: int
+    load_options: dict[str, Any] = field(default_factory=dict, hash=False, compare=False)
+
+
+@dataclass(frozen=True)
+class PyramidInfo:
+    width: int
+    height: int
+    tile_width: int
+    tile_height: int
+    levels: tuple[PyramidLevel, ...]
+
+    @property
+    def scale_factors(self) -> list[int]:
+        if len(self.levels) > 1:
+            return [level.scale_factor for level in self.levels]
+        # A flat image is still tiled virtually; stop once it fits in one tile.
+        factors = [1]
+        while (
+            math.ceil(self.width / factors[-1]) > self.tile_width
+            or math.ceil(self.height / factors[-1]) > self.tile_height
+        ):
+            factors.append(factors[-1] * 2)
+        return factors
+
+    def best_level(self, scale: float) -> PyramidLevel:
+        """Smallest stored level that still has at least the requested resolution."""
+        chosen = self.levels[0]
+        for level in self.levels:
+            if level.width / self.width >= scale and level.height / self.height >= scale:
+                chosen = level
+        return chosen
+
+
+@dataclass(frozen=True)
+class IIIFImageRequest:
+    region: tuple[int, int, int, int]
+    size: tuple[int, int]
+    rotation: int
+    mirror: bool
+    quality: str
+    format: str
+
+    @property
+    def media_type(self) -> str:
+        return IIIF_IMAGE_FORMATS[self.format]
+
+
+def _describe_levels(source_path: str, image: pyvips.Image) -> tuple[PyramidLevel, ...]:
+    import pyvips
+
+    loader = image.get("vips-loader") if image.get_typeof("vips-loader") else ""
+    width, height = int(image.width), int(image.height)
+
+    if loader == "tiffload" and image.get_typeof("n-pages") and int(image.get("n-pages")) > 1:
+        levels: list[PyramidLevel] = []
+        for page in range(int(image.get("n-pages"))):
+            page_image = image if page == 0 else pyvips.Image.new_from_file(source_path, page=page)
+            page_width, page_height = int(page_image.width), int(page_image.height)
+            if page_width <= 0 or page_height <= 0:
+                break
+            scale_factor = max(int(round(width / page_width)), 1)
+            # Stop at the first page that is not part of a power-of-two pyramid
+            # (e.g. an embedded thumbnail or an unrelated second image).
+            if scale_factor != 1 << len(levels):
+                break
+            levels.append(PyramidLevel(scale_factor, page_width, page_height, {"page": page}))
+        return tuple(levels)
+
+    if loader == "jpegload":
+        return tuple(
+            PyramidLevel(shrink, math.ceil(width / shrink), math.ceil(height / shrink), {"shrink": shrink})
+            for shrink in JPEG_SHRINK_FACTORS
+        )
+
+    return (PyramidLevel(1, width, height, {}),)
+
+
+@lru_cache(maxsize=256)
+def _describe_pyramid_cached(source_path: str, _fingerprint: str | None) -> PyramidInfo:
+    import pyvips
+
+    try:
+        image = pyvips.Image.new_from_file(source_path)
+    except pyvips.Error as exc:
+        raise IIIFImageRequestError(500, f"Unable to open IIIF source: {os.path.basename(source_path)}") from exc
+
+    tile_width = int(image.get("tile-width")) if image.get_typeof("tile-width") else IIIF_TILE_SIZE
+    tile_height = int(image.get("tile-height")) if image.get_typeof("tile-height") else IIIF_TILE_SIZE
+    return PyramidInfo(
+        width=int(image.width),
+        height=int(image.height),
+        tile_width=tile_width,
+        tile_height=tile_height,
+        levels=_describe_levels(source_path, image),
+    )
+
+
+def describe_pyramid(source_path: str) -> PyramidInfo:
+    # Keyed on the file fingerprint so a regenerated derivative is re-read.
+    return _describe_pyramid_cached(source_path, build_iiif_source_fingerprint(source_path))
+
+
+def build_iiif_info(source_path: str, *, service_id: str) -> dict[str, Any]:
+    pyramid = describe_pyramid(source_path)
+    return {
+        "@context": IIIF_IMAGE_CONTEXT,
+        "@id": service_id,
+        "protocol": IIIF_IMAGE_PROTOCOL,
+        "width": pyramid.width,
+        "height": pyramid.height,
+        "sizes": [
+            {"width": level.width, "height": level.height}
+            for level in sorted(pyramid.levels, key=lambda level: level.width)
+        ],
+        "tiles": [
+            {
+                "width": pyramid.tile_width,
+                "height": pyramid.tile_height,
+                "scaleFactors": pyramid.scale_factors,
+            }
+        ],
+        "profile": [
+            IIIF_IMAGE_PROFILE,
+            {
+                "formats": sorted(IIIF_IMAGE_FORMATS),
+                "qualities": list(IIIF_IMAGE_QUALITIES),
+                "supports": list(IIIF_IMAGE_SUPPORTS),
+            },
+        ],
+    }
+
+
+def _parse_region(value: str, width: int, height: int) -> tuple[int, int, int, int]:
+    if value == "full":
+        return 0, 0, width, height
+    if value == "square":
+        side = min(width, height)
+        return (width - side) // 2, (height - side) // 2, side, side
+
+    pixels = _REGION_PIXELS.fullmatch(value)
+    percent = _REGION_PERCENT.fullmatch(value)
+    if pixels:
+        x, y, region_width, region_height = (int(part) for part in pixels.groups())
+    elif percent:
+        px, py, pw, ph = (float(part) for part in percent.groups())
+        x, y = int(round(px * width / 100)), int(round(py * height / 100))
+        region_width, region_height = int(round(pw * width / 100)), int(round(ph * height / 100))
+    else:
+        raise IIIFImageRequestError(400, f"Invalid region: {value}")
+
+    if region_width <= 0 or region_height <= 0 or x >= width or y >= height:
+        raise IIIFImageRequestError(400, f"Region is outside the image: {value}")
+    return x, y, min(region_width, width - x), min(region_height, height - y)
+
+
+def _parse_size(value: str, region_width: int, region_height: int) -> tuple[int, int]:
+    if value in {"full", "max"}:
+        return region_width, region_height
+
+    percent = _SIZE_PERCENT.fullmatch(value)
+    if percent:
+        factor = float(percent.group(1)) / 100
+        target = (int(round(region_width * factor)), int(round(region_height * factor)))
+    else:
+        match = _SIZE_WH.fullmatch(value)
+        if not match or not (match.group(2) or match.group(3)):
+            raise IIIFImageRequestError(400, f"Invalid size: {value}")
+        confined, raw_width, raw_height = match.group(1), match.group(2), match.group(3)
+        if confined:
+            if not raw_width or not raw_height:
+                raise IIIFImageRequestError(400, f"Invalid size: {value}")
+            scale = min(int(raw_width) / region_width, int(raw_height) / region_height)
+            target = (int(round(region_width * scale)), int(round(region_height * scale)))
+        elif raw_width and raw_height:
+            target = (int(raw_width), int(raw_height))
+        elif raw_width:
+            target = (int(raw_width), int(round(region_height * int(raw_width) / region_width)))
+        else:
+            target = (int(round(region_width * int(raw_height) / region_height)), int(raw_height))
+
+    target_width, target_height = max(target[0], 1), max(target[1], 1)
+    if target_width > region_width or target_height > region_height:
+        raise IIIFImageRequestError(400, f"Requested size is larger than the region: {value}")
+    return target_width, target_height
+
+
+def parse_iiif_image_request(suffix: str, *, width: int, height: int) -> IIIFImageRequest:
+    parts = suffix.strip("/").split("/")
+    if len(parts) != 4:
+        raise IIIFImageRequestError(400, f"Invalid IIIF image request: {suffix}")
+    region_value, size_value, rotation_value, quality_format = parts
+
+    quality, separator, image_format = quality_format.rpartition(".")
+    if not separator or image_format not in IIIF_IMAGE_FORMATS:
+        raise IIIFImageRequestError(400, f"Unsupported format: {quality_format}")
+    if quality not in IIIF_IMAGE_QUALITIES:
+        raise IIIFImageRequestError(400, f"Unsupported quality: {quality}")
+
+    mirror = rotation_value.startswith("!")
+    rotation_text = rotation_value[1:] if mirror else rotation_value
+    try:
+        rotation = float(rotation_text)
+    except ValueError as exc:
+        raise IIIFImageRequestError(400, f"Invalid rotation: {rotation_value}") from exc
+    if rotation not in {0, 90, 180, 270}:
+        raise IIIFImageRequestError(501, f"Only rotations by multiples of 90 are supported: {rotation_value}")
+
+    region = _parse_region(region_value, width, height)
+    return IIIFImageRequest(
+        region=region,
+        size=_parse_size(size_value, region[2], region[3]),
+        rotation=int(rotation),
+        mirror=mirror,
+        quality=quality,
+        format=image_format,
+    )
+
+
+def render_iiif_image(source_path: str, suffix: str) -> tuple[bytes, str]:
+    """Render one IIIF Image API request from the pyramid level closest to the requested scale."""
+    import pyvips
+
+    pyramid = describe_pyramid(source_path)
+    image_request = parse_iiif_image_request(suffix, width=pyramid.width, height=pyramid.height)
+    x, y, region_width, region_height = image_request.region
+    target_width, target_height = image_request.size
+
+    level = pyramid.best_level(max(target_width / region_width, target_height / region_height))
+    try:
+        image = pyvips.Image.new_from_file(source_path, **level.load_options)
+        level_x = min(int(x * level.width / pyramid.width), level.width - 1)
+        level_y = min(int(y * level.height / pyramid.height), level.height - 1)
+        level_width = max(min(math.ceil(region_width * level.width / pyramid.width), level.width - level_x), 1)
+        level_height = max(min(math.ceil(region_height * level.height / pyramid.height), level.height - level_y), 1)
+        image = image.crop(level_x, level_y, level_width, level_height)
+        if (level_width, level_height) != (target_width, target_height):
+            image = image.thumbnail_image(target_width, height=target_height, size="force")
+
+        if image_request.mirror:
+            image = image.fliphor()
+        if image_request.rotation:
+            image = image.rot(f"d{image_request.rotation}")
+        if image_request.quality == "gray":
+            image = image.colourspace("b-w")
+        if image.hasalpha() and image_request.format == "jpg":
+            image = image.flatten(background=[255])
+        if image_request.format == "jpg":
+            content = image.jpegsave_buffer(Q=config.IIIF_NATIVE_JPEG_QUALITY, strip=True)
+        else:
+            content = image.pngsave_buffer()
+    except pyvips.Error as exc:
+        raise IIIFImageRequestError(500, f"Unable to render IIIF image: {exc}") from exc
+    return content, image_request.media_type
+
+
+_RENDER_EXECUTOR: ThreadPoolExecutor | None = None
+_RENDER_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_iiif_render_executor() -> ThreadPoolExecutor:
+    """libvips releases the GIL, so decoding and encoding run on a dedicated pool."""
+    global _RENDER_EXECUTOR
+
+    with _RENDER_EXECUTOR_LOCK:
+        if _RENDER_EXECUTOR is None:
+            _RENDER_EXECUTOR = ThreadPoolExecutor(
+                max_workers=config.IIIF_NATIVE_MAX_WORKERS,
+                thread_name_prefix="iiif-render",
+            )
+        return _RENDER_EXECUTOR
+
+
+def shutdown_iiif_render_executor() -> None:
+    global _RENDER_EXECUTOR
+
+    with _RENDER_EXECUTOR_LOCK:
+        executor = _RENDER_EXECUTOR
+        _RENDER_EXECUTOR = None
+    if executor is not None:
+        executor.shutdown(wait=False)
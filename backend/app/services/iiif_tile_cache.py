@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+
+from .. import config
+
+DISK_CACHE_DIR_NAME = os.path.join(".cache", "iiif-tiles")
+DISK_CACHE_FILE_SUFFIX = ".tile"
+DISK_CACHE_LOCK_DIR_NAME = ".locks"
+DISK_EVICTION_TARGET_RATIO = 0.9
+# Temp files this old belong to a writer that died before renaming them.
+DISK_ABANDONED_TEMP_AGE_SECONDS = 60 * 60
+
+
+@dataclass(frozen=True)
+class CachedTile:
+    content: bytes
+    content_type: str
+
+    @property
+    def size(self) -> int:
+        return len(self.content)
+
+
+def build_tile_cache_key(asset_id: int, source_fingerprint: str, suffix: str) -> str:
+    return f"{asset_id}:{source_fingerprint}:{suffix}"
+
+
+def build_tile_etag(source_fingerprint: str, suffix: str) -> str:
+    suffix_digest = hashlib.sha1(suffix.encode("utf-8")).hexdigest()[:12]
+    return f'"{source_fingerprint}-{suffix_digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip() for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+class MemoryTileCache:
+    """Thread-safe LRU bounded by the total size of cached bodies."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(int(max_bytes), 0)
+        self._entries: OrderedDict[str, CachedTile] = OrderedDict()
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def current_bytes(self) -> int:
+        return self._current_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> CachedTile | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: CachedTile) -> None:
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._current_bytes -= previous.size
+            self._entries[key] = entry
+            self._current_bytes += entry.size
+            while self._current_bytes > self.max_bytes and self._entries:
+                _evicted_key, evicted = self._entries.popitem(last=False)
+                self._current_bytes -= evicted.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+
+
+@dataclass
+class TileCacheGCReport:
+    scanned_files: int = 0
+    scanned_bytes: int = 0
+    removed_lru: int = 0
+    removed_abandoned: int = 0
+    reclaimed_bytes: int = 0
+    remaining_bytes: int = 0
+    budget_bytes: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class DiskTileCache:
+    """Sharded on-disk cache shared by every worker process.
+
+    Requests only read and write single files. ``collect_garbage`` walks the
+    tree from the periodic GC task and evicts the oldest files by mtime once
+    the byte budget is exceeded, so the budget may be overshot until it runs.
+    """
+
+    def __init__(self, root_dir: str, max_bytes: int):
+        self.root_dir = root_dir
+        self.max_bytes = max(int(max_bytes), 0)
+
+    def _path_for_key(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.root_dir, digest[:2], digest[2:4], f"{digest}{DISK_CACHE_FILE_SUFFIX}")
+
+    def lock_path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.root_dir, DISK_CACHE_LOCK_DIR_NAME, f"{digest}.lock")
+
+    def _scan(self) -> tuple[list[tuple[float, int, str]], list[tuple[float, int, str]]]:
+        """``(mtime, size, path)`` of the cached tiles and of leftover temp files."""
+        entries: list[tuple[float, int, str]] = []
+        temp_files: list[tuple[float, int, str]] = []
+        for root, _dirs, files in os.walk(self.root_dir):
+            for filename in files:
+                if filename.endswith(DISK_CACHE_FILE_SUFFIX):
+                    bucket = entries
+                elif filename.endswith(".tmp"):
+                    bucket = temp_files
+                else:
+                    continue
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                bucket.append((stat.st_mtime, stat.st_size, path))
+        return entries, temp_files
+
+    def get(self, key: str) -> CachedTile | None:
+        if self.max_bytes <= 0:
+            return None
+        path = self._path_for_key(key)
+        try:
+            with open(path, "rb") as file_handle:
+                payload = file_handle.read()
+            os.utime(path)
+        except OSError:
+            return None
+        content_type, separator, content = payload.partition(b"\n")
+        if not separator:
+            return None
+        return CachedTile(content=content, content_type=content_type.decode("latin-1"))
+
+    def put(self, key: str, entry: CachedTile) -> None:
+        if self.max_bytes <= 0 or entry.size > self.max_bytes:
+            return
+        path = self._path_for_key(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        payload = entry.content_type.encode("latin-1") + b"\n" + entry.content
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp_path, "wb") as file_handle:
+                file_handle.write(payload)
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def collect_garbage(self, *, now: float | None = None) -> TileCacheGCReport:
+        """Trim the oldest tiles to 90% of the budget once it is exceeded and drop abandoned temp files."""
+        now = time.time() if now is None else now
+        report = TileCacheGCReport(budget_bytes=self.max_bytes)
+        entries, temp_files = self._scan()
+        report.scanned_files = len(entries)
+        report.scanned_bytes = sum(size for _mtime, size, _path in entries)
+
+        for mtime, size, path in temp_files:
+            if now - mtime >= DISK_ABANDONED_TEMP_AGE_SECONDS and _remove(path):
+                report.removed_abandoned += 1
+                report.reclaimed_bytes += size
+
+        usage = report.scanned_bytes
+        if usage > self.max_bytes:
+            target = int(self.max_bytes * DISK_EVICTION_TARGET_RATIO)
+            for _mtime, size, path in sorted(entries):
+                if usage <= target:
+                    break
+                if _remove(path):
+                    report.removed_lru += 1
+                    report.reclaimed_bytes += size
+                    usage -= size
+        report.remaining_bytes = usage
+        return report
+
+
+def _remove(path: str) -> bool:
+    try:
+        os.remove(path)
+    except OSError:
+        return False
+    return True
+
+
+class IIIFTileCache:
+    """Two-level cache: in-process LRU in front of the shared disk cache."""
+
+    def __init__(self, memory: MemoryTileCache, disk: DiskTileCache | None):
+        self.memory = memory
+        self.disk = disk
+        self.max_entry_bytes = config.IIIF_TILE_CACHE_MAX_ENTRY_BYTES
+
+    def get_memory(self, key: str) -> CachedTile | None:
+        return self.memory.get(key)
+
+    def get(self, key: str) -> CachedTile | None:
+        entry = self.memory.get(key)
+        if entry is not None or self.disk is None:
+            return entry
+        entry = self.disk.get(key)
+        if entry is not None:
+            self.memory.put(key, entry)
+        return entry
+
+    def lock_path(self, key: str) -> str | None:
+        return self.disk.lock_path(key) if self.disk is not None else None
+
+    def put(self, key: str, entry: CachedTile) -> None:
+        if entry.size > self.max_entry_bytes:
+            return
+        self.memory.put(key, entry)
+        if self.disk is not None:
+            self.disk.put(key, entry)
+
+
+_TILE_CACHE: IIIFTileCache | None = None
+_TILE_CACHE_LOCK = threading.Lock()
+
+
+def _disk_cache_dir() -> str:
+    return config.IIIF_TILE_CACHE_DIR or os.path.join(config.UPLOAD_DIR, DISK_CACHE_DIR_NAME)
+
+
+def get_iiif_tile_cache() -> IIIFTileCache:
+    global _TILE_CACHE
+
+    disk_dir = _disk_cache_dir()
+    with _TILE_CACHE_LOCK:
+        current_disk_dir = _TILE_CACHE.disk.root_dir if _TILE_CACHE is not None and _TILE_CACHE.disk else None
+        if _TILE_CACHE is None or (config.IIIF_TILE_CACHE_DISK_BYTES > 0 and current_disk_dir != disk_dir):
+            disk = DiskTileCache(disk_dir, config.IIIF_TILE_CACHE_DISK_BYTES) if config.IIIF_TILE_CACHE_DISK_BYTES > 0 else None
+            _TILE_CACHE = IIIFTileCache(MemoryTileCache(config.IIIF_TILE_CACHE_MEMORY_BYTES), disk)
+        return _TILE_CACHE
+
+
+def collect_iiif_tile_cache_garbage() -> TileCacheGCReport:
+    if config.IIIF_TILE_CACHE_DISK_BYTES <= 0:
+        return TileCacheGCReport()
+    return DiskTileCache(_disk_cache_dir(), config.IIIF_TILE_CACHE_DISK_BYTES).collect_garbage()
+
+
+def reset_iiif_tile_cache() -> None:
+    global _TILE_CACHE
+    with _TILE_CACHE_LOCK:
+        _TILE_CACHE = None
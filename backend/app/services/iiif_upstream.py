@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from typing import Mapping
+
+import httpx
+
+from .. import config
+
+IIIF_UPSTREAM_TIMEOUT = httpx.Timeout(connect=10.0, read=300.0, write=10.0, pool=10.0)
+IIIF_FORWARDED_RESPONSE_HEADERS = ("content-length", "content-encoding", "etag", "last-modified")
+
+_ASYNC_CLIENT: httpx.AsyncClient | None = None
+
+
+def build_iiif_upstream_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=config.IIIF_UPSTREAM_MAX_CONNECTIONS,
+        max_keepalive_connections=config.IIIF_UPSTREAM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=config.IIIF_UPSTREAM_KEEPALIVE_EXPIRY_SECONDS,
+    )
+
+
+def get_iiif_upstream_client() -> httpx.AsyncClient:
+    """Return the process-wide pooled client used for Cantaloupe requests."""
+    global _ASYNC_CLIENT
+
+    if _ASYNC_CLIENT is None or _ASYNC_CLIENT.is_closed:
+        _ASYNC_CLIENT = httpx.AsyncClient(
+            timeout=IIIF_UPSTREAM_TIMEOUT,
+            limits=build_iiif_upstream_limits(),
+        )
+    return _ASYNC_CLIENT
+
+
+def set_iiif_upstream_client(client: httpx.AsyncClient | None) -> None:
+    global _ASYNC_CLIENT
+    _ASYNC_CLIENT = client
+
+
+async def close_iiif_upstream_client() -> None:
+    global _ASYNC_CLIENT
+
+    client = _ASYNC_CLIENT
+    _ASYNC_CLIENT = None
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+def forwarded_response_headers(upstream_headers: Mapping[str, str], *, include_length: bool = True) -> dict[str, str]:
+    headers: dict[str, str] = {}
+    for name in IIIF_FORWARDED_RESPONSE_HEADERS:
+        if name == "content-length" and not include_length:
+            continue
+        value = upstream_headers.get(name)
+        if value:
+            headers[name] = value
+    return headers
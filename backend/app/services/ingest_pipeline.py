@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import struct
+import time
+import warnings
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+
+from fastapi import UploadFile
+from PIL import Image
+from starlette.concurrency import run_in_threadpool
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Enough for the markers/IFDs that carry dimensions in practically every JPEG,
+# PNG, TIFF and PSD/PSB, including ones with large embedded ICC/XMP segments.
+HEADER_CAPTURE_BYTES = 1024 * 1024
+
+
+class IngestTimer:
+    """Wall-clock milliseconds per ingest stage, recorded into technical metadata."""
+
+    def __init__(self) -> None:
+        self._started = time.perf_counter()
+        self._stages: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._stages[name] = self._stages.get(name, 0.0) + elapsed_ms
+
+    def as_dict(self) -> dict[str, float]:
+        timings = {f"{name}_ms": round(elapsed_ms, 3) for name, elapsed_ms in self._stages.items()}
+        timings["total_ms"] = round((time.perf_counter() - self._started) * 1000, 3)
+        return timings
+
+
+@dataclass(frozen=True)
+class SniffedImage:
+    format_name: str
+    width: int
+    height: int
+
+
+@dataclass(frozen=True)
+class StreamedUpload:
+    path: str
+    file_size: int
+    sha256: str
+    header: bytes
+
+
+class PersistedUploadFile(UploadFile, ABC):
+    """An upload whose bytes are already on disk and hashed, e.g. a completed resumable upload."""
+
+    @abstractmethod
+    def persist(self, destination_path: str) -> StreamedUpload:
+        """Move the bytes to ``destination_path`` and describe them as if they had just been streamed there."""
+
+
+def _write_chunk(buffer, digest, chunk: bytes) -> None:
+    digest.update(chunk)
+    buffer.write(chunk)
+
+
+async def stream_upload_to_disk(
+    upload_file: UploadFile,
+    destination_path: str,
+    *,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> StreamedUpload:
+    """Persist an upload while hashing it and keeping its leading bytes for sniffing.
+
+    Hashing and writing happen off the event loop, chunk by chunk, so the file
+    is read exactly once no matter how large it is. Uploads that already sit on
+    disk are moved into place instead of being copied.
+    """
+    if isinstance(upload_file, PersistedUploadFile):
+        return await run_in_threadpool(upload_file.persist, destination_path)
+
+    digest = hashlib.sha256()
+    header = bytearray()
+    file_size = 0
+    with open(destination_path, "wb") as buffer:
+        while chunk := await upload_file.read(chunk_size):
+            if len(header) < HEADER_CAPTURE_BYTES:
+                header.extend(chunk[: HEADER_CAPTURE_BYTES - len(header)])
+            await run_in_threadpool(_write_chunk, buffer, digest, chunk)
+            file_size += len(chunk)
+    return StreamedUpload(path=destination_path, file_size=file_size, sha256=digest.hexdigest(), header=bytes(header))
+
+
+def read_file_header(file_path: str, size: int = HEADER_CAPTURE_BYTES) -> bytes:
+    try:
+        with open(file_path, "rb") as handle:
+            return handle.read(size)
+    except OSError:
+        return b""
+
+
+def _sniff_photoshop(header: bytes) -> SniffedImage | None:
+    # PSD (version 1) and PSB (version 2) share a fixed 26 byte header; Pillow
+    # only understands PSD, and both keep height before width.
+    if len(header) < 26:
+        return None
+    version = struct.unpack(">H", header[4:6])[0]
+    if version not in {1, 2}:
+        return None
+    height, width = struct.unpack(">II", header[14:22])
+    if not width or not height:
+        return None
+    return SniffedImage(format_name="PSD" if version == 1 else "PSB", width=width, height=height)
+
+
+def sniff_image_header(header: bytes) -> SniffedImage | None:
+    """Format and dimensions from the first bytes of a file, or ``None`` if they are not in there."""
+    if header[:4] == b"8BPS":
+        return _sniff_photoshop(header)
+    try:
+        with warnings.catch_warnings():
+            # Pillow warns about the truncated buffer even when the header it needs is complete.
+            warnings.simplefilter("ignore")
+            image = Image.open(io.BytesIO(header))
+        with image:
+            width, height = image.size
+            if not width or not height or not image.format:
+                return None
+            return SniffedImage(format_name=image.format, width=int(width), height=int(height))
+    except Exception:
+        return None
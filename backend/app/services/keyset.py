@@ -0,0 +1,52 @@
+"""
+Keyset ("seek") conditions over ``(created_at, id)``, newest first.
+
+SQLite keeps ``DateTime`` as text. Rows filled by the ``CURRENT_TIMESTAMP``
+server default read ``2024-01-01 08:00:00`` while SQLAlchemy binds
+``2024-01-01 08:00:00.000000``, so the same instant compares as two different
+values and a plain row-value comparison hands the boundary row out again.
+On SQLite the column is compared against every spelling of the bound instead.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import String, and_, or_, tuple_, type_coerce
+from sqlalchemy.sql.elements import ColumnElement
+
+
+def _sqlite_spellings(value: datetime) -> tuple[str, ...]:
+    """Every text form SQLite may hold ``value`` in, smallest first."""
+    long_form = value.strftime("%Y-%m-%d %H:%M:%S.%f")
+    if value.microsecond:
+        return (long_form,)
+    return (value.strftime("%Y-%m-%d %H:%M:%S"), long_form)
+
+
+def created_at_before(column, value: datetime, *, dialect: str) -> ColumnElement[bool]:
+    if dialect != "sqlite":
+        return column < value
+    return type_coerce(column, String) < _sqlite_spellings(value)[0]
+
+
+def created_at_equals(column, value: datetime, *, dialect: str) -> ColumnElement[bool]:
+    if dialect != "sqlite":
+        return column == value
+    return type_coerce(column, String).in_(_sqlite_spellings(value))
+
+
+def created_at_not_after(column, value: datetime, *, dialect: str) -> ColumnElement[bool]:
+    return or_(created_at_before(column, value, dialect=dialect), created_at_equals(column, value, dialect=dialect))
+
+
+def created_before(created_at_column, id_column, created_at: datetime, row_id: Any, *, dialect: str) -> ColumnElement[bool]:
+    """Rows after ``(created_at, row_id)`` in ``created_at DESC, id DESC`` order."""
+    if dialect != "sqlite":
+        # A row-value comparison lets PostgreSQL seek the (created_at, id) index.
+        return tuple_(created_at_column, id_column) < tuple_(created_at, row_id)
+    return or_(
+        created_at_before(created_at_column, created_at, dialect=dialect),
+        and_(created_at_equals(created_at_column, created_at, dialect=dialect), id_column < row_id),
+    )
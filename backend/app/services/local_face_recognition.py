@@ -4,17 +4,35 @@ import json
 import os
 import pickle
 import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Sequence
 
 from .. import config
+from .face_ann_index import exact_top_k
+from .face_index_store import FaceIndexStoreError, get_store_dir, manifest_key, open_face_index
+
+
+# Candidates kept per face: the best match plus the runner-up behind ``margin``.
+MATCH_TOP_K = 2
 
 
 class LocalFaceRecognitionError(RuntimeError):
     pass
 
 
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError as exc:
+        raise LocalFaceRecognitionError(
+            "numpy is required for local face recognition. Install backend/requirements.txt first."
+        ) from exc
+    return np
+
+
 def _path_mtime(path: Path) -> float | None:
     try:
         return path.stat().st_mtime
@@ -23,13 +41,7 @@ def _path_mtime(path: Path) -> float | None:
 
 
 def _normalize_vector(value: Any):
-    try:
-        import numpy as np
-    except ImportError as exc:
-        raise LocalFaceRecognitionError(
-            "numpy is required for local face recognition. Install backend/requirements.txt first."
-        ) from exc
-
+    np = _numpy()
     vector = np.asarray(value, dtype=np.float32)
     if vector.ndim != 1:
         vector = vector.reshape(-1)
@@ -76,6 +88,74 @@ def _as_landmarks(value: Any) -> list[list[float]]:
     return landmarks
 
 
+@dataclass(frozen=True)
+class _DecodedImage:
+    """A BGR frame plus the factors that map its pixel coordinates back onto the original."""
+
+    pixels: Any
+    scale_x: float = 1.0
+    scale_y: float = 1.0
+
+
+def _oriented_size(image: Any) -> tuple[int, int]:
+    width, height = int(image.width), int(image.height)
+    if image.get_typeof("orientation") and image.get("orientation") in {5, 6, 7, 8}:
+        return height, width
+    return width, height
+
+
+def _decode_with_pyvips(image_path: str, max_side: int) -> _DecodedImage:
+    """Decode at most ``max_side`` pixels on the long edge, shrinking on load where the format allows.
+
+    ``thumbnail`` uses libjpeg's DCT scaling for JPEG and picks the smallest
+    sufficient page of a pyramidal TIFF, so a 400-megapixel original never has
+    to be held in memory. EXIF orientation is applied, as OpenCV's reader does.
+    """
+    import pyvips
+
+    np = _numpy()
+    try:
+        full_width, full_height = _oriented_size(pyvips.Image.new_from_file(image_path))
+        if max_side > 0:
+            image = pyvips.Image.thumbnail(image_path, max_side, height=max_side, size="down")
+        else:
+            image = pyvips.Image.new_from_file(image_path, access="sequential").autorot()
+        if image.hasalpha():
+            image = image.flatten(background=[255, 255, 255])
+        if image.interpretation != "srgb":
+            image = image.colourspace("srgb")
+        if image.format != "uchar":
+            image = image.cast("uchar")
+        if image.bands > 3:
+            image = image.extract_band(0, n=3)
+        buffer = image.write_to_memory()
+    except pyvips.Error as exc:
+        raise LocalFaceRecognitionError(f"Could not load image for local face recognition: {image_path}") from exc
+
+    rgb = np.ndarray(buffer=buffer, dtype=np.uint8, shape=(image.height, image.width, image.bands))
+    return _DecodedImage(
+        pixels=np.ascontiguousarray(rgb[:, :, ::-1]),
+        scale_x=full_width / image.width,
+        scale_y=full_height / image.height,
+    )
+
+
+def _rescale_faces(faces: Sequence[Any], scale_x: float, scale_y: float) -> list[Any]:
+    """Move boxes and keypoints from decoded-frame pixels back to original pixels, in place."""
+    if scale_x == 1.0 and scale_y == 1.0:
+        return list(faces)
+    np = _numpy()
+    point_scale = np.array([scale_x, scale_y], dtype=np.float32)
+    for face in faces:
+        bbox = getattr(face, "bbox", None)
+        if bbox is not None:
+            face.bbox = np.asarray(bbox, dtype=np.float32) * np.tile(point_scale, 2)
+        kps = getattr(face, "kps", None)
+        if kps is not None:
+            face.kps = np.asarray(kps, dtype=np.float32) * point_scale
+    return list(faces)
+
+
 def _ensure_local_models(model_root: Path, model_name: str) -> None:
     model_dir = model_root / "models" / model_name
     required_files = {
@@ -126,9 +206,18 @@ class _InsightFaceRuntime:
         self._app = FaceAnalysis(name=self._model_name, root=str(self._model_root), providers=providers)
 
         ctx_id = 0 if "CUDAExecutionProvider" in available_providers else -1
-        self._app.prepare(ctx_id=ctx_id, det_size=(640, 640))
+        self.det_size = (640, 640)
+        self._app.prepare(ctx_id=ctx_id, det_size=self.det_size)
+
+    def decode(self, image_path: str) -> _DecodedImage:
+        """Read the image as a bounded BGR frame; libvips and OpenCV release the GIL, so this can run in threads."""
+        max_side = config.FACE_RECOGNITION_DECODE_MAX_SIDE
+        try:
+            return _decode_with_pyvips(image_path, max_side)
+        except (ImportError, OSError, LocalFaceRecognitionError):
+            # Without libvips, or for formats it cannot read, fall back to OpenCV's full decode.
+            pass
 
-    def analyze(self, image_path: str) -> list[Any]:
         img = self._cv2.imread(image_path)
         if img is None:
             try:
@@ -140,19 +229,96 @@ class _InsightFaceRuntime:
         if img is None:
             raise LocalFaceRecognitionError(f"Could not load image for local face recognition: {image_path}")
 
+        height, width = img.shape[:2]
+        if max_side <= 0 or max(width, height) <= max_side:
+            return _DecodedImage(pixels=img)
+        ratio = max_side / max(width, height)
+        reduced = self._cv2.resize(
+            img,
+            (max(1, round(width * ratio)), max(1, round(height * ratio))),
+            interpolation=self._cv2.INTER_AREA,
+        )
+        return _DecodedImage(
+            pixels=reduced,
+            scale_x=width / reduced.shape[1],
+            scale_y=height / reduced.shape[0],
+        )
+
+    def detect(self, decoded: _DecodedImage) -> list[Any]:
         try:
-            return list(self._app.get(img))
+            faces = self._app.get(decoded.pixels)
         except Exception as exc:
             raise LocalFaceRecognitionError(f"InsightFace inference failed: {exc}") from exc
+        return _rescale_faces(faces, decoded.scale_x, decoded.scale_y)
+
+    def analyze(self, image_path: str) -> list[Any]:
+        return self.detect(self.decode(image_path))
+
+    def warm_up(self) -> None:
+        """Run detection once on a blank frame so ONNX Runtime allocates its sessions before real work."""
+        self.detect(_DecodedImage(pixels=self._np.zeros((self.det_size[1], self.det_size[0], 3), dtype=self._np.uint8)))
+
+
+@dataclass(frozen=True)
+class FaceMatch:
+    cluster_id: str | None
+    score: float
+    runner_up_id: str | None
+    runner_up_score: float | None
+
+    @property
+    def margin(self) -> float | None:
+        """Lead of the best match over the runner-up; small values mean an ambiguous face."""
+        if self.runner_up_score is None:
+            return None
+        return self.score - self.runner_up_score
 
 
 @dataclass(frozen=True)
 class _FaceIndexSnapshot:
     index_dir: Path
-    meta_mtime: float | None
-    embeddings_mtime: float | None
+    # What the snapshot was built from; a different key means the files changed.
+    source_key: tuple[Any, ...]
     clusters: dict[str, dict[str, Any]]
-    centers: dict[str, Any]
+    # Row i of ``center_matrix`` is the unit-length centre of ``cluster_ids[i]``;
+    # a contiguous float32 (clusters x dims) array, so matching is one matrix multiply.
+    cluster_ids: tuple[str, ...]
+    center_matrix: Any
+    # IVF index over ``center_matrix`` when the store has one built.
+    ann: Any = None
+
+    def uses_ann(self) -> bool:
+        return self.ann is not None and len(self.cluster_ids) >= config.FACE_RECOGNITION_ANN_MIN_CLUSTERS
+
+    def match(self, features: Any, *, top_k: int = MATCH_TOP_K) -> list[FaceMatch]:
+        """Best ``top_k`` clusters for each row of ``features`` (faces x dims, unit length).
+
+        Large galleries with an IVF index are searched approximately, see ``face_ann_index``.
+        """
+        np = _numpy()
+        features = np.asarray(features, dtype=np.float32)
+        if features.ndim == 1:
+            features = features.reshape(1, -1)
+        if not len(features):
+            return []
+        if not self.cluster_ids:
+            return [FaceMatch(None, -1.0, None, None) for _face in features]
+
+        if self.uses_ann():
+            ranked, ranked_scores = self.ann.search(
+                features, self.center_matrix, top_k=top_k, nprobe=config.FACE_RECOGNITION_ANN_NPROBE
+            )
+        else:
+            ranked, ranked_scores = exact_top_k(features, self.center_matrix, top_k)
+
+        matches: list[FaceMatch] = []
+        for row, row_scores in zip(ranked.tolist(), ranked_scores.tolist()):
+            # The IVF search pads with -1 when the probed lists held fewer than ``top_k`` centres.
+            found = [(self.cluster_ids[index], float(score)) for index, score in zip(row, row_scores) if index >= 0]
+            best_id, best_score = found[0] if found else (None, -1.0)
+            runner_up_id, runner_up_score = found[1] if len(found) > 1 else (None, None)
+            matches.append(FaceMatch(best_id, best_score, runner_up_id, runner_up_score))
+        return matches
 
     def format_person_info(self, cluster_id: str | None) -> dict[str, Any] | None:
         if not cluster_id:
@@ -202,7 +368,37 @@ def _get_runtime() -> _InsightFaceRuntime:
         return runtime
 
 
+def _index_source_key(index_dir: Path) -> tuple[Any, ...]:
+    store_key = manifest_key(get_store_dir(index_dir))
+    if store_key is not None:
+        return ("store", *store_key)
+    return ("legacy", _path_mtime(index_dir / "meta.json"), _path_mtime(index_dir / "embeddings.pkl"))
+
+
+def _open_store_snapshot(index_dir: Path) -> _FaceIndexSnapshot | None:
+    try:
+        store_key = manifest_key(get_store_dir(index_dir))
+        data = open_face_index(get_store_dir(index_dir))
+    except FaceIndexStoreError as exc:
+        raise LocalFaceRecognitionError(str(exc)) from exc
+    if data is None:
+        return None
+    return _FaceIndexSnapshot(
+        index_dir=index_dir,
+        source_key=("store", *store_key) if store_key else ("store",),
+        clusters=data.clusters,
+        cluster_ids=data.cluster_ids,
+        center_matrix=data.center_matrix,
+        ann=data.ann,
+    )
+
+
 def _build_index_snapshot(index_dir: Path) -> _FaceIndexSnapshot:
+    """Map the converted store if there is one, else rebuild the centres from the legacy pickle."""
+    store_snapshot = _open_store_snapshot(index_dir)
+    if store_snapshot is not None:
+        return store_snapshot
+
     meta_path = index_dir / "meta.json"
     embeddings_path = index_dir / "embeddings.pkl"
 
@@ -225,7 +421,9 @@ def _build_index_snapshot(index_dir: Path) -> _FaceIndexSnapshot:
 
     raw_clusters = metadata.get("clusters")
     clusters = raw_clusters if isinstance(raw_clusters, dict) else {}
-    centers: dict[str, Any] = {}
+    np = _numpy()
+    cluster_ids: list[str] = []
+    centers: list[Any] = []
 
     for cluster_id, cluster in clusters.items():
         if not isinstance(cluster, dict):
@@ -237,22 +435,18 @@ def _build_index_snapshot(index_dir: Path) -> _FaceIndexSnapshot:
         if not vectors:
             continue
 
-        try:
-            import numpy as np
-        except ImportError as exc:
-            raise LocalFaceRecognitionError(
-                "numpy is required for local face recognition. Install backend/requirements.txt first."
-            ) from exc
+        cluster_ids.append(str(cluster_id))
+        centers.append(_normalize_vector(np.mean(vectors, axis=0)))
 
-        mean_vector = np.mean(vectors, axis=0)
-        centers[str(cluster_id)] = _normalize_vector(mean_vector)
+    dims = len(centers[0]) if centers else 0
+    center_matrix = np.ascontiguousarray(np.stack(centers) if centers else np.empty((0, dims)), dtype=np.float32)
 
     return _FaceIndexSnapshot(
         index_dir=index_dir,
-        meta_mtime=_path_mtime(meta_path),
-        embeddings_mtime=_path_mtime(embeddings_path),
+        source_key=("legacy", _path_mtime(meta_path), _path_mtime(embeddings_path)),
         clusters={str(key): value for key, value in clusters.items() if isinstance(value, dict)},
-        centers=centers,
+        cluster_ids=tuple(cluster_ids),
+        center_matrix=center_matrix,
     )
 
 
@@ -260,17 +454,13 @@ def _get_face_index(index_dir: str) -> _FaceIndexSnapshot:
     global _INDEX_CACHE
 
     resolved_index_dir = Path(index_dir).expanduser().resolve()
-    meta_path = resolved_index_dir / "meta.json"
-    embeddings_path = resolved_index_dir / "embeddings.pkl"
-    current_meta_mtime = _path_mtime(meta_path)
-    current_embeddings_mtime = _path_mtime(embeddings_path)
+    current_source_key = _index_source_key(resolved_index_dir)
 
     with _INDEX_LOCK:
         if (
             _INDEX_CACHE is not None
             and _INDEX_CACHE.index_dir == resolved_index_dir
-            and _INDEX_CACHE.meta_mtime == current_meta_mtime
-            and _INDEX_CACHE.embeddings_mtime == current_embeddings_mtime
+            and _INDEX_CACHE.source_key == current_source_key
         ):
             return _INDEX_CACHE
 
@@ -279,50 +469,30 @@ def _get_face_index(index_dir: str) -> _FaceIndexSnapshot:
         return snapshot
 
 
-def recognize_image_file_locally(
-    file_path: str,
-    *,
-    threshold: float | None = None,
-    request_id: str | None = None,
-) -> dict[str, Any]:
-    if not file_path or not os.path.exists(file_path):
-        raise LocalFaceRecognitionError(f"Recognition source file does not exist: {file_path}")
-
-    try:
-        import numpy as np
-    except ImportError as exc:
-        raise LocalFaceRecognitionError(
-            "numpy is required for local face recognition. Install backend/requirements.txt first."
-        ) from exc
-
-    runtime = _get_runtime()
-    face_index = _get_face_index(config.FACE_RECOGNITION_INDEX_DIR)
-    faces = runtime.analyze(file_path)
-    effective_threshold = float(
-        threshold if threshold is not None else config.FACE_RECOGNITION_THRESHOLD
-    )
-
-    results: list[dict[str, Any]] = []
+def _face_feature_matrix(faces: Sequence[Any], dims: int):
+    np = _numpy()
+    features = np.zeros((len(faces), dims), dtype=np.float32)
     for index, face in enumerate(faces):
         embedding = getattr(face, "normed_embedding", None)
         if embedding is None:
             embedding = getattr(face, "embedding", None)
+        if embedding is not None:
+            features[index] = _normalize_vector(embedding)
+    return features
 
-        if embedding is None:
-            feature = np.zeros((512,), dtype=np.float32)
-        else:
-            feature = _normalize_vector(embedding)
-
-        best_score = -1.0
-        best_cluster_id: str | None = None
-        for cluster_id, center in face_index.centers.items():
-            score = float(np.dot(feature, center))
-            if score > best_score:
-                best_score = score
-                best_cluster_id = cluster_id
-
-        recognized = bool(best_cluster_id) and best_score >= effective_threshold
-        person_info = face_index.format_person_info(best_cluster_id) if recognized else None
+
+def _local_payload(
+    file_path: str,
+    request_id: str | None,
+    faces: Sequence[Any],
+    matches: Sequence[FaceMatch],
+    face_index: _FaceIndexSnapshot,
+    threshold: float,
+) -> dict[str, Any]:
+    results: list[dict[str, Any]] = []
+    for index, (face, match) in enumerate(zip(faces, matches)):
+        recognized = bool(match.cluster_id) and match.score >= threshold
+        person_info = face_index.format_person_info(match.cluster_id) if recognized else None
         results.append(
             {
                 "face_index": index,
@@ -330,8 +500,11 @@ def recognize_image_file_locally(
                 "landmarks": _as_landmarks(getattr(face, "kps", None)),
                 "recognized": recognized,
                 "person_info": person_info,
-                "score": float(best_score),
-                "confidence": _confidence_from_score(best_score),
+                "score": match.score,
+                "confidence": _confidence_from_score(match.score),
+                "runner_up_id": match.runner_up_id,
+                "runner_up_score": match.runner_up_score,
+                "margin": match.margin,
             }
         )
 
@@ -343,3 +516,97 @@ def recognize_image_file_locally(
         "count": len(results),
         "results": results,
     }
+
+
+def recognize_image_files_locally(
+    file_paths: Sequence[str],
+    *,
+    threshold: float | None = None,
+    request_ids: Sequence[str | None] | None = None,
+    decode_workers: int | None = None,
+) -> list[dict[str, Any] | LocalFaceRecognitionError]:
+    """Recognise several images with one runtime, returning a payload or an error per image.
+
+    Up to ``decode_workers`` images are decoded ahead in threads while the
+    previous one is in detection, and the faces of all images are matched
+    against the index in a single call. Errors that concern the runtime or
+    the index rather than one image are raised.
+    """
+    np = _numpy()
+    runtime = _get_runtime()
+    face_index = _get_face_index(config.FACE_RECOGNITION_INDEX_DIR)
+    effective_threshold = float(threshold if threshold is not None else config.FACE_RECOGNITION_THRESHOLD)
+    request_ids = list(request_ids) if request_ids is not None else [None] * len(file_paths)
+    workers = max(1, min(decode_workers or config.FACE_RECOGNITION_DECODE_WORKERS, len(file_paths) or 1))
+
+    def decode(file_path: str) -> Any:
+        if not file_path or not os.path.exists(file_path):
+            raise LocalFaceRecognitionError(f"Recognition source file does not exist: {file_path}")
+        return runtime.decode(file_path)
+
+    detected: list[list[Any] | LocalFaceRecognitionError] = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="face-decode") as executor:
+        # Bounded look-ahead: at most ``workers`` decoded images are held at once.
+        pending: deque = deque()
+        upcoming = iter(file_paths)
+        for file_path in upcoming:
+            pending.append(executor.submit(decode, file_path))
+            if len(pending) >= workers:
+                break
+        while pending:
+            future = pending.popleft()
+            next_path = next(upcoming, None)
+            if next_path is not None:
+                pending.append(executor.submit(decode, next_path))
+            try:
+                detected.append(runtime.detect(future.result()))
+            except LocalFaceRecognitionError as exc:
+                detected.append(exc)
+
+    dims = face_index.center_matrix.shape[1] or 512
+    face_lists = [faces for faces in detected if not isinstance(faces, LocalFaceRecognitionError)]
+    all_features = (
+        np.concatenate([_face_feature_matrix(faces, dims) for faces in face_lists])
+        if face_lists
+        else np.zeros((0, dims), dtype=np.float32)
+    )
+    all_matches = face_index.match(all_features)
+
+    results: list[dict[str, Any] | LocalFaceRecognitionError] = []
+    offset = 0
+    for file_path, request_id, faces in zip(file_paths, request_ids, detected):
+        if isinstance(faces, LocalFaceRecognitionError):
+            results.append(faces)
+            continue
+        matches = all_matches[offset : offset + len(faces)]
+        offset += len(faces)
+        results.append(_local_payload(file_path, request_id, faces, matches, face_index, effective_threshold))
+    return results
+
+
+def recognize_image_file_locally(
+    file_path: str,
+    *,
+    threshold: float | None = None,
+    request_id: str | None = None,
+) -> dict[str, Any]:
+    if not file_path or not os.path.exists(file_path):
+        raise LocalFaceRecognitionError(f"Recognition source file does not exist: {file_path}")
+
+    [result] = recognize_image_files_locally([file_path], threshold=threshold, request_ids=[request_id], decode_workers=1)
+    if isinstance(result, LocalFaceRecognitionError):
+        raise result
+    return result
+
+
+def warm_up_local_face_recognition() -> bool:
+    """Load the models and the face index and run one blank detection; returns whether it worked."""
+    if (config.FACE_RECOGNITION_PROVIDER or "local").strip().lower() not in {"local", "auto"}:
+        return False
+    try:
+        _get_runtime().warm_up()
+        _get_face_index(config.FACE_RECOGNITION_INDEX_DIR)
+    except LocalFaceRecognitionError as exc:
+        print(f"Face recognition warm-up skipped: {exc}")
+        return False
+    return True
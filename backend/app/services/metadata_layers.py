@@ -424,6 +424,7 @@ def build_metadata_layers(
     metadata: Mapping[str, Any] | None = None,
     source_metadata: Mapping[str, Any] | None = None,
     profile_hint: str | None = None,
+    copy_raw_metadata: bool = True,
 ) -> dict[str, Any]:
     source = _as_dict(metadata)
     layered = _is_layered_metadata(source)
@@ -495,7 +496,10 @@ def build_metadata_layers(
         "fields": profile_fields,
     }
 
-    raw_metadata = deepcopy(source_metadata if source_metadata is not None else raw_base or fallback)
+    raw_metadata = source_metadata if source_metadata is not None else raw_base or fallback
+    # Read-only callers may share the (possibly large) raw dump with ``metadata``.
+    if copy_raw_metadata:
+        raw_metadata = deepcopy(raw_metadata)
 
     return {
         "schema_version": METADATA_SCHEMA_VERSION,
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import glob
+import os
+import re
+import time
+from dataclasses import asdict, dataclass
+
+from sqlalchemy.orm import Session
+
+from .. import config
+from ..models import Asset
+from .preview_images import PREVIEW_DIR_NAME, PREVIEW_FILE_SUFFIX, get_preview_source_fingerprint
+
+# asset-{id}[-{mtime_ns}-{size}][-{N}px].preview.jpg
+PREVIEW_FILE_PATTERN = re.compile(
+    rf"asset-(?P<asset_id>\d+)(?:-(?P<fingerprint>\d+-\d+))?(?:-(?P<rung>\d+)px)?{re.escape(PREVIEW_FILE_SUFFIX)}"
+)
+PREVIEW_EVICTION_TARGET_RATIO = 0.9
+ABANDONED_FILE_AGE_SECONDS = 60 * 60
+ASSET_QUERY_CHUNK_SIZE = 500
+
+
+@dataclass(frozen=True)
+class PreviewCacheEntry:
+    path: str
+    asset_id: int
+    fingerprint: str | None
+    size_bytes: int
+    last_used: float
+
+
+@dataclass
+class PreviewGCReport:
+    scanned_files: int = 0
+    scanned_bytes: int = 0
+    removed_stale: int = 0
+    removed_orphaned: int = 0
+    removed_lru: int = 0
+    removed_abandoned: int = 0
+    reclaimed_bytes: int = 0
+    remaining_bytes: int = 0
+    budget_bytes: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+def get_preview_cache_dir() -> str:
+    return os.path.join(config.UPLOAD_DIR, PREVIEW_DIR_NAME)
+
+
+def scan_preview_cache(root_dir: str) -> tuple[list[PreviewCacheEntry], list[tuple[str, int, float]]]:
+    """Split the preview directory into recognised previews and leftover temp/lock files."""
+    entries: list[PreviewCacheEntry] = []
+    leftovers: list[tuple[str, int, float]] = []
+    try:
+        names = os.listdir(root_dir)
+    except FileNotFoundError:
+        return entries, leftovers
+
+    for name in names:
+        path = os.path.join(root_dir, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        match = PREVIEW_FILE_PATTERN.fullmatch(name)
+        if match:
+            entries.append(
+                PreviewCacheEntry(
+                    path=path,
+                    asset_id=int(match.group("asset_id")),
+                    fingerprint=match.group("fingerprint"),
+                    size_bytes=stat.st_size,
+                    last_used=stat.st_mtime,
+                )
+            )
+        elif name.endswith((".tmp.jpg", ".lock")):
+            leftovers.append((path, stat.st_size, stat.st_mtime))
+    return entries, leftovers
+
+
+def list_asset_preview_paths(asset_id: int) -> list[str]:
+    """Every preview file on disk for one asset, whatever fingerprint or rung it was rendered for."""
+    root_dir = get_preview_cache_dir()
+    paths = glob.glob(os.path.join(glob.escape(root_dir), f"asset-{int(asset_id)}-*{PREVIEW_FILE_SUFFIX}"))
+    paths.append(os.path.join(root_dir, f"asset-{int(asset_id)}{PREVIEW_FILE_SUFFIX}"))
+    return [path for path in paths if PREVIEW_FILE_PATTERN.fullmatch(os.path.basename(path)) and os.path.exists(path)]
+
+
+def _current_fingerprints(db: Session, asset_ids: set[int]) -> dict[int, str | None]:
+    fingerprints: dict[int, str | None] = {}
+    ordered_ids = sorted(asset_ids)
+    for start in range(0, len(ordered_ids), ASSET_QUERY_CHUNK_SIZE):
+        chunk = ordered_ids[start : start + ASSET_QUERY_CHUNK_SIZE]
+        for asset in db.query(Asset).filter(Asset.id.in_(chunk)).all():
+            fingerprints[asset.id] = get_preview_source_fingerprint(asset)
+    return fingerprints
+
+
+def _remove(path: str) -> bool:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return False
+    except OSError as exc:
+        print(f"Preview cache: could not remove {path}: {exc}")
+        return False
+    return True
+
+
+def collect_preview_garbage(
+    db: Session,
+    *,
+    budget_bytes: int | None = None,
+    min_age_seconds: float | None = None,
+    now: float | None = None,
+) -> PreviewGCReport:
+    """Drop previews of replaced sources and deleted assets, then trim LRU files to the budget.
+
+    Files younger than ``min_age_seconds`` are never touched, so a preview that
+    was just resolved for an in-flight response cannot vanish before it is sent.
+    """
+    now = time.time() if now is None else now
+    budget_bytes = config.PREVIEW_CACHE_MAX_BYTES if budget_bytes is None else budget_bytes
+    min_age_seconds = config.PREVIEW_CACHE_MIN_AGE_SECONDS if min_age_seconds is None else min_age_seconds
+    report = PreviewGCReport(budget_bytes=budget_bytes)
+
+    entries, leftovers = scan_preview_cache(get_preview_cache_dir())
+    report.scanned_files = len(entries)
+    report.scanned_bytes = sum(entry.size_bytes for entry in entries)
+
+    for path, size_bytes, modified_at in leftovers:
+        if now - modified_at >= ABANDONED_FILE_AGE_SECONDS and _remove(path):
+            report.removed_abandoned += 1
+            report.reclaimed_bytes += size_bytes
+
+    current = _current_fingerprints(db, {entry.asset_id for entry in entries})
+    survivors: list[PreviewCacheEntry] = []
+    for entry in entries:
+        if now - entry.last_used < min_age_seconds:
+            survivors.append(entry)
+            continue
+        if entry.asset_id not in current or current[entry.asset_id] is None:
+            if _remove(entry.path):
+                report.removed_orphaned += 1
+                report.reclaimed_bytes += entry.size_bytes
+            continue
+        if entry.fingerprint != current[entry.asset_id]:
+            if _remove(entry.path):
+                report.removed_stale += 1
+                report.reclaimed_bytes += entry.size_bytes
+            continue
+        survivors.append(entry)
+
+    remaining_bytes = sum(entry.size_bytes for entry in survivors)
+    if budget_bytes > 0 and remaining_bytes > budget_bytes:
+        target_bytes = int(budget_bytes * PREVIEW_EVICTION_TARGET_RATIO)
+        for entry in sorted(survivors, key=lambda item: item.last_used):
+            if remaining_bytes <= target_bytes:
+                break
+            if now - entry.last_used < min_age_seconds:
+                continue
+            if _remove(entry.path):
+                report.removed_lru += 1
+                report.reclaimed_bytes += entry.size_bytes
+                remaining_bytes -= entry.size_bytes
+
+    report.remaining_bytes = remaining_bytes
+    return report
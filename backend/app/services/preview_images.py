@@ -1,18 +1,31 @@
 from __future__ import annotations
 
 import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import TYPE_CHECKING
 
-import pyvips
 from PIL import Image, ImageOps
+from sqlalchemy.orm.attributes import flag_modified
 
 from .. import config
 from ..models import Asset
-from .metadata_layers import get_iiif_access_file_path, get_original_file_path
+from .iiif_access import build_asset_layers, get_asset_layer_view
+from .single_flight import SingleFlight, cross_process_lock, record_single_flight_event
+
+if TYPE_CHECKING:
+    import pyvips
 
 PREVIEW_DIR_NAME = "previews"
 PREVIEW_FILE_SUFFIX = ".preview.jpg"
 PREVIEW_MAX_WIDTH = 1600
 PREVIEW_JPEG_QUALITY = 82
+# Cached previews have their mtime bumped on use, at most this often, so the
+# garbage collector can treat mtime as a last-used timestamp.
+PREVIEW_TOUCH_INTERVAL_SECONDS = 60 * 60
+
+_PREVIEW_FLIGHT = SingleFlight("preview")
 
 
 def _source_fingerprint(source_path: str) -> str:
@@ -27,9 +40,28 @@ def get_preview_image_path(asset: Asset, source_path: str | None = None) -> str:
     return os.path.join(base_dir, f"asset-{asset.id}{PREVIEW_FILE_SUFFIX}")
 
 
+def get_preview_rendition_path(asset: Asset, source_path: str, size: int) -> str:
+    base_dir = os.path.join(config.UPLOAD_DIR, PREVIEW_DIR_NAME)
+    return os.path.join(
+        base_dir,
+        f"asset-{asset.id}-{_source_fingerprint(source_path)}-{int(size)}px{PREVIEW_FILE_SUFFIX}",
+    )
+
+
+def select_preview_ladder_size(requested_size: int) -> int:
+    """Smallest configured rendition that covers the requested size."""
+    sizes = sorted(config.PREVIEW_LADDER_SIZES)
+    for size in sizes:
+        if size >= requested_size:
+            return size
+    return sizes[-1]
+
+
 def _get_preview_source_path(asset: Asset) -> str | None:
-    iiif_access_file_path = get_iiif_access_file_path(asset.metadata_info)
-    if iiif_access_file_path and os.path.exists(iiif_access_file_path):
+    layer_view = get_asset_layer_view(asset)
+    # The stored derivative only; ``layer_view.iiif_access_file_path`` would default to the upload itself.
+    iiif_access_file_path = layer_view.technical.get("iiif_access_file_path")
+    if isinstance(iiif_access_file_path, str) and iiif_access_file_path and os.path.exists(iiif_access_file_path):
         return iiif_access_file_path
 
     metadata = asset.metadata_info if isinstance(asset.metadata_info, dict) else {}
@@ -39,7 +71,7 @@ def _get_preview_source_path(asset: Asset) -> str | None:
         if isinstance(preview_file_path, str) and preview_file_path and os.path.exists(preview_file_path):
             return preview_file_path
 
-    original_file_path = get_original_file_path(asset.metadata_info)
+    original_file_path = layer_view.original_file_path
     if original_file_path and os.path.exists(original_file_path):
         return original_file_path
 
@@ -49,7 +81,25 @@ def _get_preview_source_path(asset: Asset) -> str | None:
     return None
 
 
+def get_preview_source_fingerprint(asset: Asset) -> str | None:
+    """Fingerprint embedded in the names of the asset's current previews, if it has a source."""
+    source_path = _get_preview_source_path(asset)
+    if not source_path:
+        return None
+    return _source_fingerprint(source_path)
+
+
+def _mark_used(path: str) -> None:
+    try:
+        if time.time() - os.stat(path).st_mtime >= PREVIEW_TOUCH_INTERVAL_SECONDS:
+            os.utime(path)
+    except OSError:
+        pass
+
+
 def _generate_preview_with_pyvips(source_path: str, preview_path: str) -> None:
+    import pyvips
+
     image = pyvips.Image.new_from_file(source_path, access="sequential")
     width = max(int(image.width or 0), 1)
     scale = min(1.0, PREVIEW_MAX_WIDTH / width)
@@ -82,6 +132,33 @@ def _generate_preview_with_pillow(source_path: str, preview_path: str) -> None:
         image.save(preview_path, format="JPEG", quality=PREVIEW_JPEG_QUALITY, optimize=True, progressive=True)
 
 
+def _generate_preview(source_path: str, preview_path: str) -> str | None:
+    os.makedirs(os.path.dirname(preview_path), exist_ok=True)
+    with cross_process_lock(f"{preview_path}.lock") or nullcontext():
+        if os.path.exists(preview_path):
+            record_single_flight_event(_PREVIEW_FLIGHT.namespace, "cross_process_hits")
+            return preview_path
+
+        # Render next to the target and rename, so readers never see a partial JPEG.
+        temp_path = os.path.join(
+            os.path.dirname(preview_path),
+            f".{os.path.basename(preview_path)}.{os.getpid()}-{threading.get_ident()}.tmp.jpg",
+        )
+        try:
+            try:
+                _generate_preview_with_pyvips(source_path, temp_path)
+            except Exception:
+                _generate_preview_with_pillow(source_path, temp_path)
+            os.replace(temp_path, preview_path)
+        except Exception:
+            return None
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    return preview_path if os.path.exists(preview_path) else None
+
+
 def ensure_preview_image(asset: Asset) -> str | None:
     source_path = _get_preview_source_path(asset)
     if not source_path:
@@ -89,16 +166,134 @@ def ensure_preview_image(asset: Asset) -> str | None:
 
     preview_path = get_preview_image_path(asset, source_path)
     if os.path.exists(preview_path):
+        _mark_used(preview_path)
         return preview_path
 
-    os.makedirs(os.path.dirname(preview_path), exist_ok=True)
+    preview, _is_leader = _PREVIEW_FLIGHT.do(preview_path, lambda: _generate_preview(source_path, preview_path))
+    return preview
+
+
+def _temp_path_for(target_path: str) -> str:
+    return os.path.join(
+        os.path.dirname(target_path),
+        f".{os.path.basename(target_path)}.{os.getpid()}-{threading.get_ident()}.tmp.jpg",
+    )
 
+
+def _save_rendition(image: pyvips.Image, target_path: str) -> None:
+    if image.hasalpha():
+        image = image.flatten(background=[255, 255, 255])
+    temp_path = _temp_path_for(target_path)
     try:
-        _generate_preview_with_pyvips(source_path, preview_path)
-    except Exception:
+        image.jpegsave(temp_path, Q=PREVIEW_JPEG_QUALITY, strip=True, optimize_coding=True, interlace=True)
+        os.replace(temp_path, target_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _load_ladder_base(source_path: str, size: int) -> pyvips.Image:
+    import pyvips
+
+    # thumbnail() shrinks on load: it opens the smallest pyramid page (or JPEG
+    # shrink factor) that still covers ``size`` instead of decoding full resolution.
+    image = pyvips.Image.thumbnail(source_path, size, height=size, size="down")
+    if image.interpretation not in {"srgb", "b-w"}:
+        image = image.colourspace("srgb")
+    return image.copy_memory()
+
+
+def _generate_rendition(source_path: str, rendition_path: str, size: int) -> str | None:
+    os.makedirs(os.path.dirname(rendition_path), exist_ok=True)
+    with cross_process_lock(f"{rendition_path}.lock") or nullcontext():
+        if os.path.exists(rendition_path):
+            record_single_flight_event(_PREVIEW_FLIGHT.namespace, "cross_process_hits")
+            return rendition_path
         try:
-            _generate_preview_with_pillow(source_path, preview_path)
+            _save_rendition(_load_ladder_base(source_path, size), rendition_path)
         except Exception:
             return None
+    return rendition_path if os.path.exists(rendition_path) else None
+
+
+def ensure_preview_rendition(asset: Asset, size: int) -> str | None:
+    """Serve one ladder rung, rendering just that rung if the ladder task has not run yet."""
+    source_path = _get_preview_source_path(asset)
+    if not source_path:
+        return None
+
+    size = select_preview_ladder_size(size)
+    rendition_path = get_preview_rendition_path(asset, source_path, size)
+    if os.path.exists(rendition_path):
+        _mark_used(rendition_path)
+        return rendition_path
+
+    rendition, _is_leader = _PREVIEW_FLIGHT.do(
+        rendition_path,
+        lambda: _generate_rendition(source_path, rendition_path, size),
+    )
+    return rendition
+
+
+def render_preview_ladder(asset: Asset) -> dict | None:
+    """Render every configured rung from one shrink-on-load decode and describe the result.
+
+    The largest rung is read from the source; smaller rungs are derived from it
+    in memory, so the whole ladder costs a single reduced-resolution decode.
+    """
+    source_path = _get_preview_source_path(asset)
+    if not source_path:
+        return None
+
+    import pyvips
+
+    sizes = sorted(set(config.PREVIEW_LADDER_SIZES), reverse=True)
+    base: pyvips.Image | None = None
+    renditions: list[dict] = []
+    for size in sizes:
+        rendition_path = get_preview_rendition_path(asset, source_path, size)
+        if os.path.exists(rendition_path):
+            rendition = pyvips.Image.new_from_file(rendition_path)
+        else:
+            if base is None:
+                base = _load_ladder_base(source_path, sizes[0])
+            rendition = base if size >= max(base.width, base.height) else base.thumbnail_image(
+                size, height=size, size="down"
+            )
+            os.makedirs(os.path.dirname(rendition_path), exist_ok=True)
+            _save_rendition(rendition, rendition_path)
+        renditions.append(
+            {
+                "size": size,
+                "path": rendition_path,
+                "width": int(rendition.width),
+                "height": int(rendition.height),
+                "file_size": os.path.getsize(rendition_path),
+            }
+        )
+
+    return {
+        "source_path": source_path,
+        "source_fingerprint": _source_fingerprint(source_path),
+        "mime_type": "image/jpeg",
+        "renditions": sorted(renditions, key=lambda item: item["size"]),
+    }
+
+
+def record_preview_ladder(asset: Asset, ladder: dict) -> None:
+    layers = build_asset_layers(asset)
+    layers["technical"]["preview_ladder"] = ladder
+    asset.metadata_info = layers
+    flag_modified(asset, "metadata_info")
+
+
+def get_preview_ladder_paths(asset: Asset) -> list[str]:
+    ladder = get_asset_layer_view(asset).technical.get("preview_ladder")
+    if not isinstance(ladder, dict):
+        return []
+    return [
+        str(rendition["path"])
+        for rendition in ladder.get("renditions") or []
+        if isinstance(rendition, dict) and rendition.get("path")
+    ]
 
-    return preview_path if os.path.exists(preview_path) else None
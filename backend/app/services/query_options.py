@@ -0,0 +1,58 @@
+"""
+Relationship loading for list and detail endpoints.
+
+Serialisers walk relationships row by row; left to the default lazy loading
+every hop is one more query per row. Each endpoint queries with the options
+below instead, so its statement count stays flat in the number of rows:
+collections and reverse one-to-ones use ``selectinload`` (one extra
+``IN (...)`` query per relationship), many-to-ones use ``joinedload``.
+tests/test_query_budgets.py holds every endpoint to its budget.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy.orm import joinedload, selectinload
+
+from ..models import Application, ApplicationItem, ImageIngestSheet, ImageRecord, ThreeDAsset
+
+# ``_serialize_image_record``: the bound asset and the three user names.
+IMAGE_RECORD_SUMMARY_OPTIONS = (
+    selectinload(ImageRecord.asset),
+    joinedload(ImageRecord.created_by_user),
+    joinedload(ImageRecord.submitted_by_user),
+    joinedload(ImageRecord.assigned_photographer_user),
+)
+
+# Visibility checks of photographers also follow the record to its sheet's assignee.
+IMAGE_RECORD_LIST_OPTIONS = (
+    *IMAGE_RECORD_SUMMARY_OPTIONS,
+    joinedload(ImageRecord.sheet).joinedload(ImageIngestSheet.assigned_photographer_user),
+)
+
+# ``_serialize_sheet_summary`` counts items by status; visibility reads item assignees.
+IMAGE_INGEST_SHEET_LIST_OPTIONS = (
+    joinedload(ImageIngestSheet.assigned_photographer_user),
+    selectinload(ImageIngestSheet.items).joinedload(ImageRecord.assigned_photographer_user),
+)
+
+# ``_serialize_sheet_detail`` additionally serialises every visible item.
+IMAGE_INGEST_SHEET_DETAIL_OPTIONS = (
+    joinedload(ImageIngestSheet.assigned_photographer_user),
+    selectinload(ImageIngestSheet.items).selectinload(ImageRecord.asset),
+    selectinload(ImageIngestSheet.items).joinedload(ImageRecord.created_by_user),
+    selectinload(ImageIngestSheet.items).joinedload(ImageRecord.submitted_by_user),
+    selectinload(ImageIngestSheet.items).joinedload(ImageRecord.assigned_photographer_user),
+)
+
+APPLICATION_LIST_OPTIONS = (selectinload(Application.items),)
+
+APPLICATION_DETAIL_OPTIONS = (selectinload(Application.items).joinedload(ApplicationItem.asset),)
+
+# ``_serialize_three_d_asset`` reads the collection object's number, name and unit.
+THREE_D_LIST_OPTIONS = (joinedload(ThreeDAsset.collection_object),)
+
+THREE_D_DETAIL_OPTIONS = (
+    joinedload(ThreeDAsset.collection_object),
+    selectinload(ThreeDAsset.files),
+    selectinload(ThreeDAsset.production_records),
+)
@@ -0,0 +1,365 @@
+from __future__ import annotations
+
+import asyncio
+import errno
+import hashlib
+import json
+import os
+import re
+import secrets
+import shutil
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.datastructures import UploadFile as StarletteUploadFile
+
+from .. import config
+from .ingest_pipeline import UPLOAD_CHUNK_SIZE, PersistedUploadFile, StreamedUpload, read_file_header
+
+RESUMABLE_DIR_NAME = "resumable-uploads"
+UPLOAD_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+SHA256_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+class ResumableUploadError(ValueError):
+    def __init__(self, status_code: int, detail: str, *, offset: int | None = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.offset = offset
+
+
+@dataclass
+class ResumableUploadSession:
+    upload_id: str
+    filename: str
+    length: int
+    content_type: str | None
+    owner: str | None
+    created_at: float
+    expected_sha256: str | None = None
+    sha256: str | None = None
+    offset: int = 0
+    last_activity: float = 0.0
+
+    @property
+    def complete(self) -> bool:
+        return self.offset == self.length and self.sha256 is not None
+
+    @property
+    def expires_at(self) -> float:
+        return self.last_activity + config.RESUMABLE_UPLOAD_TTL_SECONDS
+
+    def as_dict(self) -> dict:
+        return {
+            "upload_id": self.upload_id,
+            "filename": self.filename,
+            "length": self.length,
+            "offset": self.offset,
+            "content_type": self.content_type,
+            "complete": self.complete,
+            "sha256": self.sha256,
+            "expires_at": int(self.expires_at),
+        }
+
+
+def get_resumable_upload_dir() -> str:
+    return os.path.join(config.UPLOAD_DIR, RESUMABLE_DIR_NAME)
+
+
+def _meta_path(upload_id: str) -> str:
+    return os.path.join(get_resumable_upload_dir(), f"{upload_id}.json")
+
+
+def _data_path(upload_id: str) -> str:
+    return os.path.join(get_resumable_upload_dir(), f"{upload_id}.part")
+
+
+def _write_meta(session: ResumableUploadSession) -> None:
+    stored = asdict(session)
+    stored.pop("offset")
+    stored.pop("last_activity")
+    meta_path = _meta_path(session.upload_id)
+    temp_path = f"{meta_path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as handle:
+        json.dump(stored, handle)
+    os.replace(temp_path, meta_path)
+
+
+def _load_session(upload_id: str) -> ResumableUploadSession | None:
+    if not UPLOAD_ID_PATTERN.fullmatch(upload_id or ""):
+        return None
+    try:
+        with open(_meta_path(upload_id), encoding="utf-8") as handle:
+            stored = json.load(handle)
+        data_stat = os.stat(_data_path(upload_id))
+        meta_mtime = os.path.getmtime(_meta_path(upload_id))
+    except (OSError, ValueError):
+        return None
+    # The data file only ever grows by appending at its end, so its size is the offset.
+    return ResumableUploadSession(
+        **stored,
+        offset=data_stat.st_size,
+        last_activity=max(data_stat.st_mtime, meta_mtime),
+    )
+
+
+def _discard_session(upload_id: str) -> None:
+    _forget_hasher(upload_id)
+    for path in (_data_path(upload_id), _meta_path(upload_id)):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def create_resumable_upload(
+    *,
+    filename: str,
+    length: int,
+    content_type: str | None = None,
+    owner: str | None = None,
+    expected_sha256: str | None = None,
+) -> ResumableUploadSession:
+    filename = os.path.basename(filename or "").strip()
+    if not filename:
+        raise ResumableUploadError(400, "Upload filename is required")
+    if length <= 0:
+        raise ResumableUploadError(400, "Upload length must be positive")
+    if length > config.RESUMABLE_UPLOAD_MAX_BYTES:
+        raise ResumableUploadError(413, f"Upload exceeds the {config.RESUMABLE_UPLOAD_MAX_BYTES} byte limit")
+    if expected_sha256 is not None:
+        expected_sha256 = expected_sha256.strip().lower()
+        if not SHA256_PATTERN.fullmatch(expected_sha256):
+            raise ResumableUploadError(400, "Expected SHA256 must be 64 hex characters")
+
+    os.makedirs(get_resumable_upload_dir(), exist_ok=True)
+    now = time.time()
+    session = ResumableUploadSession(
+        upload_id=secrets.token_hex(16),
+        filename=filename,
+        length=int(length),
+        content_type=content_type,
+        owner=owner,
+        created_at=now,
+        expected_sha256=expected_sha256,
+        last_activity=now,
+    )
+    open(_data_path(session.upload_id), "xb").close()
+    _write_meta(session)
+    return session
+
+
+def get_resumable_upload(upload_id: str, *, owner: str | None = None) -> ResumableUploadSession:
+    session = _load_session(upload_id)
+    if session is None or session.expires_at < time.time():
+        raise ResumableUploadError(404, "Upload session not found or expired")
+    if owner is not None and session.owner is not None and session.owner != owner:
+        raise ResumableUploadError(403, "Upload session belongs to another user")
+    return session
+
+
+def cancel_resumable_upload(upload_id: str, *, owner: str | None = None) -> None:
+    get_resumable_upload(upload_id, owner=owner)
+    _discard_session(upload_id)
+
+
+# SHA-256 state cannot be serialised, so each process keeps the running hash of
+# the uploads it is receiving. A chunk that lands on a process without the
+# state (another API worker, or after a restart) re-hashes the bytes received
+# so far once and carries on incrementally from there.
+_HASHERS: dict[str, tuple[int, "hashlib._Hash"]] = {}
+_HASHERS_LOCK = threading.Lock()
+_UPLOAD_LOCKS: dict[str, asyncio.Lock] = {}
+
+
+def _forget_hasher(upload_id: str) -> None:
+    with _HASHERS_LOCK:
+        _HASHERS.pop(upload_id, None)
+
+
+def _hasher_at(upload_id: str, offset: int):
+    with _HASHERS_LOCK:
+        cached = _HASHERS.pop(upload_id, None)
+    if cached is not None and cached[0] == offset:
+        return cached[1]
+
+    digest = hashlib.sha256()
+    remaining = offset
+    with open(_data_path(upload_id), "rb") as handle:
+        while remaining > 0:
+            chunk = handle.read(min(UPLOAD_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest
+
+
+def _write_at(fd: int, digest, chunk: bytes, position: int) -> None:
+    view = memoryview(chunk)
+    while view:
+        written = os.pwrite(fd, view, position)
+        digest.update(view[:written])
+        view = view[written:]
+        position += written
+
+
+async def _append_locked(
+    upload_id: str,
+    offset: int,
+    chunks: AsyncIterator[bytes],
+    owner: str | None,
+) -> ResumableUploadSession:
+    session = get_resumable_upload(upload_id, owner=owner)
+    if offset != session.offset:
+        raise ResumableUploadError(409, "Upload-Offset does not match the received bytes", offset=session.offset)
+    if session.offset == session.length:
+        raise ResumableUploadError(409, "Upload is already complete", offset=session.offset)
+
+    digest = await run_in_threadpool(_hasher_at, upload_id, session.offset)
+    position = session.offset
+    fd = os.open(_data_path(upload_id), os.O_WRONLY)
+    try:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            if position + len(chunk) > session.length:
+                raise ResumableUploadError(413, "Chunk runs past the declared upload length", offset=position)
+            await run_in_threadpool(_write_at, fd, digest, chunk, position)
+            position += len(chunk)
+    finally:
+        os.close(fd)
+        # Whatever made it to disk is kept, so the client resumes from ``position``.
+        with _HASHERS_LOCK:
+            _HASHERS[upload_id] = (position, digest)
+
+    session.offset = position
+    session.last_activity = time.time()
+    if position == session.length:
+        _record_sha256(session, digest)
+    return session
+
+
+def _record_sha256(session: ResumableUploadSession, digest) -> None:
+    _forget_hasher(session.upload_id)
+    session.sha256 = digest.hexdigest()
+    if session.expected_sha256 and session.expected_sha256 != session.sha256:
+        _discard_session(session.upload_id)
+        raise ResumableUploadError(
+            400,
+            f"Fixity Check Failed! Client: {session.expected_sha256}, Server: {session.sha256}",
+        )
+    _write_meta(session)
+
+
+async def append_resumable_chunk(
+    upload_id: str,
+    offset: int,
+    chunks: AsyncIterator[bytes],
+    *,
+    owner: str | None = None,
+) -> ResumableUploadSession:
+    """Write a request body at ``offset`` and advance the running SHA-256 with it.
+
+    Chunks must arrive in order: ``offset`` has to equal the bytes received so
+    far, which is what HEAD reports after an interrupted transfer.
+    """
+    lock = _UPLOAD_LOCKS.setdefault(upload_id, asyncio.Lock())
+    if lock.locked():
+        raise ResumableUploadError(409, "Another chunk for this upload is still being written")
+    try:
+        async with lock:
+            return await _append_locked(upload_id, offset, chunks, owner)
+    finally:
+        if not lock.locked():
+            _UPLOAD_LOCKS.pop(upload_id, None)
+
+
+def finalize_resumable_upload(upload_id: str, *, owner: str | None = None) -> ResumableUploadSession:
+    session = get_resumable_upload(upload_id, owner=owner)
+    if session.offset == session.length and session.sha256 is None:
+        # The last chunk reached disk but the process died before its hash was
+        # saved; nothing more can be appended, so hash what was received.
+        _record_sha256(session, _hasher_at(upload_id, session.offset))
+    if not session.complete:
+        raise ResumableUploadError(409, "Upload is not complete yet", offset=session.offset)
+    return session
+
+
+class ResumableUploadFile(PersistedUploadFile):
+    """A completed resumable upload, handed to the regular upload handlers in place of a multipart file."""
+
+    def __init__(self, session: ResumableUploadSession):
+        super().__init__(
+            file=open(_data_path(session.upload_id), "rb"),
+            size=session.length,
+            filename=session.filename,
+            headers=Headers({"content-type": session.content_type or "application/octet-stream"}),
+        )
+        self.session = session
+
+    def persist(self, destination_path: str) -> StreamedUpload:
+        self.file.close()
+        source_path = _data_path(self.session.upload_id)
+        os.makedirs(os.path.dirname(destination_path) or ".", exist_ok=True)
+        try:
+            os.replace(source_path, destination_path)
+        except OSError as exc:
+            if exc.errno != errno.EXDEV:
+                raise
+            shutil.move(source_path, destination_path)
+        _discard_session(self.session.upload_id)
+        return StreamedUpload(
+            path=destination_path,
+            file_size=self.session.length,
+            sha256=str(self.session.sha256),
+            header=read_file_header(destination_path),
+        )
+
+
+def resolve_upload_file(
+    file: UploadFile | None,
+    upload_id: str | None,
+    *,
+    owner: str | None = None,
+) -> UploadFile:
+    """The multipart file of a request, or the completed resumable upload it names instead."""
+    if isinstance(upload_id, str) and upload_id:
+        return ResumableUploadFile(finalize_resumable_upload(upload_id, owner=owner))
+    if not isinstance(file, StarletteUploadFile):
+        raise ResumableUploadError(400, "Either a file or an upload_id is required")
+    return file
+
+
+def expire_resumable_uploads(*, now: float | None = None) -> int:
+    """Remove sessions idle for longer than ``RESUMABLE_UPLOAD_TTL_SECONDS``; returns how many."""
+    now = time.time() if now is None else now
+    try:
+        names = os.listdir(get_resumable_upload_dir())
+    except FileNotFoundError:
+        return 0
+
+    upload_ids = {name.split(".", 1)[0] for name in names if UPLOAD_ID_PATTERN.fullmatch(name.split(".", 1)[0])}
+    expired = 0
+    for upload_id in upload_ids:
+        session = _load_session(upload_id)
+        if session is not None and session.expires_at >= now:
+            continue
+        if session is None:
+            # Half-created or half-consumed sessions: judge them by whatever file is left.
+            mtimes = [
+                os.path.getmtime(path)
+                for path in (_data_path(upload_id), _meta_path(upload_id))
+                if os.path.exists(path)
+            ]
+            if mtimes and max(mtimes) + config.RESUMABLE_UPLOAD_TTL_SECONDS >= now:
+                continue
+        _discard_session(upload_id)
+        expired += 1
+    return expired
@@ -0,0 +1,251 @@
+"""
+Text search over assets and image records.
+
+Both tables carry a lower-cased ``search_text`` column, rebuilt by the
+``before_flush`` hook in ``models`` whenever a row is written. On top of it:
+
+* PostgreSQL: a GIN index on ``to_tsvector('simple', search_text)`` for word
+  matches and ranking, plus a ``pg_trgm`` GIN index so substring matches
+  (CJK titles, object numbers such as ``故宫00123``) do not scan the table.
+* SQLite: an external-content FTS5 table with the trigram tokenizer, kept in
+  step with the base table by triggers.
+
+A row matches when the query occurs anywhere in its search text, as the old
+in-Python substring checks did, or when it contains all of the query's
+words in any order. PostgreSQL matches those words as whole words, SQLite
+as substrings.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Iterable, Mapping
+
+from sqlalchemy import Float, Integer, and_, cast, func, inspect, literal, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Query
+from sqlalchemy.sql.elements import ColumnElement
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TEXT_TABLES = ("assets", "image_records")
+TS_CONFIG = "simple"
+# The trigram tokenizer cannot match anything shorter than one trigram.
+FTS_MIN_QUERY_LENGTH = 3
+
+_SQLITE_FTS_TABLES: dict[str, bool] = {}
+
+
+def _flatten(value: Any) -> Iterable[str]:
+    if value in (None, ""):
+        return
+    if isinstance(value, Mapping):
+        for item in value.values():
+            yield from _flatten(item)
+        return
+    if isinstance(value, (list, tuple, set)):
+        for item in value:
+            yield from _flatten(item)
+        return
+    yield str(value)
+
+
+def build_search_text(values: Iterable[Any]) -> str:
+    return " ".join(token for value in values for token in _flatten(value)).lower()
+
+
+def build_asset_search_text(asset, layers: dict[str, Any]) -> str:
+    """What ``/platform/resources?q=`` searches: file fields plus every metadata layer value.
+
+    The id is not included because new rows have none yet when this runs;
+    callers match ids with ``extra_clause`` instead.
+    """
+    core = layers.get("core") or {}
+    return build_search_text(
+        [
+            asset.filename,
+            asset.file_path,
+            asset.mime_type,
+            core.get("title"),
+            core.get("resource_type"),
+            core.get("resource_type_label"),
+            core.get("profile_label"),
+            layers.get("management"),
+            layers.get("technical"),
+            (layers.get("profile") or {}).get("fields"),
+            layers.get("raw_metadata"),
+        ]
+    )
+
+
+def build_image_record_search_text(record) -> str:
+    metadata = record.metadata_info if isinstance(record.metadata_info, dict) else {}
+    management = metadata.get("management") if isinstance(metadata.get("management"), dict) else {}
+    profile = metadata.get("profile") if isinstance(metadata.get("profile"), dict) else {}
+    profile_fields = profile.get("fields") if isinstance(profile.get("fields"), dict) else {}
+    return build_search_text(
+        [
+            record.record_no,
+            record.title,
+            management.get("project_name"),
+            management.get("image_name"),
+            profile_fields.get("object_number"),
+        ]
+    )
+
+
+def _ensure_search_text_columns(engine: Engine) -> None:
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in SEARCH_TEXT_TABLES:
+            if "search_text" not in {column["name"] for column in inspector.get_columns(table)}:
+                connection.execute(text(f"ALTER TABLE {table} ADD COLUMN search_text TEXT"))
+
+
+def _ensure_postgres_indexes(engine: Engine) -> None:
+    with engine.begin() as connection:
+        for table in SEARCH_TEXT_TABLES:
+            connection.execute(
+                text(
+                    f"CREATE INDEX IF NOT EXISTS ix_{table}_search_tsv ON {table} "
+                    f"USING GIN (to_tsvector('{TS_CONFIG}', coalesce(search_text, '')))"
+                )
+            )
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            for table in SEARCH_TEXT_TABLES:
+                connection.execute(
+                    text(
+                        f"CREATE INDEX IF NOT EXISTS ix_{table}_search_trgm ON {table} "
+                        "USING GIN (search_text gin_trgm_ops)"
+                    )
+                )
+    except DBAPIError as exc:
+        logger.warning(f"pg_trgm unavailable, substring search will scan: {exc}")
+
+
+def _ensure_sqlite_fts(engine: Engine) -> None:
+    with engine.begin() as connection:
+        for table in SEARCH_TEXT_TABLES:
+            fts_table = f"{table}_fts"
+            exists = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": fts_table},
+            ).first()
+            if exists:
+                continue
+            connection.execute(
+                text(
+                    f"CREATE VIRTUAL TABLE {fts_table} USING fts5("
+                    f"search_text, content='{table}', content_rowid='id', tokenize='trigram')"
+                )
+            )
+            connection.execute(
+                text(
+                    f"CREATE TRIGGER {fts_table}_ai AFTER INSERT ON {table} BEGIN "
+                    f"INSERT INTO {fts_table}(rowid, search_text) VALUES (new.id, new.search_text); END"
+                )
+            )
+            connection.execute(
+                text(
+                    f"CREATE TRIGGER {fts_table}_ad AFTER DELETE ON {table} BEGIN "
+                    f"INSERT INTO {fts_table}({fts_table}, rowid, search_text) "
+                    f"VALUES ('delete', old.id, old.search_text); END"
+                )
+            )
+            connection.execute(
+                text(
+                    f"CREATE TRIGGER {fts_table}_au AFTER UPDATE OF search_text ON {table} BEGIN "
+                    f"INSERT INTO {fts_table}({fts_table}, rowid, search_text) "
+                    f"VALUES ('delete', old.id, old.search_text); "
+                    f"INSERT INTO {fts_table}(rowid, search_text) VALUES (new.id, new.search_text); END"
+                )
+            )
+            connection.execute(text(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')"))
+    _SQLITE_FTS_TABLES.clear()
+
+
+def ensure_search_indexes(engine: Engine) -> None:
+    """Add ``search_text`` and the dialect's text index to databases created without them."""
+    _ensure_search_text_columns(engine)
+    if engine.dialect.name == "postgresql":
+        _ensure_postgres_indexes(engine)
+    elif engine.dialect.name == "sqlite":
+        _ensure_sqlite_fts(engine)
+
+
+def _has_sqlite_fts(query: Query, fts_table: str) -> bool:
+    bind = query.session.get_bind()
+    cache_key = f"{bind.engine.url}:{fts_table}"
+    if cache_key not in _SQLITE_FTS_TABLES:
+        _SQLITE_FTS_TABLES[cache_key] = inspect(bind).has_table(fts_table)
+    return _SQLITE_FTS_TABLES[cache_key]
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+@dataclass(frozen=True)
+class TextSearch:
+    query: Query
+    # Higher is a better match; order by it descending.
+    rank: ColumnElement[Any]
+
+
+def apply_text_search(
+    query: Query,
+    model,
+    search: str,
+    *,
+    extra_clause: ColumnElement[bool] | None = None,
+) -> TextSearch:
+    """Restrict ``query`` to rows of ``model`` whose search text contains ``search``.
+
+    Rows matching ``extra_clause`` (e.g. an exact id) are kept as well.
+    """
+    normalized = search.strip().lower()
+    terms = normalized.split()
+    substring_clause = model.search_text.like(f"%{_escape_like(normalized)}%", escape="\\")
+    extra_clauses = [extra_clause] if extra_clause is not None else []
+    dialect = query.session.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        document = func.to_tsvector(TS_CONFIG, func.coalesce(model.search_text, ""))
+        ts_query = func.plainto_tsquery(TS_CONFIG, normalized)
+        return TextSearch(
+            query=query.filter(or_(document.op("@@")(ts_query), substring_clause, *extra_clauses)),
+            # ts_rank is float4; widened to float8 it survives a round trip
+            # through a page cursor and compares equal to itself.
+            rank=cast(func.ts_rank(document, ts_query), Float(precision=53)),
+        )
+
+    fts_table = f"{model.__tablename__}_fts"
+    # Trigrams cannot match a term shorter than three characters.
+    fts_usable = bool(terms) and all(len(term) >= FTS_MIN_QUERY_LENGTH for term in terms)
+    if dialect == "sqlite" and fts_usable and _has_sqlite_fts(query, fts_table):
+        # One quoted phrase per term, so the words match in any order as plainto_tsquery does.
+        match_expression = " AND ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        matches = (
+            text(f"SELECT rowid AS id, bm25({fts_table}) AS score FROM {fts_table} WHERE {fts_table} MATCH :match_expression")
+            .bindparams(match_expression=match_expression)
+            .columns(id=Integer, score=Float)
+            .subquery(f"{fts_table}_matches")
+        )
+        # bm25 is lower-is-better.
+        rank = -func.coalesce(matches.c.score, 0.0)
+        if not extra_clauses:
+            return TextSearch(query=query.join(matches, matches.c.id == model.id), rank=rank)
+        return TextSearch(
+            query=query.outerjoin(matches, matches.c.id == model.id).filter(
+                or_(matches.c.id.isnot(None), *extra_clauses)
+            ),
+            rank=rank,
+        )
+
+    term_clauses = [model.search_text.like(f"%{_escape_like(term)}%", escape="\\") for term in terms]
+    word_clause = and_(*term_clauses) if len(term_clauses) > 1 else substring_clause
+    return TextSearch(query=query.filter(or_(word_clause, *extra_clauses)), rank=literal(0.0))
@@ -0,0 +1,188 @@
+"""
+Per-process cache of resolved session users.
+
+Every authenticated request, including each IIIF tile, used to look the
+session token up and rebuild the user's roles and permissions. Entries are
+keyed by a SHA-256 of the token, so the cache holds no usable credentials.
+An entry lives until the first of the TTL, the
+session's own expiry, an eviction by the LRU bound, or an invalidation.
+Invalidations come from logout and from a flush listener that watches users,
+their role links, roles and sessions.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .. import config
+from ..models import Role, User, UserRole, UserSession
+
+PENDING_INVALIDATIONS_KEY = "session_user_cache_invalidations"
+
+
+def hash_session_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class _Entry:
+    value: Any
+    user_pk: int
+    deadline: float
+
+
+class SessionUserCache:
+    """Thread-safe LRU of resolved users with a per-entry deadline."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = max(float(ttl_seconds), 0.0)
+        self.max_entries = max(int(max_entries), 0)
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+        # Bumped by every invalidation; a lookup that started before one must not be cached.
+        self._generation = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, token: str) -> Any | None:
+        if not self.enabled:
+            return None
+        key = hash_session_token(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            if entry.deadline <= time.monotonic():
+                del self._entries[key]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry.value
+
+    def put(self, token: str, value: Any, *, user_pk: int, session_expires_at: datetime, generation: int) -> None:
+        """Cache ``value`` unless an invalidation happened since ``generation`` was read."""
+        if not self.enabled:
+            return
+        if session_expires_at.tzinfo is None:
+            session_expires_at = session_expires_at.replace(tzinfo=timezone.utc)
+        remaining = (session_expires_at - datetime.now(timezone.utc)).total_seconds()
+        lifetime = min(self.ttl_seconds, remaining)
+        if lifetime <= 0:
+            return
+        key = hash_session_token(token)
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries.pop(key, None)
+            self._entries[key] = _Entry(value=value, user_pk=user_pk, deadline=time.monotonic() + lifetime)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate_token(self, token: str) -> None:
+        with self._lock:
+            self._generation += 1
+            if self._entries.pop(hash_session_token(token), None) is not None:
+                self._stats["invalidations"] += 1
+
+    def invalidate_users(self, user_pks: set[int]) -> None:
+        if not user_pks:
+            return
+        with self._lock:
+            self._generation += 1
+            stale = [key for key, entry in self._entries.items() if entry.user_pk in user_pks]
+            for key in stale:
+                del self._entries[key]
+            self._stats["invalidations"] += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._stats["invalidations"] += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "max_entries": self.max_entries}
+
+
+_CACHE: SessionUserCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_session_user_cache() -> SessionUserCache:
+    global _CACHE
+
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = SessionUserCache(config.SESSION_USER_CACHE_TTL_SECONDS, config.SESSION_USER_CACHE_MAX_ENTRIES)
+        return _CACHE
+
+
+def get_session_user_cache_stats() -> dict[str, int]:
+    return get_session_user_cache().stats()
+
+
+def reset_session_user_cache() -> None:
+    global _CACHE
+    with _CACHE_LOCK:
+        _CACHE = None
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_auth_changes(session, _flush_context, _instances) -> None:
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if not isinstance(instance, (User, UserRole, UserSession, Role)):
+            continue
+        pending = session.info.setdefault(PENDING_INVALIDATIONS_KEY, {"tokens": set(), "users": set(), "all": False})
+        if isinstance(instance, User) and instance.id is not None:
+            pending["users"].add(instance.id)
+        elif isinstance(instance, UserRole) and instance.user_id is not None:
+            pending["users"].add(instance.user_id)
+        elif isinstance(instance, UserSession) and instance.session_token:
+            pending["tokens"].add(instance.session_token)
+        elif isinstance(instance, Role):
+            pending["all"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_auth_changes(session) -> None:
+    # Applied only once the change is visible to other sessions, so a
+    # concurrent request cannot re-cache the old state after the invalidation.
+    pending = session.info.pop(PENDING_INVALIDATIONS_KEY, None)
+    if not pending:
+        return
+    cache = get_session_user_cache()
+    if pending["all"]:
+        cache.clear()
+        return
+    for token in pending["tokens"]:
+        cache.invalidate_token(token)
+    cache.invalidate_users(pending["users"])
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_auth_changes(session) -> None:
+    session.info.pop(PENDING_INVALIDATIONS_KEY, None)
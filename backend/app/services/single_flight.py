@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from collections import defaultdict
+from typing import Awaitable, Callable, Generic, TypeVar
+
+try:  # pragma: no cover - fcntl is missing on Windows dev machines
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+from .. import config
+
+T = TypeVar("T")
+
+FILE_LOCK_POLL_INTERVAL_SECONDS = 0.02
+
+_STATS: dict[str, dict[str, int]] = defaultdict(lambda: {"leaders": 0, "followers": 0, "cross_process_hits": 0})
+_STATS_LOCK = threading.Lock()
+
+
+def record_single_flight_event(namespace: str, event: str) -> None:
+    with _STATS_LOCK:
+        _STATS[namespace][event] += 1
+
+
+def get_single_flight_stats() -> dict[str, dict[str, int]]:
+    """Per-namespace counters; ``followers`` is the number of requests that were collapsed."""
+    with _STATS_LOCK:
+        return {namespace: dict(counters) for namespace, counters in _STATS.items()}
+
+
+def reset_single_flight_stats() -> None:
+    with _STATS_LOCK:
+        _STATS.clear()
+
+
+class _Call(Generic[T]):
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: T | None = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key across threads of one process."""
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self._calls: dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], T]) -> tuple[T, bool]:
+        """Run ``fn`` once per in-flight key; returns the result and whether this caller ran it."""
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not is_leader:
+            record_single_flight_event(self.namespace, "followers")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, False
+
+        record_single_flight_event(self.namespace, "leaders")
+        try:
+            call.result = fn()
+            return call.result, True
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """Collapse concurrent coroutines for the same key on one event loop."""
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self._futures: dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        while True:
+            future = self._futures.get(key)
+            if future is None:
+                break
+            record_single_flight_event(self.namespace, "followers")
+            try:
+                return await asyncio.shield(future), False
+            except asyncio.CancelledError:
+                # The leader's client went away; let one of the followers take over.
+                if not future.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting when the leader fails; mark the error as seen.
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._futures[key] = future
+        record_single_flight_event(self.namespace, "leaders")
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result, True
+        finally:
+            self._futures.pop(key, None)
+
+
+class FileLock:
+    """Exclusive ``flock`` on a per-key lock file, removed again on release.
+
+    The inode check after locking guards against a previous holder having
+    unlinked the file between our ``open`` and ``flock``.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: int | None = None
+
+    def _lock(self, *, blocking: bool) -> bool:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        while True:
+            fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+                if os.fstat(fd).st_ino == os.stat(self.path).st_ino:
+                    self._fd = fd
+                    return True
+            except FileNotFoundError:
+                pass
+            except BlockingIOError:
+                os.close(fd)
+                return False
+            except BaseException:
+                os.close(fd)
+                raise
+            os.close(fd)
+
+    def acquire(self) -> None:
+        self._lock(blocking=True)
+
+    def try_acquire(self) -> bool:
+        """Take the lock if it is free; never waits."""
+        return self._lock(blocking=False)
+
+    async def acquire_async(self, poll_interval: float = FILE_LOCK_POLL_INTERVAL_SECONDS) -> None:
+        """Wait for the lock without holding a thread, polling until it is free.
+
+        Cancellation while waiting leaves nothing held: the lock is only
+        taken by a ``try_acquire`` that returns before the next await.
+        """
+        while not self.try_acquire():
+            await asyncio.sleep(poll_interval)
+
+    def release(self) -> None:
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        finally:
+            os.close(fd)
+
+    def __enter__(self) -> FileLock:
+        self.acquire()
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        self.release()
+
+
+def cross_process_lock(path: str | None) -> FileLock | None:
+    """File lock for sharing one computation between worker processes, if enabled."""
+    if not path or not config.SINGLE_FLIGHT_FILE_LOCKS or fcntl is None:
+        return None
+    return FileLock(path)
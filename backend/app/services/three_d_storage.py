@@ -10,6 +10,8 @@ from typing import Any, Mapping, Sequence
 
 from fastapi import UploadFile
 
+from .ingest_pipeline import stream_upload_to_disk
+
 
 THREE_D_FILE_ROLE_LABELS = {
     'model': '三维模型',
@@ -94,9 +96,7 @@ async def save_three_d_uploads(
                 stored_path = role_dir / stored_filename
                 suffix += 1
 
-            with stored_path.open('wb') as buffer:
-                while chunk := await upload.read(64 * 1024):
-                    buffer.write(chunk)
+            await stream_upload_to_disk(upload, str(stored_path))
 
             saved_files.append(
                 {
@@ -1,6 +1,8 @@
 import os
+import threading
 
-from sqlalchemy.orm import Session
+from celery.signals import worker_process_init
+from sqlalchemy.orm import Session, selectinload
 
 from . import config as app_config
 from .celery_app import celery_app
@@ -10,14 +12,20 @@ from .services.face_recognition import (
     build_face_recognition_failed_state,
     normalize_face_recognition_response,
 )
-from .services.face_recognition_client import FaceRecognitionClientError, recognize_image_file
+from .services.face_recognition_client import FaceRecognitionClientError, recognize_image_file, recognize_image_files
 from .services.iiif_access import (
     apply_iiif_access_derivative,
     build_iiif_access_output_path,
     generate_pyramidal_tiff_access_copy,
+    get_asset_iiif_access_file_path,
     get_asset_original_file_path,
 )
+from .services.iiif_tile_cache import collect_iiif_tile_cache_garbage as collect_tile_cache_garbage
+from .services.local_face_recognition import warm_up_local_face_recognition
 from .services.metadata_layers import build_metadata_layers
+from .services.preview_cache import collect_preview_garbage as collect_preview_cache_garbage
+from .services.preview_images import record_preview_ladder, render_preview_ladder
+from .services.resumable_uploads import expire_resumable_uploads as expire_resumable_upload_sessions
 
 
 def _mark_asset_error(asset: Asset, error_message: str) -> None:
@@ -152,6 +160,7 @@ def _set_face_recognition_metadata(record: ImageRecord, asset: Asset, face_recog
 def generate_iiif_access_derivative(self, asset_id: int, original_path: str | None = None):
     db: Session = SessionLocal()
     asset: Asset | None = None
+    derivative_ready = False
     try:
         asset = db.query(Asset).filter(Asset.id == asset_id).first()
         if not asset:
@@ -172,6 +181,7 @@ def generate_iiif_access_derivative(self, asset_id: int, original_path: str | No
             conversion_method="celery_pyvips_generate_iiif_access_bigtiff",
         )
         db.commit()
+        derivative_ready = asset.status == "ready"
     except Exception as exc:
         if asset is not None:
             _mark_asset_error(asset, str(exc))
@@ -180,12 +190,127 @@ def generate_iiif_access_derivative(self, asset_id: int, original_path: str | No
     finally:
         db.close()
 
+    if derivative_ready:
+        # Same worker, straight after the pyramid is written: the ladder reads
+        # from its low-resolution pages while they are still in the page cache.
+        generate_preview_ladder.run(asset_id=asset_id)
+
+
+@celery_app.task(bind=True, name="app.tasks.generate_preview_ladder")
+def generate_preview_ladder(self, asset_id: int):
+    db: Session = SessionLocal()
+    try:
+        asset = db.query(Asset).filter(Asset.id == asset_id).first()
+        if not asset:
+            print(f"Asset {asset_id} not found during preview ladder generation.")
+            return
+
+        ladder = render_preview_ladder(asset)
+        if ladder is None:
+            print(f"Preview ladder skipped for Asset {asset_id}: no readable source.")
+            return
+        record_preview_ladder(asset, ladder)
+        db.commit()
+    except Exception as exc:
+        db.rollback()
+        print(f"Error generating preview ladder for Asset {asset_id}: {exc}")
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True, name="app.tasks.collect_preview_garbage")
+def collect_preview_garbage(self):
+    db: Session = SessionLocal()
+    try:
+        report = collect_preview_cache_garbage(db)
+    finally:
+        db.close()
+
+    print(
+        f"Preview cache GC reclaimed {report.reclaimed_bytes} bytes "
+        f"(stale {report.removed_stale}, orphaned {report.removed_orphaned}, lru {report.removed_lru}, "
+        f"abandoned {report.removed_abandoned}); {report.remaining_bytes} of {report.budget_bytes} bytes in use."
+    )
+    return report.as_dict()
+
+
+@celery_app.task(bind=True, name="app.tasks.collect_iiif_tile_cache_garbage")
+def collect_iiif_tile_cache_garbage(self):
+    report = collect_tile_cache_garbage()
+    if report.reclaimed_bytes:
+        print(
+            f"IIIF tile cache GC reclaimed {report.reclaimed_bytes} bytes "
+            f"(lru {report.removed_lru}, abandoned {report.removed_abandoned}); "
+            f"{report.remaining_bytes} of {report.budget_bytes} bytes in use."
+        )
+    return report.as_dict()
+
+
+@celery_app.task(bind=True, name="app.tasks.expire_resumable_uploads")
+def expire_resumable_uploads(self):
+    expired = expire_resumable_upload_sessions()
+    if expired:
+        print(f"Removed {expired} expired resumable upload session(s).")
+    return expired
+
 
 @celery_app.task(bind=True, name="app.tasks.convert_psb_to_bigtiff")
 def convert_psb_to_bigtiff(self, asset_id: int, original_path: str):
     return generate_iiif_access_derivative.run(asset_id=asset_id, original_path=original_path)
 
 
+def _face_recognition_skip_reason(record: ImageRecord | None, asset: Asset | None, record_id: int, asset_id: int) -> str | None:
+    """``None`` if the pair should be recognised; otherwise why not, empty when not worth logging."""
+    if not record or not asset:
+        return f"record {record_id} or asset {asset_id} not found."
+    if record.profile_key != "business_activity":
+        return ""
+    if record.asset is None or record.asset.id != asset_id:
+        return f"asset {asset_id} is no longer current for record {record_id}."
+    return None
+
+
+def _face_recognition_source_path(asset: Asset) -> str | None:
+    # The pyramidal access copy has the original's dimensions, so face boxes
+    # land in the same coordinates, but its reduced pages decode far faster.
+    source_path = (
+        get_asset_iiif_access_file_path(asset, allow_original_fallback=False, require_exists=True)
+        or get_asset_original_file_path(asset)
+        or asset.file_path
+    )
+    return source_path if source_path and os.path.exists(source_path) else None
+
+
+def _apply_face_recognition_payload(record: ImageRecord, asset: Asset, payload: dict) -> None:
+    technical = asset.metadata_info.get("technical", {}) if isinstance(asset.metadata_info, dict) else {}
+    normalized = normalize_face_recognition_response(
+        payload,
+        asset_id=asset.id,
+        threshold=app_config.FACE_RECOGNITION_THRESHOLD,
+        image_width=_coerce_optional_int(technical.get("width")),
+        image_height=_coerce_optional_int(technical.get("height")),
+    )
+    _set_face_recognition_metadata(record, asset, normalized)
+
+
+def _apply_face_recognition_failure(record: ImageRecord, asset: Asset, error_message: str) -> None:
+    failed_state = build_face_recognition_failed_state(
+        asset_id=asset.id,
+        threshold=app_config.FACE_RECOGNITION_THRESHOLD,
+        error_message=error_message,
+    )
+    _set_face_recognition_metadata(record, asset, failed_state)
+
+
+@worker_process_init.connect
+def _warm_up_face_recognition(**_kwargs) -> None:
+    if not (app_config.FACE_RECOGNITION_ENABLED and app_config.FACE_RECOGNITION_WARM_UP):
+        return
+    # In a thread, so a slow model load does not trip the pool's start-up timeout;
+    # a task that arrives meanwhile waits on the runtime lock instead of loading again.
+    threading.Thread(target=warm_up_local_face_recognition, name="face-recognition-warm-up", daemon=True).start()
+
+
 @celery_app.task(bind=True, name="app.tasks.recognize_business_activity_faces")
 def recognize_business_activity_faces(self, record_id: int, asset_id: int):
     if not app_config.FACE_RECOGNITION_ENABLED:
@@ -196,23 +321,15 @@ def recognize_business_activity_faces(self, record_id: int, asset_id: int):
     try:
         record = db.query(ImageRecord).filter(ImageRecord.id == record_id).first()
         asset = db.query(Asset).filter(Asset.id == asset_id).first()
-        if not record or not asset:
-            print(f"Face recognition skipped: record {record_id} or asset {asset_id} not found.")
-            return
-        if record.profile_key != "business_activity":
-            return
-        if record.asset is None or record.asset.id != asset_id:
-            print(f"Face recognition skipped: asset {asset_id} is no longer current for record {record_id}.")
+        skip_reason = _face_recognition_skip_reason(record, asset, record_id, asset_id)
+        if skip_reason is not None:
+            if skip_reason:
+                print(f"Face recognition skipped: {skip_reason}")
             return
 
-        source_path = get_asset_original_file_path(asset) or asset.file_path
-        if not source_path or not os.path.exists(source_path):
-            failed_state = build_face_recognition_failed_state(
-                asset_id=asset_id,
-                threshold=app_config.FACE_RECOGNITION_THRESHOLD,
-                error_message="Recognition source file is not available",
-            )
-            _set_face_recognition_metadata(record, asset, failed_state)
+        source_path = _face_recognition_source_path(asset)
+        if not source_path:
+            _apply_face_recognition_failure(record, asset, "Recognition source file is not available")
             db.commit()
             return
 
@@ -221,41 +338,99 @@ def recognize_business_activity_faces(self, record_id: int, asset_id: int):
             threshold=app_config.FACE_RECOGNITION_THRESHOLD,
             request_id=f"record-{record_id}-asset-{asset_id}",
         )
-        technical = asset.metadata_info.get("technical", {}) if isinstance(asset.metadata_info, dict) else {}
-        image_width = _coerce_optional_int(technical.get("width"))
-        image_height = _coerce_optional_int(technical.get("height"))
-        normalized = normalize_face_recognition_response(
-            payload,
-            asset_id=asset_id,
-            threshold=app_config.FACE_RECOGNITION_THRESHOLD,
-            image_width=image_width,
-            image_height=image_height,
-        )
-        _set_face_recognition_metadata(record, asset, normalized)
+        _apply_face_recognition_payload(record, asset, payload)
         db.commit()
     except FaceRecognitionClientError as exc:
         record = db.query(ImageRecord).filter(ImageRecord.id == record_id).first()
         asset = db.query(Asset).filter(Asset.id == asset_id).first()
         if record and asset:
-            failed_state = build_face_recognition_failed_state(
-                asset_id=asset_id,
-                threshold=app_config.FACE_RECOGNITION_THRESHOLD,
-                error_message=str(exc),
-            )
-            _set_face_recognition_metadata(record, asset, failed_state)
+            _apply_face_recognition_failure(record, asset, str(exc))
             db.commit()
         print(f"Face recognition client error for record {record_id}: {exc}")
     except Exception as exc:
         record = db.query(ImageRecord).filter(ImageRecord.id == record_id).first()
         asset = db.query(Asset).filter(Asset.id == asset_id).first()
         if record and asset:
-            failed_state = build_face_recognition_failed_state(
-                asset_id=asset_id,
-                threshold=app_config.FACE_RECOGNITION_THRESHOLD,
-                error_message=str(exc),
-            )
-            _set_face_recognition_metadata(record, asset, failed_state)
+            _apply_face_recognition_failure(record, asset, str(exc))
             db.commit()
         print(f"Unexpected face recognition error for record {record_id}: {exc}")
     finally:
         db.close()
+
+
+@celery_app.task(bind=True, name="app.tasks.recognize_business_activity_faces_batch")
+def recognize_business_activity_faces_batch(self, pairs: list[list[int]]):
+    """Recognise many (record id, asset id) pairs with one runtime pass and one commit."""
+    if not app_config.FACE_RECOGNITION_ENABLED:
+        print(f"Face recognition skipped for {len(pairs)} record(s): feature disabled.")
+        return
+
+    pairs = [(int(record_id), int(asset_id)) for record_id, asset_id in pairs]
+    db: Session = SessionLocal()
+    targets: list[tuple[ImageRecord, Asset, str]] = []
+    summary = {"recognized": 0, "failed": 0, "skipped": 0}
+    try:
+        records = {
+            record.id: record
+            for record in db.query(ImageRecord)
+            .options(selectinload(ImageRecord.asset))
+            .filter(ImageRecord.id.in_([record_id for record_id, _asset_id in pairs]))
+        }
+        assets = {
+            asset.id: asset
+            for asset in db.query(Asset).filter(Asset.id.in_([asset_id for _record_id, asset_id in pairs]))
+        }
+        for record_id, asset_id in pairs:
+            record, asset = records.get(record_id), assets.get(asset_id)
+            skip_reason = _face_recognition_skip_reason(record, asset, record_id, asset_id)
+            if skip_reason is not None:
+                if skip_reason:
+                    print(f"Face recognition skipped: {skip_reason}")
+                summary["skipped"] += 1
+                continue
+            source_path = _face_recognition_source_path(asset)
+            if not source_path:
+                _apply_face_recognition_failure(record, asset, "Recognition source file is not available")
+                summary["failed"] += 1
+                continue
+            targets.append((record, asset, source_path))
+
+        payloads: list = []
+        if targets:
+            try:
+                payloads = recognize_image_files(
+                    [source_path for _record, _asset, source_path in targets],
+                    threshold=app_config.FACE_RECOGNITION_THRESHOLD,
+                    request_ids=[f"record-{record.id}-asset-{asset.id}" for record, asset, _path in targets],
+                )
+            except FaceRecognitionClientError as exc:
+                payloads = [exc] * len(targets)
+
+        for (record, asset, _source_path), payload in zip(targets, payloads):
+            if isinstance(payload, Exception):
+                _apply_face_recognition_failure(record, asset, str(payload))
+                print(f"Face recognition client error for record {record.id}: {payload}")
+                summary["failed"] += 1
+            else:
+                _apply_face_recognition_payload(record, asset, payload)
+                summary["recognized"] += 1
+        db.commit()
+    except Exception as exc:
+        db.rollback()
+        for record, asset, _source_path in targets:
+            _apply_face_recognition_failure(record, asset, str(exc))
+        db.commit()
+        print(f"Unexpected face recognition error for batch of {len(pairs)} record(s): {exc}")
+        summary = {"recognized": 0, "failed": len(targets), "skipped": len(pairs) - len(targets)}
+    finally:
+        db.close()
+    return summary
+
+
+def enqueue_face_recognition_batches(pairs: list[tuple[int, int]], *, batch_size: int | None = None) -> int:
+    """Split (record id, asset id) pairs into batch tasks so idle workers pick them up in parallel."""
+    size = max(1, batch_size or app_config.FACE_RECOGNITION_BATCH_SIZE)
+    batches = [pairs[start : start + size] for start in range(0, len(pairs), size)]
+    for batch in batches:
+        recognize_business_activity_faces_batch.delay([[record_id, asset_id] for record_id, asset_id in batch])
+    return len(batches)
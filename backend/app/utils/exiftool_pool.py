@@ -0,0 +1,259 @@
+"""
+Long-lived ExifTool processes driven through ``-stay_open True -@ -``.
+
+Each process reads argument lines from stdin and runs them when it sees
+``-execute<N>``; it then prints ``{ready<N>}`` on stdout. We also ask for the
+same marker on stderr with ``-echo4``, so both streams can be read up to a
+known point without closing the process. Stderr is drained on its own thread
+so a chatty request cannot fill that pipe while stdout is being read.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import select
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from .. import config
+
+logger = logging.getLogger(__name__)
+
+# Same output shape as the one-shot invocation in ``metadata.extract_metadata``.
+EXIFTOOL_COMMON_ARGS = ("-j", "-g", "-struct", "--Binary", "-charset", "filename=utf8")
+# Recycle a process after this many executions so Perl's heap cannot grow without bound.
+EXIFTOOL_MAX_EXECUTIONS_PER_PROCESS = 1000
+# select() only polls sockets on Windows, so the pool cannot wait on ExifTool's pipes there.
+PIPES_SELECTABLE = os.name != "nt"
+
+
+class ExifToolProcessError(RuntimeError):
+    pass
+
+
+class _StderrDrain(threading.Thread):
+    """Reads a pipe until EOF, keeping what arrived until a caller asks for it up to a marker."""
+
+    def __init__(self, stream):
+        super().__init__(name="exiftool-stderr", daemon=True)
+        self._fd = stream.fileno()
+        self._buffer = bytearray()
+        self._eof = False
+        self._condition = threading.Condition()
+
+    def run(self) -> None:
+        while True:
+            try:
+                chunk = os.read(self._fd, 65536)
+            except OSError:
+                chunk = b""
+            with self._condition:
+                if chunk:
+                    self._buffer.extend(chunk)
+                else:
+                    self._eof = True
+                self._condition.notify_all()
+            if not chunk:
+                return
+
+    def read_until(self, marker: bytes, deadline: float) -> bytes:
+        with self._condition:
+            while True:
+                index = self._buffer.find(marker)
+                if index >= 0:
+                    received = bytes(self._buffer[:index])
+                    del self._buffer[: index + len(marker)]
+                    return received
+                if self._eof:
+                    raise ExifToolProcessError("ExifTool exited while a request was in flight")
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise ExifToolProcessError("ExifTool did not answer before the timeout")
+                self._condition.wait(remaining)
+
+
+class ExifToolProcess:
+    """One ``-stay_open`` ExifTool process; not thread-safe, the pool hands it to one caller at a time."""
+
+    def __init__(self, executable: str, timeout_seconds: float):
+        self.executable = executable
+        self.timeout_seconds = timeout_seconds
+        self.executions = 0
+        self._sequence = 0
+        self._process: subprocess.Popen | None = None
+        self._stderr: _StderrDrain | None = None
+
+    def start(self) -> None:
+        self._process = subprocess.Popen(
+            [self.executable, "-stay_open", "True", "-@", "-", "-common_args", *EXIFTOOL_COMMON_ARGS],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        self._stderr = _StderrDrain(self._process.stderr)
+        self._stderr.start()
+        self.executions = 0
+
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def close(self, graceful: bool = True) -> None:
+        process, self._process = self._process, None
+        drain, self._stderr = self._stderr, None
+        if process is None:
+            return
+        try:
+            if not graceful:
+                process.kill()
+                process.wait()
+            elif process.poll() is None:
+                process.stdin.write(b"-stay_open\nFalse\n")
+                process.stdin.flush()
+                process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+            process.wait()
+        finally:
+            if drain is not None:
+                # The process is gone, so its stderr is at EOF and the drain ends.
+                drain.join(timeout=5)
+            for stream in (process.stdin, process.stdout, process.stderr):
+                if stream is not None:
+                    stream.close()
+
+    def _read_until(self, stream, marker: bytes, deadline: float) -> bytes:
+        buffer = bytearray()
+        fd = stream.fileno()
+        while not buffer.endswith(marker):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ExifToolProcessError("ExifTool did not answer before the timeout")
+            readable, _writable, _errored = select.select([fd], [], [], remaining)
+            if not readable:
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise ExifToolProcessError("ExifTool exited while a request was in flight")
+            buffer.extend(chunk)
+        return bytes(buffer[: -len(marker)])
+
+    def execute(self, file_paths: list[str]) -> tuple[list[dict], str]:
+        if not self.is_alive():
+            raise ExifToolProcessError("ExifTool process is not running")
+
+        self._sequence += 1
+        marker = f"{{ready{self._sequence}}}"
+        arguments = ["-echo4", marker, *file_paths, f"-execute{self._sequence}"]
+        payload = "".join(f"{argument}\n" for argument in arguments).encode("utf-8")
+        deadline = time.monotonic() + self.timeout_seconds
+        try:
+            self._process.stdin.write(payload)
+            self._process.stdin.flush()
+        except OSError as exc:
+            raise ExifToolProcessError(f"Could not write to ExifTool: {exc}") from exc
+
+        stdout = self._read_until(self._process.stdout, f"{marker}\n".encode("utf-8"), deadline)
+        stderr = self._stderr.read_until(f"{marker}\n".encode("utf-8"), deadline)
+        self.executions += 1
+
+        text = stdout.decode("utf-8", errors="replace").strip()
+        try:
+            metadata_list = json.loads(text) if text else []
+        except json.JSONDecodeError as exc:
+            raise ExifToolProcessError(f"Failed to parse ExifTool output: {exc}") from exc
+        return metadata_list if isinstance(metadata_list, list) else [], stderr.decode("utf-8", errors="replace").strip()
+
+
+class ExifToolPool:
+    """A fixed number of ExifTool processes, started lazily and restarted when they die or hang."""
+
+    def __init__(self, executable: str, size: int, timeout_seconds: float):
+        self.executable = executable
+        self.size = max(int(size), 1)
+        self.timeout_seconds = timeout_seconds
+        self._idle: queue.LifoQueue[ExifToolProcess] = queue.LifoQueue()
+        for _index in range(self.size):
+            self._idle.put(ExifToolProcess(executable, timeout_seconds))
+        self._closed = False
+        self.restarts = 0
+
+    @contextmanager
+    def _checkout(self) -> Iterator[ExifToolProcess]:
+        if self._closed:
+            raise ExifToolProcessError("ExifTool pool is closed")
+        worker = self._idle.get()
+        try:
+            if not worker.is_alive() or worker.executions >= EXIFTOOL_MAX_EXECUTIONS_PER_PROCESS:
+                if worker.executions:
+                    self.restarts += 1
+                worker.close()
+                worker.start()
+            yield worker
+        except BaseException:
+            # A half-answered request leaves the streams out of step; start over.
+            worker.close(graceful=False)
+            raise
+        finally:
+            self._idle.put(worker)
+
+    def extract(self, file_paths: list[str]) -> list[dict]:
+        """Metadata for each path, in order; ``{}`` for files ExifTool could not read."""
+        if not file_paths:
+            return []
+        with self._checkout() as worker:
+            metadata_list, stderr = worker.execute(file_paths)
+        if stderr:
+            logger.warning(f"ExifTool reported: {stderr}")
+
+        by_source = {
+            str(item.get("SourceFile")): item
+            for item in metadata_list
+            if isinstance(item, dict) and item.get("SourceFile") is not None
+        }
+        if len(file_paths) == 1 and not by_source and len(metadata_list) == 1 and isinstance(metadata_list[0], dict):
+            return [metadata_list[0]]
+        return [by_source.get(file_path, {}) for file_path in file_paths]
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            worker.close()
+
+
+_POOL: ExifToolPool | None = None
+_POOL_PID: int | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_exiftool_pool(executable: str) -> ExifToolPool | None:
+    """Process-wide pool, or ``None`` when pooling is disabled with ``EXIFTOOL_POOL_SIZE=0`` or unsupported."""
+    global _POOL, _POOL_PID
+    if config.EXIFTOOL_POOL_SIZE <= 0 or not PIPES_SELECTABLE:
+        return None
+    with _POOL_LOCK:
+        # A forked worker must not share pipes with its parent's processes.
+        if _POOL is None or _POOL_PID != os.getpid() or _POOL.executable != executable:
+            _POOL = ExifToolPool(executable, config.EXIFTOOL_POOL_SIZE, config.EXIFTOOL_TIMEOUT_SECONDS)
+            _POOL_PID = os.getpid()
+        return _POOL
+
+
+def close_exiftool_pool() -> None:
+    global _POOL, _POOL_PID
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+        owner_pid, _POOL_PID = _POOL_PID, None
+    if pool is not None and owner_pid == os.getpid():
+        pool.close()
+
+
+atexit.register(close_exiftool_pool)
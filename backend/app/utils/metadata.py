@@ -4,6 +4,8 @@ import json
 import logging
 import shutil
 
+from .exiftool_pool import get_exiftool_pool
+
 logger = logging.getLogger(__name__)
 
 def get_exiftool_path():
@@ -33,6 +35,17 @@ def extract_metadata(file_path: str) -> dict:
         logger.error("ExifTool not found. Please ensure it is installed and in the PATH.")
         return {}
 
+    pool = get_exiftool_pool(exiftool_cmd)
+    if pool is not None:
+        try:
+            return pool.extract([file_path])[0]
+        except Exception as e:
+            logger.warning(f"ExifTool pool failed, running a one-off ExifTool instead: {e}")
+
+    return _run_exiftool(exiftool_cmd, file_path)
+
+
+def _run_exiftool(exiftool_cmd: str, file_path: str) -> dict:
     try:
         # -j: JSON output
         # -g: Group output by tag group (e.g., EXIF, IPTC, XMP)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+
+def _bootstrap_app() -> None:
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    backend_root = Path(__file__).resolve().parents[1]
+    if str(backend_root) not in sys.path:
+        sys.path.insert(0, str(backend_root))
+
+
+def _synthetic_metadata(exif_tags: int) -> dict:
+    # ExifTool dumps of large TIFF/PSB masters run to hundreds of tags, many of them nested groups.
+    return {
+        "core": {"title": "Synthetic scroll", "visibility_scope": "open"},
+        "technical": {"width": 12000, "height": 8000, "fixity_sha256": "0" * 64, "format_name": "image/tiff"},
+        "management": {"project_name": "benchmark", "photographer": "Bench"},
+        "profile": {"key": "movable_artifact", "fields": {"object_number": "故宫000001"}},
+        "raw_metadata": {
+            "EXIF": {f"Tag{n}": f"value-{n}" for n in range(exif_tags)},
+            "XMP": {f"Group{n}": {"Field": [f"item-{n}-{k}" for k in range(8)]} for n in range(exif_tags // 8)},
+        },
+    }
+
+
+def _new_asset(metadata: dict):
+    from app.models import Asset
+
+    return Asset(
+        id=1,
+        filename="scroll.tif",
+        file_path="/uploads/scroll.tif",
+        file_size=900_000_000,
+        mime_type="image/tiff",
+        status="ready",
+        resource_type="image_2d_cultural_object",
+        visibility_scope="open",
+        metadata_info=metadata,
+    )
+
+
+def _legacy_manifest_layers(asset) -> tuple[int, int]:
+    """What a manifest request did before the view: two populated rebuilds, one full build, one more for dimensions."""
+    from app.services import iiif_access, metadata_layers
+
+    def populate():
+        return iiif_access.populate_iiif_access_metadata(
+            asset.metadata_info or {},
+            asset_file_path=asset.file_path,
+            asset_filename=asset.filename,
+            asset_file_size=asset.file_size,
+            asset_mime_type=asset.mime_type,
+        )
+
+    populate()  # _resolve_iiif_source_path -> get_asset_iiif_access_file_path
+    populate()  # _build_iiif_source_entry -> is_iiif_ready
+    layers = metadata_layers.build_metadata_layers(
+        asset_id=asset.id,
+        asset_filename=asset.filename,
+        asset_file_path=asset.file_path,
+        asset_file_size=asset.file_size,
+        asset_mime_type=asset.mime_type,
+        asset_status=asset.status,
+        asset_resource_type=asset.resource_type,
+        asset_created_at=asset.created_at,
+        metadata=asset.metadata_info or {},
+    )
+    return metadata_layers.get_dimensions(layers)
+
+
+def _view_manifest_layers(asset) -> tuple[int, int]:
+    from app.services.iiif_access import get_asset_iiif_access_file_path, get_asset_layer_view, is_iiif_ready
+
+    get_asset_iiif_access_file_path(asset, allow_original_fallback=True, require_exists=False)
+    is_iiif_ready(asset)
+    return get_asset_layer_view(asset).dimensions
+
+
+def _install_counters() -> dict[str, int]:
+    from app.services import metadata_layers
+
+    counts = {"layer_builds": 0, "raw_copies": 0}
+    build_core = metadata_layers._build_core_section
+    deepcopy = metadata_layers.deepcopy
+
+    def counting_build_core(**kwargs):
+        counts["layer_builds"] += 1
+        return build_core(**kwargs)
+
+    def counting_deepcopy(value):
+        counts["raw_copies"] += 1
+        return deepcopy(value)
+
+    metadata_layers._build_core_section = counting_build_core
+    metadata_layers.deepcopy = counting_deepcopy
+    return counts
+
+
+def _measure(label: str, call, metadata: dict, repeats: int, counts: dict[str, int]) -> str:
+    counts.update(layer_builds=0, raw_copies=0)
+    latencies: list[float] = []
+    for _index in range(repeats):
+        asset = _new_asset(metadata)
+        started = time.perf_counter()
+        call(asset)
+        latencies.append(time.perf_counter() - started)
+    builds = counts["layer_builds"] / repeats
+    copies = counts["raw_copies"] / repeats
+
+    tracemalloc.start()
+    asset = _new_asset(metadata)
+    baseline, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    call(asset)
+    current, peak = tracemalloc.get_traced_memory()
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+
+    return (
+        f"{label:>7}: {builds:.0f} layer builds, {copies:.0f} raw copies, "
+        f"peak {(peak - baseline) / 1024:8.1f} KiB, retained {(current - baseline) / 1024:8.1f} KiB in {blocks} blocks, "
+        f"p50 {statistics.median(latencies) * 1_000_000:8.1f}us"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Count the metadata-layer work one IIIF manifest request does, before and after the shared layer view."
+    )
+    parser.add_argument("--exif-tags", type=int, nargs="+", default=[50, 400, 2000], help="Size of the synthetic raw dump.")
+    parser.add_argument("--repeats", type=int, default=200, help="Simulated requests per measurement.")
+    args = parser.parse_args()
+
+    _bootstrap_app()
+    counts = _install_counters()
+    for exif_tags in args.exif_tags:
+        metadata = _synthetic_metadata(exif_tags)
+        print(f"{exif_tags} raw tags", flush=True)
+        print(_measure("legacy", _legacy_manifest_layers, metadata, args.repeats, counts), flush=True)
+        print(_measure("view", _view_manifest_layers, metadata, args.repeats, counts), flush=True)
+
+
+if __name__ == "__main__":
+    main()
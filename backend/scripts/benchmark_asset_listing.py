@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+def _bootstrap_app(database_url: str) -> None:
+    os.environ["DATABASE_URL"] = database_url
+    backend_root = Path(__file__).resolve().parents[1]
+    if str(backend_root) not in sys.path:
+        sys.path.insert(0, str(backend_root))
+
+
+def _synthetic_metadata(index: int, visibility_scope: str, collection_object_id: int | None) -> dict:
+    # Roughly the size of a real asset's layers, so deserialising them costs what it does in production.
+    return {
+        "core": {
+            "title": f"Synthetic asset {index}",
+            "visibility_scope": visibility_scope,
+            "collection_object_id": collection_object_id,
+        },
+        "technical": {"width": 6000, "height": 4000, "ingest_timings": {"stream_ms": 12.5, "total_ms": 40.1}},
+        "management": {"project_name": "benchmark", "keywords": [f"keyword-{index % 97}-{n}" for n in range(20)]},
+        "raw_metadata": {"EXIF": {f"Tag{n}": f"value-{index}-{n}" for n in range(60)}},
+    }
+
+
+def _insert_assets(engine, start: int, count: int, seed: int, collections: int) -> None:
+    from app.models import Asset
+
+    rng = random.Random(seed + start)
+    base_time = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for index in range(start, start + count):
+        owner_only = rng.random() < 0.3
+        collection_object_id = rng.randrange(1, collections + 1) if owner_only else None
+        visibility_scope = "owner_only" if owner_only else "open"
+        rows.append(
+            {
+                "id": index + 1,
+                "filename": f"asset-{index}.tif",
+                "file_path": f"/uploads/asset-{index}.tif",
+                "file_size": 50_000_000,
+                "mime_type": "image/tiff",
+                "visibility_scope": visibility_scope,
+                "collection_object_id": collection_object_id,
+                "metadata_info": _synthetic_metadata(index, visibility_scope, collection_object_id),
+                "created_at": base_time + timedelta(seconds=index),
+                "resource_type": "image_2d_cultural_object",
+                "status": "ready",
+            }
+        )
+    with engine.begin() as connection:
+        for offset in range(0, len(rows), 5000):
+            connection.execute(Asset.__table__.insert(), rows[offset : offset + 5000])
+
+
+def _legacy_list_assets(db, user, skip: int, limit: int):
+    """The pre-keyset implementation: load every row, filter in Python, then slice."""
+    from app.models import Asset
+    from app.routers.assets import _is_asset_visible_to_user
+
+    assets = db.query(Asset).order_by(Asset.created_at.desc(), Asset.id.desc()).all()
+    visible_assets = [asset for asset in assets if _is_asset_visible_to_user(asset, user)]
+    return visible_assets[skip : skip + limit]
+
+
+def _measure(session_factory, call, repeats: int) -> list[float]:
+    latencies: list[float] = []
+    for _index in range(repeats):
+        with session_factory() as db:
+            started = time.perf_counter()
+            call(db)
+            latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def _report(label: str, latencies: list[float]) -> str:
+    ordered = sorted(latencies)
+    p95 = ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] * 1000
+    return f"{label} p50 {statistics.median(ordered) * 1000:8.2f}ms p95 {p95:8.2f}ms"
+
+
+def _run(args: argparse.Namespace) -> None:
+    from app.database import Base, SessionLocal, engine
+    from app.permissions import get_current_user
+    from app.routers.assets import list_assets
+
+    Base.metadata.create_all(bind=engine)
+    users = {
+        "public": get_current_user(x_mdams_user="resource-user"),
+        "owner": get_current_user(x_mdams_user="collection-owner", x_mdams_collection_scope="1,2,3"),
+    }
+
+    inserted = 0
+    for size in sorted(args.sizes):
+        _insert_assets(engine, inserted, size - inserted, args.seed, args.collections)
+        inserted = size
+        with SessionLocal() as db:
+            # An ``after_id`` halfway down the table, as a client paging deep into the list would send.
+            deep_anchor = list_assets(skip=size // 4, limit=1, db=db, user=users["owner"])[0].id
+
+        for user_label, user in users.items():
+            first_page = _measure(
+                SessionLocal, lambda db: list_assets(limit=args.page_size, db=db, user=user), args.repeats
+            )
+            deep_page = _measure(
+                SessionLocal,
+                lambda db: list_assets(limit=args.page_size, after_id=deep_anchor, db=db, user=user),
+                args.repeats,
+            )
+            line = f"{size:>8} rows {user_label:>6}: {_report('first', first_page)} | {_report('after_id', deep_page)}"
+            if size <= args.legacy_max_rows:
+                legacy = _measure(
+                    SessionLocal,
+                    lambda db: _legacy_list_assets(db, user, 0, args.page_size),
+                    max(args.repeats // 10, 1),
+                )
+                line += f" | {_report('legacy', legacy)}"
+            print(line, flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure GET /assets page latency as the asset table grows, against the old load-everything filter."
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 30_000, 100_000],
+        help="Table sizes to measure at; rows are added incrementally.",
+    )
+    parser.add_argument("--page-size", type=int, default=100, help="Assets per page.")
+    parser.add_argument("--repeats", type=int, default=50, help="Requests per measurement.")
+    parser.add_argument("--collections", type=int, default=50, help="Distinct collection objects owning owner_only assets.")
+    parser.add_argument(
+        "--legacy-max-rows",
+        type=int,
+        default=30_000,
+        help="Largest table size at which the old implementation is also measured (it loads every row).",
+    )
+    parser.add_argument("--seed", type=int, default=7, help="Seed for the synthetic visibility mix.")
+    parser.add_argument("--database-url", help="Database to fill; a temporary SQLite file is used otherwise.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="asset-listing-bench-") as work_dir:
+        _bootstrap_app(args.database_url or f"sqlite:///{os.path.join(work_dir, 'assets.db')}")
+        _run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def _bootstrap_app(database_url: str) -> None:
+    os.environ.setdefault("DATABASE_URL", database_url)
+    backend_root = Path(__file__).resolve().parents[1]
+    if str(backend_root) not in sys.path:
+        sys.path.insert(0, str(backend_root))
+
+
+def _synthetic_raw_metadata(asset_id: int, exif_tags: int) -> dict:
+    # Mirrors what ingest stored before the move: a full ExifTool dump next to the bookkeeping entries.
+    return {
+        "server_hash": f"{asset_id:064x}",
+        "exif_metadata": {
+            "EXIF": {f"Tag{n}": f"value-{asset_id}-{n}" for n in range(exif_tags)},
+            "XMP": {f"Group{n}": {"Field": [f"item-{n}-{k}" for k in range(8)]} for n in range(exif_tags // 8)},
+        },
+    }
+
+
+def _seed(db, *, assets: int, exif_tags: int) -> None:
+    from app.models import Asset
+
+    rows = [
+        {
+            "id": asset_id,
+            "filename": f"scan-{asset_id}.tif",
+            "file_path": f"/uploads/scan-{asset_id}.tif",
+            "file_size": 900_000_000,
+            "mime_type": "image/tiff",
+            "status": "ready",
+            "metadata_info": {
+                "core": {"title": f"Scan {asset_id}", "visibility_scope": "open"},
+                "technical": {"width": 12000, "height": 8000, "format_name": "image/tiff"},
+                "raw_metadata": _synthetic_raw_metadata(asset_id, exif_tags),
+            },
+        }
+        for asset_id in range(1, assets + 1)
+    ]
+    db.execute(Asset.__table__.insert(), rows)
+    db.commit()
+
+
+def _measure_list(db, *, page_size: int, repeats: int) -> str:
+    from app.models import Asset
+
+    latencies: list[float] = []
+    payload_bytes = 0
+    for _index in range(repeats):
+        db.expunge_all()
+        started = time.perf_counter()
+        page = db.query(Asset).order_by(Asset.id.desc()).limit(page_size).all()
+        latencies.append(time.perf_counter() - started)
+        payload_bytes = sum(len(json.dumps(asset.metadata_info, ensure_ascii=False)) for asset in page)
+    return (
+        f"metadata_info {payload_bytes / page_size / 1024:8.1f} KiB/row, "
+        f"p50 {statistics.median(latencies) * 1000:7.2f}ms per {page_size}-row page"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure list-query payload before and after moving raw ExifTool metadata to asset_source_metadata."
+    )
+    parser.add_argument("--database-url", help="Empty database to fill; a temporary SQLite file is used otherwise.")
+    parser.add_argument("--assets", type=int, default=2000)
+    parser.add_argument("--exif-tags", type=int, default=400, help="Size of each synthetic raw dump.")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        database_url = args.database_url or f"sqlite:///{Path(scratch) / 'payload.db'}"
+        _bootstrap_app(database_url)
+
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+
+        from app.database import Base
+        from app.services.asset_source_metadata import migrate_asset_source_metadata
+
+        engine = create_engine(database_url)
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        try:
+            _seed(db, assets=args.assets, exif_tags=args.exif_tags)
+            print(f"{args.assets} assets, {args.exif_tags} raw tags each", flush=True)
+            print(f" inline: {_measure_list(db, page_size=args.page_size, repeats=args.repeats)}", flush=True)
+
+            started = time.perf_counter()
+            counts = migrate_asset_source_metadata(db)
+            print(f"migrated {counts['moved']}/{counts['visited']} rows in {time.perf_counter() - started:.2f}s", flush=True)
+            print(f"  moved: {_measure_list(db, page_size=args.page_size, repeats=args.repeats)}", flush=True)
+        finally:
+            db.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+
+def _bootstrap_app() -> None:
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    backend_root = Path(__file__).resolve().parents[1]
+    if str(backend_root) not in sys.path:
+        sys.path.insert(0, str(backend_root))
+
+
+def _unit_rows(matrix):
+    import numpy as np
+
+    return (matrix / np.linalg.norm(matrix, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _gallery(rng, clusters: int, dims: int):
+    # Identity embeddings are not uniform on the sphere: people group by age, lighting and capture setup.
+    groups = _unit_rows(rng.standard_normal((max(1, clusters // 50), dims)))
+    members = groups[rng.integers(len(groups), size=clusters)]
+    return _unit_rows(members + 0.9 * _unit_rows(rng.standard_normal((clusters, dims))))
+
+
+def _queries(rng, centers, faces: int, noise: float):
+    truth = rng.integers(len(centers), size=faces)
+    return _unit_rows(centers[truth] + noise * _unit_rows(rng.standard_normal((faces, centers.shape[1])))), truth
+
+
+def _time(call, repeats: int) -> tuple[float, object]:
+    latencies = []
+    result = None
+    for _index in range(repeats):
+        started = time.perf_counter()
+        result = call()
+        latencies.append(time.perf_counter() - started)
+    return statistics.median(latencies), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recall and latency of the IVF/PQ face index against exact search.")
+    parser.add_argument("--gallery-sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--dims", type=int, default=512)
+    parser.add_argument("--faces", type=int, default=40, help="Faces per image searched together.")
+    parser.add_argument("--queries", type=int, default=400, help="Faces used to estimate recall.")
+    parser.add_argument("--noise", type=float, default=1.0, help="Query noise; 1.0 gives a cosine of about 0.7 to the true centre.")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--pq-subvectors", type=int, nargs="+", default=[0, 64], help="0 builds IVF without PQ codes.")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    _bootstrap_app()
+    import numpy as np
+
+    from app.services.face_ann_index import build_ivf, exact_top_k
+
+    rng = np.random.default_rng(0)
+    for gallery_size in args.gallery_sizes:
+        centers = _gallery(rng, gallery_size, args.dims)
+        queries, _truth = _queries(rng, centers, args.queries, args.noise)
+        expected, _scores = exact_top_k(queries, centers, 1)
+        batch = queries[: args.faces]
+        exact_s, _result = _time(lambda: exact_top_k(batch, centers, 2), args.repeats)
+        print(f"{gallery_size} clusters: exact {exact_s * 1000:8.2f}ms per {args.faces} faces", flush=True)
+
+        for pq_subvectors in args.pq_subvectors:
+            started = time.perf_counter()
+            index = build_ivf(centers, pq_subvectors=pq_subvectors)
+            build_s = time.perf_counter() - started
+            label = f"IVF{index.nlist}" + (f",PQ{pq_subvectors}" if pq_subvectors else "")
+            print(f"  {label}: built in {build_s:.1f}s", flush=True)
+            for nprobe in args.nprobe:
+                found, _scores = index.search(queries, centers, top_k=1, nprobe=nprobe)
+                recall = float(np.mean(found[:, 0] == expected[:, 0]))
+                search_s, _result = _time(lambda: index.search(batch, centers, top_k=2, nprobe=nprobe), args.repeats)
+                print(
+                    f"    nprobe {nprobe:>3}: recall@1 {recall:6.3f}, {search_s * 1000:8.2f}ms "
+                    f"({exact_s / search_s:5.1f}x exact)",
+                    flush=True,
+                )
+
+
+if __name__ == "__main__":
+    main()
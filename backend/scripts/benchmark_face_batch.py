@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def _bootstrap_app() -> None:
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    backend_root = Path(__file__).resolve().parents[1]
+    if str(backend_root) not in sys.path:
+        sys.path.insert(0, str(backend_root))
+
+
+class _StandInRuntime:
+    """Real JPEG decoding with Pillow, and a fixed sleep in place of InsightFace detection."""
+
+    def __init__(self, detect_ms: float):
+        self.detect_s = detect_ms / 1000
+
+    def decode(self, image_path: str):
+        from PIL import Image
+
+        with Image.open(image_path) as image:
+            image.load()
+            return image
+
+    def detect(self, _img):
+        time.sleep(self.detect_s)
+        return []
+
+
+def _write_photos(directory: Path, count: int, megapixels: float) -> list[str]:
+    import numpy as np
+    from PIL import Image
+
+    side = int((megapixels * 1_000_000) ** 0.5)
+    rng = np.random.default_rng(0)
+    # Smooth noise compresses like a photograph rather than like static.
+    base = rng.integers(0, 255, size=(side // 16, side // 16, 3), dtype=np.uint8)
+    image = Image.fromarray(base).resize((side, side), Image.BILINEAR)
+    paths = []
+    for index in range(count):
+        path = directory / f"activity-{index}.jpg"
+        image.save(path, quality=90)
+        paths.append(str(path))
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Per-record recognition against one batch with threaded decoding and a single match call."
+    )
+    parser.add_argument("--photos", type=int, default=32)
+    parser.add_argument("--megapixels", type=float, default=24.0)
+    parser.add_argument("--decode-workers", type=int, default=4)
+    parser.add_argument(
+        "--detect-ms",
+        type=float,
+        default=0.0,
+        help="Use a stand-in runtime that sleeps this long per image; 0 uses the configured InsightFace runtime.",
+    )
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    _bootstrap_app()
+    from app.services import local_face_recognition
+
+    cold_s = None
+    if args.detect_ms:
+        runtime = _StandInRuntime(args.detect_ms)
+        local_face_recognition._get_runtime = lambda: runtime
+    else:
+        started = time.perf_counter()
+        local_face_recognition.warm_up_local_face_recognition()
+        cold_s = time.perf_counter() - started
+
+    with tempfile.TemporaryDirectory(prefix="face-batch-bench-") as scratch:
+        paths = _write_photos(Path(scratch), args.photos, args.megapixels)
+        per_record, batched = [], []
+        for _index in range(args.repeats):
+            started = time.perf_counter()
+            for path in paths:
+                local_face_recognition.recognize_image_file_locally(path)
+            per_record.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            local_face_recognition.recognize_image_files_locally(paths, decode_workers=args.decode_workers)
+            batched.append(time.perf_counter() - started)
+
+    if cold_s is not None:
+        print(f"runtime warm-up (paid once per worker process): {cold_s * 1000:.0f}ms")
+    per_record_s, batched_s = statistics.median(per_record), statistics.median(batched)
+    print(f"{args.photos} photos of {args.megapixels:g} MP, {args.decode_workers} decode threads")
+    print(f"  per record: {per_record_s * 1000:8.0f}ms ({args.photos / per_record_s:5.1f} photos/s)")
+    print(f"  batched:    {batched_s * 1000:8.0f}ms ({args.photos / batched_s:5.1f} photos/s)")
+
+
+if __name__ == "__main__":
+    main()
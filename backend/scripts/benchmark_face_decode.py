@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def _bootstrap_app() -> None:
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    backend_root = Path(__file__).resolve().parents[1]
+    if str(backend_root) not in sys.path:
+        sys.path.insert(0, str(backend_root))
+
+
+def _write_original(path: Path, megapixels: float, **save_options) -> None:
+    import pyvips
+
+    side = int((megapixels * 1_000_000) ** 0.5)
+    # Coarse noise scaled up compresses like a photograph rather than like static, and is generated lazily.
+    bands = [pyvips.Image.gaussnoise(side // 8 + 1, side // 8 + 1, sigma=40, mean=128) for _band in range(3)]
+    noise = bands[0].bandjoin(bands[1:]).resize(8).crop(0, 0, side, side)
+    noise.cast("uchar").copy(interpretation="srgb").write_to_file(str(path), **save_options)
+
+
+def _measure(path: str, max_side: int, queue) -> None:
+    """Runs in a fresh process so its peak RSS belongs to one decode only."""
+    _bootstrap_app()
+    from app.services.local_face_recognition import _decode_with_pyvips
+
+    try:
+        import cv2
+    except ImportError:
+        cv2 = None
+
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    if max_side or cv2 is None:
+        pixels = _decode_with_pyvips(path, max_side).pixels
+    else:
+        pixels = cv2.imread(path)
+    elapsed = time.perf_counter() - started
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((elapsed, (peak_kb - baseline_kb) / 1024, pixels.shape))
+
+
+def _run(path: Path, max_side: int, repeats: int) -> tuple[float, float, tuple]:
+    context = multiprocessing.get_context("spawn")
+    timings, peaks, shape = [], [], ()
+    for _index in range(repeats):
+        queue = context.Queue()
+        process = context.Process(target=_measure, args=(str(path), max_side, queue))
+        process.start()
+        elapsed, peak_mb, shape = queue.get()
+        process.join()
+        timings.append(elapsed)
+        peaks.append(peak_mb)
+    return statistics.median(timings), max(peaks), shape
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Time and peak memory of a full decode against the bounded decode used for face recognition."
+    )
+    parser.add_argument("--megapixels", type=float, nargs="+", default=[24, 100, 400])
+    parser.add_argument("--max-side", type=int, default=2048)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    _bootstrap_app()
+    try:
+        import cv2  # noqa: F401
+
+        full_reader = "cv2.imread"
+    except ImportError:
+        full_reader = "libvips full decode"
+
+    print(f"full decode with {full_reader}; bounded decode at {args.max_side}px with libvips thumbnail")
+    with tempfile.TemporaryDirectory(prefix="face-decode-bench-") as scratch:
+        for megapixels in args.megapixels:
+            originals = {
+                "JPEG": (Path(scratch) / f"original-{megapixels:g}.jpg", {"Q": 90}),
+                "pyramidal TIFF": (
+                    Path(scratch) / f"access-{megapixels:g}.tif",
+                    {"tile": True, "pyramid": True, "compression": "deflate", "bigtiff": True},
+                ),
+            }
+            for label, (path, save_options) in originals.items():
+                _write_original(path, megapixels, **save_options)
+                full_s, full_mb, full_shape = _run(path, 0, args.repeats)
+                bounded_s, bounded_mb, bounded_shape = _run(path, args.max_side, args.repeats)
+                print(f"{megapixels:g} MP {label} ({path.stat().st_size / 2**20:.0f} MiB on disk)", flush=True)
+                print(f"  full:    {full_s * 1000:8.0f}ms, peak +{full_mb:7.0f} MiB, {full_shape[1]}x{full_shape[0]}")
+                print(
+                    f"  bounded: {bounded_s * 1000:8.0f}ms, peak +{bounded_mb:7.0f} MiB, "
+                    f"{bounded_shape[1]}x{bounded_shape[0]} ({full_s / bounded_s:.1f}x faster)",
+                    flush=True,
+                )
+                path.unlink()
+
+
+if __name__ == "__main__":
+    main()
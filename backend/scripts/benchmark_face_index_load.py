@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pickle
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+
+def _bootstrap_app() -> None:
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    backend_root = Path(__file__).resolve().parents[1]
+    if str(backend_root) not in sys.path:
+        sys.path.insert(0, str(backend_root))
+
+
+def _write_legacy_index(index_dir: Path, faces: int, clusters: int, dims: int) -> None:
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    embeddings = {f"face-{n}": rng.standard_normal(dims).astype(np.float32) for n in range(faces)}
+    members: dict[str, list[str]] = {}
+    for n in range(faces):
+        members.setdefault(f"person-{n % clusters}", []).append(f"face-{n}")
+    meta = {
+        "clusters": {
+            cluster_id: {"name": cluster_id, "count": len(face_ids), "face_ids": face_ids}
+            for cluster_id, face_ids in members.items()
+        }
+    }
+    (index_dir / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+    with (index_dir / "embeddings.pkl").open("wb") as file_obj:
+        pickle.dump(embeddings, file_obj)
+
+
+def _measure(label: str, load, repeats: int) -> str:
+    latencies = []
+    for _index in range(repeats):
+        started = time.perf_counter()
+        load()
+        latencies.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    snapshot = load()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del snapshot
+    return (
+        f"{label:>6}: load p50 {statistics.median(latencies) * 1000:8.1f}ms, "
+        f"peak {peak / 2**20:7.1f} MiB, private after load {retained / 2**20:7.1f} MiB per process"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare loading the pickled face index with mapping the converted store.")
+    parser.add_argument("--faces", type=int, default=100_000)
+    parser.add_argument("--clusters", type=int, default=20_000)
+    parser.add_argument("--dims", type=int, default=512)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    _bootstrap_app()
+    from app.services import local_face_recognition
+    from app.services.face_index_store import convert_legacy_index
+
+    with tempfile.TemporaryDirectory(prefix="face-index-bench-") as scratch:
+        index_dir = Path(scratch)
+        _write_legacy_index(index_dir, args.faces, args.clusters, args.dims)
+        print(f"{args.faces} faces in {args.clusters} clusters, {args.dims} dims", flush=True)
+        print(_measure("pickle", lambda: local_face_recognition._build_index_snapshot(index_dir), args.repeats), flush=True)
+
+        started = time.perf_counter()
+        convert_legacy_index(index_dir)
+        print(f"converted in {(time.perf_counter() - started) * 1000:.0f}ms", flush=True)
+        print(_measure("mmap", lambda: local_face_recognition._build_index_snapshot(index_dir), args.repeats), flush=True)
+
+
+if __name__ == "__main__":
+    main()
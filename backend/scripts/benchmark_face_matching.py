@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+
+def _bootstrap_app() -> None:
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    backend_root = Path(__file__).resolve().parents[1]
+    if str(backend_root) not in sys.path:
+        sys.path.insert(0, str(backend_root))
+
+
+def _unit_rows(rng, rows: int, dims: int):
+    import numpy as np
+
+    matrix = rng.standard_normal((rows, dims)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix
+
+
+def _snapshot(centers):
+    from app.services.local_face_recognition import _FaceIndexSnapshot
+
+    return _FaceIndexSnapshot(
+        index_dir=Path("."),
+        source_key=("benchmark",),
+        clusters={},
+        cluster_ids=tuple(str(n) for n in range(len(centers))),
+        center_matrix=centers,
+    )
+
+
+def _legacy_match(faces, centers_by_id: dict):
+    """The per-face, per-cluster ``np.dot`` loop the matrix path replaced."""
+    import numpy as np
+
+    matches = []
+    for feature in faces:
+        best_score = -1.0
+        best_cluster_id = None
+        for cluster_id, center in centers_by_id.items():
+            score = float(np.dot(feature, center))
+            if score > best_score:
+                best_score = score
+                best_cluster_id = cluster_id
+        matches.append(best_cluster_id)
+    return matches
+
+
+def _time(call, repeats: int) -> float:
+    latencies = []
+    for _index in range(repeats):
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+    return statistics.median(latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time matching detected faces against face index galleries of growing size.")
+    parser.add_argument("--gallery-sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--faces", type=int, default=40, help="Faces per image, e.g. a group photograph.")
+    parser.add_argument("--dims", type=int, default=512)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--legacy-limit", type=int, default=10_000, help="Skip the legacy loop above this gallery size.")
+    args = parser.parse_args()
+
+    _bootstrap_app()
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    faces = _unit_rows(rng, args.faces, args.dims)
+    for gallery_size in args.gallery_sizes:
+        centers = np.ascontiguousarray(_unit_rows(rng, gallery_size, args.dims))
+        snapshot = _snapshot(centers)
+        matrix_s = _time(lambda: snapshot.match(faces), args.repeats)
+        line = f"{gallery_size:>7} clusters x {args.faces} faces: matrix {matrix_s * 1000:9.2f}ms"
+        if gallery_size <= args.legacy_limit:
+            centers_by_id = dict(zip(snapshot.cluster_ids, centers))
+            assert _legacy_match(faces, centers_by_id) == [match.cluster_id for match in snapshot.match(faces)]
+            legacy_s = _time(lambda: _legacy_match(faces, centers_by_id), max(1, args.repeats // 2))
+            line += f", legacy loop {legacy_s * 1000:9.2f}ms ({legacy_s / matrix_s:.0f}x)"
+        print(line, flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+def _bootstrap_app() -> None:
+    os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+    backend_root = Path(__file__).resolve().parents[1]
+    if str(backend_root) not in sys.path:
+        sys.path.insert(0, str(backend_root))
+
+
+def _start_stub_upstream(tile_bytes: bytes, latency_ms: float) -> ThreadingHTTPServer:
+    class StubTileHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):  # noqa: N802
+            if latency_ms:
+                time.sleep(latency_ms / 1000.0)
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(tile_bytes)))
+            self.send_header("ETag", '"stub-tile"')
+            self.send_header("Last-Modified", "Tue, 01 Jul 2025 00:00:00 GMT")
+            self.end_headers()
+            self.wfile.write(tile_bytes)
+
+        def log_message(self, *_args):
+            return
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubTileHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _build_benchmark_app(upstream_base_url: str):
+    from starlette.applications import Starlette
+    from starlette.concurrency import run_in_threadpool
+    from starlette.routing import Route
+
+    from app.routers import iiif as iiif_router
+
+    def _target(request) -> iiif_router._ProxyTarget:
+        suffix = request.path_params["suffix"]
+        return iiif_router._ProxyTarget(
+            asset_id=1,
+            target_url=f"{upstream_base_url}/stub.tif/{suffix}",
+            source_path="stub.tif",
+            resolved_identifier="stub.tif",
+            suffix=suffix,
+            iiif_ready=True,
+            visibility_scope="open",
+            # No fingerprint: measure the proxy path itself, not the tile cache.
+            source_fingerprint=None,
+            requested_version=None,
+        )
+
+    async def sync_proxy(request):
+        response, _cache_entry = await run_in_threadpool(
+            iiif_router._proxy_iiif_upstream_sync,
+            _target(request),
+            proxy_base_url="http://bench/iiif/1/service/stub.tif",
+        )
+        return response
+
+    async def async_proxy(request):
+        response, _cache_entry = await iiif_router._proxy_iiif_upstream_streaming(
+            _target(request),
+            proxy_base_url="http://bench/iiif/1/service/stub.tif",
+        )
+        return response
+
+    return Starlette(
+        routes=[
+            Route("/sync/{suffix:path}", sync_proxy),
+            Route("/async/{suffix:path}", async_proxy),
+        ]
+    )
+
+
+async def _drive(app, mode: str, tiles: int, concurrency: int) -> float:
+    import httpx
+
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def fetch(index: int) -> None:
+            column, row = index % 32, index // 32
+            async with semaphore:
+                response = await client.get(f"/{mode}/{column * 256},{row * 256},256,256/256,/0/default.jpg")
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(fetch(index) for index in range(tiles)))
+        return time.perf_counter() - started
+
+
+async def _run(args: argparse.Namespace) -> None:
+    from app.services.iiif_upstream import close_iiif_upstream_client
+
+    server = _start_stub_upstream(os.urandom(args.tile_bytes), args.latency_ms)
+    upstream_base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    app = _build_benchmark_app(upstream_base_url)
+    try:
+        for mode in ("sync", "async"):
+            await _drive(app, mode, min(args.tiles, args.concurrency), args.concurrency)
+            elapsed = await _drive(app, mode, args.tiles, args.concurrency)
+            print(f"{mode:>5}: {args.tiles} tiles in {elapsed:.3f}s -> {args.tiles / elapsed:.1f} tiles/sec")
+    finally:
+        await close_iiif_upstream_client()
+        server.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare sync and async IIIF tile proxy throughput against a local stub upstream.")
+    parser.add_argument("--tiles", type=int, default=2000, help="Number of tile requests per mode.")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent in-flight tile requests.")
+    parser.add_argument("--tile-bytes", type=int, default=24 * 1024, help="Size of each stub tile body.")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Artificial upstream latency per tile.")
+    args = parser.parse_args()
+
+    _bootstrap_app()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
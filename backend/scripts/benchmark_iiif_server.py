@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def _bootstrap_app() -> None:
+    os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+    backend_root = Path(__file__).resolve().parents[1]
+    if str(backend_root) not in sys.path:
+        sys.path.insert(0, str(backend_root))
+
+
+def _build_synthetic_pyramid(work_dir: str, width: int, height: int) -> str:
+    import pyvips
+
+    from app.services.iiif_access import generate_pyramidal_tiff_access_copy
+
+    source_path = os.path.join(work_dir, "synthetic.v")
+    # Gradient plus noise so JPEG encoding does real work on every tile.
+    gradient = pyvips.Image.xyz(width, height)
+    noise = pyvips.Image.gaussnoise(width, height, sigma=24, mean=128)
+    image = gradient[0].bandjoin([gradient[1], noise]).cast("uchar")
+    image.write_to_file(source_path)
+
+    output_path = os.path.join(work_dir, "synthetic.pyramidal.tiff")
+    generate_pyramidal_tiff_access_copy(source_path, output_path)
+    return output_path
+
+
+def _tile_suffixes(pyramid, tiles: int, seed: int) -> list[str]:
+    """Random tiles across every advertised scale factor, as a deep-zoom viewer would request them."""
+    rng = random.Random(seed)
+    suffixes: list[str] = []
+    for _index in range(tiles):
+        scale_factor = rng.choice(pyramid.scale_factors)
+        region_size = pyramid.tile_width * scale_factor
+        columns = max((pyramid.width + region_size - 1) // region_size, 1)
+        rows = max((pyramid.height + region_size - 1) // region_size, 1)
+        x = rng.randrange(columns) * region_size
+        y = rng.randrange(rows) * region_size
+        region_width = min(region_size, pyramid.width - x)
+        region_height = min(region_size, pyramid.height - y)
+        output_width = max((region_width + scale_factor - 1) // scale_factor, 1)
+        suffixes.append(f"{x},{y},{region_width},{region_height}/{output_width},/0/default.jpg")
+    return suffixes
+
+
+async def _measure(fetch, suffixes: list[str], concurrency: int) -> tuple[float, list[float]]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def run(suffix: str) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await fetch(suffix)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run(suffix) for suffix in suffixes))
+    return time.perf_counter() - started, latencies
+
+
+def _report(label: str, elapsed: float, latencies: list[float]) -> None:
+    ordered = sorted(latencies)
+    p50 = statistics.median(ordered) * 1000
+    p95 = ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] * 1000
+    print(
+        f"{label:>10}: {len(ordered)} tiles in {elapsed:.3f}s -> {len(ordered) / elapsed:.1f} tiles/sec, "
+        f"p50 {p50:.1f}ms, p95 {p95:.1f}ms"
+    )
+
+
+async def _run(args: argparse.Namespace) -> None:
+    from app.services.iiif_image_server import describe_pyramid, get_iiif_render_executor, render_iiif_image
+
+    with tempfile.TemporaryDirectory(prefix="iiif-bench-") as work_dir:
+        pyramid_path = args.pyramid or _build_synthetic_pyramid(work_dir, args.width, args.height)
+        pyramid = describe_pyramid(pyramid_path)
+        print(
+            f"pyramid: {pyramid.width}x{pyramid.height}, tiles {pyramid.tile_width}x{pyramid.tile_height}, "
+            f"scale factors {pyramid.scale_factors}"
+        )
+        suffixes = _tile_suffixes(pyramid, args.tiles, args.seed)
+
+        loop = asyncio.get_running_loop()
+        executor = get_iiif_render_executor()
+
+        async def native_fetch(suffix: str) -> None:
+            await loop.run_in_executor(executor, render_iiif_image, pyramid_path, suffix)
+
+        await _measure(native_fetch, suffixes[: args.concurrency], args.concurrency)
+        _report("native", *await _measure(native_fetch, suffixes, args.concurrency))
+
+        if not args.cantaloupe_url:
+            return
+
+        import httpx
+
+        base_url = f"{args.cantaloupe_url.rstrip('/')}/{args.identifier}"
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=60.0) as client:
+
+            async def cantaloupe_fetch(suffix: str) -> None:
+                response = await client.get(f"{base_url}/{suffix}")
+                response.raise_for_status()
+
+            await _measure(cantaloupe_fetch, suffixes[: args.concurrency], args.concurrency)
+            _report("cantaloupe", *await _measure(cantaloupe_fetch, suffixes, args.concurrency))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure native pyvips IIIF tile latency, optionally against a Cantaloupe serving the same pyramid."
+    )
+    parser.add_argument("--pyramid", help="Existing pyramidal TIFF to serve; a synthetic one is generated otherwise.")
+    parser.add_argument("--width", type=int, default=12000, help="Synthetic pyramid width.")
+    parser.add_argument("--height", type=int, default=9000, help="Synthetic pyramid height.")
+    parser.add_argument("--tiles", type=int, default=1000, help="Number of tile requests per server.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent in-flight tile requests.")
+    parser.add_argument("--seed", type=int, default=7, help="Seed for the tile request mix.")
+    parser.add_argument("--cantaloupe-url", help="Cantaloupe IIIF 2 base URL, e.g. http://localhost:8182/iiif/2.")
+    parser.add_argument("--identifier", help="Cantaloupe identifier of the same pyramid (required with --cantaloupe-url).")
+    args = parser.parse_args()
+    if args.cantaloupe_url and not args.identifier:
+        parser.error("--identifier is required with --cantaloupe-url")
+
+    _bootstrap_app()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+WORDS = ("bronze", "mirror", "vase", "scroll", "lamp", "jade", "seal", "bell", "ink", "silk", "porcelain", "lacquer")
+CJK_WORDS = ("青铜", "瓷器", "书画", "玉器", "漆器", "铜镜", "印章", "丝绸")
+
+
+def _bootstrap_app(database_url: str) -> None:
+    os.environ["DATABASE_URL"] = database_url
+    backend_root = Path(__file__).resolve().parents[1]
+    if str(backend_root) not in sys.path:
+        sys.path.insert(0, str(backend_root))
+
+
+def _synthetic_layers(rng: random.Random, index: int) -> dict:
+    title = " ".join(rng.sample(WORDS, 2)) + f" {rng.choice(CJK_WORDS)}"
+    return {
+        "core": {"title": title, "resource_type": "image_2d_cultural_object", "profile_label": "可移动文物"},
+        "technical": {"width": 6000, "height": 4000, "format_name": "TIFF", "fixity_sha256": f"{index:064x}"},
+        "management": {
+            "project_name": f"Survey {index % 40}",
+            "photographer": f"Photographer {index % 25}",
+            "keywords": rng.sample(WORDS, 4),
+        },
+        "profile": {"key": "movable_artifact", "fields": {"object_number": f"故宫{index:06d}", "object_name": title}},
+        "raw_metadata": {"EXIF": {f"Tag{n}": f"value-{index}-{n}" for n in range(40)}},
+    }
+
+
+def _insert_assets(engine, count: int, seed: int) -> None:
+    from app.models import Asset
+    from app.services.search_index import build_asset_search_text
+
+    rng = random.Random(seed)
+    base_time = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    batch = []
+    with engine.begin() as connection:
+        for index in range(count):
+            layers = _synthetic_layers(rng, index)
+            row = {
+                "id": index + 1,
+                "filename": f"asset-{index}.tif",
+                "file_path": f"/uploads/asset-{index}.tif",
+                "mime_type": "image/tiff",
+                "status": "ready",
+                "visibility_scope": "open",
+                "resource_type": "image_2d_cultural_object",
+                "metadata_info": layers,
+                "created_at": base_time + timedelta(seconds=index),
+                "title": layers["core"]["title"],
+                "profile_key": "movable_artifact",
+                "preview_enabled": True,
+            }
+            row["search_text"] = build_asset_search_text(SimpleNamespace(**row), layers)
+            batch.append(row)
+            if len(batch) == 5000:
+                connection.execute(Asset.__table__.insert(), batch)
+                batch = []
+        if batch:
+            connection.execute(Asset.__table__.insert(), batch)
+
+
+def _legacy_search(db, query: str) -> int:
+    """The pre-index implementation: build every asset's layers and substring-match their values."""
+    from app.models import Asset
+    from app.services.metadata_layers import build_metadata_layers
+
+    matches = 0
+    for asset in db.query(Asset).order_by(Asset.created_at.desc(), Asset.id.desc()).all():
+        layers = build_metadata_layers(
+            asset_id=asset.id,
+            asset_filename=asset.filename,
+            asset_file_path=asset.file_path,
+            asset_file_size=asset.file_size,
+            asset_mime_type=asset.mime_type,
+            asset_status=asset.status,
+            asset_resource_type=asset.resource_type,
+            asset_created_at=asset.created_at,
+            metadata=asset.metadata_info or {},
+        )
+        tokens = [asset.filename or "", str(layers["core"].get("title") or "")]
+        for section in ("management", "technical", "raw_metadata"):
+            tokens.extend(str(value) for value in (layers.get(section) or {}).values())
+        tokens.extend(str(value) for value in ((layers.get("profile") or {}).get("fields") or {}).values())
+        if query in " ".join(tokens).lower():
+            matches += 1
+    return matches
+
+
+def _measure(session_factory, call, repeats: int) -> tuple[list[float], int]:
+    latencies: list[float] = []
+    result_count = 0
+    for _index in range(repeats):
+        with session_factory() as db:
+            started = time.perf_counter()
+            result_count = call(db)
+            latencies.append(time.perf_counter() - started)
+    return latencies, result_count
+
+
+def _report(label: str, latencies: list[float], result_count: int) -> str:
+    ordered = sorted(latencies)
+    p95 = ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] * 1000
+    return f"{label} p50 {statistics.median(ordered) * 1000:9.2f}ms p95 {p95:9.2f}ms ({result_count} hits)"
+
+
+def _run(args: argparse.Namespace) -> None:
+    from app.database import Base, SessionLocal, engine
+    from app.platform.image_source import list_unified_resources_filtered
+    from app.services.search_index import ensure_search_indexes
+
+    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    _insert_assets(engine, args.assets, args.seed)
+    ensure_search_indexes(engine)
+    print(f"{engine.dialect.name}: indexed {args.assets} assets in {time.perf_counter() - started:.1f}s", flush=True)
+
+    for query in args.queries:
+        normalized = query.strip().lower()
+        indexed = _measure(
+            SessionLocal, lambda db: len(list_unified_resources_filtered(db, q=normalized)), args.repeats
+        )
+        line = f"{query!r:>16}: {_report('indexed', *indexed)}"
+        if not args.skip_legacy:
+            line += f" | {_report('legacy', *_measure(SessionLocal, lambda db: _legacy_search(db, normalized), 1))}"
+        print(line, flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure /platform/resources?q= latency from the search index against the old per-asset scan."
+    )
+    parser.add_argument("--assets", type=int, default=50_000, help="Synthetic assets to index.")
+    parser.add_argument(
+        "--queries",
+        nargs="+",
+        default=["bronze mirror", "故宫000123", "铜镜", "survey 7", "no-such-term"],
+        help="Search strings to time.",
+    )
+    parser.add_argument("--repeats", type=int, default=20, help="Requests per query.")
+    parser.add_argument("--skip-legacy", action="store_true", help="Only time the indexed search.")
+    parser.add_argument("--seed", type=int, default=7, help="Seed for the synthetic corpus.")
+    parser.add_argument("--database-url", help="Database to fill; a temporary SQLite file is used otherwise.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="resource-search-bench-") as work_dir:
+        _bootstrap_app(args.database_url or f"sqlite:///{os.path.join(work_dir, 'assets.db')}")
+        _run(args)
+
+
+if __name__ == "__main__":
+    main()
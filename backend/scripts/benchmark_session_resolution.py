@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def _bootstrap_app(database_url: str) -> None:
+    os.environ.setdefault("DATABASE_URL", database_url)
+    backend_root = Path(__file__).resolve().parents[1]
+    if str(backend_root) not in sys.path:
+        sys.path.insert(0, str(backend_root))
+
+
+def _measure(label: str, db, engine, tokens: list[str], repeats: int) -> str:
+    from sqlalchemy import event
+
+    from app.permissions import get_current_user
+
+    queries = [0]
+
+    def count(*_args):
+        queries[0] += 1
+
+    latencies: list[float] = []
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        for _index in range(repeats):
+            for token in tokens:
+                started = time.perf_counter()
+                get_current_user(db=db, authorization=f"Bearer {token}")
+                latencies.append(time.perf_counter() - started)
+                # A request session starts with an empty identity map.
+                db.expunge_all()
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    requests = repeats * len(tokens)
+    return (
+        f"{label:>5}: {queries[0] / requests:4.1f} queries/request, "
+        f"p50 {statistics.median(latencies) * 1_000_000:8.1f}us over {requests} requests"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Queries and latency of resolving a session token, with and without the user cache.")
+    parser.add_argument("--database-url", help="Empty database to fill; a temporary SQLite file is used otherwise.")
+    parser.add_argument("--sessions", type=int, default=11, help="Distinct logged-in users (at most one per seeded account).")
+    parser.add_argument("--repeats", type=int, default=200, help="Requests per session, e.g. tiles of one viewer.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        database_url = args.database_url or f"sqlite:///{Path(scratch) / 'sessions.db'}"
+        _bootstrap_app(database_url)
+
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+
+        from app.database import Base
+        from app.models import User
+        from app.services.auth import create_user_session, seed_auth_data
+        from app.services import session_user_cache
+        from app.services.session_user_cache import SessionUserCache, get_session_user_cache_stats
+
+        engine = create_engine(database_url)
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        try:
+            seed_auth_data(db)
+            users = db.query(User).order_by(User.id).limit(args.sessions).all()
+            tokens = [create_user_session(db, user).session_token for user in users]
+
+            session_user_cache._CACHE = SessionUserCache(ttl_seconds=0, max_entries=0)
+            print(_measure("off", db, engine, tokens, args.repeats), flush=True)
+            session_user_cache._CACHE = SessionUserCache(ttl_seconds=300, max_entries=4096)
+            _measure("prime", db, engine, tokens, 1)
+            print(_measure("warm", db, engine, tokens, args.repeats), flush=True)
+            print(f"cache: {get_session_user_cache_stats()}", flush=True)
+        finally:
+            db.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+
+# Runs in a fresh interpreter per sample so every import is cold.
+WORKER_SCRIPT = """
+import json, sys, time
+
+started = time.perf_counter()
+mode = sys.argv[1]
+import app.main
+if mode == "legacy":
+    # What importing app.main did before the bootstrap command existed.
+    import pyvips
+    from app.bootstrap import bootstrap_database
+    bootstrap_database(force_seed=True)
+imported = time.perf_counter()
+
+from fastapi.testclient import TestClient
+
+with TestClient(app.main.app) as client:
+    ready = time.perf_counter()
+    response = client.get("/health")
+    answered = time.perf_counter()
+assert response.status_code == 200, response.text
+
+heavy = [name for name in ("pyvips", "numpy", "insightface") if name in sys.modules]
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "first_request_ms": (answered - ready) * 1000,
+    "heavy_modules": heavy,
+}))
+"""
+
+MODES = {
+    # mode -> DATABASE_BOOTSTRAP_ON_STARTUP
+    "legacy": "0",
+    "startup-hook": "1",
+    "bootstrapped": "0",
+}
+
+
+def _environment(database_url: str, upload_dir: str, **overrides: str) -> dict[str, str]:
+    return {**os.environ, "DATABASE_URL": database_url, "UPLOAD_DIR": upload_dir, "DOTENV_LOADED": "1", **overrides}
+
+
+def _sample(mode: str, database_url: str, upload_dir: str) -> dict:
+    env = _environment(database_url, upload_dir, DATABASE_BOOTSTRAP_ON_STARTUP=MODES[mode])
+    completed = subprocess.run(
+        [sys.executable, "-c", WORKER_SCRIPT, mode],
+        cwd=BACKEND_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Cold import, startup and first-request time of one API worker, before and after the bootstrap command."
+    )
+    parser.add_argument("--database-url", help="Database to bootstrap; a temporary SQLite file is used otherwise.")
+    parser.add_argument("--repeats", type=int, default=5, help="Fresh interpreters per mode.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        database_url = args.database_url or f"sqlite:///{Path(scratch) / 'startup.db'}"
+        subprocess.run(
+            [sys.executable, "-m", "app.bootstrap"],
+            cwd=BACKEND_ROOT,
+            env=_environment(database_url, scratch),
+            check=True,
+        )
+        for mode in MODES:
+            samples = [_sample(mode, database_url, scratch) for _index in range(args.repeats)]
+            # Cold starts are noisy; the minimum is the least disturbed sample.
+            import_ms = [sample["import_ms"] for sample in samples]
+            startup_ms = min(sample["startup_ms"] for sample in samples)
+            first_ms = min(sample["first_request_ms"] for sample in samples)
+            heavy = ", ".join(samples[-1]["heavy_modules"]) or "none"
+            print(
+                f"{mode:>12}: import min {min(import_ms):7.1f}ms / p50 {statistics.median(import_ms):7.1f}ms, "
+                f"startup {startup_ms:6.1f}ms, first request {first_ms:5.1f}ms, heavy modules: {heavy}",
+                flush=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
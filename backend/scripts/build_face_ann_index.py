@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+
+def _bootstrap_app() -> None:
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    backend_root = Path(__file__).resolve().parents[1]
+    if str(backend_root) not in sys.path:
+        sys.path.insert(0, str(backend_root))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Train the IVF (and optional PQ) index over the face index store's cluster centres."
+    )
+    parser.add_argument(
+        "--index-dir",
+        default=None,
+        help="Face index directory holding store/. Defaults to FACE_RECOGNITION_INDEX_DIR.",
+    )
+    parser.add_argument("--nlist", type=int, default=0, help="Inverted lists. 0 means about 4 * sqrt(clusters).")
+    parser.add_argument(
+        "--pq-subvectors",
+        type=int,
+        default=0,
+        help="Product-quantisation sub-vectors per centre; must divide the embedding size. 0 disables PQ.",
+    )
+    args = parser.parse_args()
+
+    _bootstrap_app()
+
+    from app import config
+    from app.services.face_index_store import build_ann_index, get_store_dir
+
+    index_dir = Path(args.index_dir or config.FACE_RECOGNITION_INDEX_DIR).expanduser().resolve()
+    started = time.perf_counter()
+    result = build_ann_index(get_store_dir(index_dir), nlist=args.nlist or None, pq_subvectors=args.pq_subvectors)
+    print(
+        f"Built IVF{result['nlist']}"
+        + (f",PQ{result['pq_subvectors']}" if result["pq_subvectors"] else "")
+        + f" for generation {result['generation']} in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
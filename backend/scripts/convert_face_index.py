@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+
+def _bootstrap_app() -> None:
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    backend_root = Path(__file__).resolve().parents[1]
+    if str(backend_root) not in sys.path:
+        sys.path.insert(0, str(backend_root))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Convert a meta.json + embeddings.pkl face index into the memory-mapped store that workers load."
+    )
+    parser.add_argument(
+        "--index-dir",
+        default=None,
+        help="Directory holding meta.json and embeddings.pkl. Defaults to FACE_RECOGNITION_INDEX_DIR.",
+    )
+    args = parser.parse_args()
+
+    _bootstrap_app()
+
+    from app import config
+    from app.services.face_index_store import convert_legacy_index, get_store_dir
+
+    index_dir = Path(args.index_dir or config.FACE_RECOGNITION_INDEX_DIR).expanduser().resolve()
+    result = convert_legacy_index(index_dir)
+    print(
+        f"Wrote generation {result['generation']} to {get_store_dir(index_dir)}: "
+        f"{result['faces']} faces in {result['clusters']} clusters"
+    )
+
+
+if __name__ == "__main__":
+    main()
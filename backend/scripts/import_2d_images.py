@@ -172,6 +172,7 @@ def main() -> None:
                 file_path=str(target_file),
                 file_size=target_file.stat().st_size,
                 mime_type="image/jpeg",
+                fixity_sha256=metadata.get("fixity_sha256"),
                 status="ready",
                 resource_type="image_2d_cultural_object",
                 process_message="Imported from DigicolPhotoScan living utensils dataset",
@@ -17,6 +17,7 @@ def _bootstrap_app(database_url: str, upload_dir: str) -> None:
 async def _ingest_one(ingest_router, session, image_path: Path, import_filename: str, manifest: dict[str, object]) -> dict[str, object]:
     from fastapi import UploadFile
     from starlette.datastructures import Headers
+    from starlette.requests import Request
 
     with image_path.open("rb") as handle:
         upload = UploadFile(
@@ -25,6 +26,7 @@ async def _ingest_one(ingest_router, session, image_path: Path, import_filename:
             headers=Headers({"content-type": "image/tiff" if image_path.suffix.lower() in {".tif", ".tiff"} else "image/jpeg"}),
         )
         return await ingest_router.ingest_sip(
+            request=Request({"type": "http", "method": "POST", "path": "/ingest/sip", "headers": []}),
             file=upload,
             manifest=json.dumps(manifest, ensure_ascii=False),
             db=session,
@@ -1,9 +1,10 @@
 import os
 import sys
+from contextlib import contextmanager
 from pathlib import Path
 
 import pytest
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 
@@ -109,3 +110,44 @@ def db_session(db_engine):
         yield session
     finally:
         session.close()
+
+
+@pytest.fixture()
+def query_budget(db_engine):
+    """``with query_budget(n):`` fails the test when the block runs more than ``n`` SQL statements."""
+
+    @contextmanager
+    def budget(limit: int):
+        statements: list[str] = []
+
+        def record(_connection, _cursor, statement, *_args):
+            statements.append(statement)
+
+        event.listen(db_engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(db_engine, "before_cursor_execute", record)
+        assert len(statements) <= limit, f"{len(statements)} statements over a budget of {limit}:\n" + "\n".join(statements)
+
+    return budget
+
+
+@pytest.fixture(autouse=True)
+def queued_preview_ladders(monkeypatch):
+    """Routes enqueue the preview ladder once an asset is ready; record instead of hitting the broker."""
+    from app.tasks import generate_preview_ladder
+
+    queued: list[int] = []
+    monkeypatch.setattr(generate_preview_ladder, "delay", lambda asset_id: queued.append(asset_id))
+    return queued
+
+
+@pytest.fixture(autouse=True)
+def fresh_session_user_cache():
+    """Each test rebuilds the schema, so user ids repeat; never serve a user cached by an earlier test."""
+    from app.services.session_user_cache import reset_session_user_cache
+
+    reset_session_user_cache()
+    yield
+    reset_session_user_cache()
@@ -0,0 +1,68 @@
+import hashlib
+
+import pytest
+
+from app.models import Asset
+from app.services.asset_fixity import backfill_asset_fixity, find_assets_by_fixity, normalize_fixity_sha256
+
+
+pytestmark = [pytest.mark.unit, pytest.mark.integration]
+
+
+def _sha256(label: str) -> str:
+    return hashlib.sha256(label.encode("utf-8")).hexdigest()
+
+
+def _insert_legacy_asset(db_session, *, asset_id: int, technical: dict, fixity_sha256: str | None = None) -> None:
+    # Written around the ORM, like rows that predate the column.
+    db_session.execute(
+        Asset.__table__.insert().values(
+            id=asset_id,
+            filename=f"asset-{asset_id}.jpg",
+            file_path=f"/tmp/asset-{asset_id}.jpg",
+            file_size=128,
+            mime_type="image/jpeg",
+            fixity_sha256=fixity_sha256,
+            status="ready",
+            metadata_info={"core": {}, "technical": technical, "management": {}, "raw_metadata": {}},
+        )
+    )
+    db_session.commit()
+
+
+def test_normalize_fixity_sha256_rejects_non_hashes():
+    assert normalize_fixity_sha256(f"  {_sha256('a').upper()} ") == _sha256("a")
+    assert normalize_fixity_sha256("not-a-hash") is None
+    assert normalize_fixity_sha256(None) is None
+
+
+def test_backfill_copies_metadata_hashes_and_lookup_uses_column(db_session):
+    _insert_legacy_asset(db_session, asset_id=1, technical={"fixity_sha256": _sha256("one").upper()})
+    _insert_legacy_asset(db_session, asset_id=2, technical={"checksum": _sha256("one")})
+    _insert_legacy_asset(db_session, asset_id=3, technical={})
+    _insert_legacy_asset(db_session, asset_id=4, technical={}, fixity_sha256=_sha256("two"))
+
+    assert find_assets_by_fixity(db_session, _sha256("one")) == []
+
+    result = backfill_asset_fixity(db_session, batch_size=1)
+
+    assert result == {"updated": 2, "missing": 1}
+    assert [asset.id for asset in find_assets_by_fixity(db_session, _sha256("one").upper())] == [1, 2]
+    assert [asset.id for asset in find_assets_by_fixity(db_session, _sha256("two"))] == [4]
+    assert find_assets_by_fixity(db_session, "") == []
+    assert backfill_asset_fixity(db_session) == {"updated": 0, "missing": 1}
+
+
+def test_orm_writes_fill_fixity_from_metadata(db_session):
+    db_session.add(
+        Asset(
+            id=10,
+            filename="new.jpg",
+            file_path="/tmp/new.jpg",
+            status="ready",
+            metadata_info={"technical": {"fixity_sha256": _sha256("new")}},
+        )
+    )
+    db_session.commit()
+
+    assert [asset.id for asset in find_assets_by_fixity(db_session, _sha256("new"))] == [10]
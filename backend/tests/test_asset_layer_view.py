@@ -0,0 +1,124 @@
+import pytest
+
+from app.models import Asset
+from app.services import iiif_access
+from app.services.iiif_access import (
+    get_asset_iiif_access_file_path,
+    get_asset_iiif_access_mime_type,
+    get_asset_layer_view,
+    get_asset_original_file_path,
+    get_asset_primary_file_path,
+    is_iiif_ready,
+    populate_iiif_access_metadata,
+    requires_iiif_access_derivative,
+)
+
+
+pytestmark = pytest.mark.unit
+
+
+def _asset(metadata_info: dict, *, file_path: str = "/uploads/scan.tif", mime_type: str = "image/tiff") -> Asset:
+    return Asset(
+        id=7,
+        filename="scan.tif",
+        file_path=file_path,
+        file_size=2048,
+        mime_type=mime_type,
+        status="ready",
+        metadata_info=metadata_info,
+    )
+
+
+def _count_layer_builds(monkeypatch) -> list[int]:
+    calls = [0]
+    build = iiif_access.build_metadata_layers
+
+    def counting_build(**kwargs):
+        calls[0] += 1
+        return build(**kwargs)
+
+    monkeypatch.setattr(iiif_access, "build_metadata_layers", counting_build)
+    return calls
+
+
+def test_path_helpers_share_one_layer_build(monkeypatch):
+    asset = _asset(
+        {
+            "core": {"title": "Scroll"},
+            "technical": {"width": 6000, "height": 4000, "fixity_sha256": "a" * 64},
+            "raw_metadata": {"EXIF": {"Make": "Phase One"}},
+        }
+    )
+    calls = _count_layer_builds(monkeypatch)
+
+    assert get_asset_iiif_access_file_path(asset) == "/uploads/scan.tif"
+    assert get_asset_original_file_path(asset) == "/uploads/scan.tif"
+    assert get_asset_primary_file_path(asset) == "/uploads/scan.tif"
+    assert get_asset_iiif_access_mime_type(asset) == "image/tiff"
+    assert is_iiif_ready(asset) is True
+    view = get_asset_layer_view(asset)
+    assert view.dimensions == (6000, 4000)
+    assert view.fixity_sha256 == "a" * 64
+    assert calls[0] == 1
+
+    # The raw dump is shared with the stored metadata rather than copied.
+    assert view.layers["raw_metadata"]["EXIF"] is asset.metadata_info["raw_metadata"]["EXIF"]
+
+
+def test_layer_view_follows_metadata_and_column_changes(monkeypatch):
+    asset = _asset({"technical": {"width": 100, "height": 50}})
+    calls = _count_layer_builds(monkeypatch)
+    assert get_asset_layer_view(asset).width == 100
+
+    asset.metadata_info = {"technical": {"width": 300, "height": 50}}
+    assert get_asset_layer_view(asset).width == 300
+
+    asset.file_path = "/uploads/replaced.tif"
+    assert get_asset_original_file_path(asset) == "/uploads/replaced.tif"
+    assert calls[0] == 3
+
+
+def test_layer_view_is_read_only():
+    view = get_asset_layer_view(_asset({"technical": {"width": 100}}))
+
+    with pytest.raises(AttributeError):
+        view.width = 1
+    with pytest.raises(TypeError):
+        view.technical["width"] = 1
+    with pytest.raises(TypeError):
+        view.layers["core"]["title"] = "changed"
+
+    copy = view.as_dict()
+    copy["technical"]["width"] = 1
+    assert view.width == 100
+
+
+@pytest.mark.parametrize(
+    "metadata_info",
+    [
+        {},
+        {"technical": {"original_file_path": "/archive/scan.psb", "derivative_rule_id": "psb_mandatory_access_bigtiff"}},
+        {"technical": {"derivative_priority": "required"}},
+        {
+            "technical": {
+                "iiif_access_file_path": "/uploads/derivatives/asset-7/iiif-access.pyramidal.tiff",
+                "iiif_access_mime_type": "image/tiff",
+            }
+        },
+    ],
+)
+def test_layer_view_matches_populated_access_metadata(metadata_info):
+    asset = _asset(metadata_info)
+    populated = populate_iiif_access_metadata(
+        metadata_info,
+        asset_file_path=asset.file_path,
+        asset_filename=asset.filename,
+        asset_file_size=asset.file_size,
+        asset_mime_type=asset.mime_type,
+    )["technical"]
+
+    view = get_asset_layer_view(asset)
+    assert view.iiif_access_file_path == populated.get("iiif_access_file_path")
+    assert view.iiif_access_mime_type == populated.get("iiif_access_mime_type")
+    assert view.original_file_path == (populated.get("original_file_path") or asset.file_path)
+    assert view.requires_iiif_access_derivative == requires_iiif_access_derivative({"technical": populated})
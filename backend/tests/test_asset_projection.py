@@ -0,0 +1,96 @@
+import pytest
+
+from app.models import Asset
+from app.platform.image_source import list_unified_resources_filtered
+from app.services.asset_projection import backfill_asset_projection
+
+
+pytestmark = [pytest.mark.unit, pytest.mark.integration]
+
+
+def _artifact_metadata(title: str, object_number: str) -> dict:
+    return {
+        "core": {"title": title},
+        "technical": {"width": 4000, "height": 3000, "derivative_rule_id": "jpeg_direct_access"},
+        "management": {},
+        "profile": {"key": "movable_artifact", "fields": {"object_number": object_number}},
+        "raw_metadata": {},
+    }
+
+
+def test_orm_writes_keep_projected_columns_in_sync(db_session, tmp_path):
+    asset = Asset(
+        id=1,
+        filename="vase.jpg",
+        file_path=str(tmp_path / "vase.jpg"),
+        mime_type="image/jpeg",
+        status="processing",
+        metadata_info=_artifact_metadata("Blue Vase", "OBJ-1"),
+    )
+    db_session.add(asset)
+    db_session.commit()
+
+    assert asset.title == "Blue Vase"
+    assert asset.profile_key == "movable_artifact"
+    assert asset.object_number == "OBJ-1"
+    assert (asset.width, asset.height) == (4000, 3000)
+    assert asset.derivative_rule_id == "jpeg_direct_access"
+    assert asset.iiif_access_file_path == str(tmp_path / "vase.jpg")
+    assert asset.preview_enabled is False
+
+    asset.status = "ready"
+    db_session.commit()
+
+    assert asset.preview_enabled is True
+
+
+def test_platform_filters_run_on_projected_columns(db_session, tmp_path):
+    db_session.add_all(
+        [
+            Asset(
+                id=1,
+                filename="vase.jpg",
+                file_path=str(tmp_path / "vase.jpg"),
+                mime_type="image/jpeg",
+                status="ready",
+                metadata_info=_artifact_metadata("Blue Vase", "OBJ-1"),
+            ),
+            Asset(
+                id=2,
+                filename="pending.jpg",
+                file_path=str(tmp_path / "pending.jpg"),
+                mime_type="image/jpeg",
+                status="processing",
+                metadata_info=_artifact_metadata("Pending Vase", "OBJ-2"),
+            ),
+            Asset(id=3, filename="other.jpg", file_path=str(tmp_path / "other.jpg"), status="ready", metadata_info={}),
+        ]
+    )
+    db_session.commit()
+
+    artifacts = list_unified_resources_filtered(db_session, profile_key="movable_artifact")
+    previewable = list_unified_resources_filtered(db_session, profile_key="movable_artifact", preview_enabled=True)
+    searched = list_unified_resources_filtered(db_session, q="obj-2")
+
+    assert [resource.source_id for resource in artifacts] == ["2", "1"]
+    assert [(resource.source_id, resource.title) for resource in previewable] == [("1", "Blue Vase")]
+    assert [resource.source_id for resource in searched] == ["2"]
+
+
+def test_backfill_projects_rows_written_around_the_orm(db_session, tmp_path):
+    db_session.execute(
+        Asset.__table__.insert().values(
+            id=7,
+            filename="legacy.jpg",
+            file_path=str(tmp_path / "legacy.jpg"),
+            mime_type="image/jpeg",
+            status="ready",
+            metadata_info=_artifact_metadata("Legacy Vase", "OBJ-7"),
+        )
+    )
+    db_session.commit()
+
+    assert backfill_asset_projection(db_session, batch_size=10) == 1
+
+    legacy = db_session.get(Asset, 7)
+    assert (legacy.title, legacy.profile_key, legacy.preview_enabled) == ("Legacy Vase", "movable_artifact", True)
@@ -0,0 +1,63 @@
+import pytest
+
+from app.models import Asset, AssetSourceMetadata
+from app.services.asset_detail import build_asset_detail_response
+from app.services.asset_source_metadata import migrate_asset_source_metadata
+
+
+pytestmark = [pytest.mark.unit, pytest.mark.integration]
+
+EXIF_DUMP = {"EXIF": {"Make": "Phase One", "Model": "IQ4 150MP"}, "File": {"ImageWidth": 14204}}
+
+
+def _insert_legacy_asset(db_session, asset_id: int, raw_metadata: dict) -> None:
+    # Core insert, as rows written before the move still carry the dump inline.
+    db_session.execute(
+        Asset.__table__.insert(),
+        {
+            "id": asset_id,
+            "filename": f"scan-{asset_id}.tif",
+            "file_path": f"/uploads/scan-{asset_id}.tif",
+            "file_size": 4096,
+            "mime_type": "image/tiff",
+            "status": "ready",
+            "metadata_info": {"core": {"title": f"Scan {asset_id}"}, "technical": {}, "raw_metadata": raw_metadata},
+        },
+    )
+    db_session.commit()
+
+
+def test_migration_moves_exif_dump_to_side_table(db_session):
+    _insert_legacy_asset(db_session, 1, {"exif_metadata": EXIF_DUMP, "server_hash": "a" * 64})
+    _insert_legacy_asset(db_session, 2, {"server_hash": "b" * 64})
+
+    assert migrate_asset_source_metadata(db_session, batch_size=1) == {"visited": 2, "moved": 1}
+    assert migrate_asset_source_metadata(db_session) == {"visited": 2, "moved": 0}
+
+    migrated = db_session.get(Asset, 1)
+    assert migrated.metadata_info["raw_metadata"] == {"server_hash": "a" * 64}
+    assert migrated.metadata_info["core"]["title"] == "Scan 1"
+    assert migrated.source_metadata_record.payload == {"exif_metadata": EXIF_DUMP}
+    assert db_session.get(Asset, 2).source_metadata_record is None
+
+    detail = build_asset_detail_response(migrated)
+    assert detail.metadata_layers["raw_metadata"] == {"server_hash": "a" * 64, "exif_metadata": EXIF_DUMP}
+
+
+def test_source_metadata_is_deleted_with_its_asset(db_session):
+    asset = Asset(
+        filename="scan.tif",
+        file_path="/uploads/scan.tif",
+        file_size=4096,
+        mime_type="image/tiff",
+        status="ready",
+        metadata_info={},
+        source_metadata_record=AssetSourceMetadata(payload={"exif_metadata": EXIF_DUMP}),
+    )
+    db_session.add(asset)
+    db_session.commit()
+
+    db_session.delete(asset)
+    db_session.commit()
+
+    assert db_session.query(AssetSourceMetadata).count() == 0
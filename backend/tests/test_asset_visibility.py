@@ -6,6 +6,8 @@ from app.models import Asset
 from app.permissions import build_system_user, get_current_user
 from app.routers import assets as assets_router
 from app.routers import iiif as iiif_router
+from app.services.iiif_access import build_iiif_source_fingerprint
+from app.services.iiif_capability import issue_iiif_capability
 
 
 pytestmark = [pytest.mark.unit, pytest.mark.integration]
@@ -88,6 +90,42 @@ def test_asset_list_filters_owner_only_scope(db_session):
     assert {asset.id for asset in admin_assets} == {open_asset.id, owner_asset.id}
 
 
+
+def test_asset_list_pages_with_after_id_and_sql_visibility(db_session):
+    for offset in range(6):
+        _create_asset(
+            db_session,
+            asset_id=2001 + offset,
+            filename=f"asset-{offset}.jpg",
+            visibility_scope="owner_only" if offset % 2 else "open",
+            collection_object_id=42 if offset % 2 else None,
+        )
+    owner_user = get_current_user(x_mdams_user="collection-owner", x_mdams_collection_scope="42")
+    public_user = get_current_user(x_mdams_user="resource-user")
+
+    first_page = assets_router.list_assets(limit=2, db=db_session, user=owner_user)
+    second_page = assets_router.list_assets(limit=2, after_id=first_page[-1].id, db=db_session, user=owner_user)
+    skipped_page = assets_router.list_assets(skip=2, limit=2, db=db_session, user=owner_user)
+    public_assets = assets_router.list_assets(limit=10, db=db_session, user=public_user)
+
+    assert [asset.id for asset in first_page] == [2006, 2005]
+    assert [asset.id for asset in second_page] == [2004, 2003]
+    assert [asset.id for asset in skipped_page] == [2004, 2003]
+    assert [asset.id for asset in public_assets] == [2005, 2003, 2001]
+
+
+def test_asset_list_rechecks_scope_recorded_only_in_metadata(db_session):
+    hidden_asset = _create_asset(db_session, asset_id=3001, filename="legacy.jpg", visibility_scope="owner_only", collection_object_id=7)
+    hidden_asset.visibility_scope = None
+    hidden_asset.collection_object_id = None
+    db_session.commit()
+
+    public_user = get_current_user(x_mdams_user="resource-user")
+    owner_user = get_current_user(x_mdams_user="collection-owner", x_mdams_collection_scope="7")
+
+    assert assets_router.list_assets(db=db_session, user=public_user) == []
+    assert [asset.id for asset in assets_router.list_assets(db=db_session, user=owner_user)] == [hidden_asset.id]
+
 def test_iiif_manifest_blocks_hidden_assets(db_session, monkeypatch, tmp_path):
     hidden_file = tmp_path / "hidden.jpg"
     hidden_file.write_bytes(b"test-hidden-image")
@@ -122,5 +160,7 @@ def test_iiif_manifest_blocks_hidden_assets(db_session, monkeypatch, tmp_path):
     )
     assert manifest["id"].endswith(f"/iiif/{owner_asset.id}/manifest")
     assert manifest["items"][0]["items"][0]["items"][0]["body"]["service"][0]["id"] == (
-        f"http://localhost:3000/api/iiif/{owner_asset.id}/service/hidden.jpg"
+        f"http://localhost:3000/api/iiif/{owner_asset.id}/capability/"
+        f"{issue_iiif_capability(owner_asset.id, 'hidden.jpg', 'owner_only')}/"
+        f"v-{build_iiif_source_fingerprint(str(hidden_file))}/hidden.jpg"
     )
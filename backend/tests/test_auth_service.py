@@ -1,12 +1,14 @@
 import pytest
 
 from app.models import Role, User
+from app.services import auth as auth_service
 from app.services.auth import (
     DEFAULT_PASSWORD,
     authenticate_user,
     create_user_session,
     get_user_by_session_token,
     seed_auth_data,
+    seed_auth_data_if_changed,
 )
 
 
@@ -36,3 +38,19 @@ def test_authenticate_seeded_user_and_session(db_session):
 
     assert resolved_user is not None
     assert resolved_user.username == "system_admin"
+
+
+def test_auth_seed_is_skipped_until_its_definitions_change(db_session, monkeypatch):
+    assert seed_auth_data_if_changed(db_session) is True
+    assert seed_auth_data_if_changed(db_session) is False
+
+    user = db_session.query(User).filter(User.username == "resource_user").one()
+    user.display_name = "Edited by an administrator"
+    db_session.commit()
+    assert seed_auth_data_if_changed(db_session) is False
+    assert db_session.get(User, user.id).display_name == "Edited by an administrator"
+
+    monkeypatch.setattr(auth_service, "AUTH_SEED_VERSION", auth_service.AUTH_SEED_VERSION + 1)
+    assert seed_auth_data_if_changed(db_session) is True
+    assert db_session.get(User, user.id).display_name == "资源使用者"
+    assert seed_auth_data_if_changed(db_session, force=True) is True
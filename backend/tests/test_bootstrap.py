@@ -0,0 +1,76 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import inspect, select
+
+from app.bootstrap import bootstrap_database
+from app.database import Base
+from app.models import Asset
+
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.mark.unit
+def test_importing_the_app_touches_no_database_or_heavy_modules():
+    # An unreachable database proves nothing is queried at import time.
+    env = {
+        **os.environ,
+        "DATABASE_URL": "postgresql://nobody@127.0.0.1:1/missing",
+        "DATABASE_BOOTSTRAP_ON_STARTUP": "0",
+        "DOTENV_LOADED": "1",
+    }
+    completed = subprocess.run(
+        [sys.executable, "-c", "import sys, app.main; print(sorted({'pyvips', 'numpy', 'insightface'} & set(sys.modules)))"],
+        cwd=BACKEND_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.strip() == "[]"
+
+
+@pytest.mark.integration
+def test_bootstrap_creates_schema_and_skips_an_unchanged_seed(db_engine):
+    Base.metadata.drop_all(bind=db_engine)
+
+    first = bootstrap_database(db_engine)
+    second = bootstrap_database(db_engine)
+
+    assert first["seeded"] is True
+    assert second["seeded"] is False
+    tables = set(inspect(db_engine).get_table_names())
+    assert {"assets", "users", "bootstrap_state", "asset_source_metadata"} <= tables
+
+
+@pytest.mark.integration
+def test_bootstrap_projects_assets_written_before_the_projection(db_engine):
+    Base.metadata.drop_all(bind=db_engine)
+    bootstrap_database(db_engine)
+    with db_engine.begin() as connection:
+        connection.execute(
+            Asset.__table__.insert().values(
+                id=11,
+                filename="legacy.jpg",
+                file_path="/tmp/legacy.jpg",
+                mime_type="image/jpeg",
+                status="processing",
+                metadata_info={"core": {"title": "Legacy Vase"}},
+            )
+        )
+
+    first = bootstrap_database(db_engine)
+    second = bootstrap_database(db_engine)
+
+    assert (first["projected_assets"], second["projected_assets"]) == (1, 0)
+    with db_engine.connect() as connection:
+        title, preview_enabled, search_text = connection.execute(
+            select(Asset.title, Asset.preview_enabled, Asset.search_text).where(Asset.id == 11)
+        ).one()
+    assert (title, preview_enabled) == ("Legacy Vase", False)
+    assert "legacy vase" in search_text
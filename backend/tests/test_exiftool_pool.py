@@ -0,0 +1,110 @@
+import sys
+import textwrap
+
+import pytest
+
+from app import config as app_config
+from app.utils import exiftool_pool, metadata
+from app.utils.exiftool_pool import ExifToolPool, ExifToolProcessError
+
+FAKE_EXIFTOOL = textwrap.dedent(
+    """
+    import json, os, sys, time
+
+    arguments, marker = [], None
+    for line in sys.stdin:
+        line = line.rstrip("\\n")
+        if arguments and arguments[-1] == "-stay_open" and line == "False":
+            sys.exit(0)
+        if arguments and arguments[-1] == "-echo4":
+            arguments.pop()
+            marker = line
+            continue
+        if line.startswith("-execute"):
+            files = [argument for argument in arguments if not argument.startswith("-")]
+            arguments = []
+            if any(os.path.basename(path) == "crash.jpg" for path in files):
+                sys.exit(1)
+            if any(os.path.basename(path) == "hang.jpg" for path in files):
+                time.sleep(30)
+            if any(os.path.basename(path) == "noisy.jpg" for path in files):
+                # Far more than a pipe buffer holds, written before any stdout.
+                sys.stderr.write("Warning: odd maker note\\n" * 20000)
+                sys.stderr.flush()
+            records = [
+                {"SourceFile": path, "File": {"FileName": os.path.basename(path)}, "Process": {"Pid": os.getpid()}}
+                for path in files
+                if os.path.basename(path) != "missing.jpg"
+            ]
+            sys.stdout.write((json.dumps(records) if records else "") + "\\n{ready" + line[len("-execute"):] + "}\\n")
+            sys.stdout.flush()
+            sys.stderr.write(marker + "\\n")
+            sys.stderr.flush()
+            continue
+        arguments.append(line)
+    """
+)
+
+
+@pytest.fixture
+def fake_exiftool(tmp_path):
+    script_path = tmp_path / "exiftool"
+    script_path.write_text(f"#!{sys.executable}\n{FAKE_EXIFTOOL}", encoding="utf-8")
+    script_path.chmod(0o755)
+    return str(script_path)
+
+
+def test_pool_reuses_one_process_for_many_requests(fake_exiftool):
+    pool = ExifToolPool(fake_exiftool, size=1, timeout_seconds=10)
+    try:
+        first = pool.extract(["/data/a.jpg"])
+        batch = pool.extract(["/data/b.jpg", "/data/missing.jpg", "/data/c.jpg"])
+    finally:
+        pool.close()
+
+    assert first[0]["File"]["FileName"] == "a.jpg"
+    assert [item.get("File", {}).get("FileName") for item in batch] == ["b.jpg", None, "c.jpg"]
+    assert first[0]["Process"]["Pid"] == batch[0]["Process"]["Pid"]
+
+
+def test_pool_restarts_a_process_that_died_or_hung(fake_exiftool):
+    pool = ExifToolPool(fake_exiftool, size=1, timeout_seconds=1)
+    try:
+        before = pool.extract(["/data/a.jpg"])[0]["Process"]["Pid"]
+        with pytest.raises(ExifToolProcessError):
+            pool.extract(["/data/crash.jpg"])
+        with pytest.raises(ExifToolProcessError):
+            pool.extract(["/data/hang.jpg"])
+        after = pool.extract(["/data/a.jpg"])[0]["Process"]["Pid"]
+    finally:
+        pool.close()
+
+    assert before != after
+
+
+def test_pool_drains_stderr_while_waiting_for_stdout(fake_exiftool):
+    pool = ExifToolPool(fake_exiftool, size=1, timeout_seconds=5)
+    try:
+        noisy = pool.extract(["/data/noisy.jpg"])
+        quiet = pool.extract(["/data/a.jpg"])
+    finally:
+        pool.close()
+
+    assert noisy[0]["File"]["FileName"] == "noisy.jpg"
+    assert quiet[0]["Process"]["Pid"] == noisy[0]["Process"]["Pid"]
+
+
+def test_extract_metadata_uses_pool_and_falls_back_without_it(fake_exiftool, monkeypatch):
+    monkeypatch.setattr(app_config, "EXIFTOOL_POOL_SIZE", 2)
+    monkeypatch.setattr(metadata, "get_exiftool_path", lambda: fake_exiftool)
+    try:
+        assert metadata.extract_metadata("/data/c.jpg")["File"]["FileName"] == "c.jpg"
+    finally:
+        exiftool_pool.close_exiftool_pool()
+
+    # Windows pipes cannot be polled with select(), so the pool is never built there.
+    monkeypatch.setattr(exiftool_pool, "PIPES_SELECTABLE", False)
+    assert exiftool_pool.get_exiftool_pool(fake_exiftool) is None
+
+    monkeypatch.setattr(metadata, "get_exiftool_path", lambda: None)
+    assert metadata.extract_metadata("/data/a.jpg") == {}
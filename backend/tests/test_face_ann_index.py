@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from app import config as app_config
+from app.services.face_ann_index import build_ivf, exact_top_k
+from app.services.face_index_store import append_faces, build_ann_index, get_store_dir, open_face_index
+from app.services.local_face_recognition import _get_face_index
+
+
+def _unit_rows(matrix):
+    return (matrix / np.linalg.norm(matrix, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _gallery(size: int, dims: int = 32, seed: int = 5):
+    rng = np.random.default_rng(seed)
+    groups = _unit_rows(rng.normal(size=(max(1, size // 20), dims)))
+    return _unit_rows(groups[rng.integers(len(groups), size=size)] + 0.8 * _unit_rows(rng.normal(size=(size, dims))))
+
+
+def _queries(centers, count: int, seed: int = 9):
+    rng = np.random.default_rng(seed)
+    truth = rng.integers(len(centers), size=count)
+    return _unit_rows(centers[truth] + 0.5 * _unit_rows(rng.normal(size=(count, centers.shape[1]))))
+
+
+@pytest.mark.parametrize("pq_subvectors", [0, 8])
+def test_probing_every_list_matches_exact_search(pq_subvectors):
+    centers = _gallery(600)
+    queries = _queries(centers, 30)
+    index = build_ivf(centers, nlist=12, pq_subvectors=pq_subvectors)
+
+    rows, scores = index.search(queries, centers, top_k=2, nprobe=index.nlist, rerank=len(centers))
+    expected_rows, expected_scores = exact_top_k(queries, centers, 2)
+
+    assert np.array_equal(rows, expected_rows)
+    assert np.allclose(scores, expected_scores, atol=1e-5)
+    assert sorted(index.list_rows.tolist()) == list(range(len(centers)))
+
+
+@pytest.mark.parametrize("pq_subvectors", [0, 8])
+def test_few_probes_keep_recall_high(pq_subvectors):
+    centers = _gallery(3000)
+    queries = _queries(centers, 200)
+    index = build_ivf(centers, pq_subvectors=pq_subvectors)
+
+    rows, _scores = index.search(queries, centers, top_k=1, nprobe=8)
+    expected_rows, _expected = exact_top_k(queries, centers, 1)
+
+    assert np.mean(rows[:, 0] == expected_rows[:, 0]) >= 0.95
+
+
+def test_search_pads_when_probed_lists_are_short():
+    centers = _unit_rows(np.eye(4, dtype=np.float32))
+    index = build_ivf(centers, nlist=4)
+
+    rows, scores = index.search(centers[:1], centers, top_k=2, nprobe=1)
+
+    assert rows.tolist() == [[0, -1]]
+    assert scores[0, 1] == -np.inf
+
+
+def test_store_ann_is_used_for_large_galleries_and_survives_appends(tmp_path, monkeypatch):
+    centers = _gallery(400)
+    store_dir = get_store_dir(tmp_path)
+    append_faces(store_dir, [f"f{n}" for n in range(len(centers))], [f"c{n}" for n in range(len(centers))], centers)
+    result = build_ann_index(store_dir, nlist=8)
+    assert result == {"generation": 1, "nlist": 8, "pq_subvectors": 0}
+
+    monkeypatch.setattr(app_config, "FACE_RECOGNITION_ANN_NPROBE", 8)
+    monkeypatch.setattr(app_config, "FACE_RECOGNITION_ANN_MIN_CLUSTERS", 1000)
+    snapshot = _get_face_index(str(tmp_path))
+    assert snapshot.ann is not None
+    assert not snapshot.uses_ann()
+
+    monkeypatch.setattr(app_config, "FACE_RECOGNITION_ANN_MIN_CLUSTERS", 100)
+    assert snapshot.uses_ann()
+    [match] = snapshot.match(centers[7])
+    assert match.cluster_id == "c7"
+    assert match.runner_up_id is not None
+
+    newcomer = _unit_rows(np.random.default_rng(1).normal(size=(1, centers.shape[1])))
+    append_faces(store_dir, ["new"], ["newcomer"], newcomer)
+    reopened = open_face_index(store_dir)
+    assert reopened.ann is not None
+    assert len(reopened.ann.list_rows) == len(centers) + 1
+    assert [match.cluster_id for match in _get_face_index(str(tmp_path)).match(newcomer)] == ["newcomer"]
+    assert len(list(store_dir.glob("ann-*.npz"))) == 2
@@ -0,0 +1,245 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import config as app_config
+from app import tasks as app_tasks
+from app.models import Asset, ImageIngestSheet, ImageRecord
+from app.permissions import get_current_user
+from app.routers import image_records as image_records_router
+from app.services import face_recognition_client, local_face_recognition
+from app.services.face_index_store import append_faces, get_store_dir
+from app.services.face_recognition_client import FaceRecognitionClientError
+from app.services.local_face_recognition import LocalFaceRecognitionError
+
+
+DIMS = 8
+
+
+class _FakeRuntime:
+    """Decodes a file to the embedding written in it and 'detects' one face per non-empty file."""
+
+    def __init__(self):
+        self.decoding = 0
+        self.max_decoding = 0
+        self.lock = threading.Lock()
+        self.warmed = 0
+
+    def decode(self, image_path):
+        with self.lock:
+            self.decoding += 1
+            self.max_decoding = max(self.max_decoding, self.decoding)
+        time.sleep(0.01)
+        with self.lock:
+            self.decoding -= 1
+        text = open(image_path, encoding="utf-8").read().strip()
+        if text == "corrupt":
+            raise LocalFaceRecognitionError(f"Could not load image for local face recognition: {image_path}")
+        return np.array([float(value) for value in text.split()], dtype=np.float32) if text else None
+
+    def detect(self, img):
+        if img is None:
+            return []
+        return [SimpleNamespace(normed_embedding=img, bbox=[1, 2, 3, 4], kps=None)]
+
+    def warm_up(self):
+        self.warmed += 1
+
+
+def _basis(index: int) -> np.ndarray:
+    vector = np.zeros(DIMS, dtype=np.float32)
+    vector[index] = 1.0
+    return vector
+
+
+@pytest.fixture()
+def local_runtime(tmp_path, monkeypatch):
+    index_dir = tmp_path / "index"
+    append_faces(
+        get_store_dir(index_dir),
+        ["a-0", "b-0", "c-0"],
+        ["a", "b", "c"],
+        np.stack([_basis(0), _basis(1), _basis(2)]),
+        clusters={"a": {"name": "Ann"}, "b": {"name": "Bo"}, "c": {"name": "Cy"}},
+    )
+    runtime = _FakeRuntime()
+    monkeypatch.setattr(app_config, "FACE_RECOGNITION_INDEX_DIR", str(index_dir))
+    monkeypatch.setattr(local_face_recognition, "_get_runtime", lambda: runtime)
+    return runtime
+
+
+def _image(tmp_path, name: str, content: str) -> str:
+    path = tmp_path / name
+    path.write_text(content, encoding="utf-8")
+    return str(path)
+
+
+def test_local_batch_matches_every_image_in_one_call(tmp_path, local_runtime, monkeypatch):
+    paths = [
+        _image(tmp_path, "ann.txt", " ".join(str(value) for value in _basis(0))),
+        _image(tmp_path, "nobody.txt", ""),
+        _image(tmp_path, "corrupt.txt", "corrupt"),
+        str(tmp_path / "missing.txt"),
+        _image(tmp_path, "cy.txt", " ".join(str(value) for value in _basis(2) + 0.1 * _basis(1))),
+    ]
+    match_calls: list[int] = []
+    original_match = local_face_recognition._FaceIndexSnapshot.match
+
+    def counting_match(self, features, **kwargs):
+        match_calls.append(len(features))
+        return original_match(self, features, **kwargs)
+
+    monkeypatch.setattr(local_face_recognition._FaceIndexSnapshot, "match", counting_match)
+
+    results = local_face_recognition.recognize_image_files_locally(
+        paths, threshold=0.5, request_ids=[f"req-{n}" for n in range(len(paths))], decode_workers=2
+    )
+
+    assert match_calls == [2]
+    assert local_runtime.max_decoding <= 2
+    assert results[0]["request_id"] == "req-0"
+    assert results[0]["results"][0]["person_info"]["name"] == "Ann"
+    assert results[1]["count"] == 0
+    assert isinstance(results[2], LocalFaceRecognitionError)
+    assert "does not exist" in str(results[3])
+    assert results[4]["results"][0]["person_info"]["name"] == "Cy"
+    assert results[4]["results"][0]["runner_up_id"] == "b"
+
+
+def test_client_batch_sends_only_local_failures_to_remote_in_auto_mode(tmp_path, monkeypatch):
+    monkeypatch.setattr(app_config, "FACE_RECOGNITION_ENABLED", True)
+    monkeypatch.setattr(app_config, "FACE_RECOGNITION_PROVIDER", "auto")
+    paths = [_image(tmp_path, "one.jpg", "x"), _image(tmp_path, "two.jpg", "x"), str(tmp_path / "gone.jpg")]
+    remote_calls: list[str] = []
+    monkeypatch.setattr(
+        face_recognition_client,
+        "recognize_image_files_locally",
+        lambda file_paths, threshold=None, request_ids=None: [
+            {"status": "success", "count": 0, "results": []},
+            LocalFaceRecognitionError("unreadable"),
+        ],
+    )
+
+    def remote(file_path, threshold=None, request_id=None):
+        remote_calls.append(request_id)
+        return {"status": "success", "count": 1, "results": [{"recognized": False}]}
+
+    monkeypatch.setattr(face_recognition_client, "_recognize_image_file_remote", remote)
+
+    results = face_recognition_client.recognize_image_files(paths, threshold=0.5, request_ids=["r1", "r2", "r3"])
+
+    assert results[0]["count"] == 0
+    assert results[1]["count"] == 1
+    assert isinstance(results[2], FaceRecognitionClientError)
+    assert remote_calls == ["r2"]
+
+
+def _seed_business_activity_sheet(db_session, upload_dir, count: int) -> tuple[int, list[tuple[int, int]]]:
+    sheet = ImageIngestSheet(sheet_no="IS-FACES", status="in_progress", image_type="business_activity")
+    db_session.add(sheet)
+    db_session.flush()
+    pairs = []
+    for index in range(count + 1):
+        record = ImageRecord(
+            sheet_id=sheet.id,
+            line_no=index + 1,
+            record_no=f"IR-FACE-{index}",
+            status="uploaded_pending_validation",
+            # The last item is not a business-activity photo and must be left alone.
+            profile_key="business_activity" if index < count else "other",
+            metadata_info={},
+        )
+        db_session.add(record)
+        db_session.flush()
+        image_path = upload_dir / f"activity-{index}.jpg"
+        image_path.write_bytes(b"jpeg")
+        asset = Asset(
+            filename=image_path.name,
+            file_path=str(image_path),
+            file_size=4,
+            mime_type="image/jpeg",
+            status="ready",
+            image_record_id=record.id,
+            metadata_info={"technical": {"width": 400, "height": 300}},
+        )
+        db_session.add(asset)
+        db_session.flush()
+        pairs.append((record.id, asset.id))
+    db_session.commit()
+    return sheet.id, pairs
+
+
+def test_batch_task_applies_every_result_in_one_commit(db_session, test_upload_dir, monkeypatch):
+    monkeypatch.setattr(app_config, "FACE_RECOGNITION_ENABLED", True)
+    _sheet_id, pairs = _seed_business_activity_sheet(db_session, test_upload_dir, 3)
+    (test_upload_dir / "activity-1.jpg").unlink()
+
+    def fake_batch(file_paths, threshold=None, request_ids=None):
+        assert request_ids == [f"record-{pairs[0][0]}-asset-{pairs[0][1]}", f"record-{pairs[2][0]}-asset-{pairs[2][1]}"]
+        return [
+            {"status": "success", "count": 1, "results": [{"recognized": True, "person_info": {"id": "a", "name": "Ann"}}]},
+            FaceRecognitionClientError("Local face recognition failed: unreadable"),
+        ]
+
+    monkeypatch.setattr(app_tasks, "recognize_image_files", fake_batch)
+    commits: list[Session] = []
+
+    def listener(session):
+        commits.append(session)
+
+    event.listen(Session, "after_commit", listener)
+    try:
+        summary = app_tasks.recognize_business_activity_faces_batch.run([list(pair) for pair in pairs])
+    finally:
+        event.remove(Session, "after_commit", listener)
+
+    assert summary == {"recognized": 1, "failed": 2, "skipped": 1}
+    assert len(commits) == 1
+    db_session.expire_all()
+    states = [
+        db_session.get(ImageRecord, record_id).metadata_info["raw_metadata"]["face_recognition"]
+        for record_id, _asset_id in pairs[:3]
+    ]
+    assert states[0]["status"] == "success"
+    assert states[0]["recognized_names"] == ["Ann"]
+    assert db_session.get(ImageRecord, pairs[0][0]).metadata_info["profile"]["fields"]["main_person"] == "Ann"
+    assert states[1]["error_message"] == "Recognition source file is not available"
+    assert states[2]["status"] == "failed"
+    assert "face_recognition" not in (db_session.get(ImageRecord, pairs[3][0]).metadata_info.get("raw_metadata") or {})
+
+
+def test_sheet_face_recognition_fans_out_batches(db_session, test_upload_dir, monkeypatch):
+    monkeypatch.setattr(app_config, "FACE_RECOGNITION_ENABLED", True)
+    monkeypatch.setattr(app_config, "FACE_RECOGNITION_BATCH_SIZE", 2)
+    sheet_id, pairs = _seed_business_activity_sheet(db_session, test_upload_dir, 5)
+    dispatched: list[list[list[int]]] = []
+    monkeypatch.setattr(app_tasks.recognize_business_activity_faces_batch, "delay", dispatched.append)
+
+    response = image_records_router.recognize_image_ingest_sheet_faces(
+        sheet_id=sheet_id,
+        db=db_session,
+        user=get_current_user(x_mdams_user="system-admin"),
+    )
+
+    assert response.record_count == 5
+    assert response.batch_count == 3
+    assert [len(batch) for batch in dispatched] == [2, 2, 1]
+    assert sorted(tuple(pair) for batch in dispatched for pair in batch) == sorted(pairs[:5])
+    db_session.expire_all()
+    pending = db_session.get(ImageRecord, pairs[0][0]).metadata_info["raw_metadata"]["face_recognition"]
+    assert pending["status"] == "pending"
+
+
+def test_worker_warm_up_loads_runtime_and_index(local_runtime, monkeypatch):
+    monkeypatch.setattr(app_config, "FACE_RECOGNITION_PROVIDER", "local")
+    assert local_face_recognition.warm_up_local_face_recognition() is True
+    assert local_runtime.warmed == 1
+
+    monkeypatch.setattr(app_config, "FACE_RECOGNITION_PROVIDER", "remote")
+    assert local_face_recognition.warm_up_local_face_recognition() is False
+    assert local_runtime.warmed == 1
@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pyvips = pytest.importorskip("pyvips")
+
+from app.services.local_face_recognition import (
+    LocalFaceRecognitionError,
+    _decode_with_pyvips,
+    _local_payload,
+    _rescale_faces,
+)
+
+
+def _write_photo(path, width: int, height: int, **save_options) -> str:
+    # Red left half, blue right half, so channel order and orientation are both checkable.
+    red = pyvips.Image.black(width // 2, height).new_from_image([255, 0, 0])
+    blue = pyvips.Image.black(width - width // 2, height).new_from_image([0, 0, 255])
+    image = red.join(blue, "horizontal").cast("uchar").copy(interpretation="srgb")
+    orientation = save_options.pop("orientation", None)
+    if orientation:
+        image = image.copy()
+        image.set_type(pyvips.GValue.gint_type, "orientation", orientation)
+    image.write_to_file(str(path), **save_options)
+    return str(path)
+
+
+def test_large_jpeg_is_decoded_at_bounded_size_in_bgr(tmp_path):
+    path = _write_photo(tmp_path / "large.jpg", 6000, 4000, Q=90)
+
+    decoded = _decode_with_pyvips(path, 1500)
+
+    assert decoded.pixels.shape == (1000, 1500, 3)
+    assert decoded.pixels.dtype == np.uint8
+    assert decoded.scale_x == pytest.approx(4.0)
+    assert decoded.scale_y == pytest.approx(4.0)
+    # BGR: the red half has its signal in the last channel.
+    assert decoded.pixels[500, 100].tolist() == pytest.approx([0, 0, 255], abs=3)
+    assert decoded.pixels[500, 1400].tolist() == pytest.approx([255, 0, 0], abs=3)
+
+
+def test_small_images_and_unbounded_decodes_keep_full_resolution(tmp_path):
+    path = _write_photo(tmp_path / "small.png", 800, 600)
+
+    assert _decode_with_pyvips(path, 2048).pixels.shape == (600, 800, 3)
+    assert _decode_with_pyvips(path, 0).scale_x == 1.0
+
+
+def test_pyramidal_tiff_and_exif_orientation_map_back_to_original_pixels(tmp_path):
+    pyramid = _write_photo(tmp_path / "access.tif", 8192, 4096, tile=True, pyramid=True, compression="deflate")
+    decoded = _decode_with_pyvips(pyramid, 1024)
+    assert decoded.pixels.shape == (512, 1024, 3)
+    assert (decoded.scale_x, decoded.scale_y) == (8.0, 8.0)
+
+    rotated = _write_photo(tmp_path / "rotated.jpg", 4000, 2000, orientation=6)
+    decoded = _decode_with_pyvips(rotated, 1000)
+    # Orientation 6 is a quarter turn, so the original is 2000 wide and 4000 tall once upright.
+    assert decoded.pixels.shape == (1000, 500, 3)
+    assert (decoded.scale_x, decoded.scale_y) == (4.0, 4.0)
+
+
+def test_unreadable_file_is_a_local_recognition_error(tmp_path):
+    path = tmp_path / "broken.jpg"
+    path.write_bytes(b"not an image")
+
+    with pytest.raises(LocalFaceRecognitionError):
+        _decode_with_pyvips(str(path), 1024)
+
+
+def test_faces_detected_on_a_reduced_frame_are_reported_in_original_coordinates():
+    face = SimpleNamespace(
+        bbox=np.array([10.0, 20.0, 30.0, 60.0], dtype=np.float32),
+        kps=np.array([[15.0, 30.0], [25.0, 30.0]], dtype=np.float32),
+        normed_embedding=np.ones(4, dtype=np.float32),
+    )
+    [rescaled] = _rescale_faces([face], 4.0, 2.5)
+    index = SimpleNamespace(format_person_info=lambda cluster_id: None)
+    match = SimpleNamespace(cluster_id=None, score=0.0, runner_up_id=None, runner_up_score=None, margin=None)
+
+    payload = _local_payload("photo.jpg", None, [rescaled], [match], index, 0.5)
+
+    assert payload["results"][0]["bbox"] == [40, 50, 120, 150]
+    assert payload["results"][0]["landmarks"] == [[60.0, 75.0], [100.0, 75.0]]
@@ -30,6 +30,7 @@ def test_health_payload_reports_healthy_state(tmp_path, monkeypatch):
     assert payload["status"] == "healthy"
     assert payload["checks"]["database"]["status"] == "healthy"
     assert payload["checks"]["upload_dir"]["status"] == "healthy"
+    assert isinstance(payload["single_flight"], dict)
     assert payload["http_status"] == 200
 
 
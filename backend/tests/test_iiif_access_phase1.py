@@ -11,6 +11,8 @@ from app.models import Asset
 from app.permissions import build_system_user
 from app.routers import downloads as downloads_router
 from app.routers import iiif as iiif_router
+from app.services.iiif_access import build_iiif_source_fingerprint
+from app.services.iiif_capability import issue_iiif_capability
 from app.tasks import generate_iiif_access_derivative
 
 
@@ -114,9 +116,10 @@ def test_manifest_and_download_prefer_iiif_access_copy(db_session, tmp_path, mon
         user=build_system_user(),
     )
     service_id = manifest["items"][0]["items"][0]["items"][0]["body"]["service"][0]["id"]
+    access_identifier = "derivatives/asset-1/iiif-access.pyramidal.tiff"
     assert service_id == (
-        "http://localhost:3000/api/iiif/1/service/"
-        "derivatives/asset-1/iiif-access.pyramidal.tiff"
+        f"http://localhost:3000/api/iiif/1/capability/{issue_iiif_capability(1, access_identifier, 'open')}/"
+        f"v-{build_iiif_source_fingerprint(str(access_path))}/{access_identifier}"
     )
 
     download_response = downloads_router.download_asset_file(asset_id=asset.id, db=db_session)
@@ -0,0 +1,162 @@
+import asyncio
+import json
+from io import BytesIO
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+from starlette.requests import Request
+
+from app import config as app_config
+from app.models import Asset
+from app.permissions import build_system_user
+from app.routers import iiif as iiif_router
+from app.services.iiif_access import generate_pyramidal_tiff_access_copy
+from app.services.iiif_capability import reset_iiif_source_map
+from app.services.iiif_image_server import (
+    IIIFImageRequestError,
+    describe_pyramid,
+    parse_iiif_image_request,
+    render_iiif_image,
+)
+from app.services.iiif_tile_cache import reset_iiif_tile_cache
+
+
+pytestmark = [pytest.mark.unit, pytest.mark.contract]
+
+
+def _make_request(headers=None):
+    header_items = []
+    for key, value in (headers or {}).items():
+        header_items.append((key.lower().encode("latin-1"), value.encode("latin-1")))
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "query_string": b"",
+        "headers": header_items,
+        "server": ("testserver", 80),
+        "client": ("testclient", 50000),
+        "scheme": "http",
+        "root_path": "",
+        "http_version": "1.1",
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    return Request(scope, receive)
+
+
+@pytest.fixture(autouse=True)
+def _isolated_caches(test_upload_dir, monkeypatch):
+    monkeypatch.setattr(app_config, "IIIF_TILE_CACHE_DIR", str(test_upload_dir / "tile-cache"))
+    reset_iiif_tile_cache()
+    reset_iiif_source_map()
+    yield
+    reset_iiif_tile_cache()
+    reset_iiif_source_map()
+
+
+def _build_pyramid(tmp_path, width=1200, height=800):
+    source_path = tmp_path / "source.png"
+    image = Image.new("RGB", (width, height), "white")
+    image.paste((200, 20, 20), (0, 0, width // 2, height // 2))
+    image.save(source_path, format="PNG")
+    output_path = tmp_path / "derivatives" / "asset-1" / "iiif-access.pyramidal.tiff"
+    generate_pyramidal_tiff_access_copy(str(source_path), str(output_path))
+    return output_path
+
+
+def test_describe_pyramid_reports_real_levels(tmp_path):
+    pyramid = describe_pyramid(str(_build_pyramid(tmp_path)))
+
+    assert (pyramid.width, pyramid.height) == (1200, 800)
+    assert (pyramid.tile_width, pyramid.tile_height) == (256, 256)
+    assert pyramid.scale_factors == [1, 2, 4, 8]
+    assert pyramid.best_level(0.5).scale_factor == 2
+    assert pyramid.best_level(0.3).scale_factor == 2
+    assert pyramid.best_level(1.0).scale_factor == 1
+
+
+def test_render_tile_reads_region_at_requested_scale(tmp_path):
+    pyramid_path = _build_pyramid(tmp_path)
+
+    content, media_type = render_iiif_image(str(pyramid_path), "0,0,512,512/256,/0/default.jpg")
+    tile = Image.open(BytesIO(content))
+    assert media_type == "image/jpeg"
+    assert tile.size == (256, 256)
+    red, green, _blue = tile.getpixel((10, 10))
+    assert red > 150 and green < 80
+
+    content, media_type = render_iiif_image(str(pyramid_path), "full/!100,100/90/gray.png")
+    thumbnail = Image.open(BytesIO(content))
+    assert media_type == "image/png"
+    assert thumbnail.size == (67, 100)
+
+
+@pytest.mark.parametrize(
+    ("suffix", "status_code"),
+    [
+        ("0,0,10/256,/0/default.jpg", 400),
+        ("5000,0,10,10/full/0/default.jpg", 400),
+        ("full/2400,/0/default.jpg", 400),
+        ("full/full/45/default.jpg", 501),
+        ("full/full/0/bitonal.jpg", 400),
+        ("full/full/0/default.gif", 400),
+    ],
+)
+def test_parse_rejects_invalid_requests(suffix, status_code):
+    with pytest.raises(IIIFImageRequestError) as exc:
+        parse_iiif_image_request(suffix, width=1200, height=800)
+    assert exc.value.status_code == status_code
+
+
+def test_native_mode_serves_info_and_tiles_without_upstream(db_session, test_upload_dir, monkeypatch):
+    monkeypatch.setattr(app_config, "IIIF_IMAGE_SERVER", "native")
+    monkeypatch.setattr(app_config, "API_PUBLIC_URL", "http://localhost:3000/api")
+    monkeypatch.setattr(app_config, "CANTALOUPE_INTERNAL_URL", "http://127.0.0.1:9/unreachable")
+    pyramid_path = _build_pyramid(test_upload_dir)
+    asset = Asset(
+        id=7201,
+        filename="source.png",
+        file_path=str(pyramid_path),
+        file_size=pyramid_path.stat().st_size,
+        mime_type="image/tiff",
+        visibility_scope="open",
+        status="ready",
+        resource_type="image_2d_cultural_object",
+        metadata_info={
+            "core": {"title": "source.png"},
+            "technical": {"width": 1200, "height": 800},
+            "management": {},
+            "profile": {"key": "other", "label": "Other", "sheet": "Other", "fields": {}},
+            "raw_metadata": {},
+        },
+    )
+    db_session.add(asset)
+    db_session.commit()
+
+    async def fetch(image_path):
+        return await iiif_router.proxy_iiif_image(
+            asset_id=asset.id,
+            image_path=image_path,
+            request=_make_request({"host": "localhost:3000"}),
+            db=db_session,
+            user=build_system_user(),
+        )
+
+    identifier = "derivatives/asset-1/iiif-access.pyramidal.tiff"
+    info = json.loads(asyncio.run(fetch(f"{identifier}/info.json")).body)
+    assert info["@id"].startswith(f"http://localhost:3000/api/iiif/{asset.id}/service/v-")
+    assert info["tiles"] == [{"width": 256, "height": 256, "scaleFactors": [1, 2, 4, 8]}]
+    assert info["profile"][0] == "http://iiif.io/api/image/2/level1.json"
+
+    tile_response = asyncio.run(fetch(f"{identifier}/256,256,256,256/256,/0/default.jpg"))
+    assert tile_response.media_type == "image/jpeg"
+    assert Image.open(BytesIO(tile_response.body)).size == (256, 256)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(fetch(f"{identifier}/full/full/45/default.jpg"))
+    assert exc.value.status_code == 501
@@ -0,0 +1,378 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from PIL import Image
+from starlette.requests import Request
+from starlette.routing import Match
+
+from app import config as app_config
+from app.models import Asset
+from app.permissions import build_system_user
+from app.routers import iiif as iiif_router
+from app.services import iiif_upstream
+from app.services.iiif_access import build_iiif_source_fingerprint
+from app.services.iiif_capability import reset_iiif_source_map
+from app.services.iiif_tile_cache import build_tile_etag, reset_iiif_tile_cache
+from app.services.single_flight import get_single_flight_stats, reset_single_flight_stats
+
+
+pytestmark = [pytest.mark.integration, pytest.mark.contract]
+
+
+@pytest.fixture(autouse=True)
+def _isolated_tile_cache(test_upload_dir, monkeypatch):
+    monkeypatch.setattr(app_config, "IIIF_TILE_CACHE_DIR", str(test_upload_dir / "tile-cache"))
+    reset_iiif_tile_cache()
+    reset_iiif_source_map()
+    yield
+    reset_iiif_tile_cache()
+    reset_iiif_source_map()
+
+
+class _NoDatabase:
+    def __getattr__(self, name):
+        raise AssertionError(f"capability tile requests must not touch the database (used {name})")
+
+
+class _ChunkedUpstreamStream(httpx.AsyncByteStream):
+    def __init__(self, chunks: list[bytes]):
+        self._chunks = chunks
+
+    async def __aiter__(self):
+        for chunk in self._chunks:
+            yield chunk
+
+
+def _tile_response(tile_bytes: bytes) -> httpx.Response:
+    return httpx.Response(
+        200,
+        stream=_ChunkedUpstreamStream([tile_bytes[:4], tile_bytes[4:]]),
+        headers={
+            "content-type": "image/jpeg",
+            "content-length": str(len(tile_bytes)),
+            "etag": '"tile-etag"',
+            "last-modified": "Tue, 01 Jul 2025 00:00:00 GMT",
+        },
+    )
+
+
+def _make_request(headers=None):
+    header_items = []
+    for key, value in (headers or {}).items():
+        header_items.append((key.lower().encode("latin-1"), value.encode("latin-1")))
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "query_string": b"",
+        "headers": header_items,
+        "server": ("testserver", 80),
+        "client": ("testclient", 50000),
+        "scheme": "http",
+        "root_path": "",
+        "http_version": "1.1",
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    return Request(scope, receive)
+
+
+def _create_asset(db_session, upload_dir) -> Asset:
+    source_path = upload_dir / "tile-source.jpg"
+    Image.new("RGB", (64, 48), "white").save(source_path, format="JPEG")
+    asset = Asset(
+        id=7101,
+        filename=source_path.name,
+        file_path=str(source_path),
+        file_size=source_path.stat().st_size,
+        mime_type="image/jpeg",
+        visibility_scope="open",
+        collection_object_id=None,
+        status="ready",
+        resource_type="image_2d_cultural_object",
+        metadata_info={
+            "core": {"title": source_path.name},
+            "technical": {"width": 64, "height": 48},
+            "management": {},
+            "profile": {"key": "other", "label": "Other", "sheet": "Other", "fields": {}},
+            "raw_metadata": {},
+        },
+    )
+    db_session.add(asset)
+    db_session.commit()
+    db_session.refresh(asset)
+    return asset
+
+
+async def _proxy(asset_id: int, image_path: str, db_session, handler, calls: list[str], headers=None):
+    def _recording_handler(upstream_request: httpx.Request) -> httpx.Response:
+        calls.append(str(upstream_request.url))
+        return handler(upstream_request)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(_recording_handler))
+    iiif_upstream.set_iiif_upstream_client(client)
+    try:
+        response = await iiif_router.proxy_iiif_image(
+            asset_id=asset_id,
+            image_path=image_path,
+            request=_make_request({"host": "localhost:3000", **(headers or {})}),
+            db=db_session,
+            user=build_system_user(),
+        )
+        if isinstance(response, StreamingResponse):
+            chunks = [chunk async for chunk in response.body_iterator]
+            if response.background is not None:
+                await response.background()
+            body = b"".join(chunks)
+        else:
+            body = response.body
+        return response, body
+    finally:
+        await iiif_upstream.close_iiif_upstream_client()
+
+
+def test_async_proxy_streams_tile_and_forwards_validators(db_session, test_upload_dir, monkeypatch):
+    monkeypatch.setattr(app_config, "IIIF_PROXY_MODE", "async")
+    monkeypatch.setattr(app_config, "CANTALOUPE_INTERNAL_URL", "http://cantaloupe:8182/iiif/2")
+    monkeypatch.setattr(app_config, "IIIF_TILE_CACHE_MAX_ENTRY_BYTES", 0)
+    asset = _create_asset(db_session, test_upload_dir)
+    tile_bytes = b"\xff\xd8tile-bytes\xff\xd9"
+    fingerprint = build_iiif_source_fingerprint(asset.file_path)
+
+    calls: list[str] = []
+    response, body = asyncio.run(
+        _proxy(asset.id, "tile-source.jpg/0,0,64,48/64,/0/default.jpg", db_session, lambda _r: _tile_response(tile_bytes), calls)
+    )
+
+    assert isinstance(response, StreamingResponse)
+    assert calls == ["http://cantaloupe:8182/iiif/2/tile-source.jpg/0,0,64,48/64,/0/default.jpg"]
+    assert body == tile_bytes
+    assert response.status_code == 200
+    assert response.headers["content-length"] == str(len(tile_bytes))
+    assert response.headers["etag"] == build_tile_etag(fingerprint, "0,0,64,48/64,/0/default.jpg")
+    assert response.headers["last-modified"] == "Tue, 01 Jul 2025 00:00:00 GMT"
+    assert response.headers["cache-control"] == "no-cache"
+
+
+def test_versioned_tile_is_cached_and_revalidated(db_session, test_upload_dir, monkeypatch):
+    monkeypatch.setattr(app_config, "IIIF_PROXY_MODE", "async")
+    monkeypatch.setattr(app_config, "CANTALOUPE_INTERNAL_URL", "http://cantaloupe:8182/iiif/2")
+    asset = _create_asset(db_session, test_upload_dir)
+    tile_bytes = b"\xff\xd8cached-tile\xff\xd9"
+    fingerprint = build_iiif_source_fingerprint(asset.file_path)
+    image_path = f"v-{fingerprint}/tile-source.jpg/0,0,64,48/64,/0/default.jpg"
+
+    calls: list[str] = []
+    first, first_body = asyncio.run(_proxy(asset.id, image_path, db_session, lambda _r: _tile_response(tile_bytes), calls))
+    second, second_body = asyncio.run(_proxy(asset.id, image_path, db_session, lambda _r: _tile_response(tile_bytes), calls))
+    not_modified, _body = asyncio.run(
+        _proxy(
+            asset.id,
+            image_path,
+            db_session,
+            lambda _r: _tile_response(tile_bytes),
+            calls,
+            headers={"if-none-match": first.headers["etag"]},
+        )
+    )
+
+    assert len(calls) == 1
+    assert first_body == second_body == tile_bytes
+    # Session-authenticated responses stay out of shared caches even for open assets.
+    assert first.headers["cache-control"] == f"private, max-age={app_config.IIIF_TILE_CACHE_MAX_AGE_SECONDS}, immutable"
+    assert second.headers["etag"] == first.headers["etag"]
+    assert second.media_type == "image/jpeg"
+    assert not_modified.status_code == 304
+
+    reset_iiif_tile_cache()
+    from_disk, from_disk_body = asyncio.run(
+        _proxy(asset.id, image_path, db_session, lambda _r: _tile_response(tile_bytes), calls)
+    )
+    assert len(calls) == 1
+    assert from_disk_body == tile_bytes
+    assert from_disk.status_code == 200
+
+
+def test_async_proxy_rewrites_info_json_service_id(db_session, test_upload_dir, monkeypatch):
+    monkeypatch.setattr(app_config, "IIIF_PROXY_MODE", "async")
+    monkeypatch.setattr(app_config, "API_PUBLIC_URL", "http://localhost:3000/api")
+    monkeypatch.setattr(app_config, "CANTALOUPE_INTERNAL_URL", "http://cantaloupe:8182/iiif/2")
+    asset = _create_asset(db_session, test_upload_dir)
+
+    def handler(_request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            json={"@id": "http://cantaloupe:8182/iiif/2/tile-source.jpg", "width": 64, "height": 48},
+        )
+
+    calls: list[str] = []
+    response, body = asyncio.run(_proxy(asset.id, "tile-source.jpg/info.json", db_session, handler, calls))
+
+    info = json.loads(body)
+    fingerprint = build_iiif_source_fingerprint(asset.file_path)
+    assert info["@id"] == f"http://localhost:3000/api/iiif/7101/service/v-{fingerprint}/tile-source.jpg"
+    assert info["id"] == info["@id"]
+    assert response.media_type == "application/json; charset=utf-8"
+    assert int(response.headers["content-length"]) == len(body)
+
+
+async def _proxy_with_capability(asset_id: int, capability: str, image_path: str, db, handler, calls: list[str]):
+    def _recording_handler(upstream_request: httpx.Request) -> httpx.Response:
+        calls.append(str(upstream_request.url))
+        return handler(upstream_request)
+
+    iiif_upstream.set_iiif_upstream_client(httpx.AsyncClient(transport=httpx.MockTransport(_recording_handler)))
+    try:
+        response = await iiif_router.proxy_iiif_image_with_capability(
+            asset_id=asset_id,
+            capability=capability,
+            image_path=image_path,
+            request=_make_request({"host": "localhost:3000"}),
+            db=db,
+        )
+        return response, response.body
+    finally:
+        await iiif_upstream.close_iiif_upstream_client()
+
+
+def _manifest_capability(asset_id: int, db_session) -> tuple[str, str]:
+    manifest = iiif_router.get_iiif_manifest(
+        asset_id=asset_id,
+        request=_make_request({"host": "localhost:3000"}),
+        db=db_session,
+        user=build_system_user(),
+    )
+    service_id = manifest["items"][0]["items"][0]["items"][0]["body"]["service"][0]["id"]
+    capability_path = service_id.split(f"/iiif/{asset_id}/capability/", 1)[1]
+    capability, image_path = capability_path.split("/", 1)
+    return capability, image_path
+
+
+def test_capability_url_serves_tiles_without_database(db_session, test_upload_dir, monkeypatch):
+    monkeypatch.setattr(app_config, "IIIF_PROXY_MODE", "async")
+    monkeypatch.setattr(app_config, "API_PUBLIC_URL", "http://localhost:3000/api")
+    monkeypatch.setattr(app_config, "CANTALOUPE_INTERNAL_URL", "http://cantaloupe:8182/iiif/2")
+    asset = _create_asset(db_session, test_upload_dir)
+    capability, service_path = _manifest_capability(asset.id, db_session)
+    tile_bytes = b"\xff\xd8capability-tile\xff\xd9"
+
+    calls: list[str] = []
+    response, body = asyncio.run(
+        _proxy_with_capability(
+            asset.id,
+            capability,
+            f"{service_path}/0,0,64,48/64,/0/default.jpg",
+            _NoDatabase(),
+            lambda _r: _tile_response(tile_bytes),
+            calls,
+        )
+    )
+    assert body == tile_bytes
+    assert calls == ["http://cantaloupe:8182/iiif/2/tile-source.jpg/0,0,64,48/64,/0/default.jpg"]
+    assert response.headers["cache-control"].startswith("public, ")
+
+    def info_handler(_request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"@id": "http://cantaloupe:8182/iiif/2/tile-source.jpg"})
+
+    _response, info_body = asyncio.run(
+        _proxy_with_capability(asset.id, capability, f"{service_path}/info.json", _NoDatabase(), info_handler, calls)
+    )
+    assert json.loads(info_body)["@id"] == f"http://localhost:3000/api/iiif/{asset.id}/capability/{capability}/{service_path}"
+
+
+def test_tampered_capability_falls_back_to_session_check(db_session, test_upload_dir, monkeypatch):
+    monkeypatch.setattr(app_config, "CANTALOUPE_INTERNAL_URL", "http://cantaloupe:8182/iiif/2")
+    asset = _create_asset(db_session, test_upload_dir)
+    capability, service_path = _manifest_capability(asset.id, db_session)
+    expires_at, scope, signature = capability.split(".")
+    tampered = f"{int(expires_at) + 3600}.{scope}.{signature}"
+
+    calls: list[str] = []
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(
+            _proxy_with_capability(
+                asset.id,
+                tampered,
+                f"{service_path}/0,0,64,48/64,/0/default.jpg",
+                db_session,
+                lambda _r: _tile_response(b"never"),
+                calls,
+            )
+        )
+    assert exc.value.status_code == 401
+    assert calls == []
+
+
+def test_identifiers_starting_with_t_dash_reach_the_session_route():
+    scope = {"type": "http", "method": "GET", "path": "/iiif/7101/service/t-scan.jpg/info.json"}
+    endpoint = next(route.endpoint for route in iiif_router.router.routes if route.matches(scope)[0] == Match.FULL)
+    assert endpoint is iiif_router.proxy_iiif_image
+
+
+def test_capability_url_for_unknown_asset_requires_a_session(db_session, test_upload_dir, monkeypatch):
+    monkeypatch.setattr(app_config, "CANTALOUPE_INTERNAL_URL", "http://cantaloupe:8182/iiif/2")
+    asset = _create_asset(db_session, test_upload_dir)
+    capability, service_path = _manifest_capability(asset.id, db_session)
+
+    calls: list[str] = []
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(
+            _proxy_with_capability(
+                asset.id + 1,
+                capability,
+                f"{service_path}/0,0,64,48/64,/0/default.jpg",
+                db_session,
+                lambda _r: _tile_response(b"never"),
+                calls,
+            )
+        )
+    assert exc.value.status_code == 401
+    assert calls == []
+
+
+def test_concurrent_identical_tiles_share_one_upstream_fetch(db_session, test_upload_dir, monkeypatch):
+    monkeypatch.setattr(app_config, "IIIF_PROXY_MODE", "async")
+    monkeypatch.setattr(app_config, "API_PUBLIC_URL", "http://localhost:3000/api")
+    monkeypatch.setattr(app_config, "CANTALOUPE_INTERNAL_URL", "http://cantaloupe:8182/iiif/2")
+    asset = _create_asset(db_session, test_upload_dir)
+    capability, service_path = _manifest_capability(asset.id, db_session)
+    tile_bytes = b"\xff\xd8shared-tile\xff\xd9"
+    calls: list[str] = []
+
+    async def slow_handler(upstream_request: httpx.Request) -> httpx.Response:
+        calls.append(str(upstream_request.url))
+        await asyncio.sleep(0.05)
+        return _tile_response(tile_bytes)
+
+    async def run():
+        iiif_upstream.set_iiif_upstream_client(httpx.AsyncClient(transport=httpx.MockTransport(slow_handler)))
+        try:
+            return await asyncio.gather(
+                *(
+                    iiif_router.proxy_iiif_image_with_capability(
+                        asset_id=asset.id,
+                        capability=capability,
+                        image_path=f"{service_path}/0,0,64,48/64,/0/default.jpg",
+                        request=_make_request({"host": "localhost:3000"}),
+                        db=_NoDatabase(),
+                    )
+                    for _ in range(6)
+                )
+            )
+        finally:
+            await iiif_upstream.close_iiif_upstream_client()
+
+    reset_single_flight_stats()
+    responses = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert [response.body for response in responses] == [tile_bytes] * 6
+    assert get_single_flight_stats()["iiif_tile"]["followers"] == 5
+
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from app import config as app_config
+from app.services.iiif_tile_cache import CachedTile, DiskTileCache, collect_iiif_tile_cache_garbage
+
+
+pytestmark = [pytest.mark.unit]
+
+
+def _tile(size: int) -> CachedTile:
+    return CachedTile(content=b"x" * size, content_type="image/jpeg")
+
+
+def test_disk_cache_writes_never_evict_and_overwrites_keep_one_file(tmp_path):
+    cache = DiskTileCache(str(tmp_path), max_bytes=1000)
+    for index in range(5):
+        cache.put(f"tile-{index}", _tile(400))
+    cache.put("tile-0", _tile(400))
+
+    # Over budget until the collector runs; the overwrite replaced its file in place.
+    assert all(cache.get(f"tile-{index}") is not None for index in range(5))
+    assert cache.collect_garbage().scanned_files == 5
+
+
+def test_disk_cache_garbage_collection_trims_oldest_tiles_and_abandoned_temp_files(tmp_path):
+    cache = DiskTileCache(str(tmp_path), max_bytes=2000)
+    for index in range(5):
+        cache.put(f"tile-{index}", _tile(500))
+        path = cache._path_for_key(f"tile-{index}")
+        os.utime(path, (1000 + index, 1000 + index))
+    cache.get("tile-0")
+    abandoned = f"{cache._path_for_key('tile-0')}.1.1.tmp"
+    with open(abandoned, "wb") as file_handle:
+        file_handle.write(b"partial")
+    os.utime(abandoned, (0, 0))
+
+    report = cache.collect_garbage(now=10_000)
+
+    # Tiles are 511 bytes on disk with their content-type line; 90% of the budget keeps three.
+    assert (report.removed_lru, report.removed_abandoned, report.remaining_bytes) == (2, 1, 3 * 511)
+    assert cache.get("tile-0") is not None
+    assert [cache.get(f"tile-{index}") is None for index in range(1, 5)] == [True, True, False, False]
+    assert not os.path.exists(abandoned)
+    assert cache.collect_garbage(now=10_000).reclaimed_bytes == 0
+
+
+def test_collect_iiif_tile_cache_garbage_uses_the_configured_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(app_config, "IIIF_TILE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(app_config, "IIIF_TILE_CACHE_DISK_BYTES", 600)
+    cache = DiskTileCache(str(tmp_path), max_bytes=600)
+    cache.put("old", _tile(500))
+    os.utime(cache._path_for_key("old"), (1000, 1000))
+    cache.put("new", _tile(90))
+
+    assert collect_iiif_tile_cache_garbage().removed_lru == 1
+    assert (cache.get("old"), cache.get("new")) == (None, _tile(90))
+
+    monkeypatch.setattr(app_config, "IIIF_TILE_CACHE_DISK_BYTES", 0)
+    assert collect_iiif_tile_cache_garbage().scanned_files == 0
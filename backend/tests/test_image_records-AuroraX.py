@@ -454,7 +454,7 @@ def test_confirm_bind_keeps_only_one_representative_image_per_object_number(db_s
     monkeypatch.setattr(
         image_records_router,
         "_probe_image_file",
-        lambda _path, _mime_type: (1200, 900, "image/png", 1),
+        lambda _path, _mime_type, _header=None: (1200, 900, "image/png", 1),
     )
     seed_auth_data(db_session)
     metadata_user = _metadata_entry_user()
@@ -606,7 +606,7 @@ def test_confirm_replace_also_enforces_representative_image_uniqueness(db_sessio
     monkeypatch.setattr(
         image_records_router,
         "_probe_image_file",
-        lambda _path, _mime_type: (1200, 900, "image/png", 1),
+        lambda _path, _mime_type, _header=None: (1200, 900, "image/png", 1),
     )
     seed_auth_data(db_session)
     metadata_user = _metadata_entry_user()
@@ -755,6 +755,7 @@ def test_duplicate_hash_blocks_confirm_bind(db_session, test_upload_dir, monkeyp
             mime_type="image/png",
             status="ready",
             image_record_id=duplicate_record.id,
+            fixity_sha256=detailed.pending_upload.sha256,
             metadata_info={"technical": {"fixity_sha256": detailed.pending_upload.sha256}},
         )
     )
@@ -873,7 +874,7 @@ def test_confirm_bind_psb_upload_enqueues_iiif_derivative(db_session, test_uploa
     monkeypatch.setattr(
         image_records_router,
         "_probe_image_file",
-        lambda _path, _mime_type: (1200, 900, "image/vnd.adobe.photoshop", 1),
+        lambda _path, _mime_type, _header=None: (1200, 900, "image/vnd.adobe.photoshop", 1),
     )
 
     enqueued: list[tuple[int, str]] = []
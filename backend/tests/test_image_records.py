@@ -480,7 +480,7 @@ def test_confirm_bind_keeps_only_one_representative_image_per_object_number(db_s
     monkeypatch.setattr(
         image_records_router,
         "_probe_image_file",
-        lambda _path, _mime_type: (1200, 900, "image/png", 1),
+        lambda _path, _mime_type, _header=None: (1200, 900, "image/png", 1),
     )
     seed_auth_data(db_session)
     metadata_user = _metadata_entry_user()
@@ -632,7 +632,7 @@ def test_confirm_replace_also_enforces_representative_image_uniqueness(db_sessio
     monkeypatch.setattr(
         image_records_router,
         "_probe_image_file",
-        lambda _path, _mime_type: (1200, 900, "image/png", 1),
+        lambda _path, _mime_type, _header=None: (1200, 900, "image/png", 1),
     )
     seed_auth_data(db_session)
     metadata_user = _metadata_entry_user()
@@ -781,6 +781,7 @@ def test_duplicate_hash_blocks_confirm_bind(db_session, test_upload_dir, monkeyp
             mime_type="image/png",
             status="ready",
             image_record_id=duplicate_record.id,
+            fixity_sha256=detailed.pending_upload.sha256,
             metadata_info={"technical": {"fixity_sha256": detailed.pending_upload.sha256}},
         )
     )
@@ -876,6 +877,23 @@ def test_probe_image_file_falls_back_to_exiftool_metadata(monkeypatch, tmp_path)
     assert frame_count is None
 
 
+def test_probe_image_file_uses_the_streamed_header(monkeypatch, tmp_path):
+    buffer = BytesIO()
+    Image.new("RGB", (320, 200), "white").save(buffer, format="JPEG")
+    file_path = tmp_path / "scan.jpg"
+    file_path.write_bytes(buffer.getvalue())
+
+    def _no_disk_read(*args, **kwargs):
+        raise AssertionError("the captured header should have been enough")
+
+    monkeypatch.setattr(image_records_router, "read_file_header", _no_disk_read)
+    monkeypatch.setattr(image_records_router, "extract_metadata", _no_disk_read)
+
+    probed = image_records_router._probe_image_file(str(file_path), "application/octet-stream", buffer.getvalue())
+
+    assert probed == (320, 200, "JPEG", 1)
+
+
 def test_confirm_bind_psb_upload_enqueues_iiif_derivative(db_session, test_upload_dir, monkeypatch):
     monkeypatch.setattr(app_config, "UPLOAD_DIR", str(test_upload_dir))
     seed_auth_data(db_session)
@@ -899,7 +917,7 @@ def test_confirm_bind_psb_upload_enqueues_iiif_derivative(db_session, test_uploa
     monkeypatch.setattr(
         image_records_router,
         "_probe_image_file",
-        lambda _path, _mime_type: (1200, 900, "image/vnd.adobe.photoshop", 1),
+        lambda _path, _mime_type, _header=None: (1200, 900, "image/vnd.adobe.photoshop", 1),
     )
 
     enqueued: list[tuple[int, str]] = []
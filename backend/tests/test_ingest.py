@@ -5,6 +5,7 @@ from io import BytesIO
 
 import pytest
 from fastapi import HTTPException, UploadFile
+from starlette.requests import Request
 from PIL import Image
 
 from app import config as app_config
@@ -27,6 +28,10 @@ def _sha256_bytes(payload: bytes) -> str:
     return hashlib.sha256(payload).hexdigest()
 
 
+def _anonymous_request() -> Request:
+    return Request({"type": "http", "method": "POST", "path": "/ingest/sip", "headers": []})
+
+
 def test_ingest_sip_persists_asset_and_returns_fixity(monkeypatch, db_session, test_upload_dir):
     monkeypatch.setattr(app_config, "UPLOAD_DIR", str(test_upload_dir))
     monkeypatch.setattr(ingest_router, "extract_metadata", lambda _path: {"File": {"ImageWidth": 8, "ImageHeight": 8}})
@@ -46,6 +51,7 @@ def test_ingest_sip_persists_asset_and_returns_fixity(monkeypatch, db_session, t
 
     async def run():
         return await ingest_router.ingest_sip(
+            request=_anonymous_request(),
             file=UploadFile(file=BytesIO(payload), filename="ingest.png"),
             manifest=json.dumps(manifest),
             db=db_session,
@@ -61,12 +67,17 @@ def test_ingest_sip_persists_asset_and_returns_fixity(monkeypatch, db_session, t
     asset = db_session.query(Asset).filter(Asset.id == response["asset_id"]).first()
     assert asset is not None
     assert asset.filename == "ingest.png"
+    assert asset.fixity_sha256 == manifest["hash"]
     assert asset.status == "ready"
     assert asset.metadata_info["schema_version"] == "2.0"
     assert asset.metadata_info["technical"]["width"] == 8
     assert asset.metadata_info["technical"]["height"] == 8
     assert asset.metadata_info["technical"]["iiif_access_file_path"] == str(test_upload_dir / "ingest.png")
     assert asset.metadata_info["profile"]["key"] == "other"
+    assert set(asset.metadata_info["technical"]["ingest_timings"]) >= {"stream_ms", "probe_ms", "total_ms"}
+    assert "exif_metadata" not in asset.metadata_info["raw_metadata"]
+    assert asset.metadata_info["raw_metadata"]["server_hash"] == manifest["hash"]
+    assert asset.source_metadata_record.payload == {"exif_metadata": {"File": {"ImageWidth": 8, "ImageHeight": 8}}}
     assert (test_upload_dir / "ingest.png").exists()
     assert queued == []
 
@@ -84,6 +95,7 @@ def test_ingest_sip_rejects_bad_fixity(monkeypatch, db_session, test_upload_dir)
 
     async def run():
         return await ingest_router.ingest_sip(
+            request=_anonymous_request(),
             file=UploadFile(file=BytesIO(payload), filename="broken.png"),
             manifest=json.dumps(manifest),
             db=db_session,
@@ -117,6 +129,7 @@ def test_ingest_sip_queues_large_tiff_for_iiif_access_derivative(monkeypatch, db
 
     async def run():
         return await ingest_router.ingest_sip(
+            request=_anonymous_request(),
             file=UploadFile(file=BytesIO(payload), filename="large.tif"),
             manifest=json.dumps(manifest),
             db=db_session,
@@ -154,6 +167,7 @@ def test_ingest_sip_queues_psb_for_mandatory_iiif_access_derivative(monkeypatch,
 
     async def run():
         return await ingest_router.ingest_sip(
+            request=_anonymous_request(),
             file=UploadFile(file=BytesIO(payload), filename="master.psb"),
             manifest=json.dumps(manifest),
             db=db_session,
@@ -0,0 +1,71 @@
+import asyncio
+import hashlib
+import struct
+from io import BytesIO
+
+import pytest
+from fastapi import UploadFile
+from PIL import Image
+
+from app.services.ingest_pipeline import (
+    HEADER_CAPTURE_BYTES,
+    IngestTimer,
+    PersistedUploadFile,
+    sniff_image_header,
+    stream_upload_to_disk,
+)
+
+
+def _image_bytes(image_format: str, size: tuple[int, int]) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", size, "white").save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def _psb_header(width: int, height: int) -> bytes:
+    return b"8BPS" + struct.pack(">H6sHIIHH", 2, b"\0" * 6, 3, height, width, 8, 3)
+
+
+def test_stream_upload_to_disk_hashes_and_captures_header_in_one_pass(tmp_path):
+    payload = _image_bytes("JPEG", (640, 480)) + b"\0" * (HEADER_CAPTURE_BYTES + 4096)
+    destination = tmp_path / "upload.jpg"
+
+    streamed = asyncio.run(
+        stream_upload_to_disk(UploadFile(file=BytesIO(payload), filename="upload.jpg"), str(destination), chunk_size=7919)
+    )
+
+    assert streamed.sha256 == hashlib.sha256(payload).hexdigest()
+    assert streamed.file_size == len(payload)
+    assert streamed.header == payload[:HEADER_CAPTURE_BYTES]
+    assert destination.read_bytes() == payload
+
+
+def test_sniff_image_header_reads_dimensions_from_leading_bytes():
+    jpeg = sniff_image_header(_image_bytes("JPEG", (640, 480))[:HEADER_CAPTURE_BYTES])
+    psb = sniff_image_header(_psb_header(30000, 20000))
+
+    assert (jpeg.format_name, jpeg.width, jpeg.height) == ("JPEG", 640, 480)
+    assert (psb.format_name, psb.width, psb.height) == ("PSB", 30000, 20000)
+    assert sniff_image_header(_image_bytes("JPEG", (640, 480))[:32]) is None
+    assert sniff_image_header(b"not an image") is None
+
+
+def test_ingest_timer_accumulates_stages():
+    timer = IngestTimer()
+    with timer.stage("probe"):
+        pass
+    with timer.stage("probe"):
+        pass
+
+    timings = timer.as_dict()
+
+    assert set(timings) == {"probe_ms", "total_ms"}
+    assert 0 <= timings["probe_ms"] <= timings["total_ms"]
+
+
+def test_persisted_upload_files_must_implement_persist():
+    class Incomplete(PersistedUploadFile):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete(file=BytesIO(b""), filename="a.tif")
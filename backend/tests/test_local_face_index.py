@@ -0,0 +1,174 @@
+import json
+import pickle
+
+import numpy as np
+import pytest
+
+from app.services.face_index_store import (
+    append_faces,
+    convert_legacy_index,
+    get_store_dir,
+    load_face_embeddings,
+    open_face_index,
+)
+from app.services.face_recognition import normalize_face_recognition_response
+from app.services.local_face_recognition import _build_index_snapshot, _get_face_index
+
+
+def _write_index(index_dir, clusters: dict[str, list], *, dims: int = 8, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    embeddings = {}
+    meta_clusters = {}
+    for cluster_id, offsets in clusters.items():
+        base = rng.normal(size=dims)
+        face_ids = []
+        for number, offset in enumerate(offsets):
+            face_id = f"{cluster_id}-{number}"
+            embeddings[face_id] = base + offset * rng.normal(size=dims)
+            face_ids.append(face_id)
+        meta_clusters[cluster_id] = {"name": f"Person {cluster_id}", "face_ids": face_ids}
+
+    (index_dir / "meta.json").write_text(json.dumps({"clusters": meta_clusters}), encoding="utf-8")
+    with (index_dir / "embeddings.pkl").open("wb") as file_obj:
+        pickle.dump(embeddings, file_obj)
+    return embeddings
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_index_snapshot_holds_contiguous_center_matrix(tmp_path):
+    _write_index(tmp_path, {"a": [0.1, 0.1], "b": [0.1], "c": [0.2, 0.2, 0.2]})
+
+    snapshot = _build_index_snapshot(tmp_path)
+
+    assert snapshot.cluster_ids == ("a", "b", "c")
+    assert snapshot.center_matrix.shape == (3, 8)
+    assert snapshot.center_matrix.dtype == np.float32
+    assert snapshot.center_matrix.flags["C_CONTIGUOUS"]
+    assert np.allclose(np.linalg.norm(snapshot.center_matrix, axis=1), 1.0, atol=1e-5)
+
+
+def test_matrix_match_agrees_with_per_cluster_loop(tmp_path):
+    _write_index(tmp_path, {str(n): [0.3, 0.3] for n in range(40)}, dims=16)
+    snapshot = _build_index_snapshot(tmp_path)
+    rng = np.random.default_rng(11)
+    faces = np.stack([_unit(rng.normal(size=16)) for _face in range(25)])
+
+    matches = snapshot.match(faces)
+
+    for face, match in zip(faces, matches):
+        scores = sorted(
+            ((float(np.dot(face, center)), cluster_id) for cluster_id, center in zip(snapshot.cluster_ids, snapshot.center_matrix)),
+            reverse=True,
+        )
+        assert match.cluster_id == scores[0][1]
+        assert match.score == pytest.approx(scores[0][0], abs=1e-5)
+        assert match.runner_up_id == scores[1][1]
+        assert match.margin == pytest.approx(scores[0][0] - scores[1][0], abs=1e-5)
+        assert match.margin >= 0
+
+
+def test_match_handles_single_cluster_and_empty_gallery(tmp_path):
+    single_dir = tmp_path / "single"
+    single_dir.mkdir()
+    _write_index(single_dir, {"only": [0.1]})
+    single = _build_index_snapshot(single_dir)
+    [match] = single.match(single.center_matrix[0])
+    assert match.cluster_id == "only"
+    assert match.score == pytest.approx(1.0, abs=1e-5)
+    assert match.runner_up_id is None
+    assert match.margin is None
+
+    empty_dir = tmp_path / "empty"
+    empty_dir.mkdir()
+    _write_index(empty_dir, {})
+    empty = _build_index_snapshot(empty_dir)
+    assert empty.center_matrix.shape[0] == 0
+    [match] = empty.match(np.ones((1, 8), dtype=np.float32))
+    assert match.cluster_id is None
+    assert match.score == -1.0
+    assert empty.match(np.empty((0, 8), dtype=np.float32)) == []
+
+
+def test_normalized_faces_carry_margin_when_reported():
+    payload = normalize_face_recognition_response(
+        {
+            "status": "success",
+            "count": 2,
+            "results": [
+                {"recognized": True, "person_info": {"id": "a", "name": "Ann"}, "score": 0.8, "margin": 0.25},
+                {"recognized": False, "score": 0.1},
+            ],
+        },
+        asset_id=1,
+        threshold=0.5,
+    )
+
+    assert [face["margin"] for face in payload["faces"]] == [0.25, None]
+
+
+def test_converted_store_maps_the_same_centres_as_the_legacy_pickle(tmp_path):
+    _write_index(tmp_path, {"a": [0.1, 0.1], "b": [0.1], "c": [0.2, 0.2, 0.2]})
+    legacy = _build_index_snapshot(tmp_path)
+
+    result = convert_legacy_index(tmp_path)
+    converted = _build_index_snapshot(tmp_path)
+
+    assert result == {"generation": 1, "faces": 6, "clusters": 3}
+    assert converted.source_key[0] == "store"
+    assert isinstance(converted.center_matrix, np.memmap)
+    assert converted.cluster_ids == legacy.cluster_ids
+    assert np.allclose(converted.center_matrix, legacy.center_matrix, atol=1e-6)
+    assert converted.format_person_info("b")["name"] == "Person b"
+    assert "face_ids" not in converted.clusters["b"]
+
+
+def test_appended_faces_match_a_full_rebuild(tmp_path):
+    embeddings = _write_index(tmp_path, {"a": [0.1, 0.1], "b": [0.1]})
+    convert_legacy_index(tmp_path)
+    store_dir = get_store_dir(tmp_path)
+    before = open_face_index(store_dir)
+    before_a = np.array(before.center_matrix[0])
+    rng = np.random.default_rng(3)
+    added = rng.normal(size=(3, 8))
+
+    generation = append_faces(
+        store_dir,
+        ["a-new", "c-0", "loose"],
+        ["a", "c", None],
+        added,
+        clusters={"c": {"name": "Person c"}},
+    )
+
+    after = open_face_index(store_dir)
+    assert generation == 2
+    assert after.cluster_ids == ("a", "b", "c")
+    expected_a = _unit(sum(_unit(vector) for vector in (embeddings["a-0"], embeddings["a-1"], added[0])))
+    assert np.allclose(after.center_matrix[0], expected_a, atol=1e-5)
+    assert np.allclose(after.center_matrix[2], _unit(added[1]), atol=1e-5)
+    assert after.clusters["c"] == {"name": "Person c"}
+    face_ids, cluster_ids, stored = load_face_embeddings(store_dir)
+    assert face_ids[-3:] == ["a-new", "c-0", "loose"]
+    assert cluster_ids[-3:] == ["a", "c", None]
+    assert stored.shape == (6, 8)
+    # The mapping opened before the swap still reads the previous generation.
+    assert before.center_matrix.shape == (2, 8)
+    assert np.array_equal(before.center_matrix[0], before_a)
+    assert sorted(path.name for path in store_dir.glob("faces-*.npy")) == ["faces-000001.npy", "faces-000002.npy"]
+
+
+def test_face_index_cache_follows_manifest_swaps(tmp_path):
+    _write_index(tmp_path, {"a": [0.1]})
+    convert_legacy_index(tmp_path)
+    first = _get_face_index(str(tmp_path))
+    assert _get_face_index(str(tmp_path)) is first
+
+    append_faces(get_store_dir(tmp_path), ["b-0"], ["b"], np.ones((1, 8)))
+
+    second = _get_face_index(str(tmp_path))
+    assert second is not first
+    assert second.cluster_ids == ("a", "b")
+    assert len(list(get_store_dir(tmp_path).glob("centers-*.npy"))) == 2
@@ -14,6 +14,8 @@ from app.models import Asset
 from app.permissions import build_system_user
 from app.routers import downloads as downloads_router
 from app.routers import iiif as iiif_router
+from app.services.iiif_access import build_iiif_source_fingerprint
+from app.services.iiif_capability import issue_iiif_capability
 
 
 pytestmark = [pytest.mark.unit, pytest.mark.contract]
@@ -137,7 +139,11 @@ def test_iiif_manifest_contract_uses_encoded_access_filename_and_layered_metadat
     )
 
     body = manifest["items"][0]["items"][0]["items"][0]["body"]
-    assert body["service"][0]["id"] == "http://mdams.example/api/iiif/5/service/iiif%20access%20copy.tiff"
+    fingerprint = build_iiif_source_fingerprint(str(access_path))
+    capability = issue_iiif_capability(5, "iiif access copy.tiff", "open")
+    assert body["service"][0]["id"] == (
+        f"http://mdams.example/api/iiif/5/capability/{capability}/v-{fingerprint}/iiif%20access%20copy.tiff"
+    )
     assert body["id"].endswith("/full/max/0/default.jpg")
 
     metadata_entries = {
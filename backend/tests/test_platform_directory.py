@@ -2,7 +2,7 @@ import asyncio
 from io import BytesIO
 
 import pytest
-from fastapi import UploadFile
+from fastapi import Response, UploadFile
 from PIL import Image
 
 from app import config as app_config
@@ -59,7 +59,7 @@ def test_platform_resource_directory_maps_image_subsystem(db_session, test_uploa
     three_d_summary = next(source for source in sources if source.source_system == "three_d")
     assert three_d_summary.resource_count == 0
 
-    resources = platform_router.get_resources(db=db_session)
+    resources = platform_router.get_resources(Response(), db=db_session)
     assert len(resources) == 2
 
     resource = next(item for item in resources if item.id == f"{image_source.SOURCE_SYSTEM}:{uploaded.id}")
@@ -99,19 +99,19 @@ def test_platform_resource_directory_maps_image_subsystem(db_session, test_uploa
     assert detail.profile_label == "其他"
     assert next(action for action in detail.actions if action.key == "export_bagit").target == "export_package"
 
-    filtered = platform_router.get_resources(q="platform-sample", db=db_session)
+    filtered = platform_router.get_resources(Response(), q="platform-sample", db=db_session)
     assert len(filtered) == 1
     assert filtered[0].id == resource.id
 
-    status_filtered = platform_router.get_resources(status="ready", db=db_session)
+    status_filtered = platform_router.get_resources(Response(), status="ready", db=db_session)
     assert len(status_filtered) == 2
     assert all(item.status == "ready" for item in status_filtered)
 
-    profile_filtered = platform_router.get_resources(profile_key="movable_artifact", db=db_session)
+    profile_filtered = platform_router.get_resources(Response(), profile_key="movable_artifact", db=db_session)
     assert len(profile_filtered) == 1
     assert profile_filtered[0].id == profile_resource.id
 
-    other_filtered = platform_router.get_resources(profile_key="other", db=db_session)
+    other_filtered = platform_router.get_resources(Response(), profile_key="other", db=db_session)
     assert len(other_filtered) == 1
     assert other_filtered[0].id == resource.id
 
@@ -0,0 +1,189 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Asset, ThreeDAsset
+from app.platform.base import ResourceCursor, resource_sort_key
+from app.routers import platform as platform_router
+from app.services.search_index import ensure_search_indexes
+
+
+BASE_TIME = datetime(2024, 3, 1, 8, 0, tzinfo=timezone.utc)
+
+
+def _image_asset(asset_id: int, *, created_at: datetime | None = None, title: str | None = None) -> Asset:
+    return Asset(
+        id=asset_id,
+        filename=f"image-{asset_id}.jpg",
+        file_path=f"/tmp/image-{asset_id}.jpg",
+        mime_type="image/jpeg",
+        status="ready",
+        created_at=created_at,
+        metadata_info={"core": {"title": title or f"Image {asset_id}"}},
+    )
+
+
+def _three_d_asset(asset_id: int, *, created_at: datetime | None = None, title: str | None = None) -> ThreeDAsset:
+    return ThreeDAsset(
+        id=asset_id,
+        filename=f"model-{asset_id}.glb",
+        file_path=f"/tmp/model-{asset_id}.glb",
+        file_size=1024,
+        mime_type="model/gltf-binary",
+        status="ready",
+        resource_type="three_d_model",
+        created_at=created_at,
+        metadata_info={"core": {"title": title or f"Model {asset_id}"}},
+    )
+
+
+def _walk_pages(db, *, limit: int, **filters) -> tuple[list[str], int]:
+    ids: list[str] = []
+    pages = 0
+    cursor = None
+    while True:
+        response = Response()
+        page = platform_router.get_resources(cursor=cursor, limit=limit, response=response, db=db, **filters)
+        pages += 1
+        assert len(page) <= limit
+        ids.extend(resource.id for resource in page)
+        cursor = response.headers.get(platform_router.NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return ids, pages
+
+
+@pytest.mark.integration
+def test_resource_pages_merge_sources_in_listing_order(db_session):
+    # Timestamps collide within and across sources so every tie-break is exercised.
+    db_session.add_all(
+        [_image_asset(index, created_at=BASE_TIME + timedelta(minutes=index // 3)) for index in range(1, 10)]
+        + [_three_d_asset(index, created_at=BASE_TIME + timedelta(minutes=index // 2)) for index in range(1, 8)]
+    )
+    db_session.commit()
+
+    everything = platform_router.get_resources(limit=100, response=Response(), db=db_session)
+    assert len(everything) == 16
+    assert everything == sorted(everything, key=resource_sort_key)
+
+    for limit in (1, 3, 5, 16):
+        ids, pages = _walk_pages(db_session, limit=limit)
+        assert ids == [resource.id for resource in everything]
+        assert pages == -(-16 // limit)
+
+    # The 3D source filters titles in Python; its pages still fill up across query batches.
+    db_session.add_all([_three_d_asset(index, created_at=BASE_TIME, title=f"Bell {index}") for index in range(20, 26)])
+    db_session.commit()
+    ids, _pages = _walk_pages(db_session, limit=2, q="bell")
+    assert ids == [f"three_d:{index}" for index in range(25, 19, -1)]
+
+
+@pytest.mark.integration
+def test_resource_cursor_rejects_garbage(db_session):
+    with pytest.raises(HTTPException) as exc_info:
+        platform_router.get_resources(Response(), cursor="not-a-cursor", db=db_session)
+    assert exc_info.value.status_code == 400
+
+    foreign_id = ResourceCursor(updated_at=BASE_TIME, source_system="image_2d", source_id="abc").encode()
+    with pytest.raises(HTTPException) as exc_info:
+        platform_router.get_resources(Response(), cursor=foreign_id, db=db_session)
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.unit
+def test_resource_cursor_round_trips():
+    cursor = ResourceCursor(updated_at=BASE_TIME, source_system="three_d", source_id="42")
+    assert ResourceCursor.decode(cursor.encode()) == cursor
+
+    ranked = ResourceCursor(updated_at=BASE_TIME, source_system="image_2d", source_id="7", search_rank=1.0e-6 / 3)
+    assert ResourceCursor.decode(ranked.encode()) == ranked
+
+
+@pytest.mark.unit
+def test_sqlite_pages_do_not_repeat_server_default_timestamps(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pages.db'}")
+    Base.metadata.create_all(bind=engine)
+    ensure_search_indexes(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        # CURRENT_TIMESTAMP has whole-second precision, so these all tie.
+        session.add_all([_image_asset(index) for index in range(1, 6)] + [_three_d_asset(index) for index in range(1, 4)])
+        session.commit()
+
+        ids, _pages = _walk_pages(session, limit=3)
+        assert ids == [f"image_2d:{index}" for index in range(5, 0, -1)] + [
+            f"three_d:{index}" for index in range(3, 0, -1)
+        ]
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.mark.unit
+def test_search_pages_follow_relevance_before_listing_order(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    Base.metadata.create_all(bind=engine)
+    ensure_search_indexes(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        # The oldest image is the closest match; the 3D source has no text index and ranks its matches 0.
+        session.add_all(
+            [_image_asset(1, created_at=BASE_TIME, title="Bell")]
+            + [
+                _image_asset(index, created_at=BASE_TIME + timedelta(minutes=index), title=f"Bell tower {index} by the market")
+                for index in range(2, 6)
+            ]
+            + [
+                _three_d_asset(index, created_at=BASE_TIME + timedelta(hours=1), title=f"Bell {index}")
+                for index in range(1, 4)
+            ]
+        )
+        session.commit()
+
+        everything = platform_router.get_resources(Response(), q="bell", limit=100, db=session)
+        assert [resource.id for resource in everything] == ["image_2d:1"] + [
+            f"image_2d:{index}" for index in range(5, 1, -1)
+        ] + [f"three_d:{index}" for index in range(3, 0, -1)]
+
+        for limit in (1, 2, 3):
+            ids, _pages = _walk_pages(session, limit=limit, q="bell")
+            assert ids == [resource.id for resource in everything]
+
+        # A listing cursor cannot continue a search, nor a search cursor a listing.
+        listing_response, search_response = Response(), Response()
+        platform_router.get_resources(listing_response, limit=1, db=session)
+        platform_router.get_resources(search_response, q="bell", limit=1, db=session)
+        for cursor, q in (
+            (listing_response.headers[platform_router.NEXT_CURSOR_HEADER], "bell"),
+            (search_response.headers[platform_router.NEXT_CURSOR_HEADER], None),
+        ):
+            with pytest.raises(HTTPException) as exc_info:
+                platform_router.get_resources(Response(), cursor=cursor, q=q, db=session)
+            assert exc_info.value.status_code == 400
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.mark.integration
+def test_postgres_search_pages_keep_tied_ranks_together(db_session):
+    # Equal term frequencies and lengths tie under ts_rank; the float4 rank must survive the cursor.
+    db_session.add_all(
+        [
+            _image_asset(index, created_at=BASE_TIME + timedelta(minutes=index % 3), title=f"Bell tower {index}")
+            for index in range(1, 8)
+        ]
+        + [_image_asset(8, created_at=BASE_TIME, title="Bell bell tower 8")]
+    )
+    db_session.commit()
+
+    everything = platform_router.get_resources(Response(), q="bell", limit=100, db=db_session)
+    assert len(everything) == 8
+    assert everything[0].id == "image_2d:8"
+
+    for limit in (1, 2, 3):
+        ids, _pages = _walk_pages(db_session, limit=limit, q="bell")
+        assert ids == [resource.id for resource in everything]
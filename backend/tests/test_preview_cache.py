@@ -0,0 +1,127 @@
+import os
+import time
+from pathlib import Path
+
+from PIL import Image
+
+from app import config as app_config
+from app.models import Asset
+from app.services.preview_cache import collect_preview_garbage, list_asset_preview_paths
+from app.services.preview_images import ensure_preview_image, ensure_preview_rendition
+
+
+def _create_asset(db_session, *, asset_id: int, file_path: str) -> Asset:
+    asset = Asset(
+        id=asset_id,
+        filename=os.path.basename(file_path),
+        file_path=file_path,
+        file_size=0,
+        mime_type="image/jpeg",
+        visibility_scope="open",
+        collection_object_id=None,
+        status="ready",
+        resource_type="image_2d_cultural_object",
+        metadata_info={
+            "core": {"title": os.path.basename(file_path)},
+            "technical": {},
+            "management": {},
+            "profile": {"key": "other", "label": "其他", "sheet": "其他", "fields": {}},
+            "raw_metadata": {},
+        },
+    )
+    db_session.add(asset)
+    db_session.commit()
+    db_session.refresh(asset)
+    return asset
+
+
+def _write_image(path: Path, color: str, size: tuple[int, int]) -> None:
+    Image.new("RGB", size, color).save(path, format="JPEG", quality=95)
+
+
+def _age(path: str | Path, seconds: float) -> None:
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def _upload_dir(tmp_path, monkeypatch) -> Path:
+    upload_dir = tmp_path / "uploads"
+    upload_dir.mkdir()
+    monkeypatch.setattr(app_config, "UPLOAD_DIR", str(upload_dir))
+    return upload_dir
+
+
+def test_collect_preview_garbage_removes_stale_and_orphaned_previews(db_session, tmp_path, monkeypatch):
+    upload_dir = _upload_dir(tmp_path, monkeypatch)
+    source_path = upload_dir / "sample.jpg"
+    _write_image(source_path, "red", (320, 240))
+    asset = _create_asset(db_session, asset_id=9201, file_path=str(source_path))
+
+    stale_preview = ensure_preview_image(asset)
+    stale_rendition = ensure_preview_rendition(asset, 150)
+    _write_image(source_path, "blue", (640, 480))
+    current_preview = ensure_preview_image(asset)
+    assert current_preview != stale_preview
+
+    orphan_path = upload_dir / "previews" / "asset-999999-1-1.preview.jpg"
+    orphan_path.write_bytes(b"orphan")
+    legacy_path = upload_dir / "previews" / "asset-9201.preview.jpg"
+    legacy_path.write_bytes(b"legacy")
+    abandoned_temp = upload_dir / "previews" / ".asset-9201-1-1.preview.jpg.1-2.tmp.jpg"
+    abandoned_temp.write_bytes(b"partial")
+    for path in (stale_preview, stale_rendition, current_preview, orphan_path, legacy_path, abandoned_temp):
+        _age(path, 2 * 60 * 60)
+
+    report = collect_preview_garbage(db_session, budget_bytes=0, min_age_seconds=60)
+
+    assert Path(current_preview).exists()
+    assert not Path(stale_preview).exists()
+    assert not Path(stale_rendition).exists()
+    assert not orphan_path.exists()
+    assert not legacy_path.exists()
+    assert not abandoned_temp.exists()
+    assert report.removed_stale == 3
+    assert report.removed_orphaned == 1
+    assert report.removed_abandoned == 1
+    assert report.removed_lru == 0
+    assert report.remaining_bytes == os.path.getsize(current_preview)
+    assert report.reclaimed_bytes > 0
+
+
+def test_collect_preview_garbage_evicts_least_recently_used_over_budget(db_session, tmp_path, monkeypatch):
+    upload_dir = _upload_dir(tmp_path, monkeypatch)
+    previews: list[str] = []
+    for index in range(3):
+        source_path = upload_dir / f"sample-{index}.jpg"
+        _write_image(source_path, "green", (800, 600))
+        asset = _create_asset(db_session, asset_id=9211 + index, file_path=str(source_path))
+        previews.append(ensure_preview_image(asset))
+
+    _age(previews[0], 3 * 60 * 60)
+    _age(previews[1], 2 * 60 * 60)
+    _age(previews[2], 10)
+    budget = os.path.getsize(previews[2]) + os.path.getsize(previews[1])
+
+    report = collect_preview_garbage(db_session, budget_bytes=budget, min_age_seconds=60)
+
+    assert not Path(previews[0]).exists()
+    assert Path(previews[2]).exists()
+    assert report.removed_stale == 0
+    assert report.removed_lru >= 1
+    assert report.remaining_bytes <= budget
+
+
+def test_list_asset_preview_paths_covers_every_fingerprint_and_rung(db_session, tmp_path, monkeypatch):
+    upload_dir = _upload_dir(tmp_path, monkeypatch)
+    source_path = upload_dir / "sample.jpg"
+    _write_image(source_path, "red", (320, 240))
+    asset = _create_asset(db_session, asset_id=9221, file_path=str(source_path))
+    neighbour_path = upload_dir / "previews" / "asset-92210-1-1.preview.jpg"
+
+    first_preview = ensure_preview_image(asset)
+    rendition = ensure_preview_rendition(asset, 150)
+    _write_image(source_path, "blue", (640, 480))
+    second_preview = ensure_preview_image(asset)
+    neighbour_path.write_bytes(b"other asset")
+
+    assert sorted(list_asset_preview_paths(asset.id)) == sorted([first_preview, rendition, second_preview])
@@ -1,10 +1,19 @@
+import threading
 from pathlib import Path
 
 from PIL import Image
+from sqlalchemy.orm import sessionmaker
 
 from app import config as app_config
 from app.models import Asset
-from app.services.preview_images import ensure_preview_image, get_preview_image_path
+from app.services import preview_images
+from app.services.preview_images import (
+    ensure_preview_image,
+    ensure_preview_rendition,
+    get_preview_image_path,
+    get_preview_rendition_path,
+)
+from app.tasks import generate_preview_ladder
 
 
 def _create_asset(db_session, *, asset_id: int, filename: str, file_path: str) -> Asset:
@@ -61,3 +70,88 @@ def test_preview_image_path_changes_when_source_changes(db_session, tmp_path, mo
     assert Path(second_preview).exists()
     assert second_preview == get_preview_image_path(asset, str(source_path_v2))
     assert second_preview != first_preview
+
+
+def test_concurrent_preview_requests_decode_once(db_session, tmp_path, monkeypatch):
+    upload_dir = tmp_path / "uploads"
+    upload_dir.mkdir()
+    monkeypatch.setattr(app_config, "UPLOAD_DIR", str(upload_dir))
+
+    source_path = upload_dir / "busy.jpg"
+    _write_image(source_path, "green", (320, 240))
+    asset = _create_asset(db_session, asset_id=9003, filename="busy.jpg", file_path=str(source_path))
+
+    generate = preview_images._generate_preview_with_pyvips
+    decodes = []
+
+    def counting_generate(source, target):
+        decodes.append(source)
+        threading.Event().wait(0.1)
+        generate(source, target)
+
+    monkeypatch.setattr(preview_images, "_generate_preview_with_pyvips", counting_generate)
+    barrier = threading.Barrier(5)
+    results = []
+
+    def request_preview():
+        barrier.wait()
+        results.append(ensure_preview_image(asset))
+
+    threads = [threading.Thread(target=request_preview) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(decodes) == 1
+    assert len(set(results)) == 1 and Path(results[0]).exists()
+    assert sorted(path.name for path in (upload_dir / "previews").iterdir()) == [Path(results[0]).name]
+
+
+def test_preview_ladder_task_records_renditions(db_session, tmp_path, monkeypatch):
+    upload_dir = tmp_path / "uploads"
+    upload_dir.mkdir()
+    monkeypatch.setattr(app_config, "UPLOAD_DIR", str(upload_dir))
+    monkeypatch.setattr(app_config, "PREVIEW_LADDER_SIZES", (150, 400, 800, 1600))
+    monkeypatch.setattr("app.tasks.SessionLocal", sessionmaker(bind=db_session.get_bind(), autocommit=False, autoflush=False))
+
+    source_path = upload_dir / "wide.jpg"
+    _write_image(source_path, "orange", (2400, 1200))
+    asset = _create_asset(db_session, asset_id=9004, filename="wide.jpg", file_path=str(source_path))
+
+    generate_preview_ladder.run(asset.id)
+    db_session.refresh(asset)
+
+    ladder = asset.metadata_info["technical"]["preview_ladder"]
+    assert ladder["source_path"] == str(source_path)
+    assert [(item["size"], item["width"], item["height"]) for item in ladder["renditions"]] == [
+        (150, 150, 75),
+        (400, 400, 200),
+        (800, 800, 400),
+        (1600, 1600, 800),
+    ]
+    for rendition in ladder["renditions"]:
+        assert rendition["path"] == get_preview_rendition_path(asset, str(source_path), rendition["size"])
+        assert Image.open(rendition["path"]).size == (rendition["width"], rendition["height"])
+
+    # Served straight from the ladder: no decode on the request path.
+    monkeypatch.setattr(preview_images, "_load_ladder_base", lambda *_args: (_ for _ in ()).throw(AssertionError))
+    assert ensure_preview_rendition(asset, 300) == ladder["renditions"][1]["path"]
+    assert ensure_preview_rendition(asset, 5000) == ladder["renditions"][-1]["path"]
+
+
+def test_preview_rendition_is_rendered_on_demand_before_ladder_exists(db_session, tmp_path, monkeypatch):
+    upload_dir = tmp_path / "uploads"
+    upload_dir.mkdir()
+    monkeypatch.setattr(app_config, "UPLOAD_DIR", str(upload_dir))
+    monkeypatch.setattr(app_config, "PREVIEW_LADDER_SIZES", (150, 400))
+
+    source_path = upload_dir / "tall.jpg"
+    _write_image(source_path, "purple", (600, 900))
+    asset = _create_asset(db_session, asset_id=9005, filename="tall.jpg", file_path=str(source_path))
+
+    rendition = ensure_preview_rendition(asset, 150)
+
+    assert rendition == get_preview_rendition_path(asset, str(source_path), 150)
+    assert Image.open(rendition).size == (100, 150)
+
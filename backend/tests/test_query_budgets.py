@@ -0,0 +1,151 @@
+import pytest
+
+from app.models import (
+    Application,
+    ApplicationItem,
+    Asset,
+    ImageIngestSheet,
+    ImageRecord,
+    ThreeDAsset,
+    ThreeDAssetFile,
+    ThreeDCollectionObject,
+    ThreeDProductionRecord,
+    User,
+)
+from app.permissions import get_current_user
+from app.platform import three_d_source
+from app.routers import applications as applications_router
+from app.routers import image_records as image_records_router
+from app.routers import three_d as three_d_router
+from app.schemas import ApplicationDetailResponse
+
+
+pytestmark = pytest.mark.integration
+
+ROWS = (2, 20)
+
+
+def _admin():
+    return get_current_user(x_mdams_user="system-admin")
+
+
+def _seed(db_session, rows: int) -> dict[str, int]:
+    users = [
+        User(username=f"user-{index}", display_name=f"User {index}", password_hash="x", is_active=True)
+        for index in range(rows)
+    ]
+    db_session.add_all(users)
+    db_session.flush()
+
+    sheet = ImageIngestSheet(sheet_no="IS-0", status="in_progress")
+    db_session.add_all([sheet, *(ImageIngestSheet(sheet_no=f"IS-{index}", status="draft") for index in range(1, rows))])
+    db_session.flush()
+    assets = []
+    for index, user in enumerate(users):
+        record = ImageRecord(
+            sheet_id=sheet.id,
+            line_no=index + 1,
+            record_no=f"IR-{index}",
+            status="ready_for_upload",
+            created_by_user_id=user.id,
+            submitted_by_user_id=user.id,
+            assigned_photographer_user_id=user.id,
+        )
+        db_session.add(record)
+        db_session.flush()
+        asset = Asset(
+            filename=f"scan-{index}.tif",
+            file_path=f"/uploads/scan-{index}.tif",
+            file_size=1024,
+            mime_type="image/tiff",
+            status="ready",
+            image_record_id=record.id,
+            metadata_info={},
+        )
+        assets.append(asset)
+    db_session.add_all(assets)
+    db_session.flush()
+
+    applications = [
+        Application(
+            application_no=f"APP-{index}",
+            requester_name="Reader",
+            purpose="research",
+            items=[ApplicationItem(asset_id=asset.id) for asset in assets],
+        )
+        for index in range(rows)
+    ]
+    db_session.add_all(applications)
+
+    three_d_assets = []
+    for index in range(rows):
+        three_d_asset = ThreeDAsset(
+            filename=f"model-{index}.glb",
+            file_path=f"/uploads/model-{index}.glb",
+            file_size=2048,
+            mime_type="model/gltf-binary",
+            status="ready",
+            metadata_info={"core": {"title": f"Model {index}"}},
+            collection_object=ThreeDCollectionObject(object_number=f"OBJ-{index}", object_name=f"Object {index}"),
+            files=[
+                ThreeDAssetFile(role="model", filename=f"part-{part}.glb", file_path=f"/uploads/part-{part}.glb", sort_order=part)
+                for part in range(rows)
+            ],
+            production_records=[
+                ThreeDProductionRecord(stage="capture", event_type="scan", status="done") for _part in range(rows)
+            ],
+        )
+        three_d_assets.append(three_d_asset)
+    db_session.add_all(three_d_assets)
+    db_session.commit()
+    ids = {"sheet": sheet.id, "application": applications[0].id, "three_d": three_d_assets[0].id}
+    # Every endpoint starts from an empty identity map, as a request does.
+    db_session.expunge_all()
+    return ids
+
+
+ENDPOINTS = {
+    "sheet_list": (2, lambda db, ids: image_records_router.list_image_ingest_sheets(q=None, db=db, user=_admin())),
+    "sheet_detail": (3, lambda db, ids: image_records_router.get_image_ingest_sheet(ids["sheet"], db=db, user=_admin())),
+    "image_record_list": (2, lambda db, ids: image_records_router.list_image_records(db=db, user=_admin())),
+    "application_list": (2, lambda db, ids: applications_router.list_applications(db=db, user=_admin())),
+    "application_detail": (
+        2,
+        lambda db, ids: ApplicationDetailResponse.model_validate(
+            applications_router.get_application(ids["application"], db=db, user=_admin())
+        ),
+    ),
+    "three_d_list": (1, lambda db, ids: three_d_router.list_three_d_resources(db=db, user=_admin())),
+    "three_d_detail": (3, lambda db, ids: three_d_router.get_three_d_resource(ids["three_d"], db=db)),
+    "platform_three_d_detail": (3, lambda db, ids: three_d_source.get_unified_resource(ids["three_d"], db)),
+}
+
+
+@pytest.mark.parametrize("rows", ROWS)
+@pytest.mark.parametrize("endpoint", sorted(ENDPOINTS))
+def test_endpoint_stays_within_query_budget(db_session, query_budget, endpoint, rows):
+    ids = _seed(db_session, rows)
+    budget, call = ENDPOINTS[endpoint]
+
+    with query_budget(budget):
+        result = call(db_session, ids)
+
+    assert result
+
+
+def test_sheet_edits_reload_the_sheet_within_budget(db_session, query_budget):
+    from app.schemas import ImageIngestSheetSaveRequest
+
+    ids = _seed(db_session, 20)
+    db_session.expunge_all()
+
+    with query_budget(7):
+        detail = image_records_router.update_image_ingest_sheet(
+            ids["sheet"],
+            ImageIngestSheetSaveRequest(title="Renamed"),
+            db=db_session,
+            user=_admin(),
+        )
+
+    assert detail.title == "Renamed"
+    assert len(detail.items) == 20
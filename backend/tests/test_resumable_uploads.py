@@ -0,0 +1,194 @@
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+from io import BytesIO
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+from starlette.requests import Request
+
+from app import config as app_config
+from app.models import Asset
+from app.permissions import get_current_user
+from app.routers import ingest as ingest_router
+from app.routers import three_d as three_d_router
+from app.services import resumable_uploads
+from app.services.resumable_uploads import (
+    ResumableUploadError,
+    append_resumable_chunk,
+    create_resumable_upload,
+    expire_resumable_uploads,
+    finalize_resumable_upload,
+    get_resumable_upload,
+)
+
+
+pytestmark = [pytest.mark.integration]
+
+
+async def _body(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+def _append(upload_id: str, offset: int, *parts: bytes, owner: str | None = "uploader"):
+    return asyncio.run(append_resumable_chunk(upload_id, offset, _body(*parts), owner=owner))
+
+
+def _png_bytes() -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (64, 48), "white").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_resumable_upload_resumes_from_reported_offset(monkeypatch, test_upload_dir):
+    monkeypatch.setattr(app_config, "UPLOAD_DIR", str(test_upload_dir))
+    payload = os.urandom(300_000)
+    session = create_resumable_upload(filename="master.psb", length=len(payload), owner="uploader")
+
+    first = _append(session.upload_id, 0, payload[:100_000], payload[100_000:120_000])
+    assert first.offset == 120_000
+    assert not first.complete
+
+    with pytest.raises(ResumableUploadError) as conflict:
+        _append(session.upload_id, 0, payload[:10])
+    assert conflict.value.status_code == 409
+    assert conflict.value.offset == 120_000
+    with pytest.raises(ResumableUploadError) as foreign:
+        get_resumable_upload(session.upload_id, owner="someone-else")
+    assert foreign.value.status_code == 403
+
+    # The next chunk lands on a process that never saw the first one.
+    resumable_uploads._HASHERS.clear()
+    resumed_offset = get_resumable_upload(session.upload_id, owner="uploader").offset
+    finished = _append(session.upload_id, resumed_offset, payload[resumed_offset:])
+
+    assert finished.complete
+    assert finished.sha256 == hashlib.sha256(payload).hexdigest()
+    assert get_resumable_upload(session.upload_id).sha256 == finished.sha256
+
+
+def test_finalize_recovers_an_upload_whose_hash_was_never_saved(monkeypatch, test_upload_dir):
+    monkeypatch.setattr(app_config, "UPLOAD_DIR", str(test_upload_dir))
+    payload = os.urandom(50_000)
+    session = create_resumable_upload(filename="master.tif", length=len(payload), owner="uploader")
+    _append(session.upload_id, 0, payload)
+    # The process died after the last chunk was written but before the meta file recorded its hash.
+    meta_path = os.path.join(resumable_uploads.get_resumable_upload_dir(), f"{session.upload_id}.json")
+    with open(meta_path, encoding="utf-8") as handle:
+        stored = json.load(handle)
+    stored["sha256"] = None
+    with open(meta_path, "w", encoding="utf-8") as handle:
+        json.dump(stored, handle)
+    resumable_uploads._HASHERS.clear()
+
+    finished = finalize_resumable_upload(session.upload_id, owner="uploader")
+
+    assert finished.complete
+    assert finished.sha256 == hashlib.sha256(payload).hexdigest()
+    assert get_resumable_upload(session.upload_id).sha256 == finished.sha256
+
+
+def test_resumable_upload_rejects_mismatched_checksum(monkeypatch, test_upload_dir):
+    monkeypatch.setattr(app_config, "UPLOAD_DIR", str(test_upload_dir))
+    session = create_resumable_upload(filename="a.tif", length=4, expected_sha256="0" * 64)
+
+    with pytest.raises(ResumableUploadError) as mismatch:
+        _append(session.upload_id, 0, b"data", owner=None)
+
+    assert mismatch.value.status_code == 400
+    with pytest.raises(ResumableUploadError):
+        get_resumable_upload(session.upload_id)
+
+
+def _request_as(user: str | None) -> Request:
+    headers = [(b"x-mdams-user", user.encode())] if user else []
+    return Request({"type": "http", "method": "POST", "path": "/ingest/sip", "headers": headers})
+
+
+def test_completed_resumable_upload_is_ingested_without_copying(monkeypatch, db_session, test_upload_dir):
+    monkeypatch.setattr(app_config, "UPLOAD_DIR", str(test_upload_dir))
+    monkeypatch.setattr(ingest_router, "extract_metadata", lambda _path: {})
+    payload = _png_bytes()
+    owner = get_current_user(x_mdams_user="system-admin").user_id
+    session = create_resumable_upload(filename="resumed.png", length=len(payload), content_type="image/png", owner=owner)
+    _append(session.upload_id, 0, payload, owner=owner)
+    part_inode = os.stat(os.path.join(resumable_uploads.get_resumable_upload_dir(), f"{session.upload_id}.part")).st_ino
+
+    def ingest(request: Request):
+        return asyncio.run(
+            ingest_router.ingest_sip(
+                request=request,
+                file=None,
+                manifest=json.dumps({"hash": hashlib.sha256(payload).hexdigest(), "metadata": {}}),
+                upload_id=session.upload_id,
+                db=db_session,
+            )
+        )
+
+    # Knowing the upload id is not enough to ingest someone else's upload.
+    with pytest.raises(HTTPException) as anonymous:
+        ingest(_request_as(None))
+    assert anonymous.value.status_code == 401
+    with pytest.raises(HTTPException) as foreign:
+        ingest(_request_as("resource-user"))
+    assert foreign.value.status_code == 403
+
+    response = ingest(_request_as("system-admin"))
+
+    asset = db_session.query(Asset).filter(Asset.id == response["asset_id"]).one()
+    assert response["fixity_check"] == "PASS"
+    assert asset.filename == "resumed.png"
+    assert asset.metadata_info["technical"]["width"] == 64
+    assert os.stat(asset.file_path).st_ino == part_inode
+    assert os.listdir(resumable_uploads.get_resumable_upload_dir()) == []
+
+
+def test_rejected_three_d_upload_closes_the_resumable_handles_it_opened(monkeypatch, db_session, test_upload_dir):
+    monkeypatch.setattr(app_config, "UPLOAD_DIR", str(test_upload_dir))
+    owner = get_current_user(x_mdams_user="system-admin")
+    upload_ids = []
+    for filename in ("model.glb", "cloud.ply"):
+        session = create_resumable_upload(filename=filename, length=4, owner=owner.user_id)
+        _append(session.upload_id, 0, b"mesh", owner=owner.user_id)
+        upload_ids.append(session.upload_id)
+
+    opened = []
+
+    def recording_resolve(file, upload_id, *, owner=None):
+        upload = resumable_uploads.resolve_upload_file(file, upload_id, owner=owner)
+        opened.append(upload)
+        return upload
+
+    monkeypatch.setattr(three_d_router, "resolve_upload_file", recording_resolve)
+    form = {name: None for name in inspect.signature(three_d_router.upload_three_d_resource).parameters}
+
+    def upload(**fields):
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(three_d_router.upload_three_d_resource(**{**form, "db": db_session, "_user": owner, **fields}))
+        return exc_info.value.status_code
+
+    # A later id that does not resolve, and a check after every id resolved.
+    assert upload(mesh_upload_ids=[upload_ids[0], "0" * 32]) == 404
+    assert upload(mesh_upload_ids=upload_ids, collection_object_id=987654) == 404
+
+    assert len(opened) == 3
+    assert all(upload.file.closed for upload in opened)
+
+
+def test_expire_resumable_uploads_removes_idle_sessions(monkeypatch, test_upload_dir):
+    monkeypatch.setattr(app_config, "UPLOAD_DIR", str(test_upload_dir))
+    monkeypatch.setattr(app_config, "RESUMABLE_UPLOAD_TTL_SECONDS", 60)
+    idle = create_resumable_upload(filename="idle.tif", length=10)
+    active = create_resumable_upload(filename="active.tif", length=10)
+    for suffix in (".json", ".part"):
+        path = os.path.join(resumable_uploads.get_resumable_upload_dir(), f"{idle.upload_id}{suffix}")
+        os.utime(path, (0, 0))
+
+    assert expire_resumable_uploads() == 1
+    assert get_resumable_upload(active.upload_id).offset == 0
+    with pytest.raises(ResumableUploadError):
+        get_resumable_upload(idle.upload_id)
@@ -63,7 +63,7 @@ async def _upload_sample(db_session, upload_dir):
     return uploaded
 
 
-def test_root_health_and_upload_chain(db_session, test_upload_dir, monkeypatch):
+def test_root_health_and_upload_chain(db_session, test_upload_dir, monkeypatch, queued_preview_ladders):
     monkeypatch.setattr(app_config, "UPLOAD_DIR", str(test_upload_dir))
     monkeypatch.setattr(app_config, "CANTALOUPE_PUBLIC_URL", "http://cantaloupe:8182/iiif/2")
 
@@ -76,6 +76,16 @@ def test_root_health_and_upload_chain(db_session, test_upload_dir, monkeypatch):
     assert health_payload["checks"]["upload_dir"]["status"] == "healthy"
 
     uploaded = asyncio.run(_upload_sample(db_session, test_upload_dir))
+    assert queued_preview_ladders == [uploaded.id]
+
+    preview_response = assets_router.get_asset_preview_rendition(
+        asset_id=uploaded.id,
+        size=150,
+        db=db_session,
+        user=build_system_user(),
+    )
+    assert preview_response.media_type == "image/jpeg"
+    assert Path(preview_response.path).name.endswith("-150px.preview.jpg")
 
     assets = assets_router.list_assets(db=db_session, user=build_system_user())
     assert len(assets) == 1
@@ -110,9 +120,10 @@ def test_root_health_and_upload_chain(db_session, test_upload_dir, monkeypatch):
     )
     assert manifest["id"].endswith(f"/iiif/{uploaded.id}/manifest")
     assert manifest["items"][0]["id"].endswith(f"/iiif/{uploaded.id}/canvas/1")
-    assert manifest["items"][0]["items"][0]["items"][0]["body"]["service"][0]["id"].endswith(
-        f"/iiif/{uploaded.id}/service/smoke.png"
-    )
+    service_id = manifest["items"][0]["items"][0]["items"][0]["body"]["service"][0]["id"]
+    assert f"/iiif/{uploaded.id}/capability/" in service_id
+    assert "/v-" in service_id
+    assert service_id.endswith("/smoke.png")
 
     download_response = downloads_router.download_asset_file(asset_id=uploaded.id, db=db_session)
     assert Path(download_response.path).exists()
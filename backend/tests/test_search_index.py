@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Asset
+from app.platform.image_source import list_unified_resources_filtered
+from app.services.search_index import apply_text_search, ensure_search_indexes
+
+
+def _asset(asset_id: int, title: str, object_number: str) -> Asset:
+    return Asset(
+        id=asset_id,
+        filename=f"asset-{asset_id}.jpg",
+        file_path=f"/tmp/asset-{asset_id}.jpg",
+        mime_type="image/jpeg",
+        status="ready",
+        metadata_info={
+            "core": {"title": title},
+            "technical": {},
+            "management": {"project_name": "Spring survey"},
+            "profile": {"key": "movable_artifact", "fields": {"object_number": object_number}},
+            "raw_metadata": {},
+        },
+    )
+
+
+def _search_ids(session, search: str) -> list[int]:
+    result = apply_text_search(session.query(Asset), Asset, search)
+    return [asset.id for asset in result.query.order_by(result.rank.desc(), Asset.id.asc()).all()]
+
+
+@pytest.fixture()
+def sqlite_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    Base.metadata.create_all(bind=engine)
+    ensure_search_indexes(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.mark.unit
+def test_sqlite_fts_tracks_writes_and_matches_substrings(sqlite_session):
+    sqlite_session.add_all([_asset(1, "青铜镜", "故宫00123"), _asset(2, "Blue Vase", "OBJ-2")])
+    sqlite_session.commit()
+
+    assert _search_ids(sqlite_session, "宫001") == [1]
+    assert _search_ids(sqlite_session, "blue vas") == [2]
+    assert _search_ids(sqlite_session, "vase blue") == [2]
+    assert _search_ids(sqlite_session, "vase jar") == []
+    # A two-letter word is too short for trigrams; the LIKE fallback keeps the same semantics.
+    assert _search_ids(sqlite_session, "vase bl") == [2]
+    assert _search_ids(sqlite_session, "survey") == [1, 2]
+
+    vase = sqlite_session.get(Asset, 2)
+    vase.metadata_info = {**vase.metadata_info, "core": {"title": "Green Jar"}}
+    sqlite_session.commit()
+    sqlite_session.delete(sqlite_session.get(Asset, 1))
+    sqlite_session.commit()
+
+    assert _search_ids(sqlite_session, "blue vas") == []
+    assert _search_ids(sqlite_session, "green jar") == [2]
+    assert _search_ids(sqlite_session, "故宫") == []
+
+
+@pytest.mark.integration
+def test_platform_query_is_served_from_the_search_index(db_session):
+    db_session.add_all([_asset(1, "青铜镜", "故宫00123"), _asset(2, "Blue Vase", "OBJ-2"), _asset(3, "Vase", "OBJ-3")])
+    db_session.commit()
+
+    assert [resource.source_id for resource in list_unified_resources_filtered(db_session, q="宫0012")] == ["1"]
+    assert [resource.source_id for resource in list_unified_resources_filtered(db_session, q="vase blue")] == ["2"]
+    assert [resource.source_id for resource in list_unified_resources_filtered(db_session, q="image_2d:3")] == ["3"]
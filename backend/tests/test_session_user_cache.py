@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from app.models import Role, User, UserRole
+from app.permissions import get_current_user
+from app.services import session_user_cache
+from app.services.auth import create_user_session, delete_session_token, seed_auth_data
+from app.services.session_user_cache import SessionUserCache, get_session_user_cache_stats
+
+
+pytestmark = pytest.mark.unit
+
+
+class _QueryCounter:
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _count(self, *_args):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *_exc_info):
+        event.remove(self.engine, "before_cursor_execute", self._count)
+
+
+def _login(db_session, username: str) -> str:
+    user = db_session.query(User).filter(User.username == username).one()
+    return create_user_session(db_session, user).session_token
+
+
+def test_warm_session_lookups_issue_no_queries(db_session):
+    seed_auth_data(db_session)
+    token = _login(db_session, "resource_user")
+
+    with _QueryCounter(db_session.get_bind()) as cold:
+        first = get_current_user(db=db_session, authorization=f"Bearer {token}")
+    with _QueryCounter(db_session.get_bind()) as warm:
+        second = get_current_user(db=db_session, session_token=token)
+
+    assert cold.count >= 3
+    assert warm.count == 0
+    assert second == first
+    # Each request gets its own copy of the cached user.
+    second.permissions.add("system.manage")
+    assert not get_current_user(db=db_session, session_token=token).has_permission("application.review")
+
+    stats = get_session_user_cache_stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+
+
+def test_logout_drops_the_cached_user(db_session):
+    seed_auth_data(db_session)
+    token = _login(db_session, "resource_user")
+    get_current_user(db=db_session, session_token=token)
+
+    delete_session_token(db_session, token)
+
+    with pytest.raises(HTTPException) as exc_info:
+        get_current_user(db=db_session, session_token=token)
+    assert exc_info.value.status_code == 401
+
+
+def test_role_and_scope_changes_drop_the_cached_user(db_session):
+    seed_auth_data(db_session)
+    token = _login(db_session, "resource_user")
+    assert not get_current_user(db=db_session, session_token=token).has_permission("application.review")
+
+    user = db_session.query(User).filter(User.username == "resource_user").one()
+    reviewer = db_session.query(Role).filter(Role.key == "application_reviewer").one()
+    db_session.add(UserRole(user_id=user.id, role_id=reviewer.id))
+    db_session.commit()
+    assert get_current_user(db=db_session, session_token=token).has_permission("application.review")
+
+    user.collection_scope = [3, 5]
+    db_session.commit()
+    assert get_current_user(db=db_session, session_token=token).collection_scope == {3, 5}
+
+    # Uncommitted changes leave the cache alone.
+    user.collection_scope = [9]
+    db_session.flush()
+    db_session.rollback()
+    with _QueryCounter(db_session.get_bind()) as warm:
+        assert get_current_user(db=db_session, session_token=token).collection_scope == {3, 5}
+    assert warm.count == 0
+
+
+def test_entries_expire_with_ttl_or_session(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(session_user_cache.time, "monotonic", lambda: now[0])
+    cache = SessionUserCache(ttl_seconds=30, max_entries=2)
+    later = datetime.now(timezone.utc) + timedelta(hours=1)
+
+    cache.put("a", "user-a", user_pk=1, session_expires_at=later, generation=cache.generation)
+    cache.put("b", "user-b", user_pk=2, session_expires_at=datetime.now(timezone.utc) + timedelta(seconds=5), generation=cache.generation)
+    now[0] += 10
+    assert cache.get("a") == "user-a"
+    assert cache.get("b") is None
+
+    now[0] += 25
+    assert cache.get("a") is None
+    assert cache.stats()["expired"] == 2
+
+
+def test_lookups_racing_an_invalidation_are_not_cached():
+    cache = SessionUserCache(ttl_seconds=30, max_entries=2)
+    later = datetime.now(timezone.utc) + timedelta(hours=1)
+
+    generation = cache.generation
+    cache.invalidate_users({1})
+    cache.put("a", "stale", user_pk=1, session_expires_at=later, generation=generation)
+    assert cache.get("a") is None
+
+    for token in ("a", "b", "c"):
+        cache.put(token, token, user_pk=1, session_expires_at=later, generation=cache.generation)
+    assert len(cache) == 2
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,146 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from app.services.single_flight import (
+    AsyncSingleFlight,
+    FileLock,
+    SingleFlight,
+    get_single_flight_stats,
+    reset_single_flight_stats,
+)
+
+
+pytestmark = [pytest.mark.unit]
+
+
+@pytest.fixture(autouse=True)
+def _reset_stats():
+    reset_single_flight_stats()
+    yield
+    reset_single_flight_stats()
+
+
+def test_threads_share_one_leader_result():
+    flight = SingleFlight("test-threads")
+    calls = []
+    barrier = threading.Barrier(6)
+    results = []
+
+    def expensive():
+        calls.append(1)
+        time.sleep(0.1)
+        return "rendered"
+
+    def worker():
+        barrier.wait()
+        results.append(flight.do("preview-1", expensive))
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(results) == [("rendered", False)] * 5 + [("rendered", True)]
+    assert get_single_flight_stats()["test-threads"] == {"leaders": 1, "followers": 5, "cross_process_hits": 0}
+
+
+def test_leader_error_reaches_followers():
+    flight = SingleFlight("test-errors")
+    started = threading.Event()
+    errors = []
+
+    def failing():
+        started.set()
+        time.sleep(0.05)
+        raise RuntimeError("decode failed")
+
+    def follower():
+        started.wait()
+        try:
+            flight.do("broken", failing)
+        except RuntimeError as exc:
+            errors.append(str(exc))
+
+    thread = threading.Thread(target=follower)
+    thread.start()
+    with pytest.raises(RuntimeError):
+        flight.do("broken", failing)
+    thread.join()
+
+    assert errors == ["decode failed"]
+
+
+def test_async_flight_collapses_concurrent_coroutines():
+    flight = AsyncSingleFlight("test-async")
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return b"tile"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("tile-key", fetch) for _ in range(10)))
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert [result for result, _is_leader in results] == [b"tile"] * 10
+    assert sum(is_leader for _result, is_leader in results) == 1
+    assert get_single_flight_stats()["test-async"]["followers"] == 9
+
+
+def test_file_lock_serialises_holders_and_removes_lock_file(tmp_path):
+    lock_path = str(tmp_path / "locks" / "key.lock")
+    order = []
+    holder = FileLock(lock_path)
+    holder.acquire()
+
+    def contender():
+        with FileLock(lock_path):
+            order.append("contender")
+
+    thread = threading.Thread(target=contender)
+    thread.start()
+    time.sleep(0.1)
+    order.append("holder")
+    holder.release()
+    thread.join()
+
+    assert order == ["holder", "contender"]
+    assert not os.path.exists(lock_path)
+
+
+def test_async_file_lock_waits_without_a_thread_and_holds_nothing_when_cancelled(tmp_path):
+    lock_path = str(tmp_path / "locks" / "key.lock")
+    holder = FileLock(lock_path)
+    holder.acquire()
+
+    async def run():
+        cancelled = asyncio.create_task(FileLock(lock_path).acquire_async(poll_interval=0.01))
+        await asyncio.sleep(0.05)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+
+        waiter = FileLock(lock_path)
+        waiting = asyncio.create_task(waiter.acquire_async(poll_interval=0.01))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        holder.release()
+        # The cancelled contender holds nothing, so the waiter gets the lock.
+        await asyncio.wait_for(waiting, timeout=1)
+        assert not FileLock(lock_path).try_acquire()
+        waiter.release()
+
+        follower = FileLock(lock_path)
+        assert follower.try_acquire()
+        follower.release()
+
+    asyncio.run(run())
@@ -3,7 +3,7 @@ from io import BytesIO
 from pathlib import Path
 
 import pytest
-from fastapi import UploadFile
+from fastapi import Response, UploadFile
 
 from app import config as app_config
 from app.platform import three_d_source
@@ -177,7 +177,7 @@ def test_three_d_resource_subsystem_and_platform_adapter(db_session, test_upload
     assert three_d_summary.resource_count == 1
     assert three_d_summary.entrypoint == "/api/three-d/resources"
 
-    unified_resources = platform_router.get_resources(source_system=three_d_source.SOURCE_SYSTEM, db=db_session)
+    unified_resources = platform_router.get_resources(Response(), source_system=three_d_source.SOURCE_SYSTEM, db=db_session)
     assert len(unified_resources) == 1
     unified_resource = unified_resources[0]
     assert unified_resource.id == f"{three_d_source.SOURCE_SYSTEM}:{uploaded.id}"
@@ -264,7 +264,7 @@ def test_three_d_package_resource_stores_multiple_file_roles(db_session, test_up
     assert download_response.media_type == "application/zip"
     assert Path(download_response.path).exists()
 
-    unified_resources = platform_router.get_resources(source_system=three_d_source.SOURCE_SYSTEM, db=db_session)
+    unified_resources = platform_router.get_resources(Response(), source_system=three_d_source.SOURCE_SYSTEM, db=db_session)
     assert len(unified_resources) == 1
     assert unified_resources[0].profile_key == "package"
     assert unified_resources[0].resource_type == "three_d_package"
@@ -41,6 +41,9 @@ const PlatformDirectory: React.FC<PlatformDirectoryProps> = ({
   const [previewState, setPreviewState] = useState<string | undefined>();
   const [resourceType, setResourceType] = useState<string | undefined>();
   const [profileKey, setProfileKey] = useState<string | undefined>();
+  const [nextCursor, setNextCursor] = useState<string | undefined>();
+  const [filterParams, setFilterParams] = useState<Record<string, string | boolean>>({});
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const fetchDirectory = async (
     nextQuery = query,
@@ -65,11 +68,27 @@ const PlatformDirectory: React.FC<PlatformDirectoryProps> = ({
       ]);
       setSources(sourcesRes.data);
       setResources(resourcesRes.data);
+      setFilterParams(params);
+      setNextCursor(resourcesRes.headers['x-next-cursor'] || undefined);
     } finally {
       setLoading(false);
     }
   };
 
+  const fetchMoreResources = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const res = await axios.get<UnifiedResourceSummary[]>('/api/platform/resources', {
+        params: { ...filterParams, cursor: nextCursor },
+      });
+      setResources((current) => [...current, ...res.data]);
+      setNextCursor(res.headers['x-next-cursor'] || undefined);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     void fetchDirectory();
     // eslint-disable-next-line react-hooks/exhaustive-deps
@@ -264,6 +283,16 @@ const PlatformDirectory: React.FC<PlatformDirectoryProps> = ({
           columns={columns}
           pagination={{ pageSize: 10 }}
         />
+        {nextCursor && (
+          <Button
+            data-testid="platform-load-more"
+            style={{ marginTop: 16 }}
+            loading={loadingMore}
+            onClick={() => void fetchMoreResources()}
+          >
+            加载更多
+          </Button>
+        )}
       </Card>
     </Space>
   );
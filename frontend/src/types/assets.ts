@@ -321,6 +321,7 @@ export interface FaceRecognitionFaceResult {
   score: number;
   bbox: number[];
   cluster_id?: string | null;
+  margin?: number | null;
 }
 
 export interface FaceRecognitionMetadata {